@@ -24,6 +24,9 @@ from dataclasses import dataclass
 import re
 from urllib.parse import urljoin, urlparse
 
+sys.path.append(str(Path(__file__).parent.parent))
+from analysis.keyword_matcher import KeywordMatcher
+
 @dataclass
 class Publication:
     title: str
@@ -85,6 +88,7 @@ class AcademicRadar:
         # Load configuration
         self.load_target_professors()
         self.research_keywords = self.get_research_keywords()
+        self.research_matcher = KeywordMatcher(self.research_keywords)
         
         # Rate limiting
         self.last_request_time = {}
@@ -282,9 +286,8 @@ class AcademicRadar:
                     
                     for item in data.get('items', []):
                         # Calculate relevance based on research keywords
-                        description = item.get('description', '').lower()
-                        readme_relevance = sum(1 for keyword in self.research_keywords 
-                                             if keyword in description)
+                        description = item.get('description') or ''
+                        readme_relevance = len(self.research_matcher.match(description))
                         
                         if readme_relevance > 0:  # Only include relevant repos
                             repo = GitHubRepo(
@@ -446,7 +449,7 @@ class AcademicRadar:
             # Research interest alignment
             common_interests = [
                 interest for interest in professor.research_interests
-                if any(keyword in interest.lower() for keyword in self.research_keywords)
+                if self.research_matcher.match(interest)
             ]
             
             if common_interests:
@@ -19,6 +19,9 @@ from datetime import datetime
 from typing import Dict, List, Any, Optional
 from collections import defaultdict
 
+sys.path.append(str(Path(__file__).parent.parent))
+from monitoring.dashboard import update_dashboard_section
+
 # 設定日誌
 logging.basicConfig(
     level=logging.INFO,
@@ -369,18 +372,20 @@ class BudgetAnalyzer:
             # 生成成本比較
             comparisons = self.generate_cost_comparison(schools)
             
-            # 渲染報告
-            markdown = self.render_markdown_report(app_costs, comparisons)
-            
-            # 附加到 dashboard
-            if Path(self.dashboard_file).exists():
-                with open(self.dashboard_file, 'a', encoding='utf-8') as f:
-                    f.write('\n\n---\n\n')
-                    f.write(markdown)
-            else:
-                with open(self.dashboard_file, 'w', encoding='utf-8') as f:
-                    f.write('# 申請進度儀表板\n\n')
-                    f.write(markdown)
+            # 只在資料變更時重新渲染並替換 dashboard 的財務區塊
+            changed = update_dashboard_section(
+                'budget', '財務規劃',
+                inputs={
+                    'application_costs': app_costs,
+                    'comparisons': comparisons,
+                    'exchange_rates': self.exchange_rates,
+                    'live_rates': self.use_live_rates
+                },
+                render=lambda: self.render_markdown_report(app_costs, comparisons),
+                output_dir=Path(self.dashboard_file).parent
+            )
+            if not changed:
+                self.logger.info("財務資料沒有變更，dashboard 不需更新")
             
             self.logger.info(f"Dashboard 已更新: {self.dashboard_file}")
             
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Compiled Multi-Pattern Keyword Matcher
+
+Features:
+- Aho-Corasick automaton over word tokens, compiled once and reused
+- Word-boundary matching ("ai" does not match "chair")
+- Synonyms and light plural stemming ("cyber security" == "cybersecurity")
+- One scan per text returns every matched term with its weight and label
+- Scoring counts each text span and each synonym group once
+- CJK characters are matched character by character (no word boundaries)
+"""
+
+import re
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Any, Iterable, Tuple, Union
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+|[\u3400-\u9fff\uf900-\ufaff]')
+
+# Common spelling variants in this project's interest profiles
+DEFAULT_SYNONYMS = {
+    'cybersecurity': ['cyber security', 'cyber-security', 'it security'],
+    'artificial intelligence': ['ai'],
+    'machine learning': ['ml'],
+    'post-quantum cryptography': ['pqc'],
+    'information security': ['infosec'],
+}
+
+
+def stem(token: str) -> str:
+    """Light stemming: fold plural forms onto the singular"""
+    if len(token) <= 3 or not token.isascii():
+        return token
+    if token.endswith('ies'):
+        return token[:-3] + 'y'
+    if token.endswith('sses'):
+        return token[:-2]
+    if token.endswith('s') and not token.endswith(('ss', 'us', 'is')):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str, use_stemming: bool = True) -> List[str]:
+    """Lowercase and split text into (optionally stemmed) word tokens"""
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    if use_stemming:
+        return [stem(token) for token in tokens]
+    return tokens
+
+
+@dataclass
+class KeywordMatch:
+    term: str
+    weight: float
+    labels: List[str] = field(default_factory=list)
+    count: int = 0
+    surfaces: List[str] = field(default_factory=list)
+
+
+class KeywordMatcher:
+    """Aho-Corasick keyword matcher over word tokens"""
+
+    def __init__(
+        self,
+        terms: Union[Iterable[str], Dict[str, float], None] = None,
+        synonyms: Optional[Dict[str, List[str]]] = None,
+        use_stemming: bool = True
+    ):
+        """
+        Args:
+            terms: Terms to match, or a term -> weight mapping
+            synonyms: Canonical term -> alternative spellings
+            use_stemming: Fold plural forms before matching
+        """
+        self.use_stemming = use_stemming
+        self.synonyms = {k.lower(): v for k, v in (DEFAULT_SYNONYMS if synonyms is None else synonyms).items()}
+
+        # term -> (weight, labels)
+        self.terms: Dict[str, Tuple[float, List[str]]] = {}
+        self._compiled = False
+
+        if isinstance(terms, dict):
+            for term, weight in terms.items():
+                self.add(term, weight)
+        elif terms:
+            for term in terms:
+                self.add(term)
+
+    @classmethod
+    def from_profile(cls, profile: Dict[str, Any]) -> 'KeywordMatcher':
+        """
+        Build the interest matcher from my_profile.yml
+
+        Weights: primary 2.0, secondary 1.5, keywords 1.0. Optional
+        academic_interests.synonyms extends the default synonyms.
+        """
+        interests = (profile or {}).get('academic_interests', {})
+        synonyms = dict(DEFAULT_SYNONYMS)
+        synonyms.update(interests.get('synonyms', {}) or {})
+
+        matcher = cls(synonyms=synonyms)
+        # Add lower weights first so a term listed twice keeps the highest weight
+        for key, weight in (('keywords', 1.0), ('secondary', 1.5), ('primary', 2.0)):
+            for term in interests.get(key, []) or []:
+                matcher.add(term, weight)
+        return matcher
+
+    def add(self, term: str, weight: float = 1.0, label: Optional[str] = None) -> None:
+        """
+        Register a term (the automaton is rebuilt lazily on the next scan)
+
+        Adding the same term again updates its weight; labels accumulate, so
+        one word can count towards several groups.
+        """
+        labels = list(self.terms[term][1]) if term in self.terms else []
+        if label is not None and label not in labels:
+            labels.append(label)
+        self.terms[term] = (weight, labels)
+        self._compiled = False
+
+    def _variants(self, term: str) -> List[str]:
+        """The term plus all of its synonyms (in both directions)"""
+        lowered = term.lower()
+        variants = [term]
+        variants.extend(self.synonyms.get(lowered, []))
+        for canonical, alternatives in self.synonyms.items():
+            if lowered in (a.lower() for a in alternatives):
+                variants.append(canonical)
+        return variants
+
+    def canonical(self, term: str) -> str:
+        """Group key shared by a term and its synonyms ("AI" -> "artificial intelligence")"""
+        lowered = term.lower()
+        if lowered not in self.synonyms:
+            for canonical, alternatives in self.synonyms.items():
+                if lowered in (a.lower() for a in alternatives):
+                    lowered = canonical
+                    break
+        return ' '.join(tokenize(lowered, self.use_stemming))
+
+    def compile(self) -> None:
+        """Build the Aho-Corasick automaton"""
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Per node: (term, token length of the matched variant)
+        self._output: List[List[Tuple[str, int]]] = [[]]
+
+        for term in self.terms:
+            for variant in self._variants(term):
+                tokens = tokenize(variant, self.use_stemming)
+                if not tokens:
+                    continue
+                node = 0
+                for token in tokens:
+                    if token not in self._goto[node]:
+                        self._goto.append({})
+                        self._fail.append(0)
+                        self._output.append([])
+                        self._goto[node][token] = len(self._goto) - 1
+                    node = self._goto[node][token]
+                if (term, len(tokens)) not in self._output[node]:
+                    self._output[node].append((term, len(tokens)))
+
+        # Breadth-first construction of failure links
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for token, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(token, 0)
+                self._output[child].extend(
+                    out for out in self._output[self._fail[child]] if out not in self._output[child]
+                )
+
+        self._compiled = True
+
+    def _scan(self, text: str) -> Tuple[List[str], List[Tuple[str, int, int]]]:
+        """
+        Run the automaton over text
+
+        Returns:
+            (raw tokens, occurrences as (term, first token index, last token index))
+        """
+        if not text or not self.terms:
+            return [], []
+        if not self._compiled:
+            self.compile()
+
+        raw_tokens = TOKEN_PATTERN.findall(text.lower())
+        occurrences: List[Tuple[str, int, int]] = []
+        node = 0
+
+        for index, raw in enumerate(raw_tokens):
+            token = stem(raw) if self.use_stemming else raw
+            while node and token not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(token, 0)
+            occurrences.extend((term, index - length + 1, index) for term, length in self._output[node])
+
+        return raw_tokens, occurrences
+
+    def match(self, text: str) -> List[KeywordMatch]:
+        """
+        Scan text once and return every matched term
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            Matches ordered by first occurrence
+        """
+        raw_tokens, occurrences = self._scan(text)
+        matches: Dict[str, KeywordMatch] = {}
+
+        for term, start, end in occurrences:
+            weight, labels = self.terms[term]
+            found = matches.get(term)
+            if found is None:
+                found = matches[term] = KeywordMatch(term=term, weight=weight, labels=list(labels))
+            found.count += 1
+            words = raw_tokens[start:end + 1]
+            surface = ('' if not words[0].isascii() else ' ').join(words)
+            if surface not in found.surfaces:
+                found.surfaces.append(surface)
+
+        return list(matches.values())
+
+    def score(self, text: str) -> Tuple[float, List[str]]:
+        """
+        Sum the weights of matched terms, counting each span and synonym group once
+
+        Overlapping matches keep only the highest-weight term ("cyber security"
+        counts as Cybersecurity, not also as Cyber and Security), and terms that
+        are synonyms of each other ("AI", "Artificial Intelligence") score once,
+        so spelling variants of a name score the same.
+
+        Returns:
+            (score, matched terms)
+        """
+        _, occurrences = self._scan(text)
+        # Highest weight first, then the longer span
+        occurrences.sort(key=lambda o: (-self.terms[o[0]][0], o[1] - o[2], o[1]))
+
+        taken: List[Tuple[int, int]] = []
+        groups: Dict[str, Tuple[int, str]] = {}
+        for term, start, end in occurrences:
+            if any(start <= other_end and other_start <= end for other_start, other_end in taken):
+                continue
+            taken.append((start, end))
+            # The first term kept for a synonym group has the group's highest weight
+            groups.setdefault(self.canonical(term), (start, term))
+
+        terms = [term for _, term in sorted(groups.values())]
+        return sum(self.terms[term][0] for term in terms), terms
+
+    def label_counts(self, text: str) -> Dict[str, int]:
+        """Total occurrences per label (e.g. per theme)"""
+        counts: Dict[str, int] = {}
+        for m in self.match(text):
+            for label in m.labels:
+                counts[label] = counts.get(label, 0) + m.count
+        return counts
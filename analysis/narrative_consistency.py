@@ -21,6 +21,9 @@ from pathlib import Path
 from dataclasses import dataclass
 import re
 
+sys.path.append(str(Path(__file__).parent.parent))
+from analysis.keyword_matcher import KeywordMatcher
+
 @dataclass
 class NarrativeElement:
     document_type: str  # CV, SOP, Recommendation
@@ -51,6 +54,7 @@ class NarrativeConsistencyChecker:
         # Load narrative configuration
         self.load_narrative_profile()
         self.setup_llm_integration()
+        self.build_keyword_matchers()
     
     def load_narrative_profile(self):
         """Load user's core narrative themes and keywords"""
@@ -122,15 +126,9 @@ class NarrativeConsistencyChecker:
             print(f"⚠️  Could not read {file_path}: {e}")
             return ""
     
-    def analyze_document_themes(self, content: str, doc_type: str) -> NarrativeElement:
-        """Analyze themes and emphasis in a document"""
-        # Extract key themes based on content analysis
-        themes = []
-        keywords = []
-        emphasis = []
-        
-        # Theme detection based on keywords
-        theme_keywords = {
+    def build_keyword_matchers(self):
+        """Compile theme, technical keyword and tone matchers once"""
+        self.theme_keywords = {
             '成長曲線': ['growth', 'improvement', 'development', 'progression', 'advancement', 'evolution', 'learning'],
             '雲端安全架構': ['cloud', 'security', 'architecture', 'infrastructure', 'AWS', 'cybersecurity', 'defense'],
             '量子計算潛力': ['quantum', 'computing', 'cryptography', 'post-quantum', 'algorithm', 'qiskit'],
@@ -138,33 +136,47 @@ class NarrativeConsistencyChecker:
             '實務導向創新': ['practical', 'implementation', 'real-world', 'industry', 'application', 'solution']
         }
         
-        content_lower = content.lower()
+        self.theme_matcher = KeywordMatcher(synonyms={})
+        for theme, theme_words in self.theme_keywords.items():
+            for word in theme_words:
+                self.theme_matcher.add(word, label=theme)
+        
+        self.tech_matcher = KeywordMatcher([
+            'python', 'cybersecurity', 'machine learning', 'ai', 'cloud', 'security',
+            'quantum', 'cryptography', 'blockchain', 'devops', 'automation',
+            'leadership', 'management', 'consulting', 'architecture', 'engineering'
+        ])
+        
+        self.tone_matcher = KeywordMatcher(synonyms={}, use_stemming=False)
+        for word in ['furthermore', 'therefore', 'consequently', 'moreover', 'research', 'academic']:
+            self.tone_matcher.add(word, label='formal')
+        for word in ['i', 'my', 'personally', 'believe', 'passion', 'excited', 'dream']:
+            self.tone_matcher.add(word, label='personal')
+    
+    def analyze_document_themes(self, content: str, doc_type: str) -> NarrativeElement:
+        """Analyze themes and emphasis in a document"""
+        # Extract key themes based on content analysis
+        themes = []
+        emphasis = []
+        
+        # Theme detection based on keywords (one scan, counts per theme)
+        theme_counts = self.theme_matcher.label_counts(content)
         
-        for theme, theme_words in theme_keywords.items():
-            if any(word in content_lower for word in theme_words):
+        for theme in self.theme_keywords:
+            frequency = theme_counts.get(theme, 0)
+            if frequency:
                 themes.append(theme)
                 # Count frequency for emphasis
-                frequency = sum(content_lower.count(word) for word in theme_words)
                 if frequency >= 3:
                     emphasis.append(theme)
         
         # Extract key technical keywords
-        tech_keywords = [
-            'python', 'cybersecurity', 'machine learning', 'ai', 'cloud', 'security',
-            'quantum', 'cryptography', 'blockchain', 'devops', 'automation',
-            'leadership', 'management', 'consulting', 'architecture', 'engineering'
-        ]
-        
-        for keyword in tech_keywords:
-            if keyword in content_lower:
-                keywords.append(keyword)
+        keywords = [m.term for m in self.tech_matcher.match(content)]
         
         # Analyze tone (simplified)
-        formal_indicators = ['furthermore', 'therefore', 'consequently', 'moreover', 'research', 'academic']
-        personal_indicators = ['i', 'my', 'personally', 'believe', 'passion', 'excited', 'dream']
-        
-        formal_count = sum(content_lower.count(word) for word in formal_indicators)
-        personal_count = sum(content_lower.count(word) for word in personal_indicators)
+        tone_counts = self.tone_matcher.label_counts(content)
+        formal_count = tone_counts.get('formal', 0)
+        personal_count = tone_counts.get('personal', 0)
         
         if formal_count > personal_count:
             tone = "formal_academic"
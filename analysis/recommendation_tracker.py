@@ -17,6 +17,9 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
 from jinja2 import Template
 
+sys.path.append(str(Path(__file__).parent.parent))
+from monitoring.dashboard import update_dashboard_section
+
 # 設定日誌
 logging.basicConfig(
     level=logging.INFO,
@@ -383,19 +386,15 @@ class RecommendationTracker:
             status_table = self.generate_status_table()
             overdue_items = self.check_overdue_items()
             
-            markdown = self.render_markdown_table(status_table)
-            markdown += self.render_overdue_section(overdue_items)
-            
-            # 如果 dashboard 存在，附加內容
-            if Path(self.dashboard_file).exists():
-                with open(self.dashboard_file, 'a', encoding='utf-8') as f:
-                    f.write('\n\n---\n\n')
-                    f.write(markdown)
-            else:
-                # 建立新 dashboard
-                with open(self.dashboard_file, 'w', encoding='utf-8') as f:
-                    f.write('# 申請進度儀表板\n\n')
-                    f.write(markdown)
+            # 只在資料變更時重新渲染並替換 dashboard 的推薦信區塊
+            changed = update_dashboard_section(
+                'recommendations', '推薦信狀態',
+                inputs={'status_table': status_table, 'overdue_items': overdue_items},
+                render=lambda: self.render_markdown_table(status_table) + self.render_overdue_section(overdue_items),
+                output_dir=Path(self.dashboard_file).parent
+            )
+            if not changed:
+                self.logger.info("推薦信資料沒有變更，dashboard 不需更新")
             
             self.logger.info(f"Dashboard 已更新: {self.dashboard_file}")
             return True
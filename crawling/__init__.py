@@ -0,0 +1,20 @@
+"""
+共用爬蟲基礎設施模組
+Shared Crawler Infrastructure
+"""
+
+from .page_pool import BrowserPool
+from .resource_policy import ResourcePolicy, lightweight_context_options
+from .readiness import ReadinessTracker, ReadyCondition
+from .selector_health import SelectorHealth
+from .http_fetcher import HttpFetcher
+
+__all__ = [
+    'BrowserPool',
+    'ResourcePolicy',
+    'lightweight_context_options',
+    'ReadinessTracker',
+    'ReadyCondition',
+    'SelectorHealth',
+    'HttpFetcher',
+]
@@ -0,0 +1,242 @@
+"""
+HTTP 優先的頁面抓取
+HTTP-First Fetching with Browser Escalation
+
+功能：
+- 以共用連線池的非同步 HTTP 客戶端（httpx）抓取伺服器端渲染的頁面
+- 以 ETag / Last-Modified 發送條件式 GET，未變更的頁面回應 304 不需下載內容
+- 記錄需要 JavaScript 才能渲染的網站，之後直接交給瀏覽器
+- 未安裝 httpx 時停用，呼叫端一律使用瀏覽器
+"""
+
+import re
+import json
+import time
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+from urllib.parse import urlparse
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+from .page_pool import DEFAULT_USER_AGENT
+
+
+DEFAULT_CACHE_FILE = Path('logs/http_validators.json')
+
+# 客戶端渲染頁面的常見特徵
+JS_SHELL_PATTERNS = [
+    re.compile(r'<div[^>]+id="(root|app|__nuxt)"[^>]*>\s*</div>', re.IGNORECASE),
+    re.compile(r'(enable|requires?)\s+javascript', re.IGNORECASE),
+]
+
+
+@dataclass
+class FetchResult:
+    """單次 HTTP 抓取結果"""
+    url: str
+    status: int
+    html: Optional[str] = None      # 304 時為 None
+    not_modified: bool = False
+    elapsed_ms: float = 0.0
+    error: Optional[str] = None
+
+
+def visible_text_length(html: str) -> int:
+    """粗略估計 HTML 的可見文字長度（移除 script / style / 標籤）"""
+    text = re.sub(r'<(script|style|noscript|template)[^>]*>.*?</\1>', ' ', html, flags=re.IGNORECASE | re.DOTALL)
+    text = re.sub(r'<[^>]+>', ' ', text)
+    return len(re.sub(r'\s+', ' ', text).strip())
+
+
+def looks_js_rendered(html: str, min_text: int = 200) -> bool:
+    """
+    判斷頁面是否需要 JavaScript 才能顯示內容
+
+    Args:
+        html: 原始 HTML
+        min_text: 可見文字少於此長度時視為殼頁面
+
+    Returns:
+        是否需要瀏覽器渲染
+    """
+    text_length = visible_text_length(html)
+    if text_length < min_text:
+        return True
+    return text_length < min_text * 5 and any(p.search(html) for p in JS_SHELL_PATTERNS)
+
+
+class HttpFetcher:
+    """共用連線池的條件式 GET 抓取器"""
+
+    def __init__(
+        self,
+        cache_file: Optional[Path] = None,
+        timeout: float = 15.0,
+        max_connections: int = 10,
+        needs_js_days: int = 30
+    ):
+        """
+        初始化抓取器
+
+        Args:
+            cache_file: 驗證資訊（ETag / Last-Modified）與需要 JS 的網站紀錄
+            timeout: 請求逾時（秒）
+            max_connections: 連線池上限
+            needs_js_days: 網站被標記為需要 JS 後，多久重新嘗試 HTTP
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.cache_file = Path(cache_file or DEFAULT_CACHE_FILE)
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.needs_js_ttl = timedelta(days=needs_js_days)
+        self.cache: Dict[str, Dict[str, Any]] = self._load()
+        self.client = None
+        self._touched: set = set()
+        self._host_locks: Dict[str, asyncio.Lock] = {}
+
+    @property
+    def available(self) -> bool:
+        """是否可使用 HTTP 快速路徑"""
+        return httpx is not None
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        """載入驗證資訊"""
+        empty = {'validators': {}, 'needs_js': {}}
+        if not self.cache_file.exists():
+            return empty
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                return {**empty, **json.load(f)}
+        except Exception as e:
+            self.logger.debug(f"載入 HTTP 驗證資訊失敗: {e}")
+            return empty
+
+    def save(self) -> None:
+        """儲存驗證資訊（只覆寫本次更新的項目）"""
+        if not self._touched:
+            return
+        try:
+            merged = self._load()
+            for section, key in self._touched:
+                if key in self.cache[section]:
+                    merged[section][key] = self.cache[section][key]
+                else:
+                    merged[section].pop(key, None)
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.cache_file, 'w', encoding='utf-8') as f:
+                json.dump(merged, f, indent=2, sort_keys=True)
+            self._touched.clear()
+        except Exception as e:
+            self.logger.debug(f"儲存 HTTP 驗證資訊失敗: {e}")
+
+    async def __aenter__(self) -> 'HttpFetcher':
+        if self.available and self.client is None:
+            self.client = httpx.AsyncClient(
+                follow_redirects=True,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                ),
+                headers={'User-Agent': DEFAULT_USER_AGENT, 'Accept': 'text/html,application/xhtml+xml'}
+            )
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """關閉連線池並儲存驗證資訊"""
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+        self.save()
+
+    def needs_js(self, url: str) -> bool:
+        """網站是否已知需要 JavaScript（標記過期後重新嘗試 HTTP）"""
+        marked_at = self.cache['needs_js'].get(urlparse(url).netloc)
+        if not marked_at:
+            return False
+        return datetime.now() - datetime.fromisoformat(marked_at) < self.needs_js_ttl
+
+    def mark_needs_js(self, url: str, needs_js: bool = True) -> None:
+        """標記（或取消標記）網站需要 JavaScript"""
+        host = urlparse(url).netloc
+        if needs_js:
+            self.cache['needs_js'][host] = datetime.now().isoformat()
+            self.logger.info(f"{host} 需要瀏覽器渲染，之後直接使用瀏覽器")
+        else:
+            self.cache['needs_js'].pop(host, None)
+        self._touched.add(('needs_js', host))
+
+    def forget(self, url: str) -> None:
+        """移除網址的驗證資訊（下次一定取得完整內容）"""
+        self.cache['validators'].pop(url, None)
+        self._touched.add(('validators', url))
+
+    async def fetch(self, url: str, conditional: bool = True) -> FetchResult:
+        """
+        抓取頁面（同一網站的請求依序進行）
+
+        Args:
+            url: 目標 URL
+            conditional: 是否使用條件式 GET
+
+        Returns:
+            抓取結果；失敗時 status 為 0 並附上 error
+        """
+        if self.client is None:
+            return FetchResult(url=url, status=0, error='HTTP client not available')
+
+        headers = {}
+        validators = self.cache['validators'].get(url, {}) if conditional else {}
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+
+        lock = self._host_locks.setdefault(urlparse(url).netloc, asyncio.Lock())
+        started = time.monotonic()
+        try:
+            async with lock:
+                response = await self.client.get(url, headers=headers)
+        except Exception as e:
+            return FetchResult(url=url, status=0, elapsed_ms=(time.monotonic() - started) * 1000, error=str(e))
+
+        elapsed_ms = round((time.monotonic() - started) * 1000, 1)
+        if response.status_code == 304:
+            return FetchResult(url=url, status=304, not_modified=True, elapsed_ms=elapsed_ms)
+
+        if response.status_code == 200:
+            etag, last_modified = response.headers.get('etag'), response.headers.get('last-modified')
+            if etag or last_modified:
+                self.cache['validators'][url] = {'etag': etag, 'last_modified': last_modified}
+                self._touched.add(('validators', url))
+            elif url in self.cache['validators']:
+                self.forget(url)
+            return FetchResult(url=url, status=200, html=response.text, elapsed_ms=elapsed_ms)
+
+        return FetchResult(url=url, status=response.status_code, elapsed_ms=elapsed_ms,
+                           error=f"HTTP {response.status_code}")
+
+    async def fetch_many(self, urls: List[str], conditional: bool = True) -> Dict[str, FetchResult]:
+        """
+        並行抓取多個頁面（不同網站並行，同一網站依序）
+
+        Args:
+            urls: 目標 URL 清單
+            conditional: 是否使用條件式 GET
+
+        Returns:
+            URL -> 抓取結果
+        """
+        unique = list(dict.fromkeys(urls))
+        results = await asyncio.gather(*(self.fetch(url, conditional) for url in unique))
+        return dict(zip(unique, results))
@@ -0,0 +1,124 @@
+"""
+Playwright 瀏覽器 Context 池
+Bounded Browser Context Pool
+
+功能：
+- 在單一瀏覽器程序上維護有上限的 context 池
+- 依網站設定並行上限（politeness）
+- 以 async context manager 借出 / 歸還 Page
+"""
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional, AsyncIterator, List, TYPE_CHECKING
+from playwright.async_api import Browser, BrowserContext, Page
+
+if TYPE_CHECKING:
+    from .resource_policy import ResourcePolicy
+
+
+DEFAULT_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+
+class BrowserPool:
+    """有上限的瀏覽器 context 池"""
+
+    def __init__(
+        self,
+        browser: Browser,
+        max_contexts: int = 4,
+        per_site_limits: Optional[Dict[str, int]] = None,
+        default_site_limit: int = 2,
+        context_options: Optional[Dict[str, Any]] = None,
+        resource_policy: Optional['ResourcePolicy'] = None
+    ):
+        """
+        初始化 context 池
+
+        Args:
+            browser: 已啟動的 Playwright Browser
+            max_contexts: 同時存在的 context 上限
+            per_site_limits: 各網站的並行上限（key 為網站名稱）
+            default_site_limit: 未設定網站的預設並行上限
+            context_options: 建立 context 時的參數
+            resource_policy: 套用至每個 context 的資源攔截政策（可選）
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.browser = browser
+        self.max_contexts = max(1, max_contexts)
+        self.per_site_limits = per_site_limits or {}
+        self.default_site_limit = max(1, default_site_limit)
+        self.context_options = context_options or {'user_agent': DEFAULT_USER_AGENT}
+        self.resource_policy = resource_policy
+
+        self._slots = asyncio.Semaphore(self.max_contexts)
+        self._site_slots: Dict[str, asyncio.Semaphore] = {}
+        self._idle: List[BrowserContext] = []
+        self._all: List[BrowserContext] = []
+        self._closed = False
+
+    def site_semaphore(self, site: str) -> asyncio.Semaphore:
+        """取得網站的並行限制 semaphore"""
+        if site not in self._site_slots:
+            limit = self.per_site_limits.get(site, self.default_site_limit)
+            self._site_slots[site] = asyncio.Semaphore(max(1, min(limit, self.max_contexts)))
+        return self._site_slots[site]
+
+    async def _checkout_context(self) -> BrowserContext:
+        """取出閒置 context，沒有則建立新的"""
+        if self._idle:
+            return self._idle.pop()
+
+        context = await self.browser.new_context(**self.context_options)
+        if self.resource_policy:
+            await self.resource_policy.apply(context)
+        self._all.append(context)
+        self.logger.debug(f"建立新的 context（共 {len(self._all)} 個）")
+        return context
+
+    @asynccontextmanager
+    async def page(self, site: str = 'default') -> AsyncIterator[Page]:
+        """
+        借出一個 Page，結束後自動歸還 context
+
+        Args:
+            site: 網站名稱（用於並行上限）
+
+        Yields:
+            Playwright Page 物件
+        """
+        if self._closed:
+            raise RuntimeError("BrowserPool 已關閉")
+
+        async with self.site_semaphore(site):
+            async with self._slots:
+                context = await self._checkout_context()
+                page = await context.new_page()
+                try:
+                    yield page
+                finally:
+                    try:
+                        await page.close()
+                    except Exception as e:
+                        self.logger.debug(f"關閉 Page 失敗: {e}")
+
+                    if self._closed:
+                        await self._close_context(context)
+                    else:
+                        self._idle.append(context)
+
+    async def _close_context(self, context: BrowserContext) -> None:
+        """關閉單一 context"""
+        try:
+            await context.close()
+        except Exception as e:
+            self.logger.debug(f"關閉 context 失敗: {e}")
+
+    async def close(self) -> None:
+        """關閉所有 context（瀏覽器本身由呼叫端負責）"""
+        self._closed = True
+        for context in self._all:
+            await self._close_context(context)
+        self._idle.clear()
+        self._all.clear()
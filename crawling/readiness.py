@@ -0,0 +1,237 @@
+"""
+事件驅動的頁面就緒偵測
+Event-Driven Page Readiness
+
+功能：
+- 依目標設定就緒條件（選擇器出現、結果數量穩定、文字穩定、特定 XHR 完成）
+- 依過去載入時間自動調整逾時（adaptive timeout）
+- 記錄每個目標的實際就緒延遲
+"""
+
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from playwright.async_api import Page, Response
+
+
+DEFAULT_STATS_FILE = Path('logs/readiness_stats.json')
+
+
+@dataclass
+class ReadyCondition:
+    """頁面就緒條件"""
+    selector: Optional[str] = None          # 需出現的選擇器
+    min_count: int = 1                      # 選擇器最少元素數
+    stable_ms: int = 0                      # 元素數量（或文字長度）需維持不變的毫秒數
+    text_stable: bool = False               # 以 body 文字長度穩定作為條件
+    response_pattern: Optional[str] = None  # 需完成的回應 URL 子字串
+
+
+class ReadinessTracker:
+    """追蹤各目標的就緒延遲並提供自適應逾時"""
+
+    def __init__(
+        self,
+        stats_file: Optional[Path] = None,
+        min_timeout: int = 2000,
+        max_timeout: int = 30000,
+        max_samples: int = 50
+    ):
+        """
+        初始化追蹤器
+
+        Args:
+            stats_file: 延遲統計檔案
+            min_timeout: 自適應逾時下限（毫秒）
+            max_timeout: 自適應逾時上限（毫秒）
+            max_samples: 每個目標保留的樣本數
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.stats_file = Path(stats_file or DEFAULT_STATS_FILE)
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.max_samples = max_samples
+        self.samples: Dict[str, List[float]] = self._load()
+        # 逾時次數另外計算，不進入延遲百分位數（否則一次空結果頁就會拉高之後的逾時）
+        self.failures: Dict[str, int] = {}
+        self._touched: set = set()
+
+    def _load(self) -> Dict[str, List[float]]:
+        """載入延遲統計"""
+        if not self.stats_file.exists():
+            return {}
+        try:
+            with open(self.stats_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            self.logger.debug(f"載入就緒統計失敗: {e}")
+            return {}
+
+    def save(self) -> None:
+        """儲存延遲統計（只覆寫本次更新的目標）"""
+        if not self._touched:
+            return
+        try:
+            merged = self._load()
+            for target in self._touched:
+                merged[target] = self.samples[target]
+            self.stats_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.stats_file, 'w', encoding='utf-8') as f:
+                json.dump(merged, f, indent=2)
+            self._touched.clear()
+        except Exception as e:
+            self.logger.debug(f"儲存就緒統計失敗: {e}")
+
+    def record(self, target: str, latency_ms: float) -> None:
+        """記錄一次就緒延遲"""
+        samples = self.samples.setdefault(target, [])
+        samples.append(round(latency_ms, 1))
+        del samples[:-self.max_samples]
+        self._touched.add(target)
+
+    def timeout_for(self, target: str, default: int) -> int:
+        """
+        取得目標的自適應逾時
+
+        樣本不足時使用預設值；否則為 p95 延遲的 2.5 倍，限制在上下限之間。
+
+        Args:
+            target: 目標名稱
+            default: 預設逾時（毫秒）
+
+        Returns:
+            逾時（毫秒）
+        """
+        samples = self.samples.get(target, [])
+        if len(samples) < 5:
+            return default
+        ordered = sorted(samples)
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        return int(max(self.min_timeout, min(self.max_timeout, p95 * 2.5)))
+
+    async def _wait_stable(self, page: Page, condition: ReadyCondition, deadline: float) -> bool:
+        """等待元素數量或文字長度在 stable_ms 內維持不變"""
+        last_value, stable_since = None, time.monotonic()
+        while time.monotonic() < deadline:
+            if condition.text_stable:
+                value = await page.evaluate('() => document.body ? document.body.innerText.length : 0')
+                enough = value > 0
+            else:
+                value = await page.locator(condition.selector).count()
+                enough = value >= condition.min_count
+
+            now = time.monotonic()
+            if value != last_value:
+                last_value, stable_since = value, now
+            elif enough and (now - stable_since) * 1000 >= condition.stable_ms:
+                return True
+            await asyncio.sleep(0.1)
+        return False
+
+    async def wait(
+        self,
+        page: Page,
+        target: str,
+        condition: ReadyCondition,
+        default_timeout: int = 15000,
+        started: Optional[float] = None,
+        response_task: Optional['asyncio.Future'] = None
+    ) -> bool:
+        """
+        等待頁面符合就緒條件
+
+        Args:
+            page: Playwright Page 物件
+            target: 目標名稱（用於統計與日誌）
+            condition: 就緒條件
+            default_timeout: 樣本不足時的逾時（毫秒）
+            started: 開始計時的 time.monotonic()（預設為現在）
+            response_task: 事先建立的等待回應 task（goto 前建立）
+
+        Returns:
+            是否在逾時前就緒
+        """
+        started = started or time.monotonic()
+        timeout = self.timeout_for(target, default_timeout)
+        deadline = started + timeout / 1000
+        ready = True
+
+        try:
+            if response_task is not None:
+                remaining = max(0.1, deadline - time.monotonic())
+                await asyncio.wait_for(response_task, timeout=remaining)
+
+            if condition.selector:
+                remaining = max(100, int((deadline - time.monotonic()) * 1000))
+                await page.wait_for_selector(condition.selector, timeout=remaining, state='attached')
+
+            if condition.stable_ms and (condition.selector or condition.text_stable):
+                ready = await self._wait_stable(page, condition, deadline)
+        except Exception as e:
+            self.logger.debug(f"[{target}] 等待就緒失敗: {e}")
+            ready = False
+        finally:
+            if response_task is not None and not response_task.done():
+                response_task.cancel()
+
+        latency_ms = (time.monotonic() - started) * 1000
+
+        if ready:
+            self.record(target, latency_ms)
+            self.logger.info(f"[{target}] 頁面就緒 {latency_ms:.0f} ms（逾時 {timeout} ms）")
+        else:
+            self.failures[target] = self.failures.get(target, 0) + 1
+            self.logger.warning(
+                f"[{target}] 頁面未在 {timeout} ms 內就緒（{latency_ms:.0f} ms，本次第 {self.failures[target]} 次）"
+            )
+        return ready
+
+    async def goto(
+        self,
+        page: Page,
+        url: str,
+        target: str,
+        condition: ReadyCondition,
+        default_timeout: int = 15000,
+        navigation_timeout: int = 30000
+    ) -> Tuple[Optional[Response], bool]:
+        """
+        導航並等待就緒（以 domcontentloaded 取代 networkidle + 固定等待）
+
+        Args:
+            page: Playwright Page 物件
+            url: 目標 URL
+            target: 目標名稱
+            condition: 就緒條件
+            default_timeout: 就緒逾時（毫秒）
+            navigation_timeout: 導航逾時（毫秒）
+
+        Returns:
+            (導航回應, 是否就緒)
+        """
+        started = time.monotonic()
+        response_task = None
+        if condition.response_pattern:
+            pattern = condition.response_pattern
+            response_task = asyncio.ensure_future(
+                page.wait_for_event('response', lambda r: pattern in r.url, timeout=navigation_timeout)
+            )
+
+        try:
+            response = await page.goto(url, timeout=navigation_timeout, wait_until='domcontentloaded')
+        except Exception:
+            if response_task is not None:
+                response_task.cancel()
+            raise
+
+        ready = await self.wait(
+            page, target, condition,
+            default_timeout=default_timeout,
+            started=started,
+            response_task=response_task
+        )
+        return response, ready
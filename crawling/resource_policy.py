@@ -0,0 +1,217 @@
+"""
+Playwright 資源攔截政策
+Resource Blocking Policy
+
+功能：
+- 攔截非必要的資源類型（圖片、字型、影音）
+- 攔截追蹤 / 廣告網域，避免拖慢 networkidle
+- 依目標網站設定允許清單
+- 統計每次執行節省的請求數與估計流量
+"""
+
+import logging
+from typing import Dict, Any, Optional, Iterable, Union
+from urllib.parse import urlparse
+from playwright.async_api import BrowserContext, Page, Route, Response
+
+from .page_pool import DEFAULT_USER_AGENT
+
+
+# 預設攔截的資源類型
+DEFAULT_BLOCKED_TYPES = {'image', 'media', 'font'}
+
+# 常見追蹤 / 廣告網域（比對網域結尾）
+DEFAULT_BLOCKED_DOMAINS = {
+    'google-analytics.com',
+    'googletagmanager.com',
+    'googleadservices.com',
+    'googlesyndication.com',
+    'doubleclick.net',
+    'facebook.net',
+    'connect.facebook.net',
+    'hotjar.com',
+    'hotjar.io',
+    'clarity.ms',
+    'segment.io',
+    'segment.com',
+    'mixpanel.com',
+    'amplitude.com',
+    'fullstory.com',
+    'newrelic.com',
+    'nr-data.net',
+    'optimizely.com',
+    'criteo.com',
+    'taboola.com',
+    'outbrain.com',
+    'adnxs.com',
+    'linkedin.com/px',
+    'snap.licdn.com',
+    'bat.bing.com',
+    'cookiebot.com',
+    'onetrust.com',
+}
+
+# 被攔截資源的平均大小估計（bytes），用於估算節省流量
+ESTIMATED_BYTES_BY_TYPE = {
+    'image': 45_000,
+    'media': 500_000,
+    'font': 35_000,
+    'stylesheet': 25_000,
+    'script': 40_000,
+    'xhr': 3_000,
+    'fetch': 3_000,
+    'other': 5_000,
+}
+
+# 各目標網站的允許清單（URL 子字串），優先於攔截規則
+TARGET_ALLOWLISTS = {
+    # 登入表單可能使用 reCAPTCHA
+    'universityadmissions': ['google.com/recaptcha', 'gstatic.com/recaptcha'],
+    'dreamapply': ['google.com/recaptcha', 'gstatic.com/recaptcha'],
+    'saarland': ['google.com/recaptcha', 'gstatic.com/recaptcha'],
+}
+
+
+class ResourcePolicy:
+    """共用的資源攔截政策"""
+
+    def __init__(
+        self,
+        target: str = 'default',
+        blocked_types: Optional[Iterable[str]] = None,
+        blocked_domains: Optional[Iterable[str]] = None,
+        allowlist: Optional[Iterable[str]] = None
+    ):
+        """
+        初始化攔截政策
+
+        Args:
+            target: 目標網站名稱（用於查詢 TARGET_ALLOWLISTS 與日誌）
+            blocked_types: 要攔截的資源類型
+            blocked_domains: 要攔截的網域
+            allowlist: 額外允許的 URL 子字串
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.target = target
+        self.blocked_types = set(DEFAULT_BLOCKED_TYPES if blocked_types is None else blocked_types)
+        self.blocked_domains = set(DEFAULT_BLOCKED_DOMAINS if blocked_domains is None else blocked_domains)
+        self.allowlist = list(TARGET_ALLOWLISTS.get(target, [])) + list(allowlist or [])
+        self.stats: Dict[str, Any] = {
+            'allowed_requests': 0,
+            'blocked_requests': 0,
+            'blocked_by_type': {},
+            'blocked_by_domain': 0,
+            'estimated_bytes_saved': 0,
+            'bytes_loaded': 0,
+        }
+
+    def is_allowed(self, url: str) -> bool:
+        """檢查 URL 是否在允許清單"""
+        return any(pattern in url for pattern in self.allowlist)
+
+    def is_tracker(self, url: str) -> bool:
+        """檢查 URL 是否屬於追蹤 / 廣告網域"""
+        parsed = urlparse(url)
+        host = parsed.netloc.lower()
+        host_path = f"{host}{parsed.path}"
+        for domain in self.blocked_domains:
+            if '/' in domain:
+                if domain in host_path:
+                    return True
+            elif host == domain or host.endswith(f".{domain}"):
+                return True
+        return False
+
+    def should_block(self, url: str, resource_type: str) -> bool:
+        """
+        判斷請求是否應被攔截
+
+        Args:
+            url: 請求 URL
+            resource_type: Playwright 資源類型
+
+        Returns:
+            是否攔截
+        """
+        if url.startswith('data:') or self.is_allowed(url):
+            return False
+        return resource_type in self.blocked_types or self.is_tracker(url)
+
+    async def handle_route(self, route: Route) -> None:
+        """Playwright route 處理函式"""
+        request = route.request
+        resource_type = request.resource_type
+
+        if self.should_block(request.url, resource_type):
+            self.stats['blocked_requests'] += 1
+            by_type = self.stats['blocked_by_type']
+            by_type[resource_type] = by_type.get(resource_type, 0) + 1
+            if resource_type not in self.blocked_types:
+                self.stats['blocked_by_domain'] += 1
+            self.stats['estimated_bytes_saved'] += ESTIMATED_BYTES_BY_TYPE.get(resource_type, ESTIMATED_BYTES_BY_TYPE['other'])
+            try:
+                await route.abort()
+            except Exception as e:
+                self.logger.debug(f"攔截請求失敗: {e}")
+            return
+
+        self.stats['allowed_requests'] += 1
+        try:
+            await route.continue_()
+        except Exception as e:
+            self.logger.debug(f"放行請求失敗: {e}")
+
+    def _record_response(self, response: Response) -> None:
+        """記錄實際載入的流量（依 content-length）"""
+        try:
+            length = response.headers.get('content-length')
+            if length and length.isdigit():
+                self.stats['bytes_loaded'] += int(length)
+        except Exception:
+            pass
+
+    async def apply(self, target: Union[BrowserContext, Page]) -> None:
+        """
+        將政策套用至 context 或 page
+
+        Args:
+            target: Playwright BrowserContext 或 Page
+        """
+        await target.route('**/*', self.handle_route)
+        target.on('response', self._record_response)
+
+    def summary(self) -> Dict[str, Any]:
+        """取得統計摘要"""
+        summary = dict(self.stats)
+        summary['target'] = self.target
+        summary['estimated_mb_saved'] = round(self.stats['estimated_bytes_saved'] / 1_048_576, 2)
+        return summary
+
+    def log_summary(self) -> None:
+        """輸出統計摘要"""
+        summary = self.summary()
+        self.logger.info(
+            f"[{self.target}] 攔截 {summary['blocked_requests']} 個請求 "
+            f"（追蹤網域 {summary['blocked_by_domain']}），"
+            f"估計節省 {summary['estimated_mb_saved']} MB，"
+            f"實際載入 {round(summary['bytes_loaded'] / 1_048_576, 2)} MB"
+        )
+
+
+def lightweight_context_options(**overrides: Any) -> Dict[str, Any]:
+    """
+    輕量 context 參數（停用 service worker、較小的 viewport）
+
+    Args:
+        **overrides: 覆寫的參數
+
+    Returns:
+        new_context 參數字典
+    """
+    options = {
+        'user_agent': DEFAULT_USER_AGENT,
+        'viewport': {'width': 1280, 'height': 800},
+        'service_workers': 'block',
+    }
+    options.update(overrides)
+    return options
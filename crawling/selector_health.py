@@ -0,0 +1,230 @@
+"""
+選擇器健康度遙測
+Selector Health Telemetry
+
+功能：
+- 記錄每個網站、每次執行中各選擇器的嘗試次數、命中次數、元素數、有效課程數與延遲
+- 依近期統計自動排序：只有產生有效課程紀錄的選擇器維持優先（彼此保持手動順序），
+  命中卻擷取不到有效課程的通用選擇器不會超越主要選擇器
+- 偵測漂移：過去有命中的選擇器在本次執行中降為 0 時發出警告
+"""
+
+import json
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+
+DEFAULT_HEALTH_FILE = Path('logs/selector_health.json')
+
+# 每個選擇器的統計欄位（checked：驗證過的元素數；valid：其中產生有效課程紀錄的數量）
+STAT_KEYS = ('attempts', 'hits', 'cards', 'checked', 'valid', 'latency_ms')
+
+
+class SelectorHealth:
+    """單一網站的選擇器健康度"""
+
+    def __init__(
+        self,
+        site: str,
+        health_file: Optional[Path] = None,
+        window: int = 10,
+        max_runs: int = 30,
+        min_precision: float = 0.8
+    ):
+        """
+        初始化遙測
+
+        Args:
+            site: 網站名稱
+            health_file: 統計檔案
+            window: 排序與漂移判斷參考的最近執行次數
+            max_runs: 每個網站保留的執行紀錄數
+            min_precision: 元素中產生有效課程紀錄的比例達此值才算可靠的選擇器
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.site = site
+        self.health_file = Path(health_file or DEFAULT_HEALTH_FILE)
+        self.window = window
+        self.max_runs = max_runs
+        self.min_precision = min_precision
+
+        data = self._load().get(site, {})
+        self.runs: List[Dict[str, Any]] = data.get('runs', [])
+        self.drift: List[str] = data.get('drift', [])
+
+        # 本次執行：selector -> STAT_KEYS
+        self.current: Dict[str, Dict[str, float]] = {}
+        self.started_at = datetime.now().isoformat()
+
+    def _load(self) -> Dict[str, Any]:
+        if not self.health_file.exists():
+            return {}
+        try:
+            with open(self.health_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            self.logger.debug(f"載入選擇器統計失敗: {e}")
+            return {}
+
+    def record(self, selector: str, count: int, latency_ms: float) -> None:
+        """
+        記錄一次選擇器嘗試
+
+        Args:
+            selector: 選擇器
+            count: 找到的元素數
+            latency_ms: 查詢耗時（毫秒）
+        """
+        stats = self._stats(selector)
+        stats['attempts'] += 1
+        stats['latency_ms'] += latency_ms
+        if count > 0:
+            stats['hits'] += 1
+            stats['cards'] += count
+
+    def record_valid(self, selector: str, checked: int, valid: int) -> None:
+        """
+        記錄選擇器找到的元素中，有多少產生了有效課程紀錄
+
+        Args:
+            selector: 實際使用的選擇器
+            checked: 驗證的元素數
+            valid: 產生有效課程紀錄的元素數
+        """
+        if not selector or not checked:
+            return
+        stats = self._stats(selector)
+        stats['checked'] += checked
+        stats['valid'] += valid
+
+    def _stats(self, selector: str) -> Dict[str, float]:
+        return self.current.setdefault(selector, {key: 0 for key in STAT_KEYS})
+
+    def record_attempts(self, attempts: List[Dict[str, Any]]) -> None:
+        """記錄批次擷取回傳的嘗試清單（[{selector, count, ms}]）"""
+        for attempt in attempts or []:
+            self.record(attempt.get('selector', ''), int(attempt.get('count') or 0), float(attempt.get('ms') or 0))
+
+    def totals(self) -> Dict[str, Dict[str, float]]:
+        """近期執行（含本次）的累計統計"""
+        totals: Dict[str, Dict[str, float]] = {}
+        for run in self.runs[-self.window:] + [{'selectors': self.current}]:
+            for selector, stats in run.get('selectors', {}).items():
+                total = totals.setdefault(selector, {key: 0 for key in STAT_KEYS})
+                for key in total:
+                    total[key] += stats.get(key, 0)
+        return totals
+
+    def ranked(self, selectors: List[str]) -> List[str]:
+        """
+        依健康度排序選擇器
+
+        可靠的選擇器（元素中產生有效課程紀錄的比例達 min_precision）維持手動順序排在最前；
+        有效比例較低者依比例排在其後；沒有資料或尚未驗證過有效性者維持原順序；
+        命中卻沒有產生任何有效課程、只失敗過或上次執行發生漂移（且本次尚未恢復）者排在最後。
+
+        延遲只有毫秒以下的差異，不作為排序依據；只命中元素不代表選到了課程卡片
+        （如 [class*="card"]、article），因此不以命中率排序。
+
+        Args:
+            selectors: 原始（手動調整的）選擇器順序
+
+        Returns:
+            排序後的選擇器
+        """
+        totals = self.totals()
+
+        def sort_key(item):
+            position, selector = item
+            stats = totals.get(selector)
+            if not stats or not stats['attempts']:
+                return (2, 0.0, position)
+            recovered = self.current.get(selector, {}).get('hits')
+            if not stats['hits'] or (selector in self.drift and not recovered):
+                return (3, 0.0, position)
+            if not stats['checked']:
+                return (2, 0.0, position)
+            precision = stats['valid'] / stats['checked']
+            if precision >= self.min_precision:
+                return (0, 0.0, position)
+            if precision > 0:
+                return (1, -precision, position)
+            return (3, 0.0, position)
+
+        return [selector for _, selector in sorted(enumerate(selectors), key=sort_key)]
+
+    def finish_run(self) -> List[str]:
+        """
+        結束本次執行：偵測漂移並儲存統計
+
+        Returns:
+            本次偵測到漂移的選擇器
+        """
+        if not self.current:
+            return []
+
+        previous = self.totals_before_current()
+        drifted = [
+            selector for selector, stats in self.current.items()
+            if stats['attempts'] and not stats['hits'] and previous.get(selector, {}).get('hits')
+        ]
+        if not any(stats['hits'] for stats in self.current.values()):
+            self.logger.warning(f"[{self.site}] 本次執行所有選擇器都沒有命中，頁面結構可能已變更")
+
+        for selector in drifted:
+            self.logger.warning(f"[{self.site}] 選擇器漂移：'{selector}' 過去有命中，本次降為 0")
+
+        self.drift = drifted
+        self.runs.append({
+            'started_at': self.started_at,
+            'finished_at': datetime.now().isoformat(),
+            'selectors': self.current,
+            'drift': drifted,
+        })
+        del self.runs[:-self.max_runs]
+        self.save()
+
+        self.current = {}
+        self.started_at = datetime.now().isoformat()
+        return drifted
+
+    def totals_before_current(self) -> Dict[str, Dict[str, float]]:
+        """不含本次執行的近期累計統計"""
+        current, self.current = self.current, {}
+        try:
+            return self.totals()
+        finally:
+            self.current = current
+
+    def save(self) -> None:
+        """儲存統計（只覆寫本網站）"""
+        try:
+            merged = self._load()
+            merged[self.site] = {
+                'updated_at': datetime.now().isoformat(),
+                'ranking': self.ranked(list(self.totals().keys())),
+                'drift': self.drift,
+                'runs': self.runs,
+            }
+            self.health_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.health_file, 'w', encoding='utf-8') as f:
+                json.dump(merged, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            self.logger.debug(f"儲存選擇器統計失敗: {e}")
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """近期每個選擇器的命中率、平均元素數與平均延遲（供診斷工具使用）"""
+        result = {}
+        for selector, stats in self.totals().items():
+            attempts = stats['attempts'] or 1
+            result[selector] = {
+                'attempts': int(stats['attempts']),
+                'hit_rate': round(stats['hits'] / attempts, 3),
+                'avg_cards': round(stats['cards'] / stats['hits'], 1) if stats['hits'] else 0,
+                'precision': round(stats['valid'] / stats['checked'], 3) if stats['checked'] else None,
+                'avg_latency_ms': round(stats['latency_ms'] / attempts, 2),
+                'drift': selector in self.drift,
+            }
+        return result
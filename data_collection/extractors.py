@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Detail Field Extractors
+
+Heuristic extractors for tuition, IELTS, deadline and professor data on a
+parsed program / university page. Shared by UniversityScraper (Selenium)
+and the discovery detail-page enrichment stage (Playwright).
+"""
+
+import re
+from typing import Dict, List, Optional, Any
+
+try:
+    from bs4 import BeautifulSoup
+except ImportError:
+    BeautifulSoup = None
+
+TEXT_ELEMENTS = ['p', 'div', 'span', 'td', 'li']
+
+FEE_INDICATORS = [
+    'tuition', 'fee', 'cost', 'price', 'euro', '€', 'eur',
+    'semester', 'annual', 'year', 'non-eu', 'international'
+]
+
+DEADLINE_INDICATORS = [
+    'deadline', 'apply', 'application', 'due', 'close', 'end',
+    'january', 'february', 'march', 'april', 'may', 'june',
+    'july', 'august', 'september', 'october', 'november', 'december'
+]
+
+
+def extract_tuition_fee(soup) -> Optional[str]:
+    """Extract tuition fee information"""
+    # Look for fee information in various elements
+    for selector in TEXT_ELEMENTS:
+        elements = soup.find_all(selector)
+        for element in elements:
+            text = element.get_text().lower()
+            if any(indicator in text for indicator in FEE_INDICATORS):
+                # Extract fee with context
+                full_text = element.get_text().strip()
+                if len(full_text) < 200:  # Avoid very long texts
+                    return full_text
+
+    return None
+
+
+def extract_ielts_requirements(soup) -> Optional[Dict]:
+    """Extract IELTS requirements"""
+    requirements = {}
+
+    for selector in TEXT_ELEMENTS:
+        elements = soup.find_all(selector)
+        for element in elements:
+            text = element.get_text().lower()
+            if 'ielts' in text:
+                # Try to extract overall score
+                overall_match = re.search(r'overall[:\s]*(\d+\.?\d*)', text)
+                if overall_match:
+                    requirements['overall'] = float(overall_match.group(1))
+
+                # Try to extract writing score
+                writing_match = re.search(r'writing[:\s]*(\d+\.?\d*)', text)
+                if writing_match:
+                    requirements['writing'] = float(writing_match.group(1))
+
+                # Try to extract minimum band
+                band_match = re.search(r'(?:minimum|band|each)[:\s]*(\d+\.?\d*)', text)
+                if band_match and 'minimum_band' not in requirements:
+                    requirements['minimum_band'] = float(band_match.group(1))
+
+                if requirements:  # If we found something, break
+                    break
+
+    return requirements if requirements else None
+
+
+def extract_application_deadline(soup) -> Optional[str]:
+    """Extract application deadline"""
+    for selector in TEXT_ELEMENTS:
+        elements = soup.find_all(selector)
+        for element in elements:
+            text = element.get_text().lower()
+            if any(indicator in text for indicator in DEADLINE_INDICATORS):
+                full_text = element.get_text().strip()
+                if len(full_text) < 100 and any(month in text for month in DEADLINE_INDICATORS[6:]):
+                    return full_text
+
+    return None
+
+
+def extract_professors(soup) -> Optional[List[Dict]]:
+    """Extract professor information"""
+    professors = []
+
+    # Look for faculty/staff listings
+    faculty_sections = soup.find_all(['div', 'section'],
+                                     class_=lambda x: x and any(term in str(x).lower()
+                                     for term in ['faculty', 'staff', 'professor', 'academic']))
+
+    for section in faculty_sections[:3]:  # Limit to first 3 sections
+        names = section.find_all(['h1', 'h2', 'h3', 'h4', 'strong', 'b'])
+        for name_elem in names[:10]:  # Limit to 10 names per section
+            name = name_elem.get_text().strip()
+            if len(name.split()) >= 2 and len(name) < 50:  # Reasonable name length
+                prof_info = {'name': name}
+
+                # Try to find associated email or title
+                parent = name_elem.parent
+                if parent:
+                    text = parent.get_text()
+                    email_match = re.search(r'([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})', text)
+                    if email_match:
+                        prof_info['email'] = email_match.group(1)
+
+                professors.append(prof_info)
+
+    return professors if professors else None
+
+
+def extract_details(soup, include_professors: bool = False) -> Dict[str, Any]:
+    """
+    Run the detail extractors on one parsed page
+
+    Returns:
+        Only the fields that were found (tuition_fee, ielts_requirements,
+        application_deadline, professor_list)
+    """
+    details = {
+        'tuition_fee': extract_tuition_fee(soup),
+        'ielts_requirements': extract_ielts_requirements(soup),
+        'application_deadline': extract_application_deadline(soup),
+    }
+    if include_professors:
+        details['professor_list'] = extract_professors(soup)
+    return {field: value for field, value in details.items() if value is not None}
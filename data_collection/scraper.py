@@ -36,6 +36,12 @@ except ImportError:
     print("⚠️  Missing dependencies. Install with: pip install beautifulsoup4 selenium requests")
     sys.exit(1)
 
+sys.path.append(str(Path(__file__).parent.parent))
+from crawling.readiness import ReadinessTracker
+from data_collection.extractors import (
+    extract_tuition_fee, extract_ielts_requirements, extract_application_deadline, extract_professors
+)
+
 @dataclass
 class ScrapedData:
     school_id: str
@@ -64,6 +70,9 @@ class UniversityScraper:
         self.last_request_time = {}
         self.min_delay = 2  # seconds between requests to same domain
         
+        # Page readiness (adaptive timeouts learned from past loads)
+        self.readiness = ReadinessTracker()
+        
         # DOM structure tracking
         self.dom_signatures_file = self.data_collection_dir / "dom_signatures.json"
         self.load_dom_signatures()
@@ -113,6 +122,31 @@ class UniversityScraper:
         
         self.last_request_time[domain] = time.time()
     
+    def wait_until_ready(self, target: str, default_timeout: float = 10.0) -> bool:
+        """Wait until the document is complete and its text stops changing"""
+        timeout = self.readiness.timeout_for(target, int(default_timeout * 1000)) / 1000
+        started = time.monotonic()
+        last_length = [-1]
+        
+        def text_settled(driver) -> bool:
+            if driver.execute_script("return document.readyState") != "complete":
+                return False
+            length = driver.execute_script("return document.body ? document.body.innerText.length : 0")
+            settled = length > 0 and length == last_length[0]
+            last_length[0] = length
+            return settled
+        
+        try:
+            WebDriverWait(self.driver, timeout, poll_frequency=0.25).until(text_settled)
+            ready = True
+        except Exception:
+            ready = False
+        
+        latency_ms = (time.monotonic() - started) * 1000
+        self.readiness.record(target, latency_ms)
+        print(f"⏱️  {target} ready in {latency_ms:.0f} ms" if ready else f"⚠️  {target} not ready after {timeout:.1f}s")
+        return ready
+    
     def get_dom_signature(self, html: str, url: str) -> str:
         """Generate DOM structure signature for change detection"""
         soup = BeautifulSoup(html, 'html.parser')
@@ -158,105 +192,19 @@ class UniversityScraper:
     
     def scrape_tuition_fee(self, soup: BeautifulSoup, school_id: str) -> Optional[str]:
         """Extract tuition fee information"""
-        fee_indicators = [
-            'tuition', 'fee', 'cost', 'price', 'euro', '€', 'eur',
-            'semester', 'annual', 'year', 'non-eu', 'international'
-        ]
-        
-        # Look for fee information in various elements
-        for selector in ['p', 'div', 'span', 'td', 'li']:
-            elements = soup.find_all(selector)
-            for element in elements:
-                text = element.get_text().lower()
-                if any(indicator in text for indicator in fee_indicators):
-                    # Extract fee with context
-                    full_text = element.get_text().strip()
-                    if len(full_text) < 200:  # Avoid very long texts
-                        return full_text
-        
-        return None
+        return extract_tuition_fee(soup)
     
     def scrape_ielts_requirements(self, soup: BeautifulSoup, school_id: str) -> Optional[Dict]:
         """Extract IELTS requirements"""
-        ielts_indicators = ['ielts', 'english', 'language', 'proficiency', 'writing', 'speaking']
-        
-        requirements = {}
-        
-        for selector in ['p', 'div', 'span', 'td', 'li']:
-            elements = soup.find_all(selector)
-            for element in elements:
-                text = element.get_text().lower()
-                if 'ielts' in text:
-                    full_text = element.get_text().strip()
-                    
-                    # Try to extract overall score
-                    import re
-                    overall_match = re.search(r'overall[:\s]*(\d+\.?\d*)', text)
-                    if overall_match:
-                        requirements['overall'] = float(overall_match.group(1))
-                    
-                    # Try to extract writing score
-                    writing_match = re.search(r'writing[:\s]*(\d+\.?\d*)', text)
-                    if writing_match:
-                        requirements['writing'] = float(writing_match.group(1))
-                    
-                    # Try to extract minimum band
-                    band_match = re.search(r'(?:minimum|band|each)[:\s]*(\d+\.?\d*)', text)
-                    if band_match and 'minimum_band' not in requirements:
-                        requirements['minimum_band'] = float(band_match.group(1))
-                    
-                    if requirements:  # If we found something, break
-                        break
-        
-        return requirements if requirements else None
+        return extract_ielts_requirements(soup)
     
     def scrape_application_deadline(self, soup: BeautifulSoup, school_id: str) -> Optional[str]:
         """Extract application deadline"""
-        deadline_indicators = [
-            'deadline', 'apply', 'application', 'due', 'close', 'end',
-            'january', 'february', 'march', 'april', 'may', 'june',
-            'july', 'august', 'september', 'october', 'november', 'december'
-        ]
-        
-        for selector in ['p', 'div', 'span', 'td', 'li']:
-            elements = soup.find_all(selector)
-            for element in elements:
-                text = element.get_text().lower()
-                if any(indicator in text for indicator in deadline_indicators):
-                    full_text = element.get_text().strip()
-                    if len(full_text) < 100 and any(month in text for month in deadline_indicators[6:]):
-                        return full_text
-        
-        return None
+        return extract_application_deadline(soup)
     
     def scrape_professors(self, soup: BeautifulSoup, school_id: str) -> Optional[List[Dict]]:
         """Extract professor information"""
-        professors = []
-        
-        # Look for faculty/staff listings
-        faculty_sections = soup.find_all(['div', 'section'], 
-                                       class_=lambda x: x and any(term in str(x).lower() 
-                                       for term in ['faculty', 'staff', 'professor', 'academic']))
-        
-        for section in faculty_sections[:3]:  # Limit to first 3 sections
-            names = section.find_all(['h1', 'h2', 'h3', 'h4', 'strong', 'b'])
-            for name_elem in names[:10]:  # Limit to 10 names per section
-                name = name_elem.get_text().strip()
-                if len(name.split()) >= 2 and len(name) < 50:  # Reasonable name length
-                    prof_info = {'name': name}
-                    
-                    # Try to find associated email or title
-                    parent = name_elem.parent
-                    if parent:
-                        text = parent.get_text()
-                        import re
-                        email_match = re.search(r'([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})', text)
-                        if email_match:
-                            prof_info['email'] = email_match.group(1)
-                    
-                    professors.append(prof_info)
-        
-        return professors if professors else None
+        return extract_professors(soup)
     
     def scrape_school_data(self, school_id: str) -> ScrapedData:
         """Scrape comprehensive data for a school"""
@@ -280,7 +228,7 @@ class UniversityScraper:
             # Fetch the page
             if self.driver:
                 self.driver.get(primary_url)
-                time.sleep(3)  # Allow page to load
+                self.wait_until_ready(f"scraper_{domain}")
                 html = self.driver.page_source
             else:
                 response = requests.get(primary_url, headers={
@@ -374,6 +322,7 @@ class UniversityScraper:
     
     def cleanup(self):
         """Clean up resources"""
+        self.readiness.save()
         if self.driver:
             self.driver.quit()
 
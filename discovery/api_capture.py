@@ -0,0 +1,380 @@
+"""
+搜尋 API 擷取模式
+Search API Capture Mode
+
+功能：
+- 攔截搜尋頁載入時呼叫的 JSON 端點（參考 DreamApplyMonitor.setup_api_interception）
+- 學習請求形狀（URL、方法、body、分頁參數）
+- 直接呼叫端點翻頁，取代點擊「Next」
+- 將 API 項目正規化為與 DOM 擷取相同的課程格式
+"""
+
+import asyncio
+import json
+import logging
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple
+from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
+from playwright.async_api import Page, Response
+
+
+# 可能的分頁參數；offset 類參數以筆數遞增，其餘以頁數遞增
+PAGE_PARAM_NAMES = ['page', 'p', 'pageNumber', 'page_number', 'pageIndex']
+OFFSET_PARAM_NAMES = ['offset', 'start', 'from', 'skip']
+
+# 總筆數可能的欄位名稱
+TOTAL_KEYS = ['total', 'totalCount', 'total_count', 'totalResults', 'total_results', 'hits_total', 'count']
+
+# API 項目欄位 -> 課程欄位
+ITEM_FIELD_KEYS = {
+    'program_name': ['title', 'name', 'programme_name', 'program_name', 'programName', 'study_name', 'studyName'],
+    'university_name': [
+        'organisation', 'organization', 'university', 'university_name', 'universityName',
+        'institution', 'school', 'organisationName', 'organizationName'
+    ],
+    'country': ['country', 'country_name', 'countryName'],
+    'city': ['city', 'city_name', 'cityName', 'location'],
+    'tuition_info': ['tuition', 'tuition_fee', 'tuitionFee', 'fee', 'fees'],
+    'program_url': ['url', 'link', 'href', 'permalink', 'programme_url', 'program_url'],
+}
+
+
+def _scalar(value: Any) -> Optional[str]:
+    """將巢狀值轉為文字（dict 取 name/title，list 取第一個）"""
+    if isinstance(value, dict):
+        for key in ('name', 'title', 'label', 'value', 'amount'):
+            if value.get(key) not in (None, ''):
+                return _scalar(value[key])
+        return None
+    if isinstance(value, list):
+        return _scalar(value[0]) if value else None
+    if value is None:
+        return None
+    text = str(value).strip()
+    return text or None
+
+
+def find_result_list(data: Any, depth: int = 0) -> List[Dict[str, Any]]:
+    """
+    在 JSON 中尋找最可能是搜尋結果的清單（含課程名稱欄位的最大物件陣列）
+
+    Args:
+        data: JSON 資料
+        depth: 遞迴深度
+
+    Returns:
+        結果清單
+    """
+    best: List[Dict[str, Any]] = []
+
+    if depth > 4:
+        return best
+
+    if isinstance(data, list):
+        items = [item for item in data if isinstance(item, dict)]
+        if items and any(_scalar(item.get(k)) for item in items[:5] for k in ITEM_FIELD_KEYS['program_name']):
+            best = items
+        for item in data[:5]:
+            sub = find_result_list(item, depth + 1)
+            if len(sub) > len(best):
+                best = sub
+    elif isinstance(data, dict):
+        for value in data.values():
+            if isinstance(value, (list, dict)):
+                sub = find_result_list(value, depth + 1)
+                if len(sub) > len(best):
+                    best = sub
+
+    return best
+
+
+def find_total(data: Any, depth: int = 0) -> Optional[int]:
+    """在 JSON 中尋找總筆數欄位"""
+    if depth > 3 or not isinstance(data, dict):
+        return None
+
+    for key in TOTAL_KEYS:
+        if isinstance(data.get(key), int) and not isinstance(data.get(key), bool):
+            return data[key]
+
+    for value in data.values():
+        total = find_total(value, depth + 1)
+        if total is not None:
+            return total
+    return None
+
+
+class SearchApiCapture:
+    """搜尋 API 擷取器"""
+
+    def __init__(
+        self,
+        source: str,
+        base_url: str,
+        url_keywords: Optional[List[str]] = None,
+        politeness_delay: float = 1.0,
+        max_pages: int = 50
+    ):
+        """
+        初始化擷取器
+
+        Args:
+            source: 來源名稱（寫入課程資料的 source 欄位）
+            base_url: 網站根網址（用於補全相對連結）
+            url_keywords: 候選端點 URL 須包含的關鍵字
+            politeness_delay: 直接呼叫端點時每頁的間隔秒數
+            max_pages: 最多翻頁數
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.source = source
+        self.base_url = base_url
+        self.url_keywords = url_keywords or ['search', 'api', 'studies', 'programmes', 'programs', 'results']
+        self.politeness_delay = politeness_delay
+        self.max_pages = max_pages
+        self.shape: Optional[Dict[str, Any]] = None
+        self.first_items: List[Dict[str, Any]] = []
+        self.total: Optional[int] = None
+
+    def attach(self, page: Page) -> None:
+        """開始攔截頁面的 JSON 回應"""
+        page.on('response', self._handle_response)
+
+    def detach(self, page: Page) -> None:
+        """停止攔截"""
+        try:
+            page.remove_listener('response', self._handle_response)
+        except Exception:
+            pass
+
+    async def _handle_response(self, response: Response) -> None:
+        """處理回應，保留結果最多的候選端點"""
+        try:
+            url = response.url
+            if response.status != 200 or not any(k in url.lower() for k in self.url_keywords):
+                return
+            if 'json' not in response.headers.get('content-type', ''):
+                return
+
+            data = await response.json()
+            items = find_result_list(data)
+            if not items or len(items) <= len(self.first_items):
+                return
+
+            request = response.request
+            self.first_items = items
+            self.total = find_total(data)
+            self.shape = self.learn_shape(url, request.method, request.post_data, request.headers, len(items))
+            self.logger.info(f"攔截到搜尋 API: {request.method} {url}（{len(items)} 筆）")
+        except Exception as e:
+            self.logger.debug(f"處理回應時發生錯誤: {e}")
+
+    def learn_shape(
+        self,
+        url: str,
+        method: str,
+        post_data: Optional[str],
+        headers: Dict[str, str],
+        page_size: int
+    ) -> Dict[str, Any]:
+        """
+        由攔截到的請求學習分頁形狀
+
+        Returns:
+            請求形狀字典
+        """
+        parsed = urlparse(url)
+        query = {k: v[0] for k, v in parse_qs(parsed.query, keep_blank_values=True).items()}
+
+        body = None
+        if post_data:
+            try:
+                body = json.loads(post_data)
+            except (ValueError, TypeError):
+                body = None
+
+        location, param, style = None, None, None
+        for container_name, container in (('query', query), ('body', body if isinstance(body, dict) else {})):
+            for name in PAGE_PARAM_NAMES + OFFSET_PARAM_NAMES:
+                if name in container:
+                    location, param = container_name, name
+                    style = 'offset' if name in OFFSET_PARAM_NAMES else 'page'
+                    break
+            if param:
+                break
+
+        # 沒有分頁參數時不翻頁（猜測的參數若被端點忽略，只會重複取得第一頁）
+
+        safe_headers = {
+            k: v for k, v in headers.items()
+            if k.lower() not in ('content-length', 'host', 'cookie') and not k.startswith(':')
+        }
+
+        return {
+            'method': method,
+            'url': urlunparse(parsed._replace(query='')),
+            'query': query,
+            'body': body,
+            'headers': safe_headers,
+            'page_location': location,
+            'page_param': param,
+            'page_style': style,
+            'page_size': page_size,
+            'learned_at': datetime.now().isoformat(),
+        }
+
+    def build_page_request(self, page_index: int) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """
+        產生第 page_index 頁（0 起算）的請求
+
+        Returns:
+            (URL, JSON body)
+        """
+        shape = self.shape
+        query = dict(shape['query'])
+        body = json.loads(json.dumps(shape['body'])) if isinstance(shape['body'], dict) else None
+
+        if shape['page_style'] == 'offset':
+            start = self._as_int(self._current_value(), 0)
+            value = start + page_index * shape['page_size']
+        else:
+            start = self._as_int(self._current_value(), 1)
+            value = start + page_index
+
+        if shape['page_location'] == 'body' and body is not None:
+            body[shape['page_param']] = value
+        else:
+            query[shape['page_param']] = str(value)
+
+        url = shape['url']
+        if query:
+            url = f"{url}?{urlencode(query)}"
+        return url, body
+
+    def _current_value(self) -> Any:
+        """取得首次請求的分頁參數值"""
+        shape = self.shape
+        if shape['page_location'] == 'body' and isinstance(shape['body'], dict):
+            return shape['body'].get(shape['page_param'])
+        return shape['query'].get(shape['page_param'])
+
+    @staticmethod
+    def _as_int(value: Any, default: int) -> int:
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return default
+
+    def normalize_item(self, item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """將 API 項目轉為課程資料"""
+        fields = {}
+        for field, keys in ITEM_FIELD_KEYS.items():
+            for key in keys:
+                value = _scalar(item.get(key))
+                if value:
+                    fields[field] = value
+                    break
+
+        if not (fields.get('program_name') and fields.get('university_name')):
+            return None
+
+        program_url = fields.get('program_url', '')
+        if program_url and not program_url.startswith('http'):
+            program_url = f"{self.base_url}{program_url if program_url.startswith('/') else '/' + program_url}"
+
+        return {
+            'program_name': fields['program_name'],
+            'university_name': fields['university_name'],
+            'country': fields.get('country') or 'Unknown',
+            'city': fields.get('city') or 'Unknown',
+            'tuition_info': fields.get('tuition_info') or 'N/A',
+            'program_url': program_url,
+            'source': self.source,
+            'discovery_mode': 'api',
+            'scraped_at': datetime.now().isoformat()
+        }
+
+    @staticmethod
+    def course_key(course: Dict[str, Any]) -> str:
+        """課程去重用的鍵（優先使用 program_url）"""
+        url = course.get('program_url', '')
+        if url:
+            return url
+        return f"{course.get('university_name', '')}_{course.get('program_name', '')}".lower()
+
+    async def harvest(self, page: Page) -> Optional[List[Dict[str, Any]]]:
+        """
+        由已學習的端點直接翻頁取得全部結果
+
+        Args:
+            page: 已載入搜尋頁的 Page（使用其 context 的 cookies）
+
+        Returns:
+            課程清單；尚未學習到端點時回傳 None
+        """
+        if not self.shape:
+            return None
+
+        self.save_shape()
+        courses = [c for c in (self.normalize_item(item) for item in self.first_items) if c]
+        if not courses:
+            self.logger.info("攔截到的 API 項目無法正規化，改用 DOM 擷取")
+            return None
+
+        if not self.shape['page_param']:
+            self.logger.info("攔截到的請求沒有分頁參數，只使用第一頁結果")
+            return courses
+
+        api = page.context.request
+        seen = len(self.first_items)
+        seen_keys = {self.course_key(c) for c in courses}
+
+        for page_index in range(1, self.max_pages):
+            if self.total is not None and seen >= self.total:
+                break
+
+            await asyncio.sleep(self.politeness_delay)
+            url, body = self.build_page_request(page_index)
+
+            try:
+                if self.shape['method'].upper() == 'POST':
+                    response = await api.post(url, data=body if body is not None else self.shape['body'], headers=self.shape['headers'])
+                else:
+                    response = await api.get(url, headers=self.shape['headers'])
+
+                if not response.ok:
+                    self.logger.warning(f"API 翻頁失敗 ({response.status}): {url}")
+                    break
+
+                items = find_result_list(await response.json())
+            except Exception as e:
+                self.logger.warning(f"API 翻頁時發生錯誤: {e}")
+                break
+
+            if not items:
+                break
+
+            # 端點忽略分頁參數時會重複回傳相同結果：沒有新課程即停止
+            page_courses = [c for c in (self.normalize_item(item) for item in items) if c]
+            new_courses = [c for c in page_courses if self.course_key(c) not in seen_keys]
+            if page_courses and not new_courses:
+                self.logger.info(f"API 第 {page_index + 1} 頁沒有新結果，停止翻頁")
+                break
+
+            seen += len(items)
+            seen_keys.update(self.course_key(c) for c in new_courses)
+            courses.extend(new_courses)
+            self.logger.info(f"API 第 {page_index + 1} 頁取得 {len(items)} 筆（新增 {len(new_courses)} 筆）")
+
+        return courses
+
+    def save_shape(self) -> None:
+        """記錄學習到的請求形狀（供除錯）"""
+        try:
+            shape_dir = Path('logs/api_capture')
+            shape_dir.mkdir(parents=True, exist_ok=True)
+            shape_file = shape_dir / f"{self.source.lower().replace('.', '')}_shape.json"
+            with open(shape_file, 'w', encoding='utf-8') as f:
+                json.dump({'shape': self.shape, 'total': self.total}, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            self.logger.debug(f"儲存請求形狀失敗: {e}")
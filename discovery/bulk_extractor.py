@@ -0,0 +1,136 @@
+"""
+課程卡片批次擷取
+Bulk In-Page Card Extraction
+
+以單一 page.evaluate 呼叫，依宣告式欄位規格在瀏覽器內擷取整頁的課程卡片，
+取代逐一元素 / 逐一欄位 / 逐一選擇器的 round trip。
+"""
+
+import logging
+from typing import Dict, List, Any, Optional
+from playwright.async_api import Page
+
+logger = logging.getLogger(__name__)
+
+
+# 在瀏覽器內執行的擷取函式，參數為欄位規格
+BULK_EXTRACT_JS = """
+(spec) => {
+    const textOf = (root, selectors) => {
+        for (const selector of selectors) {
+            let node = null;
+            try {
+                node = root.querySelector(selector);
+            } catch (e) {
+                continue;
+            }
+            if (node) {
+                const text = (node.innerText || '').trim();
+                if (text) {
+                    return text;
+                }
+            }
+        }
+        return null;
+    };
+
+    const hrefOf = (root) => {
+        if (spec.link_self && root.tagName.toLowerCase() === 'a') {
+            return root.getAttribute('href');
+        }
+        for (const selector of spec.link_selectors) {
+            let link = null;
+            try {
+                link = root.querySelector(selector);
+            } catch (e) {
+                continue;
+            }
+            if (link && link.getAttribute('href')) {
+                return link.getAttribute('href');
+            }
+        }
+        return null;
+    };
+
+    const attempts = [];
+    for (const cardSelector of spec.card_selectors) {
+        let cards = [];
+        const started = performance.now();
+        try {
+            cards = Array.from(document.querySelectorAll(cardSelector));
+        } catch (e) {
+            attempts.push({selector: cardSelector, count: 0, ms: performance.now() - started});
+            continue;
+        }
+        attempts.push({selector: cardSelector, count: cards.length, ms: performance.now() - started});
+        if (cards.length === 0) {
+            continue;
+        }
+
+        const rows = cards.map((card) => {
+            const row = {};
+            for (const [field, selectors] of Object.entries(spec.fields)) {
+                row[field] = textOf(card, selectors);
+            }
+            row.href = hrefOf(card);
+            return row;
+        });
+        return {selector: cardSelector, cards: rows, attempts: attempts};
+    }
+    return {selector: null, cards: [], attempts: attempts};
+}
+"""
+
+
+def build_card_spec(
+    card_selectors: List[str],
+    fields: Dict[str, List[str]],
+    link_selectors: List[str],
+    link_self: bool = False
+) -> Dict[str, Any]:
+    """
+    建立欄位規格
+
+    僅保留 CSS 選擇器；Playwright 專用語法（如 text=）無法在瀏覽器內使用，會被略過。
+
+    Args:
+        card_selectors: 卡片選擇器（依序嘗試，取第一個有結果者）
+        fields: 欄位名稱 -> 選擇器清單
+        link_selectors: 連結選擇器清單
+        link_self: 卡片本身為 <a> 時是否直接使用其 href
+
+    Returns:
+        欄位規格字典
+    """
+    def css_only(selectors: List[str]) -> List[str]:
+        return [s for s in selectors if not s.startswith('text=')]
+
+    return {
+        'card_selectors': css_only(card_selectors),
+        'fields': {name: css_only(selectors) for name, selectors in fields.items()},
+        'link_selectors': css_only(link_selectors),
+        'link_self': link_self,
+    }
+
+
+async def bulk_extract_cards(page: Page, spec: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    以單一 evaluate 呼叫擷取整頁卡片
+
+    Args:
+        page: Playwright Page 物件
+        spec: build_card_spec 產生的欄位規格
+
+    Returns:
+        {'selector': 使用的卡片選擇器, 'cards': 卡片欄位清單,
+         'attempts': 每個嘗試過的選擇器 [{selector, count, ms}]}；
+        執行失敗時回傳 None，呼叫端應改用逐一元素擷取
+    """
+    try:
+        result = await page.evaluate(BULK_EXTRACT_JS, spec)
+        if not isinstance(result, dict):
+            return None
+        return result
+    except Exception as e:
+        logger.warning(f"批次擷取失敗，改用逐一元素擷取: {e}")
+        return None
@@ -0,0 +1,636 @@
+"""
+課程目錄（SQLite）
+SQLite Program Catalog
+
+功能：
+- 以穩定的課程 ID 儲存所有探索到的課程（跨來源身分比對沿用 ProgramIndex）
+- 批次 upsert（單一交易），記錄首次 / 最後出現時間與所屬執行批次
+- 追蹤欄位（學費、IELTS、截止日期等）變更時寫入變更歷史
+- 以索引查詢「本次新發現」、「學費變更」、「符合篩選條件」的課程
+- schools.yml 由目錄產生：手動維護的條目原樣保留，新課程確認後才列入
+"""
+
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+
+import yaml
+
+from discovery.program_index import ProgramIndex, is_placeholder
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    stats TEXT
+);
+
+CREATE TABLE IF NOT EXISTS programs (
+    program_id TEXT PRIMARY KEY,
+    university TEXT NOT NULL,
+    program TEXT NOT NULL,
+    country TEXT,
+    tuition_fee TEXT,
+    tuition_amount REAL,
+    ielts_overall REAL,
+    application_deadline TEXT,
+    url TEXT,
+    match_score REAL,
+    source TEXT,
+    sources TEXT NOT NULL DEFAULT '[]',
+    curated INTEGER NOT NULL DEFAULT 0,
+    listed INTEGER NOT NULL DEFAULT 0,
+    dismissed INTEGER NOT NULL DEFAULT 0,
+    list_order INTEGER,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    first_run INTEGER,
+    last_run INTEGER,
+    data TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_programs_country ON programs(country);
+CREATE INDEX IF NOT EXISTS idx_programs_tuition ON programs(tuition_amount);
+CREATE INDEX IF NOT EXISTS idx_programs_score ON programs(match_score);
+CREATE INDEX IF NOT EXISTS idx_programs_first_run ON programs(first_run);
+CREATE INDEX IF NOT EXISTS idx_programs_last_run ON programs(last_run);
+CREATE INDEX IF NOT EXISTS idx_programs_listed ON programs(listed, list_order);
+
+CREATE TABLE IF NOT EXISTS program_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    program_id TEXT NOT NULL REFERENCES programs(program_id),
+    field TEXT NOT NULL,
+    old_value TEXT,
+    new_value TEXT,
+    changed_at TEXT NOT NULL,
+    run_id INTEGER
+);
+
+CREATE INDEX IF NOT EXISTS idx_history_program ON program_history(program_id);
+CREATE INDEX IF NOT EXISTS idx_history_field ON program_history(field, run_id);
+"""
+
+# 變更時寫入歷史的欄位
+TRACKED_FIELDS = (
+    'country', 'tuition_fee', 'tuition_amount', 'ielts_overall',
+    'application_deadline', 'url', 'match_score',
+)
+
+SCHOOLS_HEADER = "# School Information Database for Application Generation\n"
+
+
+def replace_top_level_block(text: str, key: str, block: str) -> Optional[str]:
+    """
+    替換 YAML 文件中某個頂層鍵的區塊，其餘內容逐字保留
+
+    區塊結束於下一個頂層鍵；緊接在該鍵之前的註解與空行屬於下一個鍵。
+
+    Args:
+        text: 原始 YAML 文字
+        key: 頂層鍵
+        block: 新區塊（以 'key:' 開頭）
+
+    Returns:
+        新的文字；找不到該鍵時為 None
+    """
+    lines = text.splitlines(keepends=True)
+    key_pattern = re.compile(rf'^{re.escape(key)}\s*:')
+    start = next((i for i, line in enumerate(lines) if key_pattern.match(line)), None)
+    if start is None:
+        return None
+
+    end = len(lines)
+    for i in range(start + 1, len(lines)):
+        if re.match(r'^[A-Za-z_][\w-]*\s*:', lines[i]):
+            end = i
+            break
+    if end < len(lines):
+        while end > start + 1 and (lines[end - 1].startswith('#') or not lines[end - 1].strip()):
+            end -= 1
+
+    tail = ''.join(lines[end:])
+    return ''.join(lines[:start]) + block + tail
+
+
+def parse_amount(text: Any) -> Optional[float]:
+    """
+    解析學費金額（取第一個數字；免學費視為 0）
+
+    Args:
+        text: 學費描述
+
+    Returns:
+        金額；無法解析時回傳 None
+    """
+    if text is None:
+        return None
+    if isinstance(text, (int, float)):
+        return float(text)
+
+    lowered = str(text).lower()
+    if any(keyword in lowered for keyword in ['free', 'no tuition', 'tuition-free']):
+        return 0.0
+
+    match = re.search(r'(\d[\d,.]*)', lowered)
+    if not match:
+        return None
+    try:
+        return float(match.group(1).replace(',', '').rstrip('.'))
+    except ValueError:
+        return None
+
+
+def parse_ielts(record: Dict[str, Any]) -> Optional[float]:
+    """取得 IELTS 總分要求（相容 dict、數字與文字描述）"""
+    value = record.get('ielts_overall') or record.get('ielts_requirement')
+    if isinstance(value, dict):
+        value = value.get('overall')
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+
+    match = re.search(r'(\d+(?:\.\d+)?)', str(value))
+    return float(match.group(1)) if match else None
+
+
+class ProgramCatalog:
+    """SQLite 課程目錄"""
+
+    def __init__(self, db_file: Optional[Path] = None):
+        """
+        初始化目錄
+
+        Args:
+            db_file: 資料庫檔案（預設 discovery/catalog.db）
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.db_file = Path(db_file or 'discovery/catalog.db')
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+
+        # 資料庫檔案會被 workflow 提交，使用預設日誌模式避免寫入留在 -wal 檔案
+        # （明確設定，讓先前以 WAL 模式建立的 catalog.db 也轉回來）
+        self.conn = sqlite3.connect(str(self.db_file))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=DELETE')
+        self.conn.executescript(SCHEMA)
+
+        self.index = self._build_index()
+
+    def close(self) -> None:
+        """關閉資料庫連線"""
+        self.conn.close()
+
+    def _build_index(self) -> ProgramIndex:
+        """由目錄內容重建跨來源身分索引（沿用既有的課程 ID）"""
+        index = ProgramIndex()
+        for row in self.conn.execute('SELECT program_id, university, program, url, curated FROM programs'):
+            record = {'university_name': row['university'], 'program_name': row['program']}
+            # 手動條目的網址可能是共用的學校首頁，不作為身分依據
+            if row['url'] and not row['curated']:
+                record['program_url'] = row['url']
+            index.restore(row['program_id'], record)
+        return index
+
+    @staticmethod
+    def columns(record: Dict[str, Any]) -> Dict[str, Any]:
+        """將 raw_data / schools.yml 格式的紀錄轉為目錄欄位"""
+        university, program = ProgramIndex.identity_names(record)
+        tuition_fee = record.get('tuition_fee') or record.get('tuition_info')
+        match_score = record.get('match_score')
+
+        return {
+            'university': university,
+            'program': program,
+            'country': record.get('country'),
+            'tuition_fee': None if is_placeholder(tuition_fee) else str(tuition_fee),
+            'tuition_amount': parse_amount(None if is_placeholder(tuition_fee) else tuition_fee),
+            'ielts_overall': parse_ielts(record),
+            'application_deadline': record.get('application_deadline') or record.get('deadline'),
+            'url': record.get('application_url') or record.get('program_url') or record.get('website'),
+            'match_score': float(match_score) if match_score is not None else None,
+            'source': record.get('source'),
+        }
+
+    # ---------------------------------------------------------------- 執行批次
+
+    def start_run(self, kind: str) -> int:
+        """
+        開始一次執行批次
+
+        Args:
+            kind: 批次類型（例如 filter、schools_yml）
+
+        Returns:
+            run_id
+        """
+        with self.conn:
+            cursor = self.conn.execute(
+                'INSERT INTO runs (kind, started_at) VALUES (?, ?)',
+                (kind, datetime.now().isoformat())
+            )
+        return cursor.lastrowid
+
+    def finish_run(self, run_id: int, stats: Optional[Dict[str, Any]] = None) -> None:
+        """結束執行批次並記錄統計"""
+        with self.conn:
+            self.conn.execute(
+                'UPDATE runs SET finished_at = ?, stats = ? WHERE run_id = ?',
+                (datetime.now().isoformat(), json.dumps(stats or {}, ensure_ascii=False), run_id)
+            )
+
+    def last_run_id(self, kind: str = 'filter') -> Optional[int]:
+        """取得最近一次完成的執行批次"""
+        row = self.conn.execute(
+            'SELECT MAX(run_id) FROM runs WHERE kind = ? AND finished_at IS NOT NULL', (kind,)
+        ).fetchone()
+        return row[0]
+
+    # ---------------------------------------------------------------- 寫入
+
+    def _resolve(self, record: Dict[str, Any]) -> str:
+        """取得紀錄的課程 ID（找不到時建立新 ID）"""
+        program_id, _ = self.index.add(record)
+        # 同一筆資料已經索引過時 add 回傳 None
+        return program_id or self.index.find(record)
+
+    def _new_id(self, record: Dict[str, Any]) -> str:
+        """強制建立新的課程 ID（用於不可合併的手動條目）"""
+        university, program = ProgramIndex.identity_names(record)
+        program_id = hashlib.sha1(f'{university}|{program}'.lower().encode('utf-8')).hexdigest()[:12]
+        while program_id in self.index.programs:
+            program_id = hashlib.sha1(f'{program_id}+'.encode('utf-8')).hexdigest()[:12]
+        self.index.restore(program_id, {'university_name': university, 'program_name': program})
+        return program_id
+
+    def upsert(
+        self,
+        record: Dict[str, Any],
+        run_id: Optional[int] = None,
+        curated: bool = False,
+        now: Optional[str] = None,
+        program_id: Optional[str] = None
+    ) -> Tuple[Optional[str], str]:
+        """
+        新增或更新一筆課程（呼叫端負責交易）
+
+        Args:
+            record: 課程紀錄（raw_data 或 schools.yml 格式）
+            run_id: 執行批次
+            curated: 是否為 schools.yml 中手動維護的條目
+            now: 時間戳記
+            program_id: 指定課程 ID；None 表示依身分比對
+
+        Returns:
+            (課程 ID, 'new' / 'updated' / 'unchanged' / 'skipped')
+        """
+        now = now or datetime.now().isoformat()
+        values = self.columns(record)
+        if program_id is None:
+            if not values['program']:
+                # 沒有課程名稱無法判斷身分
+                return None, 'skipped'
+            program_id = self._resolve(record)
+
+        row = self.conn.execute('SELECT * FROM programs WHERE program_id = ?', (program_id,)).fetchone()
+
+        if row is None:
+            self.conn.execute(
+                """INSERT INTO programs (
+                    program_id, university, program, country, tuition_fee, tuition_amount,
+                    ielts_overall, application_deadline, url, match_score, source, sources,
+                    curated, first_seen, last_seen, first_run, last_run, data
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (
+                    program_id, values['university'], values['program'], values['country'],
+                    values['tuition_fee'], values['tuition_amount'], values['ielts_overall'],
+                    values['application_deadline'], values['url'], values['match_score'],
+                    values['source'], json.dumps([values['source']] if values['source'] else []),
+                    int(curated), now, now, run_id, run_id,
+                    json.dumps(record, ensure_ascii=False, default=str)
+                )
+            )
+            return program_id, 'new'
+
+        updates: Dict[str, Any] = {'last_seen': now, 'last_run': run_id}
+
+        sources = json.loads(row['sources'])
+        if values['source'] and values['source'] not in sources:
+            sources.append(values['source'])
+            updates['sources'] = json.dumps(sources)
+
+        # 手動維護的條目只由 schools.yml 更新，探索結果不覆寫
+        authoritative = curated or not row['curated']
+        history = []
+
+        if authoritative:
+            for field in TRACKED_FIELDS:
+                new_value = values[field]
+                if is_placeholder(new_value) or new_value == row[field]:
+                    continue
+                history.append((program_id, field, row[field], new_value, now, run_id))
+                updates[field] = new_value
+
+            if curated:
+                # schools.yml 的條目原樣保存
+                updates['data'] = json.dumps(record, ensure_ascii=False, default=str)
+                updates['curated'] = 1
+            else:
+                data = json.loads(row['data'])
+                data.update({k: v for k, v in record.items() if not is_placeholder(v)})
+                updates['data'] = json.dumps(data, ensure_ascii=False, default=str)
+
+        assignments = ', '.join(f'{field} = ?' for field in updates)
+        self.conn.execute(
+            f'UPDATE programs SET {assignments} WHERE program_id = ?',
+            (*updates.values(), program_id)
+        )
+        if history:
+            self.conn.executemany(
+                """INSERT INTO program_history (program_id, field, old_value, new_value, changed_at, run_id)
+                VALUES (?, ?, ?, ?, ?, ?)""",
+                [(pid, field, None if old is None else str(old), str(new), at, rid)
+                 for pid, field, old, new, at, rid in history]
+            )
+        return program_id, 'updated' if history else 'unchanged'
+
+    def upsert_many(
+        self,
+        records: Iterable[Dict[str, Any]],
+        run_id: Optional[int] = None,
+        curated: bool = False
+    ) -> Dict[str, int]:
+        """
+        在單一交易中批次 upsert
+
+        Args:
+            records: 課程紀錄
+            run_id: 執行批次
+            curated: 是否為 schools.yml 中手動維護的條目
+
+        Returns:
+            統計（new / updated / unchanged / skipped）
+        """
+        stats = {'new': 0, 'updated': 0, 'unchanged': 0, 'skipped': 0}
+        now = datetime.now().isoformat()
+
+        with self.conn:
+            for record in records:
+                _, status = self.upsert(record, run_id, curated, now)
+                stats[status] += 1
+
+        self.logger.info(
+            f"課程目錄更新：新增 {stats['new']}、變更 {stats['updated']}、未變 {stats['unchanged']}"
+        )
+        return stats
+
+    # ---------------------------------------------------------------- schools.yml
+
+    def import_schools_yml(self, schools_file: Path) -> Dict[str, int]:
+        """
+        將 schools.yml 的條目同步進目錄（保留手動編輯）
+
+        從 schools.yml 移除的條目標記為 dismissed，之後不會再被當成新課程提出。
+
+        Args:
+            schools_file: schools.yml 路徑
+
+        Returns:
+            統計（new / updated / unchanged / dismissed）
+        """
+        with open(schools_file, 'r', encoding='utf-8') as f:
+            schools = (yaml.safe_load(f) or {}).get('schools', []) or []
+
+        run_id = self.start_run('schools_yml')
+        now = datetime.now().isoformat()
+        stats = {'new': 0, 'updated': 0, 'unchanged': 0, 'dismissed': 0}
+        listed_ids = []
+
+        with self.conn:
+            for school in schools:
+                # 手動條目一律保留：無法比對或與前面的條目相符時給予獨立的 ID
+                program_id = self.index.find(school)
+                if program_id is None or program_id in listed_ids:
+                    program_id = self._new_id(school)
+                _, status = self.upsert(school, run_id, curated=True, now=now, program_id=program_id)
+                stats[status] += 1
+                listed_ids.append(program_id)
+
+            previously_listed = {
+                row[0] for row in self.conn.execute('SELECT program_id FROM programs WHERE listed = 1')
+            }
+            removed = previously_listed - set(listed_ids)
+            if removed:
+                self.conn.executemany(
+                    'UPDATE programs SET listed = 0, dismissed = 1, list_order = NULL WHERE program_id = ?',
+                    [(program_id,) for program_id in removed]
+                )
+            stats['dismissed'] = len(removed)
+
+            self.conn.executemany(
+                'UPDATE programs SET listed = 1, dismissed = 0, list_order = ? WHERE program_id = ?',
+                list(enumerate(listed_ids))
+            )
+
+        self.finish_run(run_id, stats)
+        return stats
+
+    def mark_listed(self, program_ids: Iterable[str]) -> None:
+        """將課程列入 schools.yml（接在既有條目之後）"""
+        with self.conn:
+            start = self.conn.execute('SELECT COALESCE(MAX(list_order), -1) + 1 FROM programs').fetchone()[0]
+            self.conn.executemany(
+                'UPDATE programs SET listed = 1, dismissed = 0, list_order = ? WHERE program_id = ?',
+                [(start + offset, program_id) for offset, program_id in enumerate(program_ids)]
+            )
+
+    def export_schools_yml(self, schools_file: Path) -> int:
+        """
+        由目錄產生 schools.yml 的 schools 清單
+
+        只替換 schools 區塊；其他頂層鍵（例如 template_schools）、註解與格式原樣保留。
+        清單內容未變更時不改寫檔案。
+
+        Args:
+            schools_file: schools.yml 路徑
+
+        Returns:
+            寫入的條目數
+        """
+        schools_file = Path(schools_file)
+        schools = [
+            json.loads(row['data'])
+            for row in self.conn.execute('SELECT data FROM programs WHERE listed = 1 ORDER BY list_order')
+        ]
+        schools_block = yaml.dump({'schools': schools}, allow_unicode=True, sort_keys=False,
+                                  default_flow_style=False)
+
+        if not schools_file.exists():
+            content = SCHOOLS_HEADER + '\n' + schools_block
+        else:
+            with open(schools_file, 'r', encoding='utf-8') as f:
+                original = f.read()
+            data = yaml.safe_load(original) or {}
+            if data.get('schools') == schools:
+                self.logger.info(f"{schools_file} 已是最新（{len(schools)} 個條目）")
+                return len(schools)
+            content = replace_top_level_block(original, 'schools', schools_block)
+
+            # 拼接結果必須與「只替換 schools 鍵」一致，否則退回完整重新輸出
+            expected = dict(data)
+            expected['schools'] = schools
+            try:
+                spliced_ok = content is not None and yaml.safe_load(content) == expected
+            except yaml.YAMLError:
+                spliced_ok = False
+            if not spliced_ok:
+                self.logger.warning(f"無法只替換 {schools_file} 的 schools 區塊，改為重新輸出整份文件（註解不保留）")
+                content = yaml.dump(expected, allow_unicode=True, sort_keys=False, default_flow_style=False)
+
+        with open(schools_file, 'w', encoding='utf-8') as f:
+            f.write(content)
+
+        self.logger.info(f"已由課程目錄產生 {schools_file}（{len(schools)} 個條目）")
+        return len(schools)
+
+    # ---------------------------------------------------------------- 查詢
+
+    def _rows(self, sql: str, params: Tuple = ()) -> List[Dict[str, Any]]:
+        return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def get(self, program_id: str) -> Optional[Dict[str, Any]]:
+        """取得單一課程"""
+        rows = self._rows('SELECT * FROM programs WHERE program_id = ?', (program_id,))
+        return rows[0] if rows else None
+
+    def new_in_run(self, run_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        某次執行批次首次出現的課程
+
+        Args:
+            run_id: 執行批次；None 表示最近一次篩選
+
+        Returns:
+            課程清單
+        """
+        run_id = run_id or self.last_run_id('filter')
+        if run_id is None:
+            return []
+        return self._rows('SELECT * FROM programs WHERE first_run = ? ORDER BY match_score DESC', (run_id,))
+
+    def unlisted_schools(self, run_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """unlisted() 的 schools.yml 格式（附上 program_id）"""
+        schools = []
+        for row in self.unlisted(run_id):
+            school = json.loads(row['data'])
+            school['program_id'] = row['program_id']
+            schools.append(school)
+        return schools
+
+    def unlisted(self, run_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        某次執行批次中出現、尚未列入 schools.yml 的課程
+
+        Args:
+            run_id: 執行批次；None 表示最近一次篩選
+
+        Returns:
+            課程清單（依匹配分數排序）
+        """
+        run_id = run_id or self.last_run_id('filter')
+        if run_id is None:
+            return []
+        return self._rows(
+            """SELECT * FROM programs
+            WHERE last_run = ? AND listed = 0 AND dismissed = 0
+            ORDER BY match_score DESC""",
+            (run_id,)
+        )
+
+    def changes(
+        self,
+        field: Optional[str] = None,
+        run_id: Optional[int] = None,
+        since_run: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        查詢欄位變更歷史（例如 field='tuition_amount' 查詢學費變更）
+
+        Args:
+            field: 欄位名稱；None 表示所有追蹤欄位
+            run_id: 只回傳此批次的變更
+            since_run: 只回傳此批次（不含）之後的變更
+
+        Returns:
+            變更清單（含大學與課程名稱）
+        """
+        sql = """SELECT h.*, p.university, p.program FROM program_history h
+            JOIN programs p ON p.program_id = h.program_id WHERE 1 = 1"""
+        params: List[Any] = []
+        if field:
+            sql += ' AND h.field = ?'
+            params.append(field)
+        if run_id is not None:
+            sql += ' AND h.run_id = ?'
+            params.append(run_id)
+        if since_run is not None:
+            sql += ' AND h.run_id > ?'
+            params.append(since_run)
+        return self._rows(sql + ' ORDER BY h.id', tuple(params))
+
+    def query(
+        self,
+        countries: Optional[List[str]] = None,
+        excluded_countries: Optional[List[str]] = None,
+        max_tuition: Optional[float] = None,
+        max_ielts: Optional[float] = None,
+        min_score: Optional[float] = None,
+        seen_since: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        以索引欄位篩選課程；缺少學費或 IELTS 資訊的課程視為符合（與 CourseFilter 一致）
+
+        Args:
+            countries: 偏好國家
+            excluded_countries: 排除國家
+            max_tuition: 學費上限
+            max_ielts: 個人 IELTS 總分（課程要求不得高於此分數）
+            min_score: 最低匹配分數
+            seen_since: 最後出現時間下限（ISO 格式）
+
+        Returns:
+            課程清單（依匹配分數排序）
+        """
+        clauses, params = ['dismissed = 0'], []
+
+        if countries:
+            clauses.append(f"country IN ({', '.join('?' * len(countries))})")
+            params.extend(countries)
+        if excluded_countries:
+            clauses.append(f"country NOT IN ({', '.join('?' * len(excluded_countries))})")
+            params.extend(excluded_countries)
+        if max_tuition is not None:
+            clauses.append('(tuition_amount IS NULL OR tuition_amount <= ?)')
+            params.append(max_tuition)
+        if max_ielts is not None:
+            clauses.append('(ielts_overall IS NULL OR ielts_overall <= ?)')
+            params.append(max_ielts)
+        if min_score is not None:
+            clauses.append('match_score >= ?')
+            params.append(min_score)
+        if seen_since:
+            clauses.append('last_seen >= ?')
+            params.append(seen_since)
+
+        return self._rows(
+            f"SELECT * FROM programs WHERE {' AND '.join(clauses)} ORDER BY match_score DESC",
+            tuple(params)
+        )
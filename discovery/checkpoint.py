@@ -0,0 +1,190 @@
+"""
+探索爬蟲檢查點
+Crawl Checkpoints for Discovery Scrapers
+
+功能：
+- 持久化已完成的搜尋單位（關鍵字, 國家, 頁數）
+- 課程資料抓到即串流寫入 JSONL，不必等到爬蟲結束
+- 重新執行時從檢查點續爬，跳過已完成的單位
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional, Callable, Union
+
+# 整個搜尋（所有頁面）完成時使用的頁數標記
+ALL_PAGES = 'all'
+
+
+class CrawlCheckpoint:
+    """探索爬蟲檢查點"""
+
+    def __init__(
+        self,
+        source: str,
+        checkpoint_dir: Optional[Path] = None,
+        max_age_hours: float = 72,
+        resume: bool = True
+    ):
+        """
+        初始化檢查點
+
+        Args:
+            source: 來源名稱（決定檢查點檔名）
+            checkpoint_dir: 檢查點目錄
+            max_age_hours: 檢查點有效時數，超過則重新開始
+            resume: 是否從既有檢查點續爬；False 時清除舊檢查點
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.source = source
+        self.checkpoint_dir = Path(checkpoint_dir or 'discovery/checkpoints')
+        self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        self.state_file = self.checkpoint_dir / f'{source}_state.json'
+        self.records_file = self.checkpoint_dir / f'{source}_records.jsonl'
+        self.max_age = timedelta(hours=max_age_hours)
+
+        if not resume:
+            self.clear()
+
+        self.state = self._load_state()
+        self.completed = set(self.state['completed'])
+
+        if self.completed:
+            self.logger.info(f"從檢查點續爬：已完成 {len(self.completed)} 個單位（{self.state['started_at']} 開始）")
+
+    @staticmethod
+    def unit_key(keyword: str, country: Optional[str], page: Union[int, str]) -> str:
+        """搜尋單位的鍵"""
+        return f"{keyword}|{country or '*'}|{page}"
+
+    def _new_state(self) -> Dict[str, Any]:
+        return {
+            'source': self.source,
+            'started_at': datetime.now().isoformat(),
+            'updated_at': datetime.now().isoformat(),
+            'completed': []
+        }
+
+    def _load_state(self) -> Dict[str, Any]:
+        """載入檢查點狀態；過期或損毀時重新開始"""
+        if not self.state_file.exists():
+            return self._new_state()
+
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+
+            if datetime.now() - datetime.fromisoformat(state['updated_at']) > self.max_age:
+                self.logger.info("檢查點已過期，重新開始")
+                self.clear()
+                return self._new_state()
+
+            return state
+        except Exception as e:
+            self.logger.warning(f"檢查點損毀，重新開始: {e}")
+            self.clear()
+            return self._new_state()
+
+    def _save_state(self) -> None:
+        """以暫存檔 + rename 原子寫入狀態"""
+        self.state['completed'] = sorted(self.completed)
+        self.state['updated_at'] = datetime.now().isoformat()
+
+        tmp_file = self.state_file.with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_file, self.state_file)
+
+    def is_done(self, keyword: str, country: Optional[str], page: Union[int, str] = ALL_PAGES) -> bool:
+        """搜尋單位是否已完成"""
+        return self.unit_key(keyword, country, page) in self.completed
+
+    def mark_done(
+        self,
+        keyword: str,
+        country: Optional[str],
+        page: Union[int, str],
+        records: Optional[List[Dict[str, Any]]] = None
+    ) -> None:
+        """
+        串流寫入課程資料並標記單位完成
+
+        先寫入資料再更新狀態；若兩者之間中斷，續爬時該單位會重做，
+        重複的資料由 load_records 的去重處理。
+
+        Args:
+            keyword: 搜尋關鍵字
+            country: 國家（None 表示未篩選）
+            page: 頁數，或 ALL_PAGES 表示整個搜尋完成
+            records: 此單位抓到的課程資料
+        """
+        try:
+            if records:
+                # 上次中斷可能留下不完整的最後一行，先補上換行避免與新資料黏在一起
+                needs_newline = False
+                if self.records_file.exists() and self.records_file.stat().st_size > 0:
+                    with open(self.records_file, 'rb') as f:
+                        f.seek(-1, os.SEEK_END)
+                        needs_newline = f.read(1) != b'\n'
+
+                with open(self.records_file, 'a', encoding='utf-8') as f:
+                    if needs_newline:
+                        f.write('\n')
+                    for record in records:
+                        f.write(json.dumps(record, ensure_ascii=False) + '\n')
+                    f.flush()
+                    os.fsync(f.fileno())
+
+            self.completed.add(self.unit_key(keyword, country, page))
+            self._save_state()
+        except Exception as e:
+            self.logger.error(f"寫入檢查點失敗: {e}")
+
+    def load_records(self, key_func: Optional[Callable[[Dict[str, Any]], str]] = None) -> List[Dict[str, Any]]:
+        """
+        讀取已串流寫入的課程資料
+
+        Args:
+            key_func: 去重用的鍵函式（可選）
+
+        Returns:
+            課程清單
+        """
+        records = []
+        seen = set()
+
+        if not self.records_file.exists():
+            return records
+
+        with open(self.records_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # 中斷時可能留下不完整的最後一行
+                    continue
+
+                if key_func:
+                    key = key_func(record)
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                records.append(record)
+
+        return records
+
+    def clear(self) -> None:
+        """清除檢查點（爬取成功完成後呼叫）"""
+        for path in (self.state_file, self.records_file):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+        self.completed = set()
+        self.state = self._new_state()
@@ -4,8 +4,13 @@ Diagnostic Tool: Check scrapers and find correct CSS selectors
 """
 
 import asyncio
+import sys
+from pathlib import Path
 from playwright.async_api import async_playwright
 
+sys.path.append(str(Path(__file__).parent.parent))
+from crawling.selector_health import SelectorHealth
+
 async def diagnose_mastersportal():
     """診斷 Mastersportal.com"""
     print("=" * 60)
@@ -180,12 +185,36 @@ async def diagnose_studyeu():
         await browser.close()
 
 
+def print_selector_health():
+    """顯示爬蟲執行時累積的選擇器健康度（logs/selector_health.json）"""
+    print("=" * 60)
+    print("📊 選擇器健康度（近期執行）")
+    print("=" * 60)
+    
+    for site in ['mastersportal', 'studyeu']:
+        health = SelectorHealth(site)
+        summary = health.summary()
+        if not summary:
+            print(f"\n{site}: 尚無紀錄")
+            continue
+        
+        print(f"\n{site}（依目前排序）:")
+        for selector in health.ranked(list(summary.keys())):
+            stats = summary[selector]
+            flag = "⚠️ 漂移" if stats['drift'] else ("✅" if stats['hit_rate'] else "❌")
+            precision = f"{stats['precision']:.0%}" if stats['precision'] is not None else "—"
+            print(f"  {flag} '{selector}' - 命中率 {stats['hit_rate']:.0%}，有效課程 {precision}，"
+                  f"平均 {stats['avg_cards']} 個元素，{stats['avg_latency_ms']} ms")
+
+
 async def main():
     """主函式"""
     print("\n🔧 Scraper 診斷工具")
     print("這個工具會幫你找出正確的 CSS selectors\n")
     
-    choice = input("選擇要診斷的網站 (1: Mastersportal, 2: Study.eu, 3: 兩者都診斷): ")
+    print_selector_health()
+    
+    choice = input("\n選擇要診斷的網站 (1: Mastersportal, 2: Study.eu, 3: 兩者都診斷): ")
     
     if choice == '1' or choice == '3':
         await diagnose_mastersportal()
@@ -0,0 +1,232 @@
+"""
+課程詳情頁補充爬蟲
+Program Detail-Page Enrichment
+
+功能：
+- 造訪候選課程的 program_url，補齊卡片上沒有的學費、IELTS、截止日期
+- 欄位擷取沿用 UniversityScraper 的擷取器（data_collection/extractors.py）
+- context 池限制總並行數與每個網域的並行數
+- 依 URL 與內容雜湊快取結果（有效期限內不重新造訪；內容未變時不重新擷取）
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional
+from urllib.parse import urlparse
+from playwright.async_api import async_playwright, Page
+
+from crawling.page_pool import BrowserPool
+from crawling.resource_policy import ResourcePolicy, lightweight_context_options
+from crawling.readiness import ReadinessTracker, ReadyCondition
+from data_collection.extractors import BeautifulSoup, extract_details
+from discovery.program_index import is_placeholder
+
+
+# 詳情頁就緒條件：主要標題出現且文字穩定
+DETAIL_READY = ReadyCondition(selector='h1', text_stable=True, stable_ms=300)
+
+
+class DetailEnricher:
+    """課程詳情頁補充爬蟲"""
+
+    SITE_NAME = 'program_details'
+
+    def __init__(
+        self,
+        cache_file: Optional[Path] = None,
+        ttl_hours: float = 168,
+        concurrency: int = 4,
+        per_domain_concurrency: int = 2,
+        politeness_delay: float = 1.0
+    ):
+        """
+        初始化補充爬蟲
+
+        Args:
+            cache_file: 快取檔案（預設 discovery/detail_cache.json）
+            ttl_hours: 快取有效時數
+            concurrency: 同時造訪的頁面上限
+            per_domain_concurrency: 同一網域同時造訪的頁面上限
+            politeness_delay: 每頁結束後持有名額等待的秒數
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.cache_file = Path(cache_file or 'discovery/detail_cache.json')
+        self.ttl = timedelta(hours=ttl_hours)
+        self.concurrency = concurrency
+        self.per_domain_concurrency = per_domain_concurrency
+        self.politeness_delay = politeness_delay
+        self.resource_policy = ResourcePolicy(self.SITE_NAME)
+        self.readiness = ReadinessTracker()
+        self.pool: Optional[BrowserPool] = None
+        self.stats = {'cached': 0, 'fetched': 0, 'unchanged': 0, 'failed': 0}
+
+        # url -> {'fetched_at', 'content_hash', 'fields'}
+        self.cache: Dict[str, Dict[str, Any]] = self.load_cache()
+        # content_hash -> fields（不同網址內容相同時共用擷取結果）
+        self.by_hash: Dict[str, Dict[str, Any]] = {
+            entry['content_hash']: entry['fields'] for entry in self.cache.values() if entry.get('content_hash')
+        }
+
+    def load_cache(self) -> Dict[str, Dict[str, Any]]:
+        """載入快取"""
+        if not self.cache_file.exists():
+            return {}
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            self.logger.warning(f"讀取詳情快取失敗，重新建立: {e}")
+            return {}
+
+    def save_cache(self) -> None:
+        """以暫存檔 + rename 原子寫入快取"""
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.cache_file.with_suffix('.tmp')
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(self.cache, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_file, self.cache_file)
+        except Exception as e:
+            self.logger.error(f"儲存詳情快取失敗: {e}")
+
+    def is_fresh(self, url: str) -> bool:
+        """快取是否仍在有效期限內"""
+        entry = self.cache.get(url)
+        if not entry:
+            return False
+        return datetime.now() - datetime.fromisoformat(entry['fetched_at']) < self.ttl
+
+    @staticmethod
+    def apply_fields(course: Dict[str, Any], fields: Dict[str, Any]) -> None:
+        """
+        將詳情欄位補到課程上（只補缺值或 'N/A' 等佔位值，不覆寫卡片上已有的資料）
+
+        欄位對應：tuition_fee -> tuition_info、ielts_requirements -> ielts_overall / ielts_details、
+        application_deadline -> application_deadline
+        """
+        if fields.get('tuition_fee') and is_placeholder(course.get('tuition_info')):
+            course['tuition_info'] = fields['tuition_fee']
+
+        ielts = fields.get('ielts_requirements')
+        if ielts:
+            course.setdefault('ielts_details', ielts)
+            if ielts.get('overall') and is_placeholder(course.get('ielts_overall')):
+                course['ielts_overall'] = ielts['overall']
+
+        if fields.get('application_deadline') and is_placeholder(course.get('application_deadline')):
+            course['application_deadline'] = fields['application_deadline']
+
+    async def fetch_fields(self, page: Page, url: str) -> Dict[str, Any]:
+        """
+        造訪詳情頁並擷取欄位
+
+        Args:
+            page: Playwright Page 物件
+            url: 課程網址
+
+        Returns:
+            擷取到的欄位
+        """
+        await self.readiness.goto(page, url, f'{self.SITE_NAME}_{urlparse(url).netloc}', DETAIL_READY)
+        html = await page.content()
+
+        soup = BeautifulSoup(html, 'html.parser')
+        for element in soup(['script', 'style', 'noscript']):
+            element.decompose()
+        content_hash = hashlib.sha256(' '.join(soup.get_text().split()).encode('utf-8')).hexdigest()
+
+        # 內容與先前相同（或與其他網址相同）時沿用擷取結果
+        fields = self.by_hash.get(content_hash)
+        if fields is not None:
+            self.stats['unchanged'] += 1
+        else:
+            fields = extract_details(soup)
+            self.stats['fetched'] += 1
+
+        self.cache[url] = {
+            'fetched_at': datetime.now().isoformat(),
+            'content_hash': content_hash,
+            'fields': fields,
+        }
+        self.by_hash[content_hash] = fields
+        return fields
+
+    async def _enrich_url(self, url: str, courses: List[Dict[str, Any]]) -> None:
+        """造訪一個網址，結果套用到所有使用此網址的課程"""
+        try:
+            async with self.pool.page(urlparse(url).netloc) as page:
+                fields = await self.fetch_fields(page, url)
+                await asyncio.sleep(self.politeness_delay)
+        except Exception as e:
+            self.stats['failed'] += 1
+            self.logger.warning(f"補充詳情失敗 {url}: {e}")
+            return
+
+        for course in courses:
+            self.apply_fields(course, fields)
+            course['enriched_at'] = self.cache[url]['fetched_at']
+
+    async def enrich_async(self, courses: List[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        補充課程詳情（就地更新課程）
+
+        Args:
+            courses: 已通過卡片層級篩選的課程
+
+        Returns:
+            統計（cached / fetched / unchanged / failed）
+        """
+        pending: Dict[str, List[Dict[str, Any]]] = {}
+        for course in courses:
+            url = course.get('program_url')
+            if not url:
+                continue
+            if self.is_fresh(url):
+                self.apply_fields(course, self.cache[url]['fields'])
+                course['enriched_at'] = self.cache[url]['fetched_at']
+                self.stats['cached'] += 1
+            else:
+                pending.setdefault(url, []).append(course)
+
+        self.logger.info(f"詳情補充：快取命中 {self.stats['cached']}，需造訪 {len(pending)} 個頁面")
+        if not pending:
+            return self.stats
+
+        playwright = await async_playwright().start()
+        browser = await playwright.chromium.launch(headless=True)
+        self.pool = BrowserPool(
+            browser,
+            max_contexts=self.concurrency,
+            default_site_limit=self.per_domain_concurrency,
+            context_options=lightweight_context_options(),
+            resource_policy=self.resource_policy
+        )
+
+        try:
+            # 同一網址只造訪一次；並行數由 context 池限制
+            await asyncio.gather(*(self._enrich_url(url, group) for url, group in pending.items()))
+        finally:
+            await self.pool.close()
+            await browser.close()
+            await playwright.stop()
+            self.save_cache()
+            self.readiness.save()
+            self.resource_policy.log_summary()
+
+        self.logger.info(
+            f"詳情補充完成：擷取 {self.stats['fetched']}、內容未變 {self.stats['unchanged']}、"
+            f"快取 {self.stats['cached']}、失敗 {self.stats['failed']}"
+        )
+        return self.stats
+
+    def enrich(self, courses: List[Dict[str, Any]]) -> Dict[str, int]:
+        """同步包裝"""
+        if BeautifulSoup is None:
+            self.logger.warning("未安裝 beautifulsoup4，略過詳情補充")
+            return self.stats
+        return asyncio.run(self.enrich_async(courses))
@@ -7,7 +7,9 @@ Smart Filtering & Validation Engine
 - IELTS 要求驗證
 - 學術興趣匹配
 - 學費驗證
-- 產出符合 schools.yml 格式的資料
+- 增量索引原始資料（跨來源合併），依成本由低到高短路驗證，大量資料時以多個 process 平行篩選
+- 可選的詳情頁補充：只對通過卡片層級篩選的課程造訪詳情頁，補齊後重新驗證
+- 產出符合 schools.yml 格式的資料，寫入課程目錄（discovery/catalog.db）
 """
 
 import yaml
@@ -15,9 +17,17 @@ import json
 import sys
 import re
 import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterable, Iterator, Set, Tuple
+
+sys.path.append(str(Path(__file__).parent.parent))
+from discovery.program_index import ProgramIndex
+from discovery.catalog import ProgramCatalog
+from discovery.raw_stream import iter_batches
+from analysis.keyword_matcher import KeywordMatcher
 
 # 設定日誌
 logging.basicConfig(
@@ -26,16 +36,59 @@ logging.basicConfig(
 )
 
 
+# 子 process 內的篩選引擎（由 _init_worker 建立）
+_WORKER_FILTER = None
+
+
+def _init_worker(profile: Dict[str, Any]) -> None:
+    """子 process 初始化：以主 process 的個人條件建立篩選引擎"""
+    global _WORKER_FILTER
+    _WORKER_FILTER = CourseFilter()
+    _WORKER_FILTER.profile = profile
+    _WORKER_FILTER.prepare_rules()
+
+
+def _filter_batch(batch: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """子 process 篩選一個批次"""
+    return _WORKER_FILTER.filter_batch(batch)
+
+
 class CourseFilter:
     """課程篩選與驗證引擎"""
     
-    def __init__(self):
-        """初始化篩選引擎"""
+    # 驗證順序：由成本最低者開始，任一不通過即短路
+    PREDICATE_ORDER = ['country', 'ielts', 'tuition', 'interest']
+    
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        batch_size: int = 500,
+        parallel_threshold: int = 5000,
+        enrich: bool = False,
+        enrich_concurrency: int = 4
+    ):
+        """
+        初始化篩選引擎
+        
+        Args:
+            workers: 平行篩選的 process 數（預設為 CPU 數）
+            batch_size: 每批次的課程數
+            parallel_threshold: 課程數超過此值後改用多 process 篩選
+            enrich: 是否造訪候選課程的詳情頁補齊學費、IELTS、截止日期
+            enrich_concurrency: 詳情頁同時造訪的上限
+        """
         self.logger = logging.getLogger(self.__class__.__name__)
         self.profile_file = 'source_data/my_profile.yml'
         self.raw_data_dir = Path('discovery/raw_data')
+        self.index_file = Path('discovery/program_index.json')
         self.output_dir = Path('discovery')
         self.profile = None
+        self.rules: Optional[Dict[str, Any]] = None
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.parallel_threshold = parallel_threshold
+        self.enrich = enrich
+        self.enrich_concurrency = enrich_concurrency
     
     def load_profile(self) -> Dict[str, Any]:
         """載入個人申請條件"""
@@ -48,26 +101,52 @@ class CourseFilter:
             self.logger.error(f"載入個人條件失敗: {e}")
             return {}
     
-    def load_raw_courses(self) -> List[Dict[str, Any]]:
-        """載入所有原始課程資料"""
-        all_courses = []
+    def prepare_rules(self) -> Dict[str, Any]:
+        """
+        由個人條件預先計算驗證所需的資料（每次執行只計算一次）
         
-        try:
-            json_files = list(self.raw_data_dir.glob('*.json'))
-            self.logger.info(f"找到 {len(json_files)} 個原始資料檔案")
-            
-            for json_file in json_files:
-                with open(json_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    courses = data.get('courses', [])
-                    all_courses.extend(courses)
-            
-            self.logger.info(f"總共載入 {len(all_courses)} 個課程")
-            return all_courses
+        Returns:
+            驗證規則字典
+        """
+        profile = self.profile or {}
+        geo = profile.get('geographic_preferences', {})
+        financial = profile.get('financial', {})
         
-        except Exception as e:
-            self.logger.error(f"載入原始資料失敗: {e}")
-            return []
+        self.rules = {
+            'my_ielts_overall': profile.get('language_proficiency', {}).get('ielts', {}).get('overall', 0),
+            'max_tuition': financial.get('max_tuition_fee', {}).get('amount', 999999),
+            'preferred_countries': set(geo.get('preferred_countries', [])),
+            'excluded_countries': set(geo.get('excluded_countries', [])),
+            # 興趣比對器（主要 > 次要 > 關鍵字），一次掃描課程名稱即可計分
+            'interest_matcher': KeywordMatcher.from_profile(profile),
+        }
+        return self.rules
+    
+    def get_rules(self) -> Dict[str, Any]:
+        """取得驗證規則（尚未計算時先計算）"""
+        if self.rules is None:
+            self.prepare_rules()
+        return self.rules
+    
+    def iter_raw_courses(self) -> Iterator[Dict[str, Any]]:
+        """
+        逐筆產生本次原始資料中出現的課程
+        
+        透過 ProgramIndex 增量索引 raw_data（串流讀取，只處理新檔案與新紀錄），
+        跨來源（及名稱略有差異）的同一課程會合併為一筆，欄位由所有來源補齊。
+        只產生本次新檔案中出現的課程；先前執行已處理過的課程不再重新篩選與寫入目錄。
+        """
+        json_files = list(self.raw_data_dir.glob('*.json'))
+        self.logger.info(f"找到 {len(json_files)} 個原始資料檔案")
+        
+        index = ProgramIndex(self.index_file)
+        touched: Set[str] = set()
+        index.index_raw_dir(self.raw_data_dir, touched=touched)
+        index.save()
+        
+        self.logger.info(f"本次出現 {len(touched)} 個不重複課程（索引共 {len(index.programs)} 個）")
+        for program_id in touched:
+            yield index.programs[program_id]
     
     def validate_ielts(self, course: Dict[str, Any]) -> bool:
         """
@@ -81,9 +160,7 @@ class CourseFilter:
         """
         try:
             # 取得個人 IELTS 分數
-            my_ielts = self.profile.get('language_proficiency', {}).get('ielts', {})
-            my_overall = my_ielts.get('overall', 0)
-            my_writing = my_ielts.get('writing', 0)
+            my_overall = self.get_rules()['my_ielts_overall']
             
             # 取得課程要求
             course_ielts_text = course.get('ielts_requirement', '')
@@ -124,33 +201,13 @@ class CourseFilter:
             (是否匹配, 匹配分數)
         """
         try:
-            interests = self.profile.get('academic_interests', {})
-            primary_interests = interests.get('primary', [])
-            secondary_interests = interests.get('secondary', [])
-            keywords = interests.get('keywords', [])
-            
-            all_interests = primary_interests + secondary_interests + keywords
-            
-            # 取得課程名稱（轉為小寫）
-            program_name = course.get('program_name', '').lower()
-            
-            # 計算匹配分數
-            match_score = 0.0
-            matched_keywords = []
-            
-            for interest in all_interests:
-                if interest.lower() in program_name:
-                    matched_keywords.append(interest)
-                    # 主要興趣權重較高
-                    if interest in primary_interests:
-                        match_score += 2.0
-                    elif interest in secondary_interests:
-                        match_score += 1.5
-                    else:
-                        match_score += 1.0
+            # 計算匹配分數（主要興趣權重較高；以字詞邊界、同義詞比對）
+            match_score, matched_keywords = self.get_rules()['interest_matcher'].score(
+                course.get('program_name', '')
+            )
             
             if matched_keywords:
-                self.logger.info(f"興趣匹配: {course.get('program_name')} -> {matched_keywords}")
+                self.logger.debug(f"興趣匹配: {course.get('program_name')} -> {matched_keywords}")
                 return True, match_score
             
             return False, 0.0
@@ -163,11 +220,7 @@ class CourseFilter:
         """驗證學費"""
         try:
             # 取得預算上限
-            max_fee = self.profile.get('financial', {}).get('max_tuition_fee', {})
-            max_amount = max_fee.get('amount', 999999)
-            
-            # 如果偏好免學費
-            prefer_free = self.profile.get('financial', {}).get('prefer_tuition_free', False)
+            max_amount = self.get_rules()['max_tuition']
             
             # 取得課程學費資訊
             tuition_info = course.get('tuition_info', '').lower()
@@ -202,8 +255,9 @@ class CourseFilter:
     def validate_country(self, course: Dict[str, Any]) -> bool:
         """驗證國家偏好"""
         try:
-            preferred = self.profile.get('geographic_preferences', {}).get('preferred_countries', [])
-            excluded = self.profile.get('geographic_preferences', {}).get('excluded_countries', [])
+            rules = self.get_rules()
+            preferred = rules['preferred_countries']
+            excluded = rules['excluded_countries']
             
             course_country = course.get('country', '')
             
@@ -222,48 +276,115 @@ class CourseFilter:
             self.logger.debug(f"國家驗證時發生錯誤: {e}")
             return True
     
-    def filter_courses(self, courses: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """篩選課程"""
+    def evaluate(self, course: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
+        """
+        依 PREDICATE_ORDER 驗證單一課程，任一條件不通過即停止
+        
+        通過時會寫入 match_score 與 validation_passed。
+        
+        Args:
+            course: 課程資料
+            
+        Returns:
+            (是否通過, 未通過的條件名稱)
+        """
+        interest_score = 0.0
+        
+        for name in self.PREDICATE_ORDER:
+            if name == 'interest':
+                ok, interest_score = self.validate_interest(course)
+            else:
+                ok = getattr(self, f'validate_{name}')(course)
+            if not ok:
+                return False, name
+        
+        course['match_score'] = interest_score
+        course['validation_passed'] = True
+        return True, None
+    
+    def filter_batch(self, batch: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+        """
+        篩選一個批次
+        
+        Returns:
+            (通過的課程, 各條件淘汰數)
+        """
+        passed = []
+        rejected = {name: 0 for name in self.PREDICATE_ORDER}
+        
+        for course in batch:
+            ok, failed = self.evaluate(course)
+            if ok:
+                passed.append(course)
+            else:
+                rejected[failed] += 1
+        
+        return passed, rejected
+    
+    def filter_stream(self, courses: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        串流篩選課程
+        
+        先在本 process 內逐批篩選；累計課程數超過 parallel_threshold 後，
+        其餘批次交給 process pool（同時在途的批次有上限，記憶體用量不隨資料量成長）。
+        
+        Args:
+            courses: 課程串流
+            
+        Returns:
+            通過所有條件的課程（依匹配分數排序）
+        """
+        self.get_rules()
+        
         filtered = []
-        stats = {
-            'total': len(courses),
-            'passed_ielts': 0,
-            'passed_interest': 0,
-            'passed_tuition': 0,
-            'passed_country': 0,
-            'passed_all': 0
-        }
+        stats = {'total': 0, 'passed_all': 0}
+        rejected = {name: 0 for name in self.PREDICATE_ORDER}
         
-        for course in courses:
-            # 驗證各項條件
-            ielts_ok = self.validate_ielts(course)
-            interest_ok, interest_score = self.validate_interest(course)
-            tuition_ok = self.validate_tuition(course)
-            country_ok = self.validate_country(course)
-            
-            # 統計
-            if ielts_ok:
-                stats['passed_ielts'] += 1
-            if interest_ok:
-                stats['passed_interest'] += 1
-            if tuition_ok:
-                stats['passed_tuition'] += 1
-            if country_ok:
-                stats['passed_country'] += 1
-            
-            # 所有條件都符合
-            if ielts_ok and interest_ok and tuition_ok and country_ok:
-                course['match_score'] = interest_score
-                course['validation_passed'] = True
-                filtered.append(course)
-                stats['passed_all'] += 1
+        def collect(result: Tuple[List[Dict[str, Any]], Dict[str, int]]) -> None:
+            passed, batch_rejected = result
+            filtered.extend(passed)
+            stats['passed_all'] += len(passed)
+            for name, count in batch_rejected.items():
+                rejected[name] += count
+        
+        batches = iter_batches(iter(courses), self.batch_size)
+        executor = None
+        pending = set()
+        
+        try:
+            for batch in batches:
+                stats['total'] += len(batch)
+                
+                if executor is None and (self.workers <= 1 or stats['total'] <= self.parallel_threshold):
+                    collect(self.filter_batch(batch))
+                    continue
+                
+                if executor is None:
+                    self.logger.info(f"課程數超過 {self.parallel_threshold}，改用 {self.workers} 個 process 平行篩選")
+                    executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        initializer=_init_worker,
+                        initargs=(self.profile,)
+                    )
+                
+                # 限制在途批次數
+                if len(pending) >= self.workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        collect(future.result())
+                
+                pending.add(executor.submit(_filter_batch, batch))
+            
+            for future in pending:
+                collect(future.result())
+        finally:
+            if executor:
+                executor.shutdown()
         
         self.logger.info(f"\n篩選統計:")
         self.logger.info(f"  總課程數: {stats['total']}")
-        self.logger.info(f"  通過 IELTS: {stats['passed_ielts']}")
-        self.logger.info(f"  通過興趣: {stats['passed_interest']}")
-        self.logger.info(f"  通過學費: {stats['passed_tuition']}")
-        self.logger.info(f"  通過國家: {stats['passed_country']}")
+        for name in self.PREDICATE_ORDER:
+            self.logger.info(f"  未通過 {name}: {rejected[name]}")
         self.logger.info(f"  全部通過: {stats['passed_all']}")
         
         # 按匹配分數排序
@@ -271,6 +392,43 @@ class CourseFilter:
         
         return filtered
     
+    def filter_courses(self, courses: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """篩選課程"""
+        return self.filter_stream(courses)
+    
+    def enrich_candidates(self, courses: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        造訪候選課程的詳情頁補齊欄位，並以補齊後的資料重新驗證
+        
+        只有通過卡片層級篩選的課程才會被造訪，以節省爬取預算。
+        
+        Args:
+            courses: 通過卡片層級篩選的課程
+            
+        Returns:
+            補齊後仍符合條件的課程
+        """
+        try:
+            from discovery.enrichment import DetailEnricher
+            
+            DetailEnricher(concurrency=self.enrich_concurrency).enrich(courses)
+        except Exception as e:
+            self.logger.error(f"詳情補充失敗，使用卡片層級資料: {e}")
+            return courses
+        
+        kept = []
+        rejected: Dict[str, int] = {}
+        for course in courses:
+            ok, failed = self.evaluate(course)
+            if ok:
+                kept.append(course)
+            else:
+                rejected[failed] = rejected.get(failed, 0) + 1
+        
+        if rejected:
+            self.logger.info(f"補齊詳情後淘汰 {len(courses) - len(kept)} 個課程: {rejected}")
+        return kept
+    
     def convert_to_schools_format(self, courses: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """轉換為 schools.yml 格式"""
         schools = []
@@ -293,6 +451,12 @@ class CourseFilter:
             # 如果有 IELTS 資訊
             if 'ielts_requirement' in course:
                 school['ielts_requirement'] = course['ielts_requirement']
+            elif 'ielts_details' in course:
+                school['ielts_requirement'] = course['ielts_details']
+            
+            # 如果有學費資訊
+            if course.get('tuition_info'):
+                school['tuition_fee'] = course['tuition_info']
             
             # 如果有截止日期
             if 'application_deadline' in course:
@@ -331,14 +495,18 @@ class CourseFilter:
                 self.logger.error("無法載入個人條件")
                 return []
             
-            # 載入原始課程資料
-            raw_courses = self.load_raw_courses()
-            if not raw_courses:
+            self.prepare_rules()
+            
+            if not any(self.raw_data_dir.glob('*.json')):
                 self.logger.warning("沒有原始課程資料")
                 return []
             
-            # 篩選課程
-            filtered = self.filter_courses(raw_courses)
+            # 增量索引原始資料（跨來源重複已合併），只篩選本次出現的課程
+            filtered = self.filter_stream(self.iter_raw_courses())
+            
+            # 只對候選課程造訪詳情頁補齊欄位
+            if self.enrich:
+                filtered = self.enrich_candidates(filtered)
             
             # 儲存結果
             self.save_filtered_results(filtered)
@@ -346,8 +514,8 @@ class CourseFilter:
             # 轉換為 schools.yml 格式
             schools_format = self.convert_to_schools_format(filtered)
             
-            # 儲存 schools 格式
-            self.save_schools_format(schools_format)
+            # 寫入課程目錄
+            self.save_to_catalog(schools_format)
             
             self.logger.info(f"=== 篩選完成，找到 {len(filtered)} 個符合的課程 ===")
             return schools_format
@@ -356,21 +524,40 @@ class CourseFilter:
             self.logger.error(f"篩選過程發生錯誤: {e}")
             return []
     
-    def save_schools_format(self, schools: List[Dict[str, Any]]) -> None:
-        """儲存 schools 格式"""
-        filename = self.output_dir / f"qualified_schools_{datetime.now().strftime('%Y%m%d_%H%M%S')}.yml"
+    def save_to_catalog(self, schools: List[Dict[str, Any]]) -> Optional[int]:
+        """
+        將篩選結果 upsert 到課程目錄（取代每次產生新的 qualified_schools_*.yml）
         
+        Returns:
+            本次執行批次的 run_id
+        """
+        catalog = None
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
-                yaml.dump({'schools': schools}, f, allow_unicode=True, sort_keys=False, default_flow_style=False)
+            catalog = ProgramCatalog(self.output_dir / 'catalog.db')
+            run_id = catalog.start_run('filter')
+            stats = catalog.upsert_many(schools, run_id)
+            catalog.finish_run(run_id, stats)
             
-            self.logger.info(f"Schools 格式已儲存: {filename}")
+            self.logger.info(f"篩選結果已寫入課程目錄（run {run_id}）")
+            return run_id
         except Exception as e:
-            self.logger.error(f"儲存 schools 格式失敗: {e}")
-
+            self.logger.error(f"寫入課程目錄失敗: {e}")
+            return None
+        finally:
+            # workflow 接著會提交 catalog.db，必須先關閉連線
+            if catalog is not None:
+                catalog.close()
 
 def main():
     """主函式"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='智慧課程篩選引擎')
+    parser.add_argument('--enrich', action='store_true', help='造訪候選課程詳情頁補齊學費、IELTS、截止日期')
+    parser.add_argument('--enrich-concurrency', type=int, default=4, help='詳情頁同時造訪的上限')
+    
+    args = parser.parse_args()
+    
     print("""
 ╔══════════════════════════════════════════════════════════╗
 ║         智慧課程篩選引擎                                ║
@@ -378,7 +565,7 @@ def main():
 ╚══════════════════════════════════════════════════════════╝
     """)
     
-    filter_engine = CourseFilter()
+    filter_engine = CourseFilter(enrich=args.enrich, enrich_concurrency=args.enrich_concurrency)
     qualified_schools = filter_engine.run()
     
     print(f"\n✅ 篩選完成！")
@@ -0,0 +1,286 @@
+"""
+URL 參數並行分頁
+Concurrent Pagination by URL Parameter
+
+功能：
+- 由第一頁的分頁連結偵測頁數 / 位移 URL 參數（page=2、offset=20 ...）
+- 以 context 池在不同 context 上並行抓取後續頁面（滑動視窗，有上限）
+- 自適應停止：遇到空白頁或全部與先前重複的頁面，就不再排程之後的頁數
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, Callable, Awaitable, Iterable, Set, TYPE_CHECKING
+from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
+from playwright.async_api import Page
+
+from discovery.api_capture import PAGE_PARAM_NAMES, OFFSET_PARAM_NAMES
+
+if TYPE_CHECKING:
+    from crawling.page_pool import BrowserPool
+
+
+# 收集頁面上的分頁連結
+PAGINATION_LINKS_JS = """
+() => {
+    const selectors = [
+        'a[rel="next"]', '.pagination a', '[class*="pagination"] a', '[class*="Pagination"] a',
+        'a[href*="page="]', 'a[href*="offset="]', 'a[href*="start="]'
+    ];
+    const hrefs = new Set();
+    for (const selector of selectors) {
+        for (const link of document.querySelectorAll(selector)) {
+            if (link.href) hrefs.add(link.href);
+        }
+    }
+    return Array.from(hrefs).slice(0, 100);
+}
+"""
+
+
+@dataclass
+class PageParam:
+    """分頁 URL 參數"""
+    name: str
+    kind: str   # 'page' 或 'offset'
+    first: int  # 第 1 頁的參數值
+    step: int   # 每頁遞增量
+
+    def value_for(self, page_num: int) -> int:
+        """第 page_num 頁（從 1 起算）的參數值"""
+        return self.first + (page_num - 1) * self.step
+
+    def url_for(self, url: str, page_num: int) -> str:
+        """將第 page_num 頁的參數值寫入 URL"""
+        parsed = urlparse(url)
+        query = parse_qs(parsed.query, keep_blank_values=True)
+        query[self.name] = [str(self.value_for(page_num))]
+        return urlunparse(parsed._replace(query=urlencode(query, doseq=True)))
+
+
+def _int_param(query: Dict[str, List[str]], name: str) -> Optional[int]:
+    try:
+        return int(query[name][0])
+    except (KeyError, IndexError, ValueError):
+        return None
+
+
+def detect_page_param(current_url: str, hrefs: Iterable[str]) -> Optional[PageParam]:
+    """
+    由分頁連結推斷分頁參數
+
+    只考慮與目前頁面路徑相同的連結；出現次數最多的候選參數勝出。
+
+    Args:
+        current_url: 目前（第 1 頁）的 URL
+        hrefs: 頁面上的分頁連結
+
+    Returns:
+        分頁參數；偵測不到時回傳 None
+    """
+    current = urlparse(current_url)
+    current_query = parse_qs(current.query)
+    values: Dict[str, Set[int]] = {}
+
+    for href in hrefs:
+        parsed = urlparse(href)
+        if parsed.netloc != current.netloc or parsed.path.rstrip('/') != current.path.rstrip('/'):
+            continue
+        query = parse_qs(parsed.query)
+        for name in PAGE_PARAM_NAMES + OFFSET_PARAM_NAMES:
+            value = _int_param(query, name)
+            if value is not None:
+                values.setdefault(name, set()).add(value)
+
+    best: Optional[PageParam] = None
+    best_hits = 0
+
+    for name, found in values.items():
+        kind = 'offset' if name in OFFSET_PARAM_NAMES else 'page'
+        first = _int_param(current_query, name)
+        if first is None:
+            # 第 1 頁通常省略參數；連結中出現 0 表示從 0 起算
+            first = 0 if (kind == 'offset' or 0 in found) else 1
+
+        deltas = [value - first for value in found if value > first]
+        if not deltas:
+            continue
+
+        if len(found) > best_hits:
+            best = PageParam(name=name, kind=kind, first=first, step=min(deltas))
+            best_hits = len(found)
+
+    return best
+
+
+async def find_page_param(page: Page) -> Optional[PageParam]:
+    """在已載入的第 1 頁上偵測分頁參數"""
+    try:
+        hrefs = await page.evaluate(PAGINATION_LINKS_JS)
+    except Exception:
+        return None
+    return detect_page_param(page.url, hrefs or [])
+
+
+class ConcurrentPaginator:
+    """以 URL 參數並行抓取搜尋結果頁"""
+
+    def __init__(
+        self,
+        pool: 'BrowserPool',
+        site: str,
+        fetch_page: Callable[[Page, str], Awaitable[List[Dict[str, Any]]]],
+        key_func: Callable[[Dict[str, Any]], str],
+        max_pages: int = 50,
+        concurrency: int = 2,
+        politeness_delay: float = 1.0,
+        max_failures: int = 3,
+        failure_backoff: float = 5.0
+    ):
+        """
+        初始化分頁器
+
+        Args:
+            pool: context 池（每頁在借出的 context 上抓取）
+            site: context 池中的網站名稱（決定並行上限）
+            fetch_page: 載入 URL 並擷取課程的函式
+            key_func: 課程去重用的鍵函式
+            max_pages: 最多抓取的頁數
+            concurrency: 同時抓取的頁數上限
+            politeness_delay: 每頁結束後持有名額等待的秒數
+            max_failures: 連續失敗幾頁後停止分頁
+            failure_backoff: 失敗後再抓取下一頁前等待的秒數（連續失敗時加倍）
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.pool = pool
+        self.site = site
+        self.fetch_page = fetch_page
+        self.key_func = key_func
+        self.max_pages = max_pages
+        self.concurrency = max(1, concurrency)
+        self.politeness_delay = politeness_delay
+        self.max_failures = max(1, max_failures)
+        self.failure_backoff = failure_backoff
+        # 最近一次 crawl 是否完整結束（到達最後一頁或分頁上限，且其間沒有失敗的頁面）
+        self.completed = False
+
+    async def _fetch(self, url: str) -> List[Dict[str, Any]]:
+        async with self.pool.page(self.site) as page:
+            items = await self.fetch_page(page, url)
+            await asyncio.sleep(self.politeness_delay)
+            return items
+
+    async def crawl(
+        self,
+        param: PageParam,
+        first_url: str,
+        seen: Optional[Set[str]] = None,
+        start_page: int = 2,
+        skip: Optional[Callable[[int], bool]] = None,
+        on_page: Optional[Callable[[int, List[Dict[str, Any]]], None]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        並行抓取 start_page 到 max_pages 頁，遇到沒有新結果的頁面或連續失敗即停止
+
+        失敗後先退避，並在恢復成功前一次只抓取一頁。結束後 self.completed 表示
+        分頁是否完整（因連續失敗停止，或停止頁之前有失敗的頁面時為 False）。
+
+        Args:
+            param: 分頁參數
+            first_url: 第 1 頁的 URL
+            seen: 已取得課程的鍵（會就地更新）
+            start_page: 起始頁數
+            skip: 判斷某頁是否略過（例如檢查點已完成）
+            on_page: 每頁完成時的回呼 (頁數, 該頁課程)
+
+        Returns:
+            新取得的課程（依完成順序）
+        """
+        seen = seen if seen is not None else set()
+        courses: List[Dict[str, Any]] = []
+        stop_at = self.max_pages
+        next_page = start_page
+        running: Dict[asyncio.Task, int] = {}
+        failures = 0
+        first_failed = stop_at
+        failed_pages: Set[int] = set()
+        gave_up = False
+        self.completed = False
+
+        def stop_after(page_num: int) -> None:
+            nonlocal stop_at
+            stop_at = min(stop_at, page_num)
+            for other, other_page in running.items():
+                if other_page > stop_at:
+                    other.cancel()
+
+        try:
+            while True:
+                # 連續失敗期間一次只抓取一頁
+                limit = 1 if failures else self.concurrency
+                while len(running) < limit and next_page <= stop_at:
+                    if skip and skip(next_page):
+                        self.logger.info(f"檢查點：第 {next_page} 頁已完成，跳過")
+                        next_page += 1
+                        continue
+                    url = param.url_for(first_url, next_page)
+                    running[asyncio.create_task(self._fetch(url))] = next_page
+                    next_page += 1
+
+                if not running:
+                    break
+
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                failed = False
+
+                for task in done:
+                    page_num = running.pop(task)
+                    if page_num > stop_at:
+                        continue
+
+                    try:
+                        items = task.result()
+                    except asyncio.CancelledError:
+                        continue
+                    except Exception as e:
+                        # 失敗的頁面不寫入檢查點，續爬時會重試
+                        failures += 1
+                        failed = True
+                        first_failed = min(first_failed, page_num) if failures > 1 else page_num
+                        failed_pages.add(page_num)
+                        self.logger.warning(f"第 {page_num} 頁抓取失敗（連續 {failures} 次）: {e}")
+                        if failures >= self.max_failures:
+                            gave_up = True
+                            stop_after(first_failed - 1)
+                            self.logger.warning(f"連續 {failures} 頁抓取失敗，分頁停止於第 {stop_at} 頁")
+                        continue
+
+                    failures = 0
+                    new_items = [item for item in items if self.key_func(item) not in seen]
+                    if not new_items:
+                        stop_after(page_num - 1)
+                        self.logger.info(f"第 {page_num} 頁沒有新結果，分頁停止於第 {stop_at} 頁")
+                        continue
+
+                    seen.update(self.key_func(item) for item in new_items)
+                    courses.extend(new_items)
+                    self.logger.info(f"第 {page_num} 頁找到 {len(new_items)} 個課程")
+                    if on_page:
+                        on_page(page_num, new_items)
+
+                # 退避後再抓取下一頁
+                if failed and failures and next_page <= stop_at:
+                    delay = self.failure_backoff * 2 ** (failures - 1)
+                    self.logger.info(f"抓取失敗，{delay:.0f} 秒後再繼續")
+                    await asyncio.sleep(delay)
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+
+        if stop_at >= self.max_pages:
+            self.logger.info(f"已達分頁上限 {self.max_pages} 頁")
+        self.completed = not gave_up and not any(page_num <= stop_at for page_num in failed_pages)
+        return courses
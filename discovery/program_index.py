@@ -0,0 +1,417 @@
+"""
+跨來源課程身分索引
+Cross-Source Program Identity Index
+
+功能：
+- 正規化大學與課程名稱（大小寫、重音、縮寫、常見贅字）
+- 以 MinHash + LSH 分桶做次線性的候選查找
+- 候選以實際 Jaccard 相似度確認，判定為同一課程
+- 合併政策：由所有來源補齊欄位，並保留來源與網址清單
+- 增量索引：重新執行時只處理新的原始資料檔案與新紀錄
+"""
+
+import json
+import hashlib
+import logging
+import random
+import re
+import unicodedata
+import zlib
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, List, Any, Iterable, Optional, Set, Tuple
+
+from discovery.raw_stream import iter_courses
+
+
+# 視為缺值的欄位內容
+PLACEHOLDER_VALUES = {None, '', 'Unknown', 'N/A', 'unknown', 'n/a'}
+
+# 縮寫展開
+ABBREVIATIONS = {
+    'univ': 'university',
+    'uni': 'university',
+    'tech': 'technology',
+    'inst': 'institute',
+    'sci': 'science',
+    'eng': 'engineering',
+    'comp': 'computer',
+    'cs': 'computer science',
+    'ai': 'artificial intelligence',
+    'ml': 'machine learning',
+    'msc': '',
+    'ms': '',
+    'ma': '',
+    'mphil': '',
+}
+
+# 不影響身分的贅字
+STOPWORDS = {
+    'the', 'of', 'in', 'and', 'for', 'at', 'de', 'der', 'und',
+    'master', 'masters', 'programme', 'program', 'degree', 'course', 'study', 'studies',
+}
+
+# 不同來源常見的課程名稱後綴，例如 "Computer Science (M.Sc.)"
+DEGREE_SUFFIX_PATTERN = re.compile(r'\((?:m\.?\s?sc|m\.?\s?a|m\.?\s?eng|master)[^)]*\)', re.IGNORECASE)
+
+# 合併時以最新值覆寫的欄位
+LATEST_WINS_FIELDS = {'scraped_at'}
+
+
+def normalize_tokens(text: Optional[str]) -> List[str]:
+    """
+    將名稱正規化為排序後的 token 清單
+
+    Args:
+        text: 原始名稱
+
+    Returns:
+        token 清單（順序無關）
+    """
+    if not text:
+        return []
+
+    text = DEGREE_SUFFIX_PATTERN.sub(' ', text)
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch)).lower()
+    text = text.replace('&', ' and ')
+    text = re.sub(r'[^a-z0-9]+', ' ', text)
+
+    tokens = []
+    for token in text.split():
+        expanded = ABBREVIATIONS.get(token, token)
+        for word in expanded.split():
+            if word not in STOPWORDS:
+                tokens.append(word)
+    return sorted(set(tokens))
+
+
+def shingles(tokens: List[str], size: int = 3) -> Set[str]:
+    """由 token 產生字元 n-gram（對拼字差異較 token 集合穩定）"""
+    text = ' '.join(tokens)
+    if len(text) <= size:
+        return {text} if text else set()
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    """Jaccard 相似度"""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def is_placeholder(value: Any) -> bool:
+    """欄位值是否為缺值"""
+    try:
+        return value in PLACEHOLDER_VALUES
+    except TypeError:
+        return False
+
+
+class MinHasher:
+    """MinHash 簽章產生器"""
+
+    PRIME = (1 << 61) - 1
+
+    def __init__(self, num_perm: int = 64, seed: int = 42):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self.params = [(rng.randrange(1, self.PRIME), rng.randrange(0, self.PRIME)) for _ in range(num_perm)]
+
+    def signature(self, items: Set[str]) -> List[int]:
+        """計算集合的 MinHash 簽章"""
+        hashes = [zlib.crc32(item.encode('utf-8')) for item in items] or [0]
+        return [min((a * h + b) % self.PRIME for h in hashes) for a, b in self.params]
+
+
+class ProgramIndex:
+    """跨來源課程身分索引"""
+
+    def __init__(
+        self,
+        index_file: Optional[Path] = None,
+        num_perm: int = 64,
+        bands: int = 16,
+        university_threshold: float = 0.6,
+        program_threshold: float = 0.7
+    ):
+        """
+        初始化索引
+
+        Args:
+            index_file: 索引檔案；None 表示只在記憶體中使用
+            num_perm: MinHash 排列數
+            bands: LSH 分段數（每段 num_perm / bands 列）
+            university_threshold: 大學名稱相似度門檻
+            program_threshold: 課程名稱相似度門檻
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.index_file = Path(index_file) if index_file else None
+        self.hasher = MinHasher(num_perm)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.university_threshold = university_threshold
+        self.program_threshold = program_threshold
+
+        self.programs: Dict[str, Dict[str, Any]] = {}
+        self.signatures: Dict[str, List[int]] = {}
+        self.indexed_files: Dict[str, float] = {}
+        self.record_fingerprints: Set[str] = set()
+
+        # 以下可由 programs 重建，不寫入檔案
+        self.buckets: Dict[Tuple[int, Tuple[int, ...]], Set[str]] = {}
+        self.shingle_cache: Dict[str, Tuple[Set[str], Set[str]]] = {}
+        self.url_index: Dict[str, str] = {}
+
+        if self.index_file:
+            self.load()
+
+    @staticmethod
+    def identity_names(record: Dict[str, Any]) -> Tuple[str, str]:
+        """取得紀錄的大學與課程名稱（相容 raw_data 與 schools.yml 欄位）"""
+        university = record.get('university_name') or record.get('name') or record.get('full_name') or ''
+        program = record.get('program_name') or record.get('program') or ''
+        return str(university), str(program)
+
+    @staticmethod
+    def record_url(record: Dict[str, Any]) -> str:
+        return record.get('program_url') or ''
+
+    def _fingerprint(self, record: Dict[str, Any]) -> str:
+        """紀錄指紋（同一來源的同一筆資料只索引一次）"""
+        university, program = self.identity_names(record)
+        raw = f"{record.get('source', '')}|{self.record_url(record)}|{university}|{program}"
+        return hashlib.sha1(raw.lower().encode('utf-8')).hexdigest()
+
+    def _shingles(self, record: Dict[str, Any]) -> Tuple[Set[str], Set[str]]:
+        university, program = self.identity_names(record)
+        return shingles(normalize_tokens(university)), shingles(normalize_tokens(program))
+
+    def _band_keys(self, signature: List[int]) -> List[Tuple[int, Tuple[int, ...]]]:
+        return [
+            (band, tuple(signature[band * self.rows:(band + 1) * self.rows]))
+            for band in range(self.bands)
+        ]
+
+    def _register(self, program_id: str, record: Dict[str, Any]) -> None:
+        """將課程加入分桶、shingle 快取與網址索引"""
+        uni_shingles, prog_shingles = self._shingles(record)
+        self.shingle_cache[program_id] = (uni_shingles, prog_shingles)
+
+        if program_id not in self.signatures:
+            self.signatures[program_id] = self.hasher.signature(
+                {f'u:{s}' for s in uni_shingles} | {f'p:{s}' for s in prog_shingles}
+            )
+        for key in self._band_keys(self.signatures[program_id]):
+            self.buckets.setdefault(key, set()).add(program_id)
+
+        for url in record.get('program_urls', []) or [self.record_url(record)]:
+            if url:
+                self.url_index[url] = program_id
+
+    def find(self, record: Dict[str, Any]) -> Optional[str]:
+        """
+        尋找紀錄對應的課程 ID
+
+        Args:
+            record: 課程紀錄
+
+        Returns:
+            課程 ID；找不到時回傳 None
+        """
+        url = self.record_url(record)
+        if url and url in self.url_index:
+            return self.url_index[url]
+
+        uni_shingles, prog_shingles = self._shingles(record)
+        if not prog_shingles:
+            return None
+
+        signature = self.hasher.signature({f'u:{s}' for s in uni_shingles} | {f'p:{s}' for s in prog_shingles})
+        candidates: Set[str] = set()
+        for key in self._band_keys(signature):
+            candidates |= self.buckets.get(key, set())
+
+        best_id, best_score = None, 0.0
+        for candidate in candidates:
+            cand_uni, cand_prog = self.shingle_cache[candidate]
+            uni_score = jaccard(uni_shingles, cand_uni)
+            prog_score = jaccard(prog_shingles, cand_prog)
+            if uni_score >= self.university_threshold and prog_score >= self.program_threshold:
+                score = uni_score + prog_score
+                if score > best_score:
+                    best_id, best_score = candidate, score
+        return best_id
+
+    def merge(self, canonical: Dict[str, Any], record: Dict[str, Any]) -> None:
+        """
+        合併政策：缺值欄位由新來源補齊；scraped_at 取最新；
+        sources 與 program_urls 累積所有來源
+        """
+        for field, value in record.items():
+            if is_placeholder(value):
+                continue
+            if field in LATEST_WINS_FIELDS:
+                if str(value) > str(canonical.get(field) or ''):
+                    canonical[field] = value
+            elif is_placeholder(canonical.get(field)):
+                canonical[field] = value
+
+        source = record.get('source')
+        if source and source not in canonical['sources']:
+            canonical['sources'].append(source)
+
+        url = self.record_url(record)
+        if url and url not in canonical['program_urls']:
+            canonical['program_urls'].append(url)
+
+    def add(self, record: Dict[str, Any]) -> Tuple[Optional[str], bool]:
+        """
+        加入一筆紀錄
+
+        Args:
+            record: 課程紀錄
+
+        Returns:
+            (課程 ID, 是否為新課程)；已索引過的紀錄回傳 (None, False)
+        """
+        fingerprint = self._fingerprint(record)
+        if fingerprint in self.record_fingerprints:
+            return None, False
+        self.record_fingerprints.add(fingerprint)
+
+        program_id = self.find(record)
+        if program_id:
+            self.merge(self.programs[program_id], record)
+            url = self.record_url(record)
+            if url:
+                self.url_index[url] = program_id
+            return program_id, False
+
+        university, program = self.identity_names(record)
+        key = f"{' '.join(normalize_tokens(university))}|{' '.join(normalize_tokens(program))}"
+        program_id = hashlib.sha1(key.encode('utf-8')).hexdigest()[:12]
+        while program_id in self.programs:
+            program_id = hashlib.sha1(f'{program_id}+'.encode('utf-8')).hexdigest()[:12]
+
+        canonical = dict(record)
+        canonical['program_id'] = program_id
+        canonical['sources'] = [record['source']] if record.get('source') else []
+        url = self.record_url(record)
+        canonical['program_urls'] = [url] if url else []
+
+        self.programs[program_id] = canonical
+        self._register(program_id, canonical)
+        return program_id, True
+
+    def restore(self, program_id: str, record: Dict[str, Any]) -> None:
+        """以既有的課程 ID 加入課程（例如由外部儲存的目錄重建索引）"""
+        canonical = dict(record)
+        canonical['program_id'] = program_id
+        canonical.setdefault('sources', [])
+        canonical.setdefault('program_urls', [])
+        self.programs[program_id] = canonical
+        self._register(program_id, canonical)
+
+    def add_many(self, records: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        批次加入紀錄
+
+        Returns:
+            統計（new / merged / skipped）
+        """
+        stats = {'new': 0, 'merged': 0, 'skipped': 0}
+        for record in records:
+            program_id, is_new = self.add(record)
+            if program_id is None:
+                stats['skipped'] += 1
+            elif is_new:
+                stats['new'] += 1
+            else:
+                stats['merged'] += 1
+        return stats
+
+    def index_raw_dir(self, raw_data_dir: Path, touched: Optional[Set[str]] = None) -> Dict[str, int]:
+        """
+        增量索引原始資料目錄（只處理新增或修改過的檔案）
+
+        Args:
+            raw_data_dir: discovery/raw_data 目錄
+            touched: 若提供，加入本次處理的檔案中出現的課程 ID（含已索引過的重複紀錄）
+
+        Returns:
+            統計（files / new / merged / skipped）
+        """
+        totals = {'files': 0, 'new': 0, 'merged': 0, 'skipped': 0}
+
+        for json_file in sorted(Path(raw_data_dir).glob('*.json')):
+            mtime = json_file.stat().st_mtime
+            if self.indexed_files.get(json_file.name) == mtime:
+                continue
+
+            for record in iter_courses(json_file):
+                program_id, is_new = self.add(record)
+                if program_id is None:
+                    totals['skipped'] += 1
+                    # 已索引過的紀錄仍代表本次有看到此課程
+                    program_id = self.find(record) if touched is not None else None
+                elif is_new:
+                    totals['new'] += 1
+                else:
+                    totals['merged'] += 1
+                if touched is not None and program_id:
+                    touched.add(program_id)
+            totals['files'] += 1
+            self.indexed_files[json_file.name] = mtime
+
+        self.logger.info(
+            f"索引 {totals['files']} 個新檔案：新增 {totals['new']}、合併 {totals['merged']}、"
+            f"略過 {totals['skipped']}（共 {len(self.programs)} 個課程）"
+        )
+        return totals
+
+    def all_programs(self) -> List[Dict[str, Any]]:
+        """取得所有合併後的課程"""
+        return list(self.programs.values())
+
+    def load(self) -> None:
+        """載入索引並重建分桶"""
+        if not self.index_file or not self.index_file.exists():
+            return
+
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+
+            self.programs = data.get('programs', {})
+            self.signatures = data.get('signatures', {})
+            self.indexed_files = data.get('indexed_files', {})
+            self.record_fingerprints = set(data.get('record_fingerprints', []))
+
+            for program_id, record in self.programs.items():
+                self._register(program_id, record)
+
+            self.logger.info(f"載入課程索引：{len(self.programs)} 個課程")
+        except Exception as e:
+            self.logger.warning(f"載入課程索引失敗，重新建立: {e}")
+            self.programs, self.signatures, self.indexed_files = {}, {}, {}
+            self.record_fingerprints = set()
+
+    def save(self) -> None:
+        """儲存索引"""
+        if not self.index_file:
+            return
+
+        try:
+            self.index_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.index_file, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'updated_at': datetime.now().isoformat(),
+                    'programs': self.programs,
+                    'signatures': self.signatures,
+                    'indexed_files': self.indexed_files,
+                    'record_fingerprints': sorted(self.record_fingerprints),
+                }, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            self.logger.error(f"儲存課程索引失敗: {e}")
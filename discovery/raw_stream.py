@@ -0,0 +1,121 @@
+"""
+原始課程資料串流讀取
+Streaming Reader for Raw Discovery Data
+
+逐筆讀取 discovery/raw_data/*.json 中 "courses" 陣列的課程，不將整個檔案載入記憶體。
+有安裝 ijson 時使用 ijson；否則使用內建的分段解析（json.JSONDecoder.raw_decode）。
+"""
+
+import json
+import logging
+import re
+from pathlib import Path
+from typing import Dict, List, Any, Iterator, Union
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+COURSES_ARRAY_PATTERN = re.compile(r'"courses"\s*:\s*\[')
+
+
+def _iter_courses_builtin(f, chunk_size: int = CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+    """以 raw_decode 逐一解析 courses 陣列中的物件"""
+    decoder = json.JSONDecoder()
+    buffer = ''
+    eof = False
+
+    # 找到 "courses": [ 的位置
+    while True:
+        match = COURSES_ARRAY_PATTERN.search(buffer)
+        if match:
+            buffer = buffer[match.end():]
+            break
+        if eof:
+            return
+        chunk = f.read(chunk_size)
+        eof = not chunk
+        # 保留尾端，避免鍵名被切在兩段之間
+        buffer = buffer[-32:] + chunk
+
+    pos = 0
+    while True:
+        # 略過空白與逗號
+        while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+            pos += 1
+
+        if pos < len(buffer) and buffer[pos] == ']':
+            return
+
+        if pos >= len(buffer):
+            if eof:
+                return
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer, pos = buffer[pos:] + chunk, 0
+            continue
+
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            # 物件被切在兩段之間，讀取更多資料再試
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer, pos = buffer[pos:] + chunk, 0
+            continue
+
+        if isinstance(item, dict):
+            yield item
+        pos = end
+
+        # 定期丟棄已解析的部分，維持緩衝區大小
+        if pos > chunk_size:
+            buffer, pos = buffer[pos:], 0
+
+
+def iter_courses(json_file: Union[str, Path]) -> Iterator[Dict[str, Any]]:
+    """
+    逐筆讀取單一原始資料檔案的課程
+
+    Args:
+        json_file: 原始資料檔案
+
+    Yields:
+        課程資料
+    """
+    try:
+        if ijson is not None:
+            with open(json_file, 'rb') as f:
+                for item in ijson.items(f, 'courses.item', use_float=True):
+                    if isinstance(item, dict):
+                        yield item
+        else:
+            with open(json_file, 'r', encoding='utf-8') as f:
+                yield from _iter_courses_builtin(f)
+    except Exception as e:
+        logger.warning(f"讀取 {json_file} 時發生錯誤，略過其餘內容: {e}")
+
+
+def iter_raw_dir(raw_data_dir: Union[str, Path]) -> Iterator[Dict[str, Any]]:
+    """逐筆讀取目錄內所有原始資料檔案的課程"""
+    for json_file in sorted(Path(raw_data_dir).glob('*.json')):
+        yield from iter_courses(json_file)
+
+
+def iter_batches(records: Iterator[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    """將串流切成固定大小的批次"""
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -7,12 +7,21 @@ import asyncio
 import json
 import sys
 import logging
+import time
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, AsyncIterator, Tuple, Set
 from playwright.async_api import async_playwright, Browser, Page
 
 sys.path.append(str(Path(__file__).parent.parent))
+from crawling.page_pool import BrowserPool
+from crawling.resource_policy import ResourcePolicy, lightweight_context_options
+from crawling.readiness import ReadinessTracker, ReadyCondition
+from crawling.selector_health import SelectorHealth
+from discovery.bulk_extractor import build_card_spec, bulk_extract_cards
+from discovery.api_capture import SearchApiCapture
+from discovery.checkpoint import CrawlCheckpoint, ALL_PAGES
+from discovery.pagination import ConcurrentPaginator, PageParam, find_page_param
 
 # 設定日誌
 logging.basicConfig(
@@ -26,86 +35,224 @@ class MastersPortalScraper:
     
     BASE_URL = 'https://www.mastersportal.com'
     SEARCH_URL = f'{BASE_URL}/search/master/'
+    SITE_NAME = 'mastersportal'
+    # 並行分頁在 context 池中使用的網站名稱（與搜尋單位分開計算並行上限）
+    PAGES_SITE = 'mastersportal_pages'
     
-    def __init__(self, keywords: List[str], countries: Optional[List[str]] = None):
+    # 課程卡片選擇器（基於診斷結果更新 2025-10-09）
+    CARD_SELECTORS = [
+        '.SearchStudyCard',  # ← 診斷找到的最新 class
+        '[class*="card"]',   # ← 診斷確認有效（20 個元素）
+        'article',           # ← 診斷確認有效（25 個元素）
+        '.StudyCard',        # 保留舊的作為 fallback
+        '.study-card',
+        '[class*="CourseCard"]',
+        '[class*="ProgramCard"]',
+        '.search-result-item'
+    ]
+    
+    # 卡片內各欄位的選擇器
+    FIELD_SELECTORS = {
+        'program_name': [
+            '.StudyName',        # ← 診斷找到的課程名稱 class
+            '.program-name',
+            '.course-name',
+            'h2',
+            'h3',
+            '[class*="title"]',
+            '[class*="StudyName"]'
+        ],
+        'university_name': ['.university-name', '.institution', '[class*="university"]', '[class*="school"]'],
+        'country': ['.country', '[class*="country"]', '.location'],
+        'city': ['.city', '[class*="city"]'],
+        'tuition_info': ['.tuition', '.fee', '[class*="tuition"]', '[class*="fee"]'],
+    }
+    
+    LINK_SELECTORS = ['a[href*="/studies/"]', 'a[href*="/programmes/"]', 'a[href*="/program/"]']
+    
+    CARD_SPEC = build_card_spec(CARD_SELECTORS, FIELD_SELECTORS, [', '.join(LINK_SELECTORS)], link_self=True)
+    
+    # 結果集簽章：網址 + 結果卡片內的所有連結（用於確認點擊「下一頁」後結果確實更換）
+    RESULT_SIGNATURE_JS = """
+    (selector) => location.href + '|' + Array.from(document.querySelectorAll(selector))
+        .flatMap(el => el.matches('a[href]') ? [el] : Array.from(el.querySelectorAll('a[href]')))
+        .map(a => a.getAttribute('href'))
+        .join(' ')
+    """
+    
+    # 頁面就緒條件：結果卡片出現且數量穩定
+    RESULTS_READY = ReadyCondition(
+        selector='.SearchStudyCard, .StudyCard, .study-card, [class*="course"], [class*="program"]',
+        stable_ms=500
+    )
+    
+    def __init__(
+        self,
+        keywords: List[str],
+        countries: Optional[List[str]] = None,
+        pool_size: int = 4,
+        site_concurrency: int = 2,
+        politeness_delay: float = 1.0,
+        discovery_mode: str = 'dom',
+        resume: bool = True,
+        max_pages: int = 50,
+        page_concurrency: int = 2
+    ):
         """
         初始化爬蟲
         
         Args:
             keywords: 搜尋關鍵字清單
             countries: 目標國家清單（可選）
+            pool_size: 並行模式的 context 池大小
+            site_concurrency: 並行模式下對本網站的同時請求上限
+            politeness_delay: 並行模式下每個搜尋單位結束後的間隔秒數
+            discovery_mode: 'dom' 解析頁面；'api' 優先直接呼叫搜尋 API，失敗時改用 DOM
+            resume: 是否從上次中斷的檢查點續爬
+            max_pages: 每個搜尋最多抓取的結果頁數
+            page_concurrency: 以 URL 參數分頁時同時抓取的頁數
         """
         self.logger = logging.getLogger(self.__class__.__name__)
         self.keywords = keywords
         self.countries = countries or []
+        self.pool_size = pool_size
+        self.site_concurrency = site_concurrency
+        self.politeness_delay = politeness_delay
+        self.discovery_mode = discovery_mode
+        self.max_pages = max_pages
+        self.page_concurrency = page_concurrency
         self.playwright = None
         self.browser: Optional[Browser] = None
+        self.pool: Optional[BrowserPool] = None
+        self.resource_policy = ResourcePolicy(self.SITE_NAME)
+        self.readiness = ReadinessTracker()
+        self.selector_health = SelectorHealth(self.SITE_NAME)
+        self.checkpoint = CrawlCheckpoint(self.SITE_NAME, resume=resume)
         self.raw_data_dir = Path('discovery/raw_data')
         self.raw_data_dir.mkdir(parents=True, exist_ok=True)
     
-    async def search_courses(self, page: Page, keyword: str) -> List[Dict[str, Any]]:
+    def build_search_url(self, keyword: str, country: Optional[str] = None) -> str:
+        """
+        構建搜尋 URL
+        
+        Args:
+            keyword: 搜尋關鍵字
+            country: 單一國家篩選；未指定時使用全部 self.countries
+            
+        Returns:
+            搜尋 URL
+        """
+        search_url = f"{self.SEARCH_URL}?q={keyword.replace(' ', '+')}"
+        countries = [country] if country else self.countries
+        if countries:
+            # 加入國家篩選
+            country_param = '&'.join([f'ct[]={c}' for c in countries])
+            search_url += f"&{country_param}"
+        return search_url
+    
+    async def search_courses(self, page: Page, keyword: str, country: Optional[str] = None) -> List[Dict[str, Any]]:
         """
         搜尋課程
         
         Args:
             page: Playwright Page 物件
             keyword: 搜尋關鍵字
+            country: 單一國家篩選（可選）
             
         Returns:
             課程清單
         """
         courses = []
         
+        # 檢查點以實際篩選的國家識別搜尋單位
+        unit_country = country or ','.join(self.countries) or None
+        if self.checkpoint.is_done(keyword, unit_country):
+            self.logger.info(f"檢查點：'{keyword}'" + (f" ({country})" if country else "") + " 已完成，跳過")
+            return courses
+        
         try:
-            self.logger.info(f"搜尋關鍵字: {keyword}")
+            self.logger.info(f"搜尋關鍵字: {keyword}" + (f" ({country})" if country else ""))
             
             # 構建搜尋 URL
-            search_url = f"{self.SEARCH_URL}?q={keyword.replace(' ', '+')}"
-            if self.countries:
-                # 加入國家篩選
-                country_param = '&'.join([f'ct[]={c}' for c in self.countries])
-                search_url += f"&{country_param}"
+            search_url = self.build_search_url(keyword, country)
+            
+            capture = None
+            if self.discovery_mode == 'api':
+                capture = SearchApiCapture('Mastersportal', self.BASE_URL)
+                capture.attach(page)
             
             self.logger.info(f"訪問: {search_url}")
-            await page.goto(search_url, timeout=30000, wait_until='networkidle')
-            await page.wait_for_timeout(3000)
+            _, ready = await self.readiness.goto(
+                page, search_url, f'{self.SITE_NAME}_search', self.RESULTS_READY, default_timeout=10000
+            )
             
-            # 等待搜尋結果載入
-            try:
-                await page.wait_for_selector('.StudyCard, .study-card, [class*="course"], [class*="program"]', timeout=10000)
-            except:
+            # API 模式：直接呼叫攔截到的搜尋端點翻頁
+            if capture:
+                capture.detach(page)
+                api_courses = await capture.harvest(page)
+                if api_courses is not None:
+                    self.logger.info(f"關鍵字 '{keyword}' 透過 API 找到 {len(api_courses)} 個課程")
+                    self.checkpoint.mark_done(keyword, unit_country, ALL_PAGES, api_courses)
+                    return api_courses
+                self.logger.info("未攔截到可用的搜尋 API，改用 DOM 擷取")
+            
+            # 搜尋結果未載入
+            if not ready:
                 self.logger.warning(f"未找到課程卡片，可能沒有結果或頁面結構已變更")
                 await self.debug_screenshot(page, f'mastersportal_no_results_{keyword}')
                 return courses
             
-            # 處理分頁
+            # 處理分頁（抓取失敗時不標記整個搜尋完成，下次由逐頁檢查點續爬）
             page_num = 1
-            max_pages = 10  # 限制最多爬取頁數
+            completed = True
             
-            while page_num <= max_pages:
-                self.logger.info(f"處理第 {page_num} 頁")
-                
-                # 抓取當前頁面的課程
-                page_courses = await self.extract_courses_from_page(page)
-                courses.extend(page_courses)
+            while page_num <= self.max_pages:
+                if self.checkpoint.is_done(keyword, unit_country, page_num):
+                    self.logger.info(f"檢查點：第 {page_num} 頁已完成，跳過")
+                else:
+                    self.logger.info(f"處理第 {page_num} 頁")
+                    
+                    # 抓取當前頁面的課程，並立即寫入檢查點
+                    page_courses = await self.extract_courses_from_page(page)
+                    courses.extend(page_courses)
+                    self.checkpoint.mark_done(keyword, unit_country, page_num, page_courses)
+                    
+                    self.logger.info(f"第 {page_num} 頁找到 {len(page_courses)} 個課程")
                 
-                self.logger.info(f"第 {page_num} 頁找到 {len(page_courses)} 個課程")
+                # 分頁由 URL 參數控制時，其餘頁面改為並行抓取
+                if page_num == 1 and self.pool:
+                    param = await find_page_param(page)
+                    if param:
+                        page_courses, completed = await self.fetch_pages_concurrently(
+                            param, page.url, keyword, unit_country, courses
+                        )
+                        courses.extend(page_courses)
+                        break
                 
                 # 檢查是否有下一頁
                 try:
                     next_button = await page.query_selector('a[rel="next"], button:has-text("Next"), .pagination .next')
                     if next_button:
+                        before = await self.result_signature(page)
                         await next_button.click()
-                        await page.wait_for_load_state('networkidle', timeout=15000)
-                        await page.wait_for_timeout(2000)
+                        # 用戶端分頁時舊卡片仍滿足就緒條件：先確認結果集已更換，否則視為最後一頁
+                        if not await self.wait_for_new_results(page, before):
+                            self.logger.info("點擊下一頁後結果未更換，停止分頁")
+                            break
+                        await self.readiness.wait(page, f'{self.SITE_NAME}_next_page', self.RESULTS_READY)
                         page_num += 1
                     else:
                         self.logger.info("沒有更多頁面")
                         break
-                except:
-                    self.logger.info("到達最後一頁")
+                except Exception as e:
+                    self.logger.warning(f"切換到第 {page_num + 1} 頁失敗: {e}")
+                    completed = False
                     break
             
+            if completed:
+                self.checkpoint.mark_done(keyword, unit_country, ALL_PAGES)
+            else:
+                self.logger.warning(f"關鍵字 '{keyword}' 分頁未完整結束，保留逐頁檢查點待下次續爬")
             self.logger.info(f"關鍵字 '{keyword}' 共找到 {len(courses)} 個課程")
             return courses
         
@@ -114,32 +261,121 @@ class MastersPortalScraper:
             await self.debug_screenshot(page, f'mastersportal_error_{keyword}')
             return courses
     
+    async def result_signature(self, page: Page) -> str:
+        """目前結果集的簽章（頁面導航中時回傳空字串）"""
+        try:
+            return await page.evaluate(self.RESULT_SIGNATURE_JS, self.RESULTS_READY.selector)
+        except Exception:
+            return ''
+    
+    async def wait_for_new_results(self, page: Page, before: str, default_timeout: int = 15000) -> bool:
+        """
+        等待結果集簽章改變（網址或第一批卡片連結不同）
+        
+        Args:
+            page: Playwright Page 物件
+            before: 點擊前的簽章
+            default_timeout: 預設逾時（毫秒，樣本足夠時改用自適應逾時）
+            
+        Returns:
+            結果是否已更換
+        """
+        target = f'{self.SITE_NAME}_next_results'
+        started = time.monotonic()
+        deadline = started + self.readiness.timeout_for(target, default_timeout) / 1000
+        while time.monotonic() < deadline:
+            signature = await self.result_signature(page)
+            if signature and signature != before:
+                self.readiness.record(target, (time.monotonic() - started) * 1000)
+                return True
+            await asyncio.sleep(0.1)
+        return False
+    
+    async def fetch_result_page(self, page: Page, url: str) -> List[Dict[str, Any]]:
+        """載入單一結果頁並擷取課程；結果未載入時回傳空清單"""
+        _, ready = await self.readiness.goto(
+            page, url, f'{self.SITE_NAME}_result_page', self.RESULTS_READY, default_timeout=10000
+        )
+        if not ready:
+            return []
+        return await self.extract_courses_from_page(page)
+    
+    async def fetch_pages_concurrently(
+        self,
+        param: PageParam,
+        first_url: str,
+        keyword: str,
+        unit_country: Optional[str],
+        first_page_courses: List[Dict[str, Any]]
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        以 URL 參數並行抓取第 2 頁之後的結果，沒有新結果時停止
+        
+        Args:
+            param: 偵測到的分頁參數
+            first_url: 第 1 頁的 URL
+            keyword: 搜尋關鍵字
+            unit_country: 檢查點使用的國家
+            first_page_courses: 第 1 頁已取得的課程（用於判斷重複頁）
+            
+        Returns:
+            (第 2 頁之後的課程, 分頁是否完整結束)
+        """
+        self.logger.info(
+            f"偵測到分頁參數 {param.name}（{param.kind}，每頁 +{param.step}），"
+            f"並行抓取最多 {self.max_pages} 頁"
+        )
+        paginator = ConcurrentPaginator(
+            self.pool,
+            self.PAGES_SITE,
+            self.fetch_result_page,
+            self.course_key,
+            max_pages=self.max_pages,
+            concurrency=self.page_concurrency,
+            politeness_delay=self.politeness_delay
+        )
+        courses = await paginator.crawl(
+            param,
+            first_url,
+            seen={self.course_key(course) for course in first_page_courses},
+            skip=lambda page_num: self.checkpoint.is_done(keyword, unit_country, page_num),
+            on_page=lambda page_num, items: self.checkpoint.mark_done(keyword, unit_country, page_num, items)
+        )
+        return courses, paginator.completed
+    
+    def create_pool(self, max_contexts: int, search_concurrency: int) -> BrowserPool:
+        """建立 context 池（搜尋單位與分頁各自有並行上限，合計不超過池大小以免互相等待）"""
+        return BrowserPool(
+            self.browser,
+            max_contexts=max(max_contexts, search_concurrency + self.page_concurrency),
+            per_site_limits={self.SITE_NAME: search_concurrency, self.PAGES_SITE: self.page_concurrency},
+            context_options=lightweight_context_options(),
+            resource_policy=self.resource_policy
+        )
+    
     async def extract_courses_from_page(self, page: Page) -> List[Dict[str, Any]]:
-        """從當前頁面提取課程資訊"""
+        """從當前頁面提取課程資訊（優先使用批次擷取）"""
+        bulk_courses = await self.extract_courses_bulk(page)
+        if bulk_courses is not None:
+            return bulk_courses
+        
         courses = []
         
         try:
-            # 嘗試多種可能的選擇器（基於診斷結果更新 2025-10-09）
-            selectors = [
-                '.SearchStudyCard',  # ← 診斷找到的最新 class
-                '[class*="card"]',   # ← 診斷確認有效（20 個元素）
-                'article',           # ← 診斷確認有效（25 個元素）
-                '.StudyCard',        # 保留舊的作為 fallback
-                '.study-card',
-                '[class*="CourseCard"]',
-                '[class*="ProgramCard"]',
-                '.search-result-item'
-            ]
-            
             course_elements = None
-            for selector in selectors:
+            used_selector = None
+            for selector in self.selector_health.ranked(self.CARD_SELECTORS):
+                started = time.perf_counter()
                 try:
                     elements = await page.query_selector_all(selector)
+                    self.selector_health.record(selector, len(elements), (time.perf_counter() - started) * 1000)
                     if elements and len(elements) > 0:
                         course_elements = elements
+                        used_selector = selector
                         self.logger.info(f"使用選擇器 '{selector}' 找到 {len(elements)} 個課程")
                         break
                 except:
+                    self.selector_health.record(selector, 0, (time.perf_counter() - started) * 1000)
                     continue
             
             if not course_elements:
@@ -149,12 +385,13 @@ class MastersPortalScraper:
             # 提取每個課程的資訊
             for element in course_elements:
                 try:
-                    course_data = await self.extract_course_details(element, page)
+                    course_data = await self.extract_course_details(element)
                     if course_data:
                         courses.append(course_data)
                 except Exception as e:
                     self.logger.error(f"提取課程詳情時發生錯誤: {e}")
                     continue
+            self.selector_health.record_valid(used_selector, len(course_elements), len(courses))
             
             return courses
         
@@ -162,126 +399,96 @@ class MastersPortalScraper:
             self.logger.error(f"從頁面提取課程時發生錯誤: {e}")
             return courses
     
-    async def extract_course_details(self, element, page: Page) -> Optional[Dict[str, Any]]:
-        """提取單一課程的詳細資訊"""
+    async def extract_courses_bulk(self, page: Page) -> Optional[List[Dict[str, Any]]]:
+        """
+        以單一 page.evaluate 擷取整頁課程卡片
+        
+        Args:
+            page: Playwright Page 物件
+            
+        Returns:
+            課程清單；批次擷取失敗時回傳 None
+        """
+        # 依近期命中率與延遲重新排序卡片選擇器
+        spec = dict(self.CARD_SPEC, card_selectors=self.selector_health.ranked(self.CARD_SPEC['card_selectors']))
+        result = await bulk_extract_cards(page, spec)
+        if result is None:
+            return None
+        self.selector_health.record_attempts(result.get('attempts'))
+        
+        if not result.get('selector'):
+            self.logger.warning("未找到課程元素")
+            return []
+        
+        self.logger.info(f"使用選擇器 '{result['selector']}' 批次擷取 {len(result['cards'])} 個課程")
+        
+        courses = []
+        for card in result['cards']:
+            # 詳情頁只在篩選後由 discovery/enrichment.py 造訪（filter_and_validate.py --enrich）
+            course_data = self.build_course_record(card, card.get('href'))
+            if course_data:
+                courses.append(course_data)
+        self.selector_health.record_valid(result['selector'], len(result['cards']), len(courses))
+        
+        return courses
+    
+    def build_course_record(self, fields: Dict[str, Optional[str]], href: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        由卡片欄位建立課程資料
+        
+        Args:
+            fields: 欄位名稱 -> 文字
+            href: 課程連結（可為相對路徑）
+            
+        Returns:
+            課程資料；缺少課程名稱或大學名稱時回傳 None
+        """
+        program_name = fields.get('program_name')
+        university = fields.get('university_name')
+        if not (program_name and university):
+            return None
+        
+        program_url = None
+        if href:
+            program_url = href if href.startswith('http') else f"{self.BASE_URL}{href}"
+        
+        return {
+            'program_name': program_name,
+            'university_name': university,
+            'country': fields.get('country') or 'Unknown',
+            'city': fields.get('city') or 'Unknown',
+            'tuition_info': fields.get('tuition_info') or 'N/A',
+            'program_url': program_url or '',
+            'source': 'Mastersportal',
+            'scraped_at': datetime.now().isoformat()
+        }
+    
+    async def extract_course_details(self, element) -> Optional[Dict[str, Any]]:
+        """提取單一課程卡片的資訊"""
         try:
-            # 程式名稱（基於診斷結果更新）
-            program_name = await self.extract_text(element, [
-                '.StudyName',        # ← 診斷找到的課程名稱 class
-                '.program-name', 
-                '.course-name', 
-                'h2', 
-                'h3', 
-                '[class*="title"]',
-                '[class*="StudyName"]'
-            ])
-            
-            # 大學名稱
-            university = await self.extract_text(element, [
-                '.university-name', '.institution', '[class*="university"]', '[class*="school"]'
-            ])
-            
-            # 國家
-            country = await self.extract_text(element, [
-                '.country', '[class*="country"]', '.location'
-            ])
-            
-            # 城市
-            city = await self.extract_text(element, [
-                '.city', '[class*="city"]'
-            ])
-            
-            # 學費
-            tuition = await self.extract_text(element, [
-                '.tuition', '.fee', '[class*="tuition"]', '[class*="fee"]'
-            ])
+            fields = {}
+            for field, selectors in self.FIELD_SELECTORS.items():
+                fields[field] = await self.extract_text(element, selectors)
             
             # 課程連結（基於診斷結果更新）
-            program_url = None
+            href = None
             
             # 如果元素本身就是連結
             if await element.evaluate('el => el.tagName.toLowerCase()') == 'a':
                 href = await element.get_attribute('href')
-                if href:
-                    program_url = href if href.startswith('http') else f"{self.BASE_URL}{href}"
             else:
                 # 在元素內查找連結
-                link = await element.query_selector('a[href*="/studies/"], a[href*="/programmes/"], a[href*="/program/"]')
+                link = await element.query_selector(', '.join(self.LINK_SELECTORS))
                 if link:
                     href = await link.get_attribute('href')
-                    if href:
-                        program_url = href if href.startswith('http') else f"{self.BASE_URL}{href}"
-            
-            # 如果找到基本資訊，回傳課程資料
-            if program_name and university:
-                course_data = {
-                    'program_name': program_name,
-                    'university_name': university,
-                    'country': country or 'Unknown',
-                    'city': city or 'Unknown',
-                    'tuition_info': tuition or 'N/A',
-                    'program_url': program_url or '',
-                    'source': 'Mastersportal',
-                    'scraped_at': datetime.now().isoformat()
-                }
-                
-                # 嘗試訪問詳細頁面獲取更多資訊
-                if program_url:
-                    detailed_info = await self.fetch_detailed_info(page, program_url)
-                    if detailed_info:
-                        course_data.update(detailed_info)
-                
-                return course_data
             
-            return None
+            # 如果找到基本資訊，回傳課程資料（詳情頁由篩選後的補充階段造訪）
+            return self.build_course_record(fields, href)
         
         except Exception as e:
             self.logger.error(f"提取課程詳情時發生錯誤: {e}")
             return None
     
-    async def fetch_detailed_info(self, page: Page, url: str) -> Optional[Dict[str, Any]]:
-        """訪問詳細頁面獲取更多資訊"""
-        try:
-            # 開啟新分頁
-            new_page = await page.context.new_page()
-            await new_page.goto(url, timeout=20000, wait_until='networkidle')
-            await new_page.wait_for_timeout(2000)
-            
-            details = {}
-            
-            # 嘗試抓取 IELTS 要求
-            ielts_text = await self.extract_text(new_page, [
-                'text=IELTS', '[class*="ielts"]', '[class*="english"]'
-            ])
-            if ielts_text:
-                details['ielts_requirement'] = ielts_text
-                # 嘗試解析分數
-                import re
-                scores = re.findall(r'(\d+\.?\d*)', ielts_text)
-                if scores:
-                    details['ielts_overall'] = float(scores[0])
-            
-            # 截止日期
-            deadline = await self.extract_text(new_page, [
-                '[class*="deadline"]', 'text=Deadline', '[class*="apply-by"]'
-            ])
-            if deadline:
-                details['application_deadline'] = deadline
-            
-            # 學費詳細資訊
-            tuition_detail = await self.extract_text(new_page, [
-                '[class*="tuition"]', '[class*="fee"]', 'text=Tuition'
-            ])
-            if tuition_detail:
-                details['tuition_detail'] = tuition_detail
-            
-            await new_page.close()
-            return details
-        
-        except Exception as e:
-            self.logger.warning(f"無法獲取詳細資訊 ({url}): {e}")
-            return None
-    
     async def extract_text(self, element, selectors: List[str]) -> Optional[str]:
         """從元素中提取文字"""
         for selector in selectors:
@@ -311,46 +518,152 @@ class MastersPortalScraper:
         except Exception as e:
             self.logger.error(f"儲存截圖失敗: {e}")
     
+    def build_search_units(self) -> List[Tuple[str, Optional[str]]]:
+        """
+        將關鍵字與國家展開為獨立的搜尋單位
+        
+        Returns:
+            (關鍵字, 國家) 清單；沒有國家篩選時國家為 None
+        """
+        countries: List[Optional[str]] = list(self.countries) or [None]
+        return [(keyword, country) for keyword in self.keywords for country in countries]
+    
+    @staticmethod
+    def course_key(course: Dict[str, Any]) -> str:
+        """課程去重用的鍵（優先使用 program_url）"""
+        url = course.get('program_url', '')
+        if url:
+            return url
+        return f"{course.get('university_name', '')}_{course.get('program_name', '')}".lower()
+    
+    async def _search_unit(self, keyword: str, country: Optional[str]) -> List[Dict[str, Any]]:
+        """在 context 池中執行單一搜尋單位"""
+        async with self.pool.page(self.SITE_NAME) as page:
+            courses = await self.search_courses(page, keyword, country)
+            # 在持有網站名額時等待，確保對網站的請求頻率有上限
+            await asyncio.sleep(self.politeness_delay)
+            return courses
+    
+    async def discover_parallel(self) -> AsyncIterator[Dict[str, Any]]:
+        """
+        並行執行所有搜尋單位，並以去重後的串流回傳課程
+        
+        需先設定 self.pool。
+        
+        Yields:
+            不重複的課程資料
+        """
+        units = self.build_search_units()
+        self.logger.info(f"並行搜尋 {len(units)} 個單位（context 池: {self.pool.max_contexts}）")
+        
+        tasks = [asyncio.create_task(self._search_unit(keyword, country)) for keyword, country in units]
+        seen: Set[str] = set()
+        
+        try:
+            for finished in asyncio.as_completed(tasks):
+                try:
+                    courses = await finished
+                except Exception as e:
+                    self.logger.error(f"搜尋單位執行失敗: {e}")
+                    continue
+                
+                for course in courses:
+                    key = self.course_key(course)
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    yield course
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+    
+    async def run_parallel_async(self) -> List[Dict[str, Any]]:
+        """執行爬蟲（並行模式）"""
+        unique_courses = []
+        
+        try:
+            self.logger.info("=== 開始並行爬取 Mastersportal.com ===")
+            
+            self.playwright = await async_playwright().start()
+            self.browser = await self.playwright.chromium.launch(headless=True)
+            self.pool = self.create_pool(self.pool_size, self.site_concurrency)
+            
+            async for course in self.discover_parallel():
+                unique_courses.append(course)
+            
+            # 合併先前中斷時已寫入檢查點的課程
+            unique_courses = self.checkpoint.load_records(self.course_key)
+            self.logger.info(f"總共找到 {len(unique_courses)} 個獨特課程")
+            
+            # 儲存原始資料，成功後清除檢查點
+            if self.save_raw_data(unique_courses):
+                self.checkpoint.clear()
+            
+            return unique_courses
+        
+        except Exception as e:
+            self.logger.error(f"並行爬蟲執行失敗: {e}")
+            return unique_courses
+        
+        finally:
+            self.resource_policy.log_summary()
+            self.readiness.save()
+            self.selector_health.finish_run()
+            if self.pool:
+                await self.pool.close()
+            if self.browser:
+                try:
+                    await self.browser.close()
+                except:
+                    pass
+            if self.playwright:
+                try:
+                    await self.playwright.stop()
+                except:
+                    pass
+    
     async def run_async(self) -> List[Dict[str, Any]]:
         """執行爬蟲"""
-        all_courses = []
-        
         try:
             self.logger.info("=== 開始爬取 Mastersportal.com ===")
             
             # 啟動 Playwright
             self.playwright = await async_playwright().start()
             self.browser = await self.playwright.chromium.launch(headless=True)
-            context = await self.browser.new_context(
-                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            )
+            context = await self.browser.new_context(**lightweight_context_options())
+            await self.resource_policy.apply(context)
             page = await context.new_page()
             
+            # 搜尋頁依序處理，分頁結果在池中的其他 context 並行抓取
+            self.pool = self.create_pool(self.page_concurrency, 0)
+            
             # 對每個關鍵字進行搜尋
             for keyword in self.keywords:
-                courses = await self.search_courses(page, keyword)
-                all_courses.extend(courses)
+                if self.checkpoint.is_done(keyword, ','.join(self.countries) or None):
+                    self.logger.info(f"檢查點：'{keyword}' 已完成，跳過")
+                    continue
+                
+                await self.search_courses(page, keyword)
                 
                 # 避免過度頻繁的請求
                 await asyncio.sleep(3)
             
-            # 去重（根據 program_url）
-            seen_urls = set()
-            unique_courses = []
-            for course in all_courses:
-                url = course.get('program_url', '')
-                if url and url not in seen_urls:
-                    seen_urls.add(url)
-                    unique_courses.append(course)
-                elif not url:
-                    unique_courses.append(course)
+            # 由檢查點讀取（含先前中斷時已完成的單位）並去重
+            unique_courses = self.checkpoint.load_records(self.course_key)
             
             self.logger.info(f"總共找到 {len(unique_courses)} 個獨特課程")
             
-            # 儲存原始資料
-            self.save_raw_data(unique_courses)
+            # 儲存原始資料，成功後清除檢查點
+            if self.save_raw_data(unique_courses):
+                self.checkpoint.clear()
+            
+            self.resource_policy.log_summary()
+            self.readiness.save()
+            self.selector_health.finish_run()
             
             # 清理
+            await self.pool.close()
             await context.close()
             await self.browser.close()
             await self.playwright.stop()
@@ -359,6 +672,9 @@ class MastersPortalScraper:
         
         except Exception as e:
             self.logger.error(f"爬蟲執行失敗: {e}")
+            self.logger.info("已完成的單位保留在檢查點，重新執行即可續爬")
+            if self.pool:
+                await self.pool.close()
             if self.browser:
                 try:
                     await self.browser.close()
@@ -371,11 +687,13 @@ class MastersPortalScraper:
                     pass
             return []
     
-    def run(self) -> List[Dict[str, Any]]:
+    def run(self, parallel: bool = False) -> List[Dict[str, Any]]:
         """同步包裝"""
+        if parallel:
+            return asyncio.run(self.run_parallel_async())
         return asyncio.run(self.run_async())
     
-    def save_raw_data(self, courses: List[Dict[str, Any]]) -> None:
+    def save_raw_data(self, courses: List[Dict[str, Any]]) -> bool:
         """儲存原始資料"""
         filename = self.raw_data_dir / f"mastersportal_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
         
@@ -391,8 +709,10 @@ class MastersPortalScraper:
                 }, f, ensure_ascii=False, indent=2)
             
             self.logger.info(f"原始資料已儲存: {filename}")
+            return True
         except Exception as e:
             self.logger.error(f"儲存原始資料失敗: {e}")
+            return False
 
 
 def main():
@@ -402,6 +722,13 @@ def main():
     parser = argparse.ArgumentParser(description='Mastersportal.com 課程搜尋爬蟲')
     parser.add_argument('--keywords', nargs='+', required=True, help='搜尋關鍵字')
     parser.add_argument('--countries', nargs='+', help='目標國家')
+    parser.add_argument('--parallel', action='store_true', help='以 context 池並行搜尋所有關鍵字 / 國家')
+    parser.add_argument('--pool-size', type=int, default=4, help='並行模式的 context 池大小')
+    parser.add_argument('--site-concurrency', type=int, default=2, help='並行模式下對網站的同時請求上限')
+    parser.add_argument('--mode', choices=['dom', 'api'], default='dom', help='擷取模式（api 失敗時自動改用 dom）')
+    parser.add_argument('--fresh', action='store_true', help='忽略上次中斷的檢查點，重新爬取')
+    parser.add_argument('--max-pages', type=int, default=50, help='每個搜尋最多抓取的結果頁數')
+    parser.add_argument('--page-concurrency', type=int, default=2, help='以 URL 參數分頁時同時抓取的頁數')
     
     args = parser.parse_args()
     
@@ -413,10 +740,16 @@ def main():
     
     scraper = MastersPortalScraper(
         keywords=args.keywords,
-        countries=args.countries
+        countries=args.countries,
+        pool_size=args.pool_size,
+        site_concurrency=args.site_concurrency,
+        discovery_mode=args.mode,
+        resume=not args.fresh,
+        max_pages=args.max_pages,
+        page_concurrency=args.page_concurrency
     )
     
-    courses = scraper.run()
+    courses = scraper.run(parallel=args.parallel)
     
     print(f"\n✅ 完成！找到 {len(courses)} 個課程")
     print(f"原始資料已儲存至: discovery/raw_data/")
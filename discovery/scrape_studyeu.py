@@ -7,12 +7,21 @@ import asyncio
 import json
 import sys
 import logging
+import time
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 from playwright.async_api import async_playwright, Browser, Page
 
 sys.path.append(str(Path(__file__).parent.parent))
+from crawling.page_pool import BrowserPool
+from crawling.resource_policy import ResourcePolicy, lightweight_context_options
+from crawling.readiness import ReadinessTracker, ReadyCondition
+from crawling.selector_health import SelectorHealth
+from discovery.bulk_extractor import build_card_spec, bulk_extract_cards
+from discovery.api_capture import SearchApiCapture
+from discovery.checkpoint import CrawlCheckpoint, ALL_PAGES
+from discovery.pagination import ConcurrentPaginator, find_page_param
 
 # 設定日誌
 logging.basicConfig(
@@ -26,14 +35,68 @@ class StudyEuScraper:
     
     BASE_URL = 'https://www.study.eu'
     SEARCH_URL = f'{BASE_URL}/search'
+    SITE_NAME = 'studyeu'
+    PAGES_SITE = 'studyeu_pages'
     
-    def __init__(self, keywords: List[str], countries: Optional[List[str]] = None):
-        """初始化爬蟲"""
+    # 課程卡片選擇器（基於診斷結果更新 2025-10-09）
+    CARD_SELECTORS = [
+        '[class*="result"]',     # ← 診斷確認有效（60 個元素）
+        '[class*="card"]',       # ← 診斷確認有效（3 個元素）
+        '.program-card',
+        '.course-card',
+        '[class*="ProgramCard"]',
+        '[class*="course"]',
+        'article'
+    ]
+    
+    FIELD_SELECTORS = {
+        'program_name': ['h2', 'h3', '.title'],
+        'university_name': ['.university', '.school', '[class*="uni"]'],
+        'country': ['.country', '[class*="country"]'],
+        'city': ['.city', '[class*="city"]'],
+    }
+    
+    CARD_SPEC = build_card_spec(CARD_SELECTORS, FIELD_SELECTORS, ['a'])
+    
+    # 頁面就緒條件：結果卡片出現且數量穩定
+    RESULTS_READY = ReadyCondition(selector='.program-card, [class*="course"], [class*="result"]', stable_ms=500)
+    
+    def __init__(
+        self,
+        keywords: List[str],
+        countries: Optional[List[str]] = None,
+        discovery_mode: str = 'dom',
+        resume: bool = True,
+        max_pages: int = 50,
+        page_concurrency: int = 2,
+        politeness_delay: float = 1.0
+    ):
+        """
+        初始化爬蟲
+        
+        Args:
+            keywords: 搜尋關鍵字清單
+            countries: 目標國家清單（可選）
+            discovery_mode: 'dom' 解析頁面；'api' 優先直接呼叫搜尋 API，失敗時改用 DOM
+            resume: 是否從上次中斷的檢查點續爬
+            max_pages: 每個搜尋最多抓取的結果頁數
+            page_concurrency: 以 URL 參數分頁時同時抓取的頁數
+            politeness_delay: 分頁時每頁結束後的間隔秒數
+        """
         self.logger = logging.getLogger(self.__class__.__name__)
         self.keywords = keywords
         self.countries = countries or []
+        self.discovery_mode = discovery_mode
+        self.max_pages = max_pages
+        self.page_concurrency = page_concurrency
+        self.politeness_delay = politeness_delay
         self.playwright = None
         self.browser: Optional[Browser] = None
+        self.pool: Optional[BrowserPool] = None
+        self.resource_policy = ResourcePolicy(self.SITE_NAME)
+        self.readiness = ReadinessTracker()
+        self.selector_health = SelectorHealth(self.SITE_NAME)
+        self.checkpoint = CrawlCheckpoint(self.SITE_NAME, resume=resume)
         self.raw_data_dir = Path('discovery/raw_data')
         self.raw_data_dir.mkdir(parents=True, exist_ok=True)
     
@@ -47,20 +110,66 @@ class StudyEuScraper:
             # 構建搜尋 URL
             search_url = f"{self.SEARCH_URL}?q={keyword.replace(' ', '+')}&level=master"
             
+            capture = None
+            if self.discovery_mode == 'api':
+                capture = SearchApiCapture('Study.eu', self.BASE_URL)
+                capture.attach(page)
+            
             self.logger.info(f"訪問: {search_url}")
-            await page.goto(search_url, timeout=30000, wait_until='networkidle')
-            await page.wait_for_timeout(3000)
+            _, ready = await self.readiness.goto(
+                page, search_url, f'{self.SITE_NAME}_search', self.RESULTS_READY, default_timeout=10000
+            )
             
-            # 等待搜尋結果
-            try:
-                await page.wait_for_selector('.program-card, [class*="course"], [class*="result"]', timeout=10000)
-            except:
+            # API 模式：直接呼叫攔截到的搜尋端點翻頁
+            if capture:
+                capture.detach(page)
+                api_courses = await capture.harvest(page)
+                if api_courses is not None:
+                    self.logger.info(f"關鍵字 '{keyword}' 透過 API 找到 {len(api_courses)} 個課程")
+                    self.checkpoint.mark_done(keyword, None, ALL_PAGES, api_courses)
+                    return api_courses
+                self.logger.info("未攔截到可用的搜尋 API，改用 DOM 擷取")
+            
+            # 搜尋結果未載入
+            if not ready:
                 self.logger.warning(f"未找到課程結果")
                 return courses
             
-            # 抓取課程
-            page_courses = await self.extract_courses_from_page(page)
-            courses.extend(page_courses)
+            # 抓取第 1 頁課程
+            if self.checkpoint.is_done(keyword, None, 1):
+                self.logger.info("檢查點：第 1 頁已完成，跳過")
+            else:
+                page_courses = await self.extract_courses_from_page(page)
+                courses.extend(page_courses)
+                self.checkpoint.mark_done(keyword, None, 1, page_courses)
+            
+            # 分頁由 URL 參數控制時，並行抓取其餘頁面（抓取失敗時不標記整個搜尋完成）
+            completed = True
+            param = await find_page_param(page) if self.pool and self.max_pages > 1 else None
+            if param:
+                self.logger.info(f"偵測到分頁參數 {param.name}，並行抓取最多 {self.max_pages} 頁")
+                paginator = ConcurrentPaginator(
+                    self.pool,
+                    self.PAGES_SITE,
+                    self.fetch_result_page,
+                    self.course_key,
+                    max_pages=self.max_pages,
+                    concurrency=self.page_concurrency,
+                    politeness_delay=self.politeness_delay
+                )
+                courses.extend(await paginator.crawl(
+                    param,
+                    page.url,
+                    seen={self.course_key(course) for course in courses},
+                    skip=lambda page_num: self.checkpoint.is_done(keyword, None, page_num),
+                    on_page=lambda page_num, items: self.checkpoint.mark_done(keyword, None, page_num, items)
+                ))
+                completed = paginator.completed
+            
+            if completed:
+                self.checkpoint.mark_done(keyword, None, ALL_PAGES)
+            else:
+                self.logger.warning(f"關鍵字 '{keyword}' 分頁未完整結束，保留逐頁檢查點待下次續爬")
             
             self.logger.info(f"關鍵字 '{keyword}' 找到 {len(courses)} 個課程")
             return courses
@@ -69,30 +178,45 @@ class StudyEuScraper:
             self.logger.error(f"搜尋課程時發生錯誤 ({keyword}): {e}")
             return courses
     
+    async def fetch_result_page(self, page: Page, url: str) -> List[Dict[str, Any]]:
+        """載入單一結果頁並擷取課程；結果未載入時回傳空清單"""
+        _, ready = await self.readiness.goto(
+            page, url, f'{self.SITE_NAME}_result_page', self.RESULTS_READY, default_timeout=10000
+        )
+        if not ready:
+            return []
+        return await self.extract_courses_from_page(page)
+    
+    @staticmethod
+    def course_key(course: Dict[str, Any]) -> str:
+        """課程去重用的鍵（優先使用 program_url）"""
+        url = course.get('program_url', '')
+        if url:
+            return url
+        return f"{course.get('university_name', '')}_{course.get('program_name', '')}".lower()
+    
     async def extract_courses_from_page(self, page: Page) -> List[Dict[str, Any]]:
-        """從當前頁面提取課程"""
+        """從當前頁面提取課程（優先使用批次擷取）"""
+        bulk_courses = await self.extract_courses_bulk(page)
+        if bulk_courses is not None:
+            return bulk_courses
+        
         courses = []
         
         try:
-            # 基於診斷結果更新（2025-10-09）
-            selectors = [
-                '[class*="result"]',     # ← 診斷確認有效（60 個元素）
-                '[class*="card"]',       # ← 診斷確認有效（3 個元素）
-                '.program-card',
-                '.course-card',
-                '[class*="ProgramCard"]',
-                '[class*="course"]',
-                'article'
-            ]
-            
             course_elements = None
-            for selector in selectors:
+            used_selector = None
+            for selector in self.selector_health.ranked(self.CARD_SELECTORS):
+                started = time.perf_counter()
                 try:
                     elements = await page.query_selector_all(selector)
+                    self.selector_health.record(selector, len(elements), (time.perf_counter() - started) * 1000)
                     if elements and len(elements) > 0:
                         course_elements = elements
+                        used_selector = selector
                         break
                 except:
+                    self.selector_health.record(selector, 0, (time.perf_counter() - started) * 1000)
                     continue
             
             if not course_elements:
@@ -105,40 +229,65 @@ class StudyEuScraper:
                         courses.append(course_data)
                 except:
                     continue
+            self.selector_health.record_valid(used_selector, len(course_elements), len(courses))
             
             return courses
         except Exception as e:
             self.logger.error(f"提取課程時發生錯誤: {e}")
             return courses
     
+    async def extract_courses_bulk(self, page: Page) -> Optional[List[Dict[str, Any]]]:
+        """以單一 page.evaluate 擷取整頁課程；失敗時回傳 None"""
+        # 依近期命中率與延遲重新排序卡片選擇器
+        spec = dict(self.CARD_SPEC, card_selectors=self.selector_health.ranked(self.CARD_SPEC['card_selectors']))
+        result = await bulk_extract_cards(page, spec)
+        if result is None:
+            return None
+        self.selector_health.record_attempts(result.get('attempts'))
+        
+        courses = []
+        for card in result.get('cards', []):
+            course_data = self.build_course_record(card, card.get('href'))
+            if course_data:
+                courses.append(course_data)
+        self.selector_health.record_valid(result.get('selector'), len(result.get('cards', [])), len(courses))
+        return courses
+    
+    def build_course_record(self, fields: Dict[str, Optional[str]], href: Optional[str]) -> Optional[Dict[str, Any]]:
+        """由卡片欄位建立課程資料"""
+        program_name = fields.get('program_name')
+        university = fields.get('university_name')
+        if not (program_name and university):
+            return None
+        
+        program_url = None
+        if href:
+            program_url = href if href.startswith('http') else f"{self.BASE_URL}{href}"
+        
+        return {
+            'program_name': program_name,
+            'university_name': university,
+            'country': fields.get('country') or 'Unknown',
+            'city': fields.get('city') or 'Unknown',
+            'program_url': program_url or '',
+            'source': 'Study.eu',
+            'scraped_at': datetime.now().isoformat()
+        }
+    
     async def extract_course_details(self, element) -> Optional[Dict[str, Any]]:
         """提取課程詳情"""
         try:
-            program_name = await self.extract_text(element, ['h2', 'h3', '.title'])
-            university = await self.extract_text(element, ['.university', '.school', '[class*="uni"]'])
-            country = await self.extract_text(element, ['.country', '[class*="country"]'])
-            city = await self.extract_text(element, ['.city', '[class*="city"]'])
+            fields = {}
+            for field, selectors in self.FIELD_SELECTORS.items():
+                fields[field] = await self.extract_text(element, selectors)
             
             # 課程連結
-            program_url = None
+            href = None
             link = await element.query_selector('a')
             if link:
                 href = await link.get_attribute('href')
-                if href:
-                    program_url = href if href.startswith('http') else f"{self.BASE_URL}{href}"
-            
-            if program_name and university:
-                return {
-                    'program_name': program_name,
-                    'university_name': university,
-                    'country': country or 'Unknown',
-                    'city': city or 'Unknown',
-                    'program_url': program_url or '',
-                    'source': 'Study.eu',
-                    'scraped_at': datetime.now().isoformat()
-                }
             
-            return None
+            return self.build_course_record(fields, href)
         except Exception as e:
             self.logger.error(f"提取詳情時發生錯誤: {e}")
             return None
@@ -158,34 +307,46 @@ class StudyEuScraper:
     
     async def run_async(self) -> List[Dict[str, Any]]:
         """執行爬蟲"""
-        all_courses = []
-        
         try:
             self.logger.info("=== 開始爬取 Study.eu ===")
             
             self.playwright = await async_playwright().start()
             self.browser = await self.playwright.chromium.launch(headless=True)
-            context = await self.browser.new_context()
+            context = await self.browser.new_context(**lightweight_context_options())
+            await self.resource_policy.apply(context)
             page = await context.new_page()
             
+            # 搜尋頁依序處理，分頁結果在池中的其他 context 並行抓取
+            self.pool = BrowserPool(
+                self.browser,
+                max_contexts=self.page_concurrency,
+                per_site_limits={self.PAGES_SITE: self.page_concurrency},
+                context_options=lightweight_context_options(),
+                resource_policy=self.resource_policy
+            )
+            
             for keyword in self.keywords:
-                courses = await self.search_courses(page, keyword)
-                all_courses.extend(courses)
+                if self.checkpoint.is_done(keyword, None):
+                    self.logger.info(f"檢查點：'{keyword}' 已完成，跳過")
+                    continue
+                await self.search_courses(page, keyword)
                 await asyncio.sleep(3)
             
-            # 去重
-            seen_urls = set()
-            unique_courses = []
-            for course in all_courses:
-                url = course.get('program_url', '')
-                if url and url not in seen_urls:
-                    seen_urls.add(url)
-                    unique_courses.append(course)
+            # 由檢查點讀取（含先前中斷時已完成的關鍵字）並依 program_url 去重
+            unique_courses = [
+                course for course in self.checkpoint.load_records(lambda c: c.get('program_url', ''))
+                if course.get('program_url')
+            ]
             
             self.logger.info(f"總共找到 {len(unique_courses)} 個獨特課程")
             
-            self.save_raw_data(unique_courses)
+            if self.save_raw_data(unique_courses):
+                self.checkpoint.clear()
+            self.resource_policy.log_summary()
+            self.readiness.save()
+            self.selector_health.finish_run()
             
+            await self.pool.close()
             await context.close()
             await self.browser.close()
             await self.playwright.stop()
@@ -193,13 +354,16 @@ class StudyEuScraper:
             return unique_courses
         except Exception as e:
             self.logger.error(f"爬蟲執行失敗: {e}")
+            self.logger.info("已完成的關鍵字保留在檢查點，重新執行即可續爬")
+            if self.pool:
+                await self.pool.close()
             return []
     
     def run(self) -> List[Dict[str, Any]]:
         """同步包裝"""
         return asyncio.run(self.run_async())
     
-    def save_raw_data(self, courses: List[Dict[str, Any]]) -> None:
+    def save_raw_data(self, courses: List[Dict[str, Any]]) -> bool:
         """儲存原始資料"""
         filename = self.raw_data_dir / f"studyeu_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
         
@@ -214,8 +378,10 @@ class StudyEuScraper:
                 }, f, ensure_ascii=False, indent=2)
             
             self.logger.info(f"原始資料已儲存: {filename}")
+            return True
         except Exception as e:
             self.logger.error(f"儲存原始資料失敗: {e}")
+            return False
 
 
 def main():
@@ -225,6 +391,10 @@ def main():
     parser = argparse.ArgumentParser(description='Study.eu 課程搜尋爬蟲')
     parser.add_argument('--keywords', nargs='+', required=True, help='搜尋關鍵字')
     parser.add_argument('--countries', nargs='+', help='目標國家')
+    parser.add_argument('--mode', choices=['dom', 'api'], default='dom', help='擷取模式（api 失敗時自動改用 dom）')
+    parser.add_argument('--fresh', action='store_true', help='忽略上次中斷的檢查點，重新爬取')
+    parser.add_argument('--max-pages', type=int, default=50, help='每個搜尋最多抓取的結果頁數')
+    parser.add_argument('--page-concurrency', type=int, default=2, help='以 URL 參數分頁時同時抓取的頁數')
     
     args = parser.parse_args()
     
@@ -232,7 +402,11 @@ def main():
     
     scraper = StudyEuScraper(
         keywords=args.keywords,
-        countries=args.countries
+        countries=args.countries,
+        discovery_mode=args.mode,
+        resume=not args.fresh,
+        max_pages=args.max_pages,
+        page_concurrency=args.page_concurrency
     )
     
     courses = scraper.run()
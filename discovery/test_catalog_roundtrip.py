@@ -0,0 +1,105 @@
+"""
+課程目錄 schools.yml 往返測試
+Program Catalog schools.yml Round-Trip Test
+
+以實際的 source_data/schools.yml 驗證：匯入目錄再匯出不改動檔案；
+列入新課程時只替換 schools 區塊，template_schools 與註解逐字保留。
+"""
+
+import sys
+import shutil
+import tempfile
+from pathlib import Path
+
+import yaml
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from discovery.catalog import ProgramCatalog
+
+SCHOOLS_FILE = Path(__file__).parent.parent / "source_data" / "schools.yml"
+
+NEW_PROGRAM = {
+    'university_name': 'Example University of Technology',
+    'program_name': 'MSc Information Security',
+    'country': 'Finland',
+    'tuition_info': '€12,000/year',
+    'program_url': 'https://example.edu/msc-infosec',
+    'source': 'mastersportal',
+}
+
+
+def _copy_schools(workdir: Path) -> Path:
+    schools_file = workdir / "schools.yml"
+    shutil.copyfile(SCHOOLS_FILE, schools_file)
+    return schools_file
+
+
+def test_roundtrip_unchanged():
+    """匯入後直接匯出，檔案逐字不變"""
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        schools_file = _copy_schools(workdir)
+        catalog = ProgramCatalog(workdir / "catalog.db")
+        try:
+            catalog.import_schools_yml(schools_file)
+            catalog.export_schools_yml(schools_file)
+        finally:
+            catalog.close()
+
+        assert schools_file.read_text(encoding='utf-8') == SCHOOLS_FILE.read_text(encoding='utf-8')
+
+
+def test_roundtrip_keeps_other_keys():
+    """列入新課程後，只有 schools 清單改變"""
+    original_text = SCHOOLS_FILE.read_text(encoding='utf-8')
+    original = yaml.safe_load(original_text)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        schools_file = _copy_schools(workdir)
+        catalog = ProgramCatalog(workdir / "catalog.db")
+        try:
+            catalog.import_schools_yml(schools_file)
+            program_id, status = catalog.upsert(NEW_PROGRAM)
+            assert status == 'new'
+            catalog.mark_listed([program_id])
+            catalog.export_schools_yml(schools_file)
+        finally:
+            catalog.close()
+
+        text = schools_file.read_text(encoding='utf-8')
+        data = yaml.safe_load(text)
+
+    # 其他頂層鍵完整保留
+    assert set(data) == set(original)
+    for key in original:
+        if key != 'schools':
+            assert data[key] == original[key]
+
+    # schools：原有條目不變，新課程接在最後
+    assert data['schools'][:-1] == original['schools']
+    assert data['schools'][-1]['program_name'] == NEW_PROGRAM['program_name']
+
+    # 檔頭註解與 schools 之後的內容（含註解與格式）逐字保留
+    assert text.startswith(original_text[:original_text.index('schools:')])
+    tail = original_text[original_text.index('# Template schools'):]
+    assert text.endswith(tail)
+
+
+def main():
+    """直接執行時依序跑所有測試"""
+    tests = [test_roundtrip_unchanged, test_roundtrip_keeps_other_keys]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
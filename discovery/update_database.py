@@ -3,11 +3,12 @@
 Automated Database Update & Pull Request Generation
 
 功能：
-- 比對新發現的課程與現有 schools.yml
+- 比對課程目錄（discovery/catalog.db）中新發現的課程與現有 schools.yml
 - 自動建立新分支
-- 將新課程附加到 schools.yml
+- 將新課程列入目錄並由目錄重新產生 schools.yml
 - 自動生成 Pull Request
 - 產生 discovery_report.md
+- catalog.db 由 course_discovery.yml 提交回主分支，首次 / 最後出現時間與變更歷史跨執行保留
 """
 
 import yaml
@@ -19,6 +20,10 @@ from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 
+sys.path.append(str(Path(__file__).parent.parent))
+from discovery.program_index import ProgramIndex
+from discovery.catalog import ProgramCatalog
+
 # 設定日誌
 logging.basicConfig(
     level=logging.INFO,
@@ -35,6 +40,21 @@ class DatabaseUpdater:
         self.schools_file = 'source_data/schools.yml'
         self.discovery_dir = Path('discovery')
         self.report_file = self.discovery_dir / 'discovery_report.md'
+        self.catalog = None
+    
+    def get_catalog(self) -> ProgramCatalog:
+        """開啟課程目錄，並先同步 schools.yml 的手動編輯"""
+        if self.catalog is None:
+            self.catalog = ProgramCatalog(self.discovery_dir / 'catalog.db')
+            stats = self.catalog.import_schools_yml(self.schools_file)
+            self.logger.info(f"已同步 schools.yml 至課程目錄: {stats}")
+        return self.catalog
+    
+    def close_catalog(self) -> None:
+        """關閉課程目錄（workflow 之後會提交 catalog.db）"""
+        if self.catalog is not None:
+            self.catalog.close()
+            self.catalog = None
     
     def load_existing_schools(self) -> List[Dict[str, Any]]:
         """載入現有的學校資料"""
@@ -49,28 +69,18 @@ class DatabaseUpdater:
             return []
     
     def load_qualified_schools(self) -> List[Dict[str, Any]]:
-        """載入篩選後的合格課程"""
+        """載入最近一次篩選中出現、尚未列入 schools.yml 的合格課程"""
         try:
-            # 確保 discovery 目錄存在
-            self.discovery_dir.mkdir(exist_ok=True)
+            catalog = self.get_catalog()
+            run_id = catalog.last_run_id('filter')
             
-            # 找到最新的 qualified_schools 檔案
-            yml_files = sorted(self.discovery_dir.glob('qualified_schools_*.yml'), reverse=True)
-            
-            if not yml_files:
-                self.logger.warning("沒有找到 qualified_schools 檔案")
-                self.logger.info(f"檢查目錄: {self.discovery_dir.absolute()}")
-                self.logger.info(f"目錄內容: {list(self.discovery_dir.glob('*'))}")
+            if run_id is None:
+                self.logger.warning("課程目錄中沒有篩選結果")
                 return []
             
-            latest_file = yml_files[0]
-            self.logger.info(f"載入篩選結果: {latest_file}")
-            
-            with open(latest_file, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
-                schools = data.get('schools', [])
-                self.logger.info(f"載入了 {len(schools)} 個合格課程")
-                return schools
+            schools = catalog.unlisted_schools(run_id)
+            self.logger.info(f"載入了 {len(schools)} 個合格課程（run {run_id}）")
+            return schools
         
         except Exception as e:
             self.logger.error(f"載入合格課程失敗: {e}")
@@ -78,18 +88,16 @@ class DatabaseUpdater:
     
     def find_new_schools(self, existing: List[Dict[str, Any]], qualified: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """找出新發現的課程"""
-        # 建立現有學校的索引（使用 name + program_name）
-        existing_index = set()
-        for school in existing:
-            key = f"{school.get('name', '')}_{school.get('program_name', '')}"
-            existing_index.add(key.lower())
+        # 建立現有學校的模糊身分索引（name + program_name，容許名稱差異）
+        existing_index = ProgramIndex()
+        existing_index.add_many(existing)
         
-        # 找出新課程
+        # 找出新課程（同一批中重複的課程也只保留一次）
         new_schools = []
         for school in qualified:
-            key = f"{school.get('name', '')}_{school.get('program_name', '')}"
-            if key.lower() not in existing_index:
+            if existing_index.find(school) is None:
                 new_schools.append(school)
+                existing_index.add(school)
         
         self.logger.info(f"找到 {len(new_schools)} 個新課程")
         return new_schools
@@ -120,20 +128,15 @@ class DatabaseUpdater:
             return False, ""
     
     def update_schools_yml(self, new_schools: List[Dict[str, Any]]) -> bool:
-        """更新 schools.yml"""
+        """將新課程列入課程目錄，並由目錄重新產生 schools.yml"""
         try:
-            # 載入現有資料
-            with open(self.schools_file, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
+            catalog = self.get_catalog()
             
-            # 附加新學校
-            existing_schools = data.get('schools', [])
-            existing_schools.extend(new_schools)
-            data['schools'] = existing_schools
+            # 列入新學校（接在既有條目之後）
+            catalog.mark_listed(school['program_id'] for school in new_schools if school.get('program_id'))
             
-            # 儲存
-            with open(self.schools_file, 'w', encoding='utf-8') as f:
-                yaml.dump(data, f, allow_unicode=True, sort_keys=False, default_flow_style=False)
+            # 由目錄產生 schools.yml
+            catalog.export_schools_yml(self.schools_file)
             
             self.logger.info(f"✅ 已更新 {self.schools_file}，新增 {len(new_schools)} 所學校")
             return True
@@ -296,6 +299,22 @@ class DatabaseUpdater:
             report += "- **無新發現課程**\n\n"
             report += "所有搜尋到的課程都已存在於 schools.yml 中。\n"
         
+        # 本次篩選中學費有變動的課程
+        try:
+            catalog = self.get_catalog()
+            tuition_changes = catalog.changes(field='tuition_fee', run_id=catalog.last_run_id('filter'))
+        except Exception as e:
+            self.logger.warning(f"查詢學費變更失敗: {e}")
+            tuition_changes = []
+        
+        if tuition_changes:
+            report += "\n## 💰 學費變更\n\n"
+            report += "| 學校 | 課程 | 原學費 | 新學費 |\n"
+            report += "|------|------|--------|--------|\n"
+            for change in tuition_changes:
+                report += f"| {change['university']} | {change['program']} "
+                report += f"| {change['old_value'] or 'N/A'} | {change['new_value']} |\n"
+        
         report += f"\n---\n\n"
         report += f"**下一步動作**:\n"
         if new_schools:
@@ -403,19 +422,20 @@ class DatabaseUpdater:
                 pass
             
             return {'success': False, 'error': str(e)}
+        
+        finally:
+            self.close_catalog()
     
     def find_new_schools(self, existing: List[Dict[str, Any]], qualified: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """找出新學校"""
-        existing_index = set()
-        for school in existing:
-            key = f"{school.get('name', '')}_{school.get('program_name', '')}"
-            existing_index.add(key.lower())
+        existing_index = ProgramIndex()
+        existing_index.add_many(existing)
         
         new_schools = []
         for school in qualified:
-            key = f"{school.get('name', '')}_{school.get('program_name', '')}"
-            if key.lower() not in existing_index:
+            if existing_index.find(school) is None:
                 new_schools.append(school)
+                existing_index.add(school)
         
         return new_schools
     
@@ -431,17 +451,11 @@ class DatabaseUpdater:
             return False, ""
     
     def update_schools_yml(self, new_schools: List[Dict[str, Any]]) -> bool:
-        """更新 schools.yml"""
+        """由課程目錄重新產生 schools.yml"""
         try:
-            with open(self.schools_file, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
-            
-            existing = data.get('schools', [])
-            existing.extend(new_schools)
-            data['schools'] = existing
-            
-            with open(self.schools_file, 'w', encoding='utf-8') as f:
-                yaml.dump(data, f, allow_unicode=True, sort_keys=False, default_flow_style=False)
+            catalog = self.get_catalog()
+            catalog.mark_listed(school['program_id'] for school in new_schools if school.get('program_id'))
+            catalog.export_schools_yml(self.schools_file)
             
             self.logger.info(f"✅ 更新 schools.yml，新增 {len(new_schools)} 所")
             return True
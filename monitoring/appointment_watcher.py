@@ -0,0 +1,383 @@
+"""
+簽證預約名額監看
+Visa Appointment Slot Watcher
+
+功能：
+- 只輪詢 visa_requirements.yml 中設定 appointment_system_url 的國家，間隔短且加入隨機抖動
+- 每次使用最便宜的探測方式：
+  1. JSON 端點（設定的 appointment_probe_url，或從預約頁面的 XHR 自動發現）
+  2. 條件式 HTTP GET 原始 HTML（304 時沿用上次結果）
+  3. 保持開啟的瀏覽器頁面，每次只重新載入
+- 每個網站有每小時請求上限與最短間隔
+- 名額出現時立即發布高優先事件（事件匯流排不等待批次視窗）
+
+使用方式：
+    python monitoring/appointment_watcher.py --duration 55    # 監看 55 分鐘
+    python monitoring/appointment_watcher.py --once           # 每個網站探測一次
+"""
+
+import re
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+from collections import deque
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, List, Any, Deque, Optional
+from urllib.parse import urlparse
+
+sys.path.append(str(Path(__file__).parent.parent))
+from monitoring.base_monitor import BaseMonitor
+from monitoring.response_capture import json_path
+from crawling.http_fetcher import HttpFetcher, looks_js_rendered
+from crawling.readiness import ReadyCondition
+from notifications.event_bus import get_event_bus
+
+
+# 名額關鍵字（先比對無名額，避免 "not available" 被視為 "available"）
+AVAILABILITY_KEYWORDS = {
+    'unavailable': ['no appointments', 'no free appointments', 'fully booked', 'not available',
+                    'keine termine', 'no slots', '無名額', '已額滿'],
+    'available': ['slots available', 'appointments available', 'book now', 'select a date', 'freie termine',
+                  '可預約', '有名額'],
+}
+
+# JSON 端點中代表可預約時段的路徑
+SLOT_PATHS = (
+    'slots[*]|availableSlots[*]|available_slots[*]|availableDates[*]|dates[*]'
+    '|appointments[*]|data.slots[*]|data.availableDates[*]'
+)
+
+# 可能是名額 API 的 XHR
+ENDPOINT_HINT = re.compile(r'(slot|termin|appointment|availab|calendar|booking)', re.IGNORECASE)
+
+
+def classify_availability(text: str) -> str:
+    """
+    依關鍵字判斷預約頁面的名額狀態
+
+    Args:
+        text: 頁面 HTML 或文字
+
+    Returns:
+        'available'、'unavailable' 或 'unknown'
+    """
+    text_lower = text.lower()
+    for status in ('unavailable', 'available'):
+        if any(keyword in text_lower for keyword in AVAILABILITY_KEYWORDS[status]):
+            return status
+    return 'unknown'
+
+
+def availability_from_json(data: Any, slot_paths: str = SLOT_PATHS) -> str:
+    """
+    依 JSON 回應判斷名額狀態
+
+    Args:
+        data: JSON 資料
+        slot_paths: 時段清單的路徑（| 分隔的替代路徑）
+
+    Returns:
+        'available'、'unavailable' 或 'unknown'
+    """
+    if json_path(data, slot_paths):
+        return 'available'
+    if data == [] or (isinstance(data, dict) and any(
+            isinstance(value, list) and not value for value in data.values())):
+        return 'unavailable'
+    return classify_availability(json.dumps(data, ensure_ascii=False))
+
+
+class RequestBudget:
+    """每個網站的請求上限（每小時次數與最短間隔）"""
+
+    def __init__(self, max_per_hour: int = 30, min_interval: float = 60.0):
+        """
+        初始化預算
+
+        Args:
+            max_per_hour: 每小時最多請求次數
+            min_interval: 同一網站兩次請求的最短間隔（秒）
+        """
+        self.max_per_hour = max_per_hour
+        self.min_interval = min_interval
+        self.sent: Dict[str, Deque[float]] = {}
+        self.limits: Dict[str, int] = {}
+
+    def set_limit(self, host: str, max_per_hour: int) -> None:
+        """設定個別網站的每小時上限"""
+        self.limits[host] = max_per_hour
+
+    def allow(self, host: str, now: Optional[float] = None) -> bool:
+        """是否還能對網站發送請求"""
+        now = now if now is not None else time.monotonic()
+        sent = self.sent.setdefault(host, deque())
+        while sent and now - sent[0] >= 3600:
+            sent.popleft()
+        if len(sent) >= self.limits.get(host, self.max_per_hour):
+            return False
+        return not sent or now - sent[-1] >= self.min_interval
+
+    def spend(self, host: str, now: Optional[float] = None) -> None:
+        """記錄一次請求"""
+        self.sent.setdefault(host, deque()).append(now if now is not None else time.monotonic())
+
+    def used(self, host: str) -> int:
+        """最近一小時已使用的請求數"""
+        return len(self.sent.get(host, ()))
+
+
+class AppointmentWatcher(BaseMonitor):
+    """高頻率、低成本的簽證預約名額監看"""
+
+    PAGE_READY = ReadyCondition(text_stable=True, stable_ms=300)
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """初始化監看器"""
+        super().__init__(config)
+        self.visa_file = 'source_data/visa_requirements.yml'
+        self.interval = self.config.get('interval', 120)
+        self.jitter = self.config.get('jitter', 0.3)
+        self.budget = RequestBudget(
+            max_per_hour=self.config.get('max_requests_per_hour', 30),
+            min_interval=self.config.get('min_request_interval', 60)
+        )
+        self.state_file = self.status_dir / 'appointment_watch.json'
+        self.state: Dict[str, Dict[str, Any]] = self.load_json(str(self.state_file)) if self.state_file.exists() else {}
+        self.fetcher = HttpFetcher(self.status_dir / 'http_validators.json', timeout=10)
+        self.pages: Dict[str, Any] = {}
+        self._browser_lock = asyncio.Lock()
+
+    def load_targets(self) -> List[Dict[str, Any]]:
+        """有預約系統 URL 且啟用監控的國家"""
+        countries = self.load_yaml(self.visa_file).get('countries', [])
+        targets = [
+            country for country in countries
+            if country.get('appointment_system_url') and country.get('monitor_enabled', True)
+        ]
+        for target in targets:
+            if target.get('appointment_budget_per_hour'):
+                self.budget.set_limit(
+                    urlparse(target['appointment_system_url']).netloc, target['appointment_budget_per_hour']
+                )
+        return targets
+
+    def next_delay(self) -> float:
+        """下次探測前的等待秒數（加入抖動，避免固定節奏）"""
+        return self.interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    async def probe_json(self, name: str, endpoint: str) -> Optional[str]:
+        """
+        探測 JSON 端點
+
+        Returns:
+            名額狀態；端點無法使用時回傳 None
+        """
+        fetched = await self.fetcher.fetch(endpoint)
+        if fetched.not_modified:
+            return self.state.get(name, {}).get('status', 'unknown')
+        if fetched.html is None:
+            self.logger.info(f"[{name}] JSON 端點無法使用（{fetched.error}），改用頁面")
+            return None
+        try:
+            return availability_from_json(json.loads(fetched.html))
+        except ValueError:
+            return None
+
+    async def probe_http(self, name: str, url: str) -> Optional[str]:
+        """
+        以條件式 GET 探測原始 HTML
+
+        Returns:
+            名額狀態；需要瀏覽器渲染或無法判斷時回傳 None
+        """
+        fetched = await self.fetcher.fetch(url)
+        if fetched.not_modified:
+            return self.state.get(name, {}).get('status', 'unknown')
+        if fetched.html is None or looks_js_rendered(fetched.html):
+            return None
+        status = classify_availability(fetched.html)
+        return None if status == 'unknown' else status
+
+    async def warm_page(self, name: str, url: str):
+        """取得保持開啟的預約頁面（第一次時建立並監聽名額 API）"""
+        page = self.pages.get(name)
+        if page is not None and not page.is_closed():
+            await page.reload(wait_until='domcontentloaded')
+            await self.readiness.wait(page, f"visa_appointment_{urlparse(url).netloc}", self.PAGE_READY)
+            return page
+
+        async with self._browser_lock:
+            if self.browser is None:
+                await self.launch_browser()
+        context = await self.new_context(self.browser, 'visa_information')
+        page = await context.new_page()
+        host = urlparse(url).netloc
+
+        def discover(response) -> None:
+            if (
+                not self.state.get(name, {}).get('endpoint')
+                and urlparse(response.url).netloc == host
+                and ENDPOINT_HINT.search(response.url)
+                and 'json' in response.headers.get('content-type', '')
+            ):
+                self.state.setdefault(name, {})['endpoint'] = response.url
+                self.logger.info(f"[{name}] 發現名額 API，之後以 HTTP 探測: {response.url}")
+
+        page.on('response', discover)
+        await self.readiness.goto(page, url, f"visa_appointment_{host}", self.PAGE_READY)
+        self.pages[name] = page
+        return page
+
+    async def probe(self, target: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        以最便宜的方式探測一次名額
+
+        Args:
+            target: visa_requirements.yml 中的國家資料
+
+        Returns:
+            探測結果；超出請求預算時回傳 None
+        """
+        name = target.get('name', 'Unknown')
+        url = target['appointment_system_url']
+        host = urlparse(url).netloc
+        if not self.budget.allow(host):
+            self.logger.debug(f"[{name}] 已達請求上限（{self.budget.used(host)}/小時），略過")
+            return None
+        self.budget.spend(host)
+
+        state = self.state.setdefault(name, {})
+        status, method = None, None
+        started = time.monotonic()
+        try:
+            endpoint = target.get('appointment_probe_url') or state.get('endpoint')
+            if endpoint and self.fetcher.available:
+                status, method = await self.probe_json(name, endpoint), 'json'
+                if status is None and not target.get('appointment_probe_url'):
+                    state.pop('endpoint', None)
+
+            if status is None and self.fetcher.available and not self.fetcher.needs_js(url):
+                status, method = await self.probe_http(name, url), 'http'
+
+            if status is None:
+                page = await self.warm_page(name, url)
+                status, method = classify_availability(await page.content()), 'page'
+                if status != 'unknown' and self.fetcher.available:
+                    self.fetcher.mark_needs_js(url)
+        except Exception as e:
+            self.logger.error(f"[{name}] 探測失敗: {e}")
+            status, method = 'error', method
+
+        return {
+            'country': name,
+            'url': url,
+            'status': status,
+            'method': method,
+            'elapsed_ms': round((time.monotonic() - started) * 1000, 1),
+            'checked_at': datetime.now().isoformat()
+        }
+
+    def record(self, result: Dict[str, Any]) -> None:
+        """更新狀態；名額由無轉有時立即發布事件"""
+        name = result['country']
+        state = self.state.setdefault(name, {})
+        previous = state.get('status')
+        if result['status'] == 'error':
+            state['errors'] = state.get('errors', 0) + 1
+            return
+
+        if result['status'] != previous:
+            state['since'] = result['checked_at']
+            self.logger.info(f"[{name}] 名額狀態: {previous} → {result['status']}（{result['method']}）")
+            if result['status'] == 'available':
+                self.send_notification({
+                    'type': 'visa_appointment_available',
+                    'country': name,
+                    'url': result['url'],
+                    'priority': 'high',
+                    'probe': result['method'],
+                    'timestamp': result['checked_at']
+                })
+        state.update(
+            status=result['status'],
+            method=result['method'],
+            last_checked=result['checked_at'],
+            checks=state.get('checks', 0) + 1,
+            errors=0
+        )
+
+    async def watch_target(self, target: Dict[str, Any], deadline: Optional[float]) -> None:
+        """持續探測單一網站直到截止時間（deadline 為 None 時只探測一次）"""
+        # 錯開各網站的第一次探測
+        if deadline is not None:
+            await asyncio.sleep(random.uniform(0, self.jitter * self.interval))
+        while True:
+            result = await self.probe(target)
+            if result is not None:
+                self.record(result)
+            if deadline is None or time.monotonic() + self.interval * (1 - self.jitter) > deadline:
+                return
+            await asyncio.sleep(self.next_delay())
+            self.save_json(self.state, str(self.state_file))
+
+    async def run_async(self, duration_minutes: Optional[float] = None) -> bool:
+        """
+        執行監看
+
+        Args:
+            duration_minutes: 監看時間（分鐘）；None 表示每個網站只探測一次
+
+        Returns:
+            是否成功
+        """
+        targets = self.load_targets()
+        if not targets:
+            self.logger.info("沒有設定預約系統 URL 的國家")
+            return True
+
+        deadline = time.monotonic() + duration_minutes * 60 if duration_minutes else None
+        self.logger.info(
+            f"=== 監看 {len(targets)} 個預約系統（間隔約 {self.interval} 秒，"
+            f"{'持續 ' + str(duration_minutes) + ' 分鐘' if duration_minutes else '單次'}）==="
+        )
+
+        event_bus = get_event_bus()
+        await event_bus.start()
+        try:
+            async with self.fetcher:
+                await asyncio.gather(*(self.watch_target(target, deadline) for target in targets))
+            return True
+        except Exception as e:
+            self.logger.error(f"監看失敗: {e}")
+            return False
+        finally:
+            self.save_json(self.state, str(self.state_file))
+            self.log_resource_summary()
+            await self.close_browser()
+            await event_bus.stop()
+
+    def run(self, duration_minutes: Optional[float] = None) -> bool:
+        """執行監看（同步包裝）"""
+        return asyncio.run(self.run_async(duration_minutes))
+
+
+def main():
+    """主函式"""
+    parser = argparse.ArgumentParser(description='簽證預約名額監看')
+    parser.add_argument('--duration', type=float, default=None, help='監看時間（分鐘）')
+    parser.add_argument('--once', action='store_true', help='每個網站只探測一次')
+    parser.add_argument('--interval', type=float, default=120, help='探測間隔（秒，會加入抖動）')
+    parser.add_argument('--max-per-hour', type=int, default=30, help='每個網站每小時的請求上限')
+    args = parser.parse_args()
+
+    watcher = AppointmentWatcher({'interval': args.interval, 'max_requests_per_hour': args.max_per_hour})
+    success = watcher.run(None if args.once else (args.duration or 55))
+    sys.exit(0 if success else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -9,8 +9,17 @@ import json
 import logging
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, List, Any, Optional, Callable, Awaitable
 from abc import ABC, abstractmethod
+from playwright.async_api import async_playwright, Browser, BrowserContext, Page
+
+from crawling.resource_policy import ResourcePolicy, lightweight_context_options
+from crawling.readiness import ReadinessTracker, ReadyCondition
+from monitoring.status_store import StatusStore, stable_state
+from monitoring.session_store import SessionStore
+from monitoring.scheduler import PollScheduler
+from monitoring.response_capture import CaptureRule, ResponseCapture
+from notifications.event_bus import get_event_bus
 
 # 確保 logs 目錄存在
 Path('logs').mkdir(exist_ok=True)
@@ -29,6 +38,13 @@ logging.basicConfig(
 class BaseMonitor(ABC):
     """所有監控腳本的基類"""
     
+    # 登入狀態驗證：造訪此 URL，出現 SESSION_LOGGED_IN 元素（且沒有密碼欄位）即視為仍在登入中
+    SESSION_CHECK_URL: Optional[str] = None
+    SESSION_LOGGED_IN: Optional[str] = None
+    
+    # 要擷取的 API 回應（URL 比對式與 JSON 路徑欄位），見 monitoring/response_capture.py
+    CAPTURE_RULES: List[CaptureRule] = []
+    
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         """
         初始化監控器
@@ -40,6 +56,22 @@ class BaseMonitor(ABC):
         self.logger = logging.getLogger(self.__class__.__name__)
         self.status_dir = Path('reports/status_history')
         self.status_dir.mkdir(parents=True, exist_ok=True)
+        self._status_store: Optional[StatusStore] = None
+        self._session_store: Optional[SessionStore] = None
+        self.restored_sessions = set()
+        self._scheduler: Optional[PollScheduler] = None
+        self.resource_policy: Optional[ResourcePolicy] = None
+        self.readiness = ReadinessTracker()
+        self.capture = ResponseCapture(
+            self.CAPTURE_RULES,
+            max_bytes=self.config.get('capture_max_bytes', 2 * 1024 * 1024)
+        )
+        
+        # 由 MonitorRunner 注入時，多個監控器共用同一個瀏覽器程序
+        self.shared_browser: Optional[Browser] = None
+        self.playwright = None
+        self.browser: Optional[Browser] = None
+        self.contexts: List[BrowserContext] = []
     
     def load_yaml(self, file_path: str) -> Dict[str, Any]:
         """
@@ -166,8 +198,91 @@ class BaseMonitor(ABC):
         """
         status['last_updated'] = datetime.now().isoformat()
         status_file = self.get_status_file_path(identifier)
+        self.record_status_history(identifier, status)
         return self.save_json(status, str(status_file))
     
+    @property
+    def status_store(self) -> StatusStore:
+        """狀態歷史儲存（首次使用時開啟）"""
+        if self._status_store is None:
+            self._status_store = StatusStore(self.status_dir / 'status_history.db')
+        return self._status_store
+    
+    def record_status_history(self, identifier: str, status: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        將狀態寫入歷史儲存（只在狀態變更時寫入差異）
+        
+        尚無歷史的識別符會先以既有的 <id>_status.json 作為起點，
+        避免升級後第一次執行把所有欄位記成變更。
+        
+        Args:
+            identifier: 識別符
+            status: 狀態字典
+            
+        Returns:
+            變更的欄位 -> (舊值, 新值)
+        """
+        monitor = self.__class__.__name__
+        try:
+            if self.status_store.latest(monitor, identifier) is None:
+                previous = self.load_saved_status(identifier)
+                if previous:
+                    self.status_store.record(
+                        monitor, identifier, previous, now=previous.get('last_updated')
+                    )
+            
+            changes = self.status_store.record(monitor, identifier, status, now=status.get('last_updated'))
+            if changes:
+                self.logger.debug(f"{identifier} 狀態變更欄位: {', '.join(sorted(changes))}")
+            return changes
+        except Exception as e:
+            self.logger.warning(f"寫入狀態歷史失敗 ({identifier}): {e}")
+            return {}
+    
+    @property
+    def scheduler(self) -> PollScheduler:
+        """輪詢排程（首次使用時載入）"""
+        if self._scheduler is None:
+            self._scheduler = PollScheduler(self.status_dir / 'poll_schedule.json')
+        return self._scheduler
+    
+    def poll_due(self, identifier: str) -> bool:
+        """
+        目標是否到期需要檢查（config 的 ignore_schedule 可強制檢查全部）
+        
+        Args:
+            identifier: 識別符
+            
+        Returns:
+            是否需要檢查
+        """
+        if self.config.get('ignore_schedule'):
+            return True
+        return self.scheduler.is_due(self.__class__.__name__, identifier)
+    
+    def record_poll(
+        self,
+        identifier: str,
+        changed: bool = False,
+        error: bool = False,
+        dates: Optional[List[Any]] = None
+    ) -> None:
+        """
+        記錄輪詢結果並排定下次檢查時間
+        
+        Args:
+            identifier: 識別符
+            changed: 狀態是否變更
+            error: 是否發生錯誤（連續錯誤會退避）
+            dates: 相關日期（截止日、預期開放日），接近時縮短間隔
+        """
+        try:
+            next_due = self.scheduler.record(self.__class__.__name__, identifier, changed, error, dates or [])
+            self.scheduler.save()
+            self.logger.info(f"{identifier} 下次檢查: {next_due:%Y-%m-%d %H:%M}")
+        except Exception as e:
+            self.logger.warning(f"更新輪詢排程失敗 ({identifier}): {e}")
+    
     def detect_changes(self, old_status: Dict[str, Any], new_status: Dict[str, Any]) -> bool:
         """
         偵測狀態變更
@@ -179,31 +294,220 @@ class BaseMonitor(ABC):
         Returns:
             是否有變更
         """
-        # 移除時間戳記後比較
-        old_copy = {k: v for k, v in old_status.items() if k != 'last_updated'}
-        new_copy = {k: v for k, v in new_status.items() if k != 'last_updated'}
+        # 移除每次輪詢都會改變的時間欄位（last_updated、last_checked、checked_at ...）後比較
+        return stable_state(old_status) != stable_state(new_status)
+    
+    async def launch_browser(self, **launch_options) -> Browser:
+        """
+        取得瀏覽器：有共用瀏覽器時直接使用，否則自行啟動 Playwright 與 Chromium
         
-        return old_copy != new_copy
+        Args:
+            **launch_options: chromium.launch 參數（使用共用瀏覽器時忽略）
+            
+        Returns:
+            Playwright Browser
+        """
+        if self.shared_browser is not None:
+            self.browser = self.shared_browser
+            return self.browser
+        
+        launch_options.setdefault('headless', True)
+        self.playwright = await async_playwright().start()
+        self.browser = await self.playwright.chromium.launch(**launch_options)
+        return self.browser
     
-    def send_notification(self, message: Dict[str, Any]) -> bool:
+    async def close_browser(self) -> None:
         """
-        發送通知
+        釋放瀏覽器資源
+        
+        關閉本監控器建立的所有 context；瀏覽器為自行啟動時一併關閉，
+        共用瀏覽器則留給 MonitorRunner 關閉。
+        """
+        for context in self.contexts:
+            try:
+                await context.close()
+            except Exception:
+                pass
+        self.contexts = []
+        
+        if self.browser is not None and self.browser is not self.shared_browser:
+            try:
+                await self.browser.close()
+            except Exception:
+                pass
+        if self.playwright is not None:
+            try:
+                await self.playwright.stop()
+            except Exception:
+                pass
+        
+        self.browser = None
+        self.playwright = None
+    
+    async def new_context(self, browser, target: str, **overrides):
+        """
+        建立套用資源攔截政策的輕量瀏覽器 context
+        
+        config 可設定 block_resources（預設 True）與 resource_allowlist。
         
         Args:
-            message: 通知訊息
+            browser: Playwright Browser
+            target: 目標網站名稱（對應 TARGET_ALLOWLISTS）
+            **overrides: 覆寫的 context 參數
             
         Returns:
-            是否成功
+            Playwright BrowserContext
         """
+        context = await browser.new_context(**lightweight_context_options(**overrides))
+        self.contexts.append(context)
+        context.on('close', lambda closed: self.contexts.remove(closed) if closed in self.contexts else None)
+        
+        if self.config.get('block_resources', True):
+            if self.resource_policy is None:
+                self.resource_policy = ResourcePolicy(
+                    target,
+                    allowlist=self.config.get('resource_allowlist')
+                )
+            await self.resource_policy.apply(context)
+        
+        return context
+    
+    @property
+    def session_store(self) -> SessionStore:
+        """加密的登入狀態儲存（首次使用時建立）"""
+        if self._session_store is None:
+            self._session_store = SessionStore(
+                self.config.get('session_dir'),
+                max_age_hours=self.config.get('session_max_age_hours', 24)
+            )
+        return self._session_store
+    
+    def session_reuse_enabled(self) -> bool:
+        """是否重用登入狀態（config 的 reuse_session 可關閉）"""
+        return (
+            self.config.get('reuse_session', True)
+            and self.SESSION_CHECK_URL is not None
+            and self.SESSION_LOGGED_IN is not None
+            and self.session_store.enabled
+        )
+    
+    async def new_session_context(self, browser, target: str, portal: str, **overrides):
+        """
+        建立 context，並載入已儲存的登入狀態（若有）
+        
+        Args:
+            browser: Playwright Browser
+            target: 目標網站名稱（資源攔截政策）
+            portal: 入口網站名稱（登入狀態檔名）
+            **overrides: 覆寫的 context 參數
+            
+        Returns:
+            Playwright BrowserContext
+        """
+        if self.session_reuse_enabled():
+            state = self.session_store.load(portal)
+            if state:
+                overrides['storage_state'] = state
+                self.restored_sessions.add(portal)
+        return await self.new_context(browser, target, **overrides)
+    
+    async def is_session_valid(self, page: Page, portal: str) -> bool:
+        """
+        以一次導航驗證登入狀態是否仍有效
+        
+        同時等待「已登入」元素與密碼欄位，哪一個先出現就能判斷，不必等到逾時。
+        """
+        condition = ReadyCondition(selector=f'{self.SESSION_LOGGED_IN}, input[type="password"]')
         try:
-            # 這裡可以整合現有的 notifications/alert_system.py
-            self.logger.info(f"通知: {message}")
+            _, ready = await self.readiness.goto(page, self.SESSION_CHECK_URL, f'{portal}_session_check', condition)
+            if not ready or 'login' in page.url.lower():
+                return False
+            if await page.query_selector('input[type="password"]'):
+                return False
+            return await page.query_selector(self.SESSION_LOGGED_IN) is not None
+        except Exception as e:
+            self.logger.debug(f"[{portal}] 驗證登入狀態失敗: {e}")
+            return False
+    
+    async def ensure_session(self, page: Page, portal: str, login: Callable[[Page], Awaitable[bool]]) -> bool:
+        """
+        確保已登入：先驗證重用的登入狀態，失效時才執行完整登入並儲存新的狀態
+        
+        Args:
+            page: 由 new_session_context 建立的頁面
+            portal: 入口網站名稱
+            login: 完整登入流程
             
-            # TODO: 整合實際的通知系統
-            # from notifications.alert_system import send_alert
-            # send_alert(message)
+        Returns:
+            是否已登入
+        """
+        if not self.session_reuse_enabled():
+            return await login(page)
+        
+        if portal in self.restored_sessions:
+            if await self.is_session_valid(page, portal):
+                self.logger.info(f"✅ [{portal}] 重用已儲存的登入狀態")
+                return True
+            self.logger.info(f"[{portal}] 登入狀態已失效，重新登入")
+            self.session_store.clear(portal)
+            self.restored_sessions.discard(portal)
+            await page.context.clear_cookies()
+        
+        if not await login(page):
+            return False
+        
+        try:
+            self.session_store.save(portal, await page.context.storage_state())
+        except Exception as e:
+            self.logger.warning(f"[{portal}] 取得登入狀態失敗: {e}")
+        return True
+    
+    def attach_capture(self, page: Page) -> None:
+        """
+        在頁面上啟用 API 回應擷取（需在導航前呼叫）
+        
+        config 的 capture_responses 設為 False 時停用，一律使用 DOM 擷取。
+        
+        Args:
+            page: Playwright Page
+        """
+        if self.config.get('capture_responses', True):
+            self.capture.attach(page)
+    
+    async def captured_records(self, rule_name: str, timeout: float = 5.0) -> List[Dict[str, Any]]:
+        """
+        取得擷取規則最近一次的紀錄
+        
+        Args:
+            rule_name: CAPTURE_RULES 中的規則名稱
+            timeout: 等待進行中解析的秒數
             
-            return True
+        Returns:
+            紀錄清單；沒有擷取到時為空清單
+        """
+        return await self.capture.records(rule_name, timeout)
+    
+    def log_resource_summary(self) -> None:
+        """輸出本次執行的資源攔截統計，並儲存頁面就緒延遲統計"""
+        if self.resource_policy:
+            self.resource_policy.log_summary()
+        self.readiness.save()
+    
+    def send_notification(self, message: Dict[str, Any]) -> bool:
+        """
+        發送通知：事件寫入本機佇列後立即返回，由 notifications/event_bus.py 批次寄送
+        
+        Args:
+            message: 通知訊息（type 為事件類型，例如 application_status_change）
+            
+        Returns:
+            是否成功寫入佇列
+        """
+        try:
+            self.logger.info(f"通知: {message}")
+            payload = {k: v for k, v in message.items() if k != 'type'}
+            event_id = get_event_bus().publish(message['type'], payload, source=self.__class__.__name__)
+            return event_id is not None
         except Exception as e:
             self.logger.error(f"發送通知失敗: {e}")
             return False
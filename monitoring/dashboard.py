@@ -8,16 +8,236 @@ Features:
 - Deadline monitoring
 - Risk assessment visualization
 - Performance metrics
+- Incremental build: the dashboard is a set of independent sections, each keyed by
+  an input hash, so only sections whose inputs changed are re-rendered
+- Machine-readable dashboard.json (section data) next to the Markdown / HTML output
 """
 
 import os
 import sys
 import yaml
 import json
+import hashlib
 from datetime import datetime, date, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Callable
 from pathlib import Path
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
+
+try:
+    import markdown
+except ImportError:
+    markdown = None
+
+
+DEFAULT_OUTPUT_DIR = Path(__file__).parent.parent / "final_applications"
+
+# Section placement; tools may register additional sections with their own order
+SECTION_ORDER = {
+    'overview': 10,
+    'deadlines': 20,
+    'schools': 30,
+    'metrics': 40,
+    'actions': 50,
+    'budget': 60,
+    'recommendations': 70,
+    'help': 90,
+}
+
+HTML_TEMPLATE = """
+<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>University Application Dashboard</title>
+    <style>
+        body {{ font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; margin: 40px; }}
+        table {{ border-collapse: collapse; width: 100%; }}
+        th, td {{ border: 1px solid #ddd; padding: 8px; text-align: left; }}
+        th {{ background-color: #f2f2f2; }}
+        .urgent {{ background-color: #ffebee; }}
+        .warning {{ background-color: #fff3e0; }}
+        .success {{ background-color: #e8f5e8; }}
+        h1 {{ color: #1976d2; }}
+        h2 {{ color: #424242; border-bottom: 2px solid #e0e0e0; padding-bottom: 8px; }}
+    </style>
+    {head_extra}
+</head>
+<body>
+{html_body}
+<script>
+    // Highlight table rows by status markers
+    function highlightRows(root) {{
+        root.querySelectorAll('tr').forEach(row => {{
+            const text = row.textContent.toLowerCase();
+            if (text.includes('[urgent]') || text.includes('urgent')) {{
+                row.classList.add('urgent');
+            }} else if (text.includes('[warning]') || text.includes('warning')) {{
+                row.classList.add('warning');
+            }} else if (text.includes('[ok]') || text.includes('[meets]') || text.includes('[affordable]')) {{
+                row.classList.add('success');
+            }}
+        }});
+    }}
+    document.addEventListener('DOMContentLoaded', () => highlightRows(document));
+</script>
+{body_extra}
+</body>
+</html>
+"""
+
+
+def input_hash(inputs: Any) -> str:
+    """Stable hash of the data a section is rendered from"""
+    encoded = json.dumps(inputs, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()[:16]
+
+
+class DashboardStore:
+    """Section cache behind application_dashboard.md / .html and dashboard.json"""
+    
+    def __init__(self, output_dir: Optional[Path] = None):
+        self.output_dir = Path(output_dir or DEFAULT_OUTPUT_DIR)
+        self.json_file = self.output_dir / "dashboard.json"
+        self.markdown_file = self.output_dir / "application_dashboard.md"
+        self.html_file = self.output_dir / "application_dashboard.html"
+        self.sections: Dict[str, Dict[str, Any]] = self._load()
+        self.changed: List[str] = []
+    
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if not self.json_file.exists():
+            return {}
+        try:
+            with open(self.json_file, 'r', encoding='utf-8') as f:
+                return json.load(f).get('sections', {})
+        except Exception as e:
+            print(f"[WARNING] Could not read {self.json_file} ({e}), rebuilding all sections")
+            return {}
+    
+    def update(self, key: str, title: str, inputs: Any, render: Callable[[], str],
+               data: Any = None, order: Optional[int] = None) -> bool:
+        """
+        Re-render a section only when its inputs changed
+        
+        Args:
+            key: section key (e.g. 'deadlines', 'budget')
+            title: human-readable section title
+            inputs: JSON-serialisable data the section is rendered from
+            render: returns the section Markdown; called only when inputs changed
+            data: machine-readable section data for dashboard.json (default: inputs)
+            order: position in the dashboard (default: SECTION_ORDER or 80)
+        
+        Returns:
+            Whether the section was re-rendered
+        """
+        digest = input_hash(inputs)
+        section = self.sections.get(key)
+        if section and section.get('input_hash') == digest and 'markdown' in section:
+            return False
+        
+        section_markdown = render().strip()
+        self.sections[key] = {
+            'title': title,
+            'order': order if order is not None else SECTION_ORDER.get(key, 80),
+            'input_hash': digest,
+            'updated_at': datetime.now().isoformat(timespec='seconds'),
+            'data': inputs if data is None else data,
+            'markdown': section_markdown,
+            'html': markdown.markdown(section_markdown, extensions=['tables']) if markdown else None
+        }
+        self.changed.append(key)
+        return True
+    
+    def ordered(self) -> List[Dict[str, Any]]:
+        """Non-empty sections in display order"""
+        return [
+            {'key': key, **section}
+            for key, section in sorted(self.sections.items(), key=lambda item: (item[1]['order'], item[0]))
+            if section.get('markdown')
+        ]
+    
+    def last_updated(self) -> str:
+        stamps = [section['updated_at'] for section in self.sections.values()]
+        return max(stamps).replace('T', ' ') if stamps else datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    
+    def render_markdown(self) -> str:
+        """Assemble the Markdown dashboard from cached sections"""
+        lines = [
+            "# 🎓 University Application Dashboard",
+            "",
+            f"**Last Updated**: {self.last_updated()}",
+            ""
+        ]
+        for section in self.ordered():
+            lines.extend([
+                f"<!-- section:{section['key']} -->",
+                section['markdown'],
+                f"<!-- /section:{section['key']} -->",
+                ""
+            ])
+        lines.append(f"*Dashboard generated at {self.last_updated()} by Application Intelligence System v2.0*")
+        return "\n".join(lines)
+    
+    def render_html(self, head_extra: str = '<meta http-equiv="refresh" content="300">',
+                    body_extra: str = '') -> Optional[str]:
+        """Assemble the HTML dashboard from cached per-section HTML"""
+        if markdown is None:
+            return None
+        parts = ["<h1>🎓 University Application Dashboard</h1>",
+                 f"<p><strong>Last Updated</strong>: <span id=\"last-updated\">{self.last_updated()}</span></p>"]
+        for section in self.ordered():
+            section_html = section.get('html') or markdown.markdown(section['markdown'], extensions=['tables'])
+            parts.append(f'<section id="section-{section["key"]}">\n{section_html}\n</section>')
+        return HTML_TEMPLATE.format(html_body="\n".join(parts), head_extra=head_extra, body_extra=body_extra)
+    
+    def to_json(self) -> Dict[str, Any]:
+        """Machine-readable dashboard"""
+        return {
+            'last_updated': self.last_updated(),
+            'sections': self.sections
+        }
+    
+    def save(self, force: bool = False) -> bool:
+        """
+        Write dashboard.json, Markdown and HTML when any section changed
+        
+        Returns:
+            Whether files were written
+        """
+        if not self.changed and not force and self.markdown_file.exists():
+            return False
+        
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.json_file, 'w', encoding='utf-8') as f:
+            json.dump(self.to_json(), f, ensure_ascii=False, indent=2, default=str)
+        with open(self.markdown_file, 'w', encoding='utf-8') as f:
+            f.write(self.render_markdown())
+        
+        html_content = self.render_html()
+        if html_content is not None:
+            with open(self.html_file, 'w', encoding='utf-8') as f:
+                f.write(html_content)
+        else:
+            print("[WARNING] Install 'markdown' package for HTML generation: pip install markdown")
+        
+        self.changed = []
+        return True
+
+
+def update_dashboard_section(key: str, title: str, inputs: Any, render: Callable[[], str],
+                             data: Any = None, order: Optional[int] = None,
+                             output_dir: Optional[Path] = None) -> bool:
+    """
+    Update a single dashboard section without rebuilding the others
+    (used by the budget analyzer and recommendation tracker)
+    
+    Returns:
+        Whether the section changed
+    """
+    store = DashboardStore(output_dir)
+    changed = store.update(key, title, inputs, render, data=data, order=order)
+    if changed:
+        store.save()
+    return changed
 
 @dataclass 
 class SchoolStatus:
@@ -153,98 +373,92 @@ class ApplicationDashboard:
         
         return None
     
-    def generate_dashboard(self) -> str:
-        """Generate the main dashboard HTML/Markdown"""
-        dashboard_lines = [
-            "# 🎓 University Application Dashboard",
-            "",
-            f"**Last Updated**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-            "",
-            "## [OVERVIEW] Quick Overview",
-            ""
+    STATUS_ORDER = ['NOT_STARTED', 'DRAFTING', 'SUBMITTED', 'DECISION_PENDING', 'ACCEPTED', 'REJECTED']
+    STATUS_ICONS = {
+        'NOT_STARTED': '⚪',
+        'DRAFTING': '🟡', 
+        'SUBMITTED': '🟢',
+        'DECISION_PENDING': '🔵',
+        'ACCEPTED': '[ACCEPTED]',
+        'REJECTED': '[REJECTED]'
+    }
+    
+    def get_statuses(self) -> List[SchoolStatus]:
+        """Status for all active schools"""
+        return [
+            self.get_school_status(school_id)
+            for school_id, school in self.schools.items()
+            if school.get('status') == 'active'
         ]
-        
-        # Get status for all active schools
-        statuses = []
-        for school_id, school in self.schools.items():
-            if school.get('status') == 'active':
-                statuses.append(self.get_school_status(school_id))
-        
-        # Summary statistics
+    
+    @staticmethod
+    def status_record(status: SchoolStatus) -> Dict[str, Any]:
+        """JSON-friendly status (without the per-run timestamp)"""
+        record = asdict(status)
+        record.pop('last_updated')
+        record['deadline'] = status.deadline.isoformat() if status.deadline else None
+        return record
+    
+    def render_overview(self, statuses: List[SchoolStatus]) -> str:
+        """Application progress table"""
         total_schools = len(statuses)
-        
-        # Application status counts
         app_status_counts = {}
         for status in statuses:
-            app_status = status.application_status
-            app_status_counts[app_status] = app_status_counts.get(app_status, 0) + 1
+            app_status_counts[status.application_status] = app_status_counts.get(status.application_status, 0) + 1
         
-        # Create overview table
-        dashboard_lines.extend([
+        lines = [
+            "## [OVERVIEW] Quick Overview",
+            "",
             "### 📈 Application Progress",
             "",
             "| Status | Count | Percentage | Progress Bar |",
             "|--------|-------|------------|--------------|"
-        ])
-        
-        status_order = ['NOT_STARTED', 'DRAFTING', 'SUBMITTED', 'DECISION_PENDING', 'ACCEPTED', 'REJECTED']
-        status_icons = {
-            'NOT_STARTED': '⚪',
-            'DRAFTING': '🟡', 
-            'SUBMITTED': '🟢',
-            'DECISION_PENDING': '🔵',
-            'ACCEPTED': '[ACCEPTED]',
-            'REJECTED': '[REJECTED]'
-        }
-        
-        for app_status in status_order:
+        ]
+        for app_status in self.STATUS_ORDER:
             count = app_status_counts.get(app_status, 0)
             if count > 0:
                 percentage = count / total_schools * 100
                 progress_bar = "█" * int(percentage / 10) + "░" * (10 - int(percentage / 10))
-                icon = status_icons.get(app_status, '❓')
-                dashboard_lines.append(f"| {icon} {app_status} | {count} | {percentage:.1f}% | {progress_bar} |")
-        
-        # Deadline urgency
-        urgent_deadlines = []
-        upcoming_deadlines = []
-        
-        for status in statuses:
-            if status.days_until_deadline is not None:
-                if 0 <= status.days_until_deadline <= 7:
-                    urgent_deadlines.append(status)
-                elif 8 <= status.days_until_deadline <= 30:
-                    upcoming_deadlines.append(status)
-        
-        if urgent_deadlines:
-            dashboard_lines.extend([
-                "",
-                "## [URGENT] URGENT DEADLINES (≤7 days)",
-                ""
-            ])
-            
-            for status in sorted(urgent_deadlines, key=lambda x: x.days_until_deadline):
+                icon = self.STATUS_ICONS.get(app_status, '❓')
+                lines.append(f"| {icon} {app_status} | {count} | {percentage:.1f}% | {progress_bar} |")
+        return "\n".join(lines)
+    
+    @staticmethod
+    def deadline_groups(statuses: List[SchoolStatus]) -> Dict[str, List[SchoolStatus]]:
+        """Urgent (≤7 days) and upcoming (8-30 days) deadlines"""
+        with_deadline = sorted(
+            (s for s in statuses if s.days_until_deadline is not None), key=lambda x: x.days_until_deadline
+        )
+        return {
+            'urgent': [s for s in with_deadline if 0 <= s.days_until_deadline <= 7],
+            'upcoming': [s for s in with_deadline if 8 <= s.days_until_deadline <= 30]
+        }
+    
+    def render_deadlines(self, statuses: List[SchoolStatus]) -> str:
+        """Urgent and upcoming deadline lists (empty when nothing is due within 30 days)"""
+        groups = self.deadline_groups(statuses)
+        lines = []
+        if groups['urgent']:
+            lines.extend(["## [URGENT] URGENT DEADLINES (≤7 days)", ""])
+            for status in groups['urgent']:
                 urgency_icon = "[CRITICAL]" if status.days_until_deadline <= 3 else "[URGENT]"
-                dashboard_lines.append(f"- {urgency_icon} **{status.school_name}**: {status.days_until_deadline} days remaining")
-        
-        if upcoming_deadlines:
-            dashboard_lines.extend([
-                "",
-                "## ⏰ Upcoming Deadlines (8-30 days)",
-                ""
-            ])
-            
-            for status in sorted(upcoming_deadlines, key=lambda x: x.days_until_deadline):
-                dashboard_lines.append(f"- 📅 **{status.school_name}**: {status.days_until_deadline} days remaining")
-        
-        # Detailed school table
-        dashboard_lines.extend([
-            "",
+                lines.append(f"- {urgency_icon} **{status.school_name}**: {status.days_until_deadline} days remaining")
+        if groups['upcoming']:
+            if lines:
+                lines.append("")
+            lines.extend(["## ⏰ Upcoming Deadlines (8-30 days)", ""])
+            for status in groups['upcoming']:
+                lines.append(f"- 📅 **{status.school_name}**: {status.days_until_deadline} days remaining")
+        return "\n".join(lines)
+    
+    def render_school_table(self, statuses: List[SchoolStatus]) -> str:
+        """Detailed per-school status table"""
+        lines = [
             "## [STATUS] Detailed School Status",
             "",
             "| School | Country | Status | Deadline | IELTS | Budget | Priority | Confidence |",
             "|--------|---------|--------|----------|-------|--------|----------|------------|"
-        ])
+        ]
         
         # Sort by priority and deadline urgency
         sorted_statuses = sorted(statuses, key=lambda x: (
@@ -256,7 +470,7 @@ class ApplicationDashboard:
         
         for status in sorted_statuses:
             # Status icon
-            status_icon = status_icons.get(status.application_status, '❓')
+            status_icon = self.STATUS_ICONS.get(status.application_status, '❓')
             
             # Deadline display
             if status.days_until_deadline is not None:
@@ -289,43 +503,49 @@ class ApplicationDashboard:
             # Country flag (simple text for now)
             country_flag = {'Estonia': '🇪🇪', 'Finland': '🇫🇮', 'Sweden': '🇸🇪', 'Germany': '🇩🇪'}.get(status.country, '🏳️')
             
-            dashboard_lines.append(
+            lines.append(
                 f"| {status_icon} **{status.school_name}** | {country_flag} {status.country} | "
                 f"{status.application_status} | {deadline_display} | {ielts_display} | "
                 f"{budget_display} | {priority_display} | {confidence_display} |"
             )
-        
-        # Key metrics
-        dashboard_lines.extend([
-            "",
+        return "\n".join(lines)
+    
+    @staticmethod
+    def compute_metrics(statuses: List[SchoolStatus]) -> Dict[str, Any]:
+        """Summary counts used by the metrics section"""
+        return {
+            'total_schools': len(statuses),
+            'high_priority': sum(1 for s in statuses if s.priority_level == 'high'),
+            'meets_ielts': sum(1 for s in statuses if s.ielts_status == 'MEETS'),
+            'affordable': sum(1 for s in statuses if s.budget_status == 'AFFORDABLE'),
+            'avg_confidence': sum(s.confidence_score for s in statuses) / len(statuses) if statuses else 0,
+            'submitted': sum(1 for s in statuses if s.application_status == 'SUBMITTED'),
+            'pending': sum(1 for s in statuses if s.application_status == 'DECISION_PENDING')
+        }
+    
+    def render_metrics(self, metrics: Dict[str, Any]) -> str:
+        """Key metrics list"""
+        total_schools = metrics['total_schools'] or 1
+        return "\n".join([
             "## 📈 Key Metrics",
-            ""
-        ])
-        
-        # Calculate metrics
-        high_priority_count = sum(1 for s in statuses if s.priority_level == 'high')
-        meets_ielts_count = sum(1 for s in statuses if s.ielts_status == 'MEETS')
-        affordable_count = sum(1 for s in statuses if s.budget_status == 'AFFORDABLE')
-        avg_confidence = sum(s.confidence_score for s in statuses) / len(statuses) if statuses else 0
-        
-        submitted_count = sum(1 for s in statuses if s.application_status == 'SUBMITTED')
-        pending_count = sum(1 for s in statuses if s.application_status == 'DECISION_PENDING')
-        
-        dashboard_lines.extend([
-            f"- **High Priority Schools**: {high_priority_count}/{total_schools} ({high_priority_count/total_schools:.1%})",
-            f"- **IELTS Requirements Met**: {meets_ielts_count}/{total_schools} ({meets_ielts_count/total_schools:.1%})",
-            f"- **Budget Friendly**: {affordable_count}/{total_schools} ({affordable_count/total_schools:.1%})",
-            f"- **Average Confidence**: {avg_confidence:.1%}",
-            f"- **Applications Submitted**: {submitted_count}",
-            f"- **Decisions Pending**: {pending_count}",
-            ""
+            "",
+            f"- **High Priority Schools**: {metrics['high_priority']}/{metrics['total_schools']} ({metrics['high_priority']/total_schools:.1%})",
+            f"- **IELTS Requirements Met**: {metrics['meets_ielts']}/{metrics['total_schools']} ({metrics['meets_ielts']/total_schools:.1%})",
+            f"- **Budget Friendly**: {metrics['affordable']}/{metrics['total_schools']} ({metrics['affordable']/total_schools:.1%})",
+            f"- **Average Confidence**: {metrics['avg_confidence']:.1%}",
+            f"- **Applications Submitted**: {metrics['submitted']}",
+            f"- **Decisions Pending**: {metrics['pending']}"
         ])
-        
-        # Action items
+    
+    def compute_actions(self, statuses: List[SchoolStatus]) -> List[str]:
+        """Recommended action items"""
         action_items = []
+        app_status_counts = {}
+        for status in statuses:
+            app_status_counts[status.application_status] = app_status_counts.get(status.application_status, 0) + 1
         
         # Check for urgent actions
-        if urgent_deadlines:
+        if self.deadline_groups(statuses)['urgent']:
             action_items.append("[URGENT] **URGENT**: Complete applications with deadlines ≤7 days")
         
         not_started_count = app_status_counts.get('NOT_STARTED', 0)
@@ -340,17 +560,17 @@ class ApplicationDashboard:
         if ielts_issues_count > 0:
             action_items.append(f"📚 Consider IELTS retake for {ielts_issues_count} schools with language issues")
         
-        if action_items:
-            dashboard_lines.extend([
-                "## [ACTIONS] Recommended Actions",
-                ""
-            ])
-            for item in action_items:
-                dashboard_lines.append(f"- {item}")
-            dashboard_lines.append("")
-        
-        # Footer
-        dashboard_lines.extend([
+        return action_items
+    
+    def render_actions(self, action_items: List[str]) -> str:
+        """Recommended actions list (empty when there is nothing to do)"""
+        if not action_items:
+            return ""
+        return "\n".join(["## [ACTIONS] Recommended Actions", ""] + [f"- {item}" for item in action_items])
+    
+    def render_help(self) -> str:
+        """How-to-update footer"""
+        return "\n".join([
             "---",
             "",
             "### [UPDATE] How to Update This Dashboard",
@@ -366,92 +586,55 @@ class ApplicationDashboard:
             "Then regenerate the dashboard by running:",
             "```bash",
             "python monitoring/dashboard.py",
-            "```",
-            "",
-            f"*Dashboard generated at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} by Application Intelligence System v2.0*"
+            "```"
         ])
+    
+    def refresh_sections(self, store: DashboardStore, statuses: Optional[List[SchoolStatus]] = None) -> List[str]:
+        """
+        Re-render the sections owned by this dashboard whose inputs changed
+        
+        Returns:
+            Keys of the re-rendered sections
+        """
+        statuses = statuses if statuses is not None else self.get_statuses()
+        records = [self.status_record(s) for s in statuses]
+        metrics = self.compute_metrics(statuses)
+        actions = self.compute_actions(statuses)
+        groups = self.deadline_groups(statuses)
+        deadline_data = {
+            name: [{'school_id': s.school_id, 'school_name': s.school_name,
+                    'deadline': s.deadline.isoformat() if s.deadline else None,
+                    'days_until_deadline': s.days_until_deadline} for s in group]
+            for name, group in groups.items()
+        }
         
-        return "\n".join(dashboard_lines)
+        before = len(store.changed)
+        store.update('overview', 'Quick Overview',
+                     [(r['school_id'], r['application_status']) for r in records],
+                     lambda: self.render_overview(statuses))
+        store.update('deadlines', 'Deadlines', deadline_data, lambda: self.render_deadlines(statuses))
+        store.update('schools', 'Detailed School Status', records, lambda: self.render_school_table(statuses))
+        store.update('metrics', 'Key Metrics', metrics, lambda: self.render_metrics(metrics))
+        store.update('actions', 'Recommended Actions', actions, lambda: self.render_actions(actions))
+        store.update('help', 'How to Update', 'static', self.render_help, data={})
+        return store.changed[before:]
+    
+    def generate_dashboard(self) -> str:
+        """Generate the main dashboard Markdown (in memory, nothing is written)"""
+        store = DashboardStore(self.output_dir)
+        self.refresh_sections(store)
+        return store.render_markdown()
     
     def save_dashboard(self):
-        """Save dashboard to file"""
-        dashboard_content = self.generate_dashboard()
-        
-        # Ensure output directory exists
-        self.output_dir.mkdir(exist_ok=True)
+        """Re-render changed sections and save Markdown, HTML and dashboard.json"""
+        store = DashboardStore(self.output_dir)
+        changed = self.refresh_sections(store)
         
-        # Save dashboard
-        dashboard_file = self.output_dir / "application_dashboard.md"
-        with open(dashboard_file, 'w', encoding='utf-8') as f:
-            f.write(dashboard_content)
-        
-        print(f"[DASHBOARD] Dashboard saved to {dashboard_file}")
-        
-        # Also save as HTML for better visualization (optional)
-        try:
-            html_content = self.generate_html_dashboard(dashboard_content)
-            html_file = self.output_dir / "application_dashboard.html"
-            with open(html_file, 'w', encoding='utf-8') as f:
-                f.write(html_content)
-            print(f"[HTML] HTML dashboard saved to {html_file}")
-        except Exception as e:
-            print(f"[WARNING] HTML generation skipped: {e}")
-    
-    def generate_html_dashboard(self, markdown_content: str) -> str:
-        """Generate HTML version of dashboard (basic conversion)"""
-        try:
-            import markdown
-            
-            # Convert markdown to HTML
-            html_body = markdown.markdown(markdown_content, extensions=['tables'])
-            
-            # Wrap in HTML template
-            html_template = f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="utf-8">
-    <title>University Application Dashboard</title>
-    <style>
-        body {{ font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; margin: 40px; }}
-        table {{ border-collapse: collapse; width: 100%; }}
-        th, td {{ border: 1px solid #ddd; padding: 8px; text-align: left; }}
-        th {{ background-color: #f2f2f2; }}
-        .urgent {{ background-color: #ffebee; }}
-        .warning {{ background-color: #fff3e0; }}
-        .success {{ background-color: #e8f5e8; }}
-        h1 {{ color: #1976d2; }}
-        h2 {{ color: #424242; border-bottom: 2px solid #e0e0e0; padding-bottom: 8px; }}
-    </style>
-    <meta http-equiv="refresh" content="300">  <!-- Auto refresh every 5 minutes -->
-</head>
-<body>
-{html_body}
-<script>
-    // Add some basic interactivity
-    document.addEventListener('DOMContentLoaded', function() {{
-        // Highlight urgent deadlines
-        const rows = document.querySelectorAll('tr');
-        rows.forEach(row => {{
-            const text = row.textContent.toLowerCase();
-            if (text.includes('[urgent]') || text.includes('urgent')) {{
-                row.classList.add('urgent');
-            }} else if (text.includes('[warning]') || text.includes('warning')) {{
-                row.classList.add('warning');
-            }} else if (text.includes('[ok]') || text.includes('[meets]') || text.includes('[affordable]')) {{
-                row.classList.add('success');
-            }}
-        }});
-    }});
-</script>
-</body>
-</html>
-            """
-            return html_template
-            
-        except ImportError:
-            print("[WARNING] Install 'markdown' package for HTML generation: pip install markdown")
-            return ""
+        if store.save():
+            print(f"[DASHBOARD] Re-rendered {len(changed)} section(s): {', '.join(changed) or 'none'}")
+            print(f"[DASHBOARD] Dashboard saved to {store.markdown_file} (data: {store.json_file})")
+        else:
+            print("[DASHBOARD] No section inputs changed, dashboard is up to date")
 
 def main():
     """Main dashboard execution"""
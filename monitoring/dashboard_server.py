@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+Live Dashboard Server
+
+Features:
+- Serves the application dashboard from in-memory state (ApplicationDashboard + DashboardStore);
+  nothing is written to final_applications/
+- Pushes updates to open browsers over server-sent events (/events)
+- Monitor events (opening status, portal status, visa changes, appointment slots) are read
+  from the notification spool as soon as monitors publish them
+- Only the delta is recomputed: source file changes and the daily deadline rollover go through
+  the section input hashes, so only sections whose inputs changed are re-rendered and pushed
+- Standard library only (asyncio streams); binds to 127.0.0.1 by default
+
+Usage:
+    python monitoring/dashboard_server.py [--host 127.0.0.1] [--port 8050]
+"""
+
+import sys
+import json
+import asyncio
+import logging
+import argparse
+from collections import deque
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Set
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from monitoring.dashboard import ApplicationDashboard, DashboardStore
+from notifications.event_bus import DEFAULT_SPOOL_FILE, EventSpool, EVENT_TYPES, DEFAULT_EVENT_TYPE, describe_event
+
+
+# Browser side: replace pushed sections in place and keep a live countdown to the next deadline
+LIVE_SCRIPT = """
+<p id="live-status" style="color:#757575">Connecting to live updates…</p>
+<p id="countdown" style="font-weight:bold"></p>
+<script>
+    let deadlines = __DEADLINES__;
+    const sectionOrder = __ORDERS__;
+
+    // Status line and countdown go under the header; sections remember their order for inserts
+    document.getElementById('last-updated').parentElement.after(
+        document.getElementById('live-status'), document.getElementById('countdown'));
+    document.querySelectorAll('section').forEach(s => { s.dataset.order = sectionOrder[s.id.slice(8)] ?? 80; });
+
+    function renderCountdown() {
+        const now = new Date();
+        const upcoming = deadlines
+            .filter(d => d.deadline && new Date(d.deadline + 'T23:59:59') >= now)
+            .sort((a, b) => a.deadline.localeCompare(b.deadline));
+        const target = document.getElementById('countdown');
+        if (!upcoming.length) { target.textContent = ''; return; }
+        const next = upcoming[0];
+        let seconds = Math.floor((new Date(next.deadline + 'T23:59:59') - now) / 1000);
+        const days = Math.floor(seconds / 86400); seconds %= 86400;
+        const hours = Math.floor(seconds / 3600); seconds %= 3600;
+        const minutes = Math.floor(seconds / 60);
+        target.textContent = `Next deadline: ${next.school_name} (${next.deadline}) in ` +
+            `${days}d ${hours}h ${minutes}m ${seconds % 60}s`;
+    }
+
+    function collectDeadlines(data) {
+        return Object.values(data || {}).flat();
+    }
+
+    const source = new EventSource('/events');
+    const status = document.getElementById('live-status');
+    source.onopen = () => { status.textContent = 'Live updates connected'; };
+    source.onerror = () => { status.textContent = 'Live updates disconnected, retrying…'; };
+    source.addEventListener('section', message => {
+        const section = JSON.parse(message.data);
+        let element = document.getElementById('section-' + section.key);
+        if (!element) {
+            // New section: place it according to its order
+            element = document.createElement('section');
+            element.id = 'section-' + section.key;
+            element.dataset.order = section.order;
+            const after = [...document.querySelectorAll('section')]
+                .find(s => Number(s.dataset.order || 0) > section.order);
+            after ? after.before(element) : document.querySelector('script').before(element);
+        }
+        element.innerHTML = section.html;
+        highlightRows(element);
+        document.getElementById('last-updated').textContent = section.updated_at.replace('T', ' ');
+        if (section.key === 'deadlines') { deadlines = collectDeadlines(section.data); renderCountdown(); }
+    });
+    source.addEventListener('monitor_event', message => {
+        const event = JSON.parse(message.data);
+        status.textContent = `${event.created_at.replace('T', ' ').slice(0, 19)} ${event.description}`;
+    });
+    renderCountdown();
+    setInterval(renderCountdown, 1000);
+</script>
+"""
+
+
+class DashboardServer:
+    """Async HTTP server for the live dashboard"""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8050,
+                 spool_file: Optional[Path] = None, poll_interval: float = 2.0,
+                 refresh_interval: float = 60.0, max_events: int = 20):
+        """
+        Args:
+            host: bind address
+            port: bind port
+            spool_file: notification spool written by the monitors
+            poll_interval: seconds between checks for new events and changed source files
+            refresh_interval: seconds between deadline recomputations
+            max_events: monitor events kept in the live events section
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.host = host
+        self.port = port
+        self.spool_file = Path(spool_file or DEFAULT_SPOOL_FILE)
+        self.poll_interval = poll_interval
+        self.refresh_interval = refresh_interval
+
+        self.dashboard = ApplicationDashboard()
+        # Sections written by other tools (budget, recommendations) come from dashboard.json
+        self.store = DashboardStore(self.dashboard.output_dir)
+        self.store.sections.pop('events', None)
+        self.events: deque = deque(maxlen=max_events)
+        self.last_event_id = 0
+        self.spool: Optional[EventSpool] = None
+        self.clients: Set[asyncio.Queue] = set()
+        self.watched = {
+            'schools': self.dashboard.source_data_dir / "schools.yml",
+            'validation': self.dashboard.output_dir / "validation_results.json",
+            'store': self.store.json_file,
+        }
+        self.mtimes = {name: self._mtime(path) for name, path in self.watched.items()}
+        self.today = date.today()
+        self.server: Optional[asyncio.AbstractServer] = None
+
+    @staticmethod
+    def _mtime(path: Path) -> float:
+        try:
+            return path.stat().st_mtime
+        except OSError:
+            return 0.0
+
+    # ------------------------------------------------------------------ state
+
+    def refresh(self) -> List[str]:
+        """Recompute the dashboard sections and return the keys whose inputs changed"""
+        changed = self.dashboard.refresh_sections(self.store)
+        self.store.changed = []
+        return changed
+
+    def reload_sources(self) -> List[str]:
+        """Re-read the source files that changed on disk and return the affected section keys"""
+        changed_files = [name for name, path in self.watched.items()
+                         if self._mtime(path) != self.mtimes[name]]
+        if not changed_files:
+            return []
+        for name in changed_files:
+            self.mtimes[name] = self._mtime(self.watched[name])
+        self.logger.info(f"Source changed: {', '.join(changed_files)}")
+
+        changed: List[str] = []
+        try:
+            if 'schools' in changed_files:
+                self.dashboard.load_configuration()
+            if 'validation' in changed_files:
+                self.dashboard.load_validation_results()
+            if 'store' in changed_files:
+                # Pick up sections other tools wrote (budget, recommendations) by input hash
+                for key, section in DashboardStore(self.dashboard.output_dir).sections.items():
+                    current = self.store.sections.get(key)
+                    if key != 'events' and (current is None or current.get('input_hash') != section.get('input_hash')):
+                        self.store.sections[key] = section
+                        changed.append(key)
+            changed.extend(key for key in self.refresh() if key not in changed)
+        except Exception as e:
+            self.logger.error(f"Failed to reload dashboard sources: {e}")
+        return changed
+
+    def read_new_events(self) -> List[Dict[str, Any]]:
+        """Monitor events appended to the spool since the last read"""
+        if self.spool is None:
+            if not self.spool_file.exists():
+                return []
+            self.spool = EventSpool(self.spool_file)
+        events = self.spool.since(self.last_event_id)
+        if events:
+            self.last_event_id = events[-1]['id']
+        return events
+
+    def add_events(self, events: List[Dict[str, Any]]) -> bool:
+        """Append monitor events to the live events section; returns whether it was re-rendered"""
+        for event in events:
+            self.events.appendleft({
+                'id': event['id'],
+                'event_type': event['event_type'],
+                'priority': EVENT_TYPES.get(event['event_type'], DEFAULT_EVENT_TYPE)['priority'],
+                'created_at': event['created_at'],
+                'description': describe_event(event)
+            })
+        items = list(self.events)
+        return self.store.update('events', 'Live Monitor Events', items,
+                                 lambda: self.render_events(items), order=15)
+
+    @staticmethod
+    def render_events(items: List[Dict[str, Any]]) -> str:
+        lines = ["## 📡 Live Monitor Events", ""]
+        if not items:
+            lines.append("*No monitor events yet*")
+        for item in items:
+            marker = "🔴 " if item['priority'] == 'high' else ""
+            lines.append(f"- {marker}**{item['created_at'][:16].replace('T', ' ')}** {item['description']}")
+        return "\n".join(lines)
+
+    def section_payload(self, key: str) -> Dict[str, Any]:
+        section = self.store.sections[key]
+        html = section.get('html')
+        if html is None:
+            html = f"<pre>{section['markdown']}</pre>"
+        return {'key': key, 'title': section['title'], 'order': section['order'],
+                'updated_at': section['updated_at'], 'html': html, 'data': section.get('data')}
+
+    # ------------------------------------------------------------------ push
+
+    def broadcast(self, event: str, data: Dict[str, Any]) -> None:
+        """Queue a server-sent event for every connected browser"""
+        message = f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+        for queue in list(self.clients):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # Slow client: drop it, the browser reconnects and reloads the full page state
+                self.clients.discard(queue)
+
+    def push_sections(self, keys: List[str]) -> None:
+        for key in keys:
+            if key in self.store.sections:
+                self.broadcast('section', self.section_payload(key))
+        if keys:
+            self.logger.info(f"Pushed {len(keys)} section(s) to {len(self.clients)} client(s): {', '.join(keys)}")
+
+    async def watch(self) -> None:
+        """Poll the event spool and source files; recompute deadlines periodically"""
+        loop = asyncio.get_running_loop()
+        next_refresh = loop.time() + self.refresh_interval
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                events = self.read_new_events()
+                changed = self.reload_sources()
+                if events:
+                    if self.add_events(events):
+                        changed.append('events')
+                    self.store.changed = []
+                    for event in events:
+                        self.broadcast('monitor_event', {
+                            'id': event['id'],
+                            'event_type': event['event_type'],
+                            'created_at': event['created_at'],
+                            'description': describe_event(event)
+                        })
+                # Day rollover changes every countdown; otherwise the hashes keep this cheap
+                if loop.time() >= next_refresh or date.today() != self.today:
+                    self.today = date.today()
+                    next_refresh = loop.time() + self.refresh_interval
+                    changed.extend(key for key in self.refresh() if key not in changed)
+                self.push_sections(changed)
+            except Exception as e:
+                self.logger.error(f"Live update failed: {e}")
+
+    # ------------------------------------------------------------------ http
+
+    def render_page(self) -> str:
+        deadlines = [entry for group in self.store.sections.get('deadlines', {}).get('data', {}).values()
+                     for entry in group]
+        orders = {section['key']: section['order'] for section in self.store.ordered()}
+        script = (LIVE_SCRIPT
+                  .replace('__DEADLINES__', json.dumps(deadlines, ensure_ascii=False, default=str))
+                  .replace('__ORDERS__', json.dumps(orders)))
+        html_content = self.store.render_html(head_extra='', body_extra=script)
+        if html_content is None:
+            return f"<pre>{self.store.render_markdown()}</pre>{script}"
+        return html_content
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = (await reader.readline()).decode('latin-1').strip()
+            while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                pass
+            parts = request_line.split()
+            if len(parts) < 2 or parts[0] != 'GET':
+                await self.respond(writer, 405, 'text/plain', 'Method Not Allowed')
+                return
+            path = parts[1].split('?', 1)[0]
+
+            if path == '/events':
+                await self.stream_events(writer)
+            elif path in ('/', '/index.html'):
+                await self.respond(writer, 200, 'text/html', self.render_page())
+            elif path == '/dashboard.json':
+                await self.respond(writer, 200, 'application/json',
+                                   json.dumps(self.store.to_json(), ensure_ascii=False, indent=2, default=str))
+            else:
+                await self.respond(writer, 404, 'text/plain', 'Not Found')
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception as e:
+            self.logger.error(f"Request failed: {e}")
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def respond(writer: asyncio.StreamWriter, status: int, content_type: str, body: str) -> None:
+        reasons = {200: 'OK', 404: 'Not Found', 405: 'Method Not Allowed'}
+        payload = body.encode('utf-8')
+        writer.write(
+            f"HTTP/1.1 {status} {reasons.get(status, 'OK')}\r\n"
+            f"Content-Type: {content_type}; charset=utf-8\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            "Cache-Control: no-cache\r\n"
+            "Connection: close\r\n\r\n".encode('latin-1') + payload
+        )
+        await writer.drain()
+
+    async def stream_events(self, writer: asyncio.StreamWriter) -> None:
+        """Keep the connection open and forward queued server-sent events"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=100)
+        self.clients.add(queue)
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: text/event-stream; charset=utf-8\r\n"
+            b"Cache-Control: no-cache\r\n"
+            b"Connection: keep-alive\r\n\r\n"
+            b"retry: 3000\n\n"
+        )
+        await writer.drain()
+        try:
+            while queue in self.clients:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    message = ": keep-alive\n\n"
+                writer.write(message.encode('utf-8'))
+                await writer.drain()
+        finally:
+            self.clients.discard(queue)
+
+    async def serve(self) -> None:
+        """Build the initial state and serve until cancelled"""
+        self.refresh()
+        if self.spool_file.exists():
+            # Show the latest events on first load, then follow new ones
+            self.spool = EventSpool(self.spool_file)
+            self.last_event_id = max(self.spool.last_id() - self.events.maxlen, 0)
+        self.add_events(self.read_new_events())
+        self.store.changed = []
+
+        self.server = await asyncio.start_server(self.handle, self.host, self.port)
+        watcher = asyncio.create_task(self.watch())
+        print(f"[DASHBOARD] Live dashboard at http://{self.host}:{self.port}/ (Ctrl+C to stop)")
+        try:
+            async with self.server:
+                await self.server.serve_forever()
+        finally:
+            watcher.cancel()
+            if self.spool is not None:
+                self.spool.close()
+
+
+def main():
+    """Run the live dashboard server"""
+    parser = argparse.ArgumentParser(description='Live application dashboard server')
+    parser.add_argument('--host', default='127.0.0.1', help='bind address (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8050, help='port (default: 8050)')
+    parser.add_argument('--spool', type=Path, default=None, help='notification spool file')
+    parser.add_argument('--poll-interval', type=float, default=2.0, help='seconds between update checks')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    server = DashboardServer(host=args.host, port=args.port, spool_file=args.spool,
+                             poll_interval=args.poll_interval)
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        print("\n[DASHBOARD] Server stopped")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,309 @@
+"""
+頁面段落層級的變更偵測
+Section-Level Structural Diffing
+
+功能：
+- 在瀏覽器內將頁面的可見文字依標題（h1–h4）切成段落
+- 每個段落各自計算指紋，只比對、儲存有變更的段落
+- 每次輪詢都會變動的段落（跑馬燈、輪播橫幅）自動判定為雜訊並忽略
+- 變更紀錄只追加實際變更的段落文字，儲存量隨真正的變更成長
+"""
+
+import re
+import json
+import difflib
+import hashlib
+import logging
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, List, Any, Iterable, Optional
+
+
+# 在瀏覽器內執行：依標題切分可見文字，回傳 [{heading, level, path, text}]
+SECTION_EXTRACT_JS = """
+() => {
+    const SKIP = new Set(['SCRIPT', 'STYLE', 'NOSCRIPT', 'TEMPLATE', 'SVG', 'IFRAME', 'CANVAS']);
+    const HEADING = /^H[1-4]$/;
+    const sections = [];
+    const trail = [];
+    let current = {heading: '', level: 0, path: [], parts: []};
+
+    const isVisible = (el) => {
+        if (el.getAttribute('aria-hidden') === 'true' || el.hidden) {
+            return false;
+        }
+        const style = getComputedStyle(el);
+        return style.display !== 'none' && style.visibility !== 'hidden';
+    };
+
+    const walk = (node) => {
+        for (const child of node.childNodes) {
+            if (child.nodeType === Node.TEXT_NODE) {
+                const text = child.textContent.replace(/\\s+/g, ' ').trim();
+                if (text) {
+                    current.parts.push(text);
+                }
+                continue;
+            }
+            if (child.nodeType !== Node.ELEMENT_NODE || SKIP.has(child.tagName) || !isVisible(child)) {
+                continue;
+            }
+            if (HEADING.test(child.tagName)) {
+                const level = Number(child.tagName[1]);
+                const heading = (child.innerText || '').replace(/\\s+/g, ' ').trim();
+                while (trail.length && trail[trail.length - 1].level >= level) {
+                    trail.pop();
+                }
+                trail.push({level: level, heading: heading});
+                sections.push(current);
+                current = {heading: heading, level: level, path: trail.map((t) => t.heading), parts: []};
+                continue;
+            }
+            const block = getComputedStyle(child).display !== 'inline';
+            if (block) {
+                current.parts.push('\\n');
+            }
+            walk(child);
+            if (block) {
+                current.parts.push('\\n');
+            }
+        }
+    };
+
+    if (document.body) {
+        walk(document.body);
+    }
+    sections.push(current);
+
+    return sections.map((s) => ({
+        heading: s.heading,
+        level: s.level,
+        path: s.path,
+        text: s.parts.join(' ')
+    }));
+}
+"""
+
+# 常見的動態內容：時間戳記、時刻、「N 分鐘前」、瀏覽次數
+NOISE_PATTERNS = [
+    (re.compile(r'\d{4}-\d{2}-\d{2}T\d{2}:\d{2}(:\d{2})?(\.\d+)?(Z|[+-]\d{2}:?\d{2})?'), 'TIMESTAMP'),
+    (re.compile(r'\b\d{1,2}:\d{2}(:\d{2})?\s*(AM|PM|am|pm)?\b'), 'TIME'),
+    (re.compile(r'\b\d+\s+(seconds?|minutes?|hours?)\s+ago\b', re.IGNORECASE), 'AGO'),
+    (re.compile(r'\d+\s*(分鐘|小時|秒)前'), 'AGO'),
+    (re.compile(r'\b\d[\d,]*\s+(views?|visitors?)\b', re.IGNORECASE), 'VIEWS'),
+]
+
+
+def normalize_text(text: str) -> str:
+    """
+    正規化段落文字：移除動態內容、合併空白、去除空行
+
+    Args:
+        text: 段落文字
+
+    Returns:
+        正規化後的文字（以換行分隔）
+    """
+    for pattern, replacement in NOISE_PATTERNS:
+        text = pattern.sub(replacement, text)
+    lines = (re.sub(r'\s+', ' ', line).strip() for line in text.split('\n'))
+    return '\n'.join(line for line in lines if line)
+
+
+def build_sections(raw_sections: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    將瀏覽器回傳的段落轉為 段落鍵 -> {heading, text, hash}
+
+    段落鍵為標題路徑（例如 "Student visa > Documents"）；同名段落依出現順序加上 #2、#3。
+    沒有文字的段落不列入。
+
+    Args:
+        raw_sections: SECTION_EXTRACT_JS 的回傳值
+
+    Returns:
+        段落字典（保留頁面順序）
+    """
+    sections: Dict[str, Dict[str, Any]] = {}
+    for raw in raw_sections:
+        text = normalize_text(raw.get('text') or '')
+        if not text:
+            continue
+
+        base_key = ' > '.join(raw.get('path') or []) or '(頁首)'
+        key, n = base_key, 1
+        while key in sections:
+            n += 1
+            key = f"{base_key} #{n}"
+
+        sections[key] = {
+            'heading': raw.get('heading') or '',
+            'text': text,
+            'hash': hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
+        }
+    return sections
+
+
+def diff_text(old_text: str, new_text: str, max_lines: int = 20) -> Dict[str, List[str]]:
+    """
+    逐行比較段落文字
+
+    Args:
+        old_text: 舊文字
+        new_text: 新文字
+        max_lines: 每側最多保留的行數
+
+    Returns:
+        {'added': [...], 'removed': [...]}
+    """
+    added, removed = [], []
+    for line in difflib.ndiff(old_text.split('\n'), new_text.split('\n')):
+        if line.startswith('+ '):
+            added.append(line[2:])
+        elif line.startswith('- '):
+            removed.append(line[2:])
+    return {'added': added[:max_lines], 'removed': removed[:max_lines]}
+
+
+class SectionSnapshotStore:
+    """各頁面的段落快照與變更紀錄"""
+
+    def __init__(self, storage_dir: Path, noise_threshold: int = 3, max_lines: int = 20):
+        """
+        初始化儲存
+
+        Args:
+            storage_dir: 儲存目錄
+            noise_threshold: 連續變更幾次即視為雜訊段落（之後連續穩定同樣次數才恢復）
+            max_lines: 每個段落變更最多記錄的行數
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.storage_dir = Path(storage_dir)
+        self.storage_dir.mkdir(parents=True, exist_ok=True)
+        self.noise_threshold = noise_threshold
+        self.max_lines = max_lines
+
+    def _file(self, name: str, suffix: str) -> Path:
+        return self.storage_dir / f"{name.replace(' ', '_').replace('/', '_')}{suffix}"
+
+    def load(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        載入段落快照
+
+        Args:
+            name: 頁面名稱（例如國家名稱）
+
+        Returns:
+            快照；不存在或無法讀取時回傳 None
+        """
+        snapshot_file = self._file(name, '_sections.json')
+        if not snapshot_file.exists():
+            return None
+        try:
+            with open(snapshot_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            self.logger.error(f"載入段落快照失敗 ({name}): {e}")
+            return None
+
+    def save(self, name: str, snapshot: Dict[str, Any]) -> bool:
+        """儲存段落快照（覆寫）"""
+        try:
+            with open(self._file(name, '_sections.json'), 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f, ensure_ascii=False, indent=2)
+            return True
+        except Exception as e:
+            self.logger.error(f"儲存段落快照失敗 ({name}): {e}")
+            return False
+
+    def append_changes(self, name: str, entry: Dict[str, Any]) -> None:
+        """變更紀錄追加一行（JSON Lines）"""
+        try:
+            with open(self._file(name, '_changes.jsonl'), 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        except Exception as e:
+            self.logger.error(f"寫入變更紀錄失敗 ({name}): {e}")
+
+    def recent_changes(self, name: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """最近的變更紀錄（新到舊）"""
+        changes_file = self._file(name, '_changes.jsonl')
+        if not changes_file.exists():
+            return []
+        with open(changes_file, 'r', encoding='utf-8') as f:
+            entries = [json.loads(line) for line in f if line.strip()]
+        return entries[::-1][:limit]
+
+    def compare(
+        self,
+        name: str,
+        url: str,
+        raw_sections: Iterable[Dict[str, Any]],
+        ignore_headings: Iterable[str] = (),
+        now: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        比對本次段落與上次快照，更新快照並追加變更紀錄
+
+        Args:
+            name: 頁面名稱
+            url: 頁面 URL
+            raw_sections: SECTION_EXTRACT_JS 的回傳值
+            ignore_headings: 標題包含這些字串的段落不列入變更
+            now: 檢查時間（ISO 格式，預設現在）
+
+        Returns:
+            {'first_check': bool, 'changes': [段落變更], 'noisy': [雜訊段落鍵], 'sections': 段落數}
+        """
+        now = now or datetime.now().isoformat()
+        ignore = [h.lower() for h in ignore_headings]
+        new_sections = build_sections(raw_sections)
+        old_snapshot = self.load(name)
+        old_sections = (old_snapshot or {}).get('sections', {})
+
+        changes = []
+        noisy = []
+        for key, section in new_sections.items():
+            old = old_sections.get(key)
+            if old is None:
+                section.update(streak=0, stable=0, noisy=False)
+                if old_snapshot is not None:
+                    changes.append({
+                        'section': key, 'type': 'added',
+                        'added': section['text'].split('\n')[:self.max_lines], 'removed': []
+                    })
+                continue
+
+            if old['hash'] == section['hash']:
+                stable = old.get('stable', 0) + 1
+                section.update(
+                    streak=0, stable=stable,
+                    noisy=old.get('noisy', False) and stable < self.noise_threshold
+                )
+                continue
+
+            streak = old.get('streak', 0) + 1
+            is_noisy = old.get('noisy', False) or streak >= self.noise_threshold
+            section.update(streak=streak, stable=0, noisy=is_noisy)
+            if is_noisy:
+                noisy.append(key)
+                continue
+            changes.append({'section': key, 'type': 'modified', **diff_text(old['text'], section['text'], self.max_lines)})
+
+        for key, old in old_sections.items():
+            if key not in new_sections and not old.get('noisy'):
+                changes.append({
+                    'section': key, 'type': 'removed',
+                    'added': [], 'removed': old['text'].split('\n')[:self.max_lines]
+                })
+
+        changes = [c for c in changes if not any(h in c['section'].lower() for h in ignore)]
+
+        self.save(name, {'url': url, 'checked_at': now, 'sections': new_sections})
+        if changes:
+            self.append_changes(name, {'url': url, 'changed_at': now, 'changes': changes})
+
+        return {
+            'first_check': old_snapshot is None,
+            'changes': changes,
+            'noisy': noisy,
+            'sections': len(new_sections)
+        }
@@ -9,16 +9,46 @@ import sys
 import json
 from typing import Dict, List, Any, Optional
 from pathlib import Path
-from playwright.async_api import async_playwright, Browser, Page, Response
+from playwright.async_api import Page
 from datetime import datetime
 
 sys.path.append(str(Path(__file__).parent.parent.parent))
 from monitoring.base_monitor import BaseMonitor
+from monitoring.response_capture import CaptureRule
+from crawling.readiness import ReadyCondition
 
 
 class DreamApplyMonitor(BaseMonitor):
     """監控 DreamApply 平台申請進度"""
     
+    # 頁面就緒條件
+    LOGIN_READY = ReadyCondition(selector='input[type="password"], input[name="password"]')
+    APPLICATIONS_READY = ReadyCondition(
+        selector='.application-item, .application, [class*="application"], tr.application-row, .card',
+        stable_ms=500
+    )
+    
+    # 登入狀態重用：驗證頁面與「已登入」元素
+    SESSION_CHECK_URL = 'https://estonia.dreamapply.com/dashboard'
+    SESSION_LOGGED_IN = '.dashboard, [class*="dashboard"], .applications, a[href*="logout"]'
+    
+    # 申請清單 API：回應抵達時只保留下列欄位
+    CAPTURE_RULES = [
+        CaptureRule(
+            name='applications',
+            url_pattern=r'dreamapply\.com/.*(api|application|data)',
+            records_path='data.applications[*]|applications[*]|data[*]|items[*]|[*]',
+            fields={
+                'school': 'university.name|institution.name|university|institution|school|universityName',
+                'program': 'programme.name|program.name|program|programme|course|programName',
+                'status': 'status.name|status|applicationStatus|state',
+                'application_id': 'id|applicationId',
+                'submitted_date': 'submittedAt|createdAt'
+            },
+            required=['school', 'program']
+        )
+    ]
+    
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         """初始化監控器"""
         super().__init__(config)
@@ -26,44 +56,10 @@ class DreamApplyMonitor(BaseMonitor):
         self.password = os.getenv('DREAMAPPLY_PASSWORD')
         self.base_url = 'https://estonia.dreamapply.com'
         self.login_url = f'{self.base_url}/account/login'
-        self.playwright = None
-        self.browser: Optional[Browser] = None
-        self.api_data = None  # 儲存攔截到的 API 資料
         
         if not self.username or not self.password:
             self.logger.warning("DreamApply 帳號密碼未設定，請設定 DREAMAPPLY_USERNAME 和 DREAMAPPLY_PASSWORD 環境變數")
     
-    async def setup_api_interception(self, page: Page) -> None:
-        """
-        設定 API 請求攔截
-        
-        Args:
-            page: Playwright Page 物件
-        """
-        async def handle_response(response: Response):
-            """處理回應"""
-            try:
-                url = response.url
-                
-                # 攔截可能包含申請資料的 API 請求
-                if any(keyword in url.lower() for keyword in ['application', 'status', 'api', 'data']):
-                    if response.status == 200:
-                        try:
-                            data = await response.json()
-                            self.logger.info(f"攔截到 API 回應: {url}")
-                            
-                            # 儲存可能相關的資料
-                            if isinstance(data, (dict, list)):
-                                if not self.api_data:
-                                    self.api_data = {}
-                                self.api_data[url] = data
-                        except:
-                            pass
-            except Exception as e:
-                self.logger.debug(f"處理回應時發生錯誤: {e}")
-        
-        page.on('response', handle_response)
-    
     async def login(self, page: Page) -> bool:
         """
         登入 DreamApply
@@ -78,8 +74,7 @@ class DreamApplyMonitor(BaseMonitor):
             self.logger.info("開始登入 DreamApply")
             
             # 導航至登入頁面
-            await page.goto(self.login_url, timeout=30000)
-            await page.wait_for_timeout(2000)
+            await self.readiness.goto(page, self.login_url, 'dreamapply_login', self.LOGIN_READY)
             
             # 填寫帳號
             await page.fill('input[name="email"], input[type="email"], input[name="username"]', self.username)
@@ -122,103 +117,39 @@ class DreamApplyMonitor(BaseMonitor):
     
     async def try_api_approach(self, page: Page) -> Optional[List[Dict[str, Any]]]:
         """
-        嘗試從攔截的 API 資料中提取申請資訊
+        從擷取到的 API 回應提取申請資訊
         
         Args:
             page: Playwright Page 物件
             
         Returns:
-            申請資料清單，若無法提取則回傳 None
+            申請資料清單，若沒有擷取到則回傳 None
         """
-        if not self.api_data:
-            return None
-        
-        try:
-            self.logger.info("嘗試從 API 資料提取申請資訊")
-            
-            applications = []
-            
-            # 分析所有攔截到的 API 資料
-            for url, data in self.api_data.items():
-                if isinstance(data, list):
-                    # 資料是陣列，可能直接是申請清單
-                    for item in data:
-                        if isinstance(item, dict) and any(key in item for key in ['application', 'status', 'program', 'university']):
-                            app_data = self.parse_application_data(item)
-                            if app_data:
-                                applications.append(app_data)
-                
-                elif isinstance(data, dict):
-                    # 資料是物件，可能包含申請清單
-                    for key, value in data.items():
-                        if isinstance(value, list):
-                            for item in value:
-                                if isinstance(item, dict):
-                                    app_data = self.parse_application_data(item)
-                                    if app_data:
-                                        applications.append(app_data)
-            
-            if applications:
-                self.logger.info(f"從 API 提取到 {len(applications)} 個申請")
-                return applications
-            
-            return None
-        
-        except Exception as e:
-            self.logger.error(f"從 API 提取資料時發生錯誤: {e}")
-            return None
+        records = await self.captured_records('applications')
+        applications = [self.parse_application_data(record) for record in records]
+        if applications:
+            self.logger.info(f"從 API 提取到 {len(applications)} 個申請")
+            return applications
+        return None
     
-    def parse_application_data(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    def parse_application_data(self, record: Dict[str, Any]) -> Dict[str, Any]:
         """
-        解析單一申請資料
+        將擷取到的紀錄轉為標準化的申請資料
         
         Args:
-            data: API 回傳的資料
+            record: CAPTURE_RULES 擷取的紀錄
             
         Returns:
             標準化的申請資料
         """
-        try:
-            # 嘗試提取各個欄位（可能的欄位名稱）
-            school = (
-                data.get('university') or
-                data.get('institution') or
-                data.get('school') or
-                data.get('universityName') or
-                'Unknown'
-            )
-            
-            program = (
-                data.get('program') or
-                data.get('programme') or
-                data.get('course') or
-                data.get('programName') or
-                'Unknown'
-            )
-            
-            status = (
-                data.get('status') or
-                data.get('applicationStatus') or
-                data.get('state') or
-                'Unknown'
-            )
-            
-            # 只有在至少有學校或課程資訊時才回傳
-            if school != 'Unknown' or program != 'Unknown':
-                return {
-                    'school': school,
-                    'program': program,
-                    'status': status,
-                    'application_id': data.get('id') or data.get('applicationId'),
-                    'submitted_date': data.get('submittedAt') or data.get('createdAt'),
-                    'checked_at': datetime.now().isoformat()
-                }
-            
-            return None
-        
-        except Exception as e:
-            self.logger.debug(f"解析申請資料時發生錯誤: {e}")
-            return None
+        return {
+            'school': str(record.get('school', 'Unknown')),
+            'program': str(record.get('program', 'Unknown')),
+            'status': str(record.get('status', 'Unknown')),
+            'application_id': record.get('application_id'),
+            'submitted_date': record.get('submitted_date'),
+            'checked_at': datetime.now().isoformat()
+        }
     
     async def extract_application_status_html(self, page: Page) -> List[Dict[str, Any]]:
         """
@@ -236,7 +167,7 @@ class DreamApplyMonitor(BaseMonitor):
             applications = []
             
             # 等待內容載入
-            await page.wait_for_timeout(3000)
+            await self.readiness.wait(page, 'dreamapply_applications', self.APPLICATIONS_READY, default_timeout=5000)
             
             # 嘗試多種選擇器
             selectors = [
@@ -327,30 +258,30 @@ class DreamApplyMonitor(BaseMonitor):
                 self.logger.error("未設定 DreamApply 帳號密碼")
                 return False
             
+            if not self.poll_due('dreamapply_applications'):
+                self.logger.info("尚未到期，略過本次檢查")
+                return True
+            
             self.logger.info("=== 開始監控 DreamApply 申請狀態 ===")
             
-            # 啟動 Playwright
-            self.playwright = await async_playwright().start()
-            self.browser = await self.playwright.chromium.launch(headless=True)
-            context = await self.browser.new_context(
-                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            )
+            # 啟動瀏覽器（由 MonitorRunner 執行時使用共用瀏覽器）
+            await self.launch_browser()
+            context = await self.new_session_context(self.browser, 'dreamapply', 'dreamapply')
             page = await context.new_page()
             
-            # 設定 API 攔截
-            await self.setup_api_interception(page)
+            # 擷取申請清單 API 回應
+            self.attach_capture(page)
             
-            # 登入
-            login_success = await self.login(page)
+            # 登入（優先重用已儲存的登入狀態）
+            login_success = await self.ensure_session(page, 'dreamapply', self.login)
             if not login_success:
+                self.record_poll('dreamapply_applications', error=True)
                 await context.close()
-                await self.browser.close()
-                await self.playwright.stop()
+                await self.close_browser()
                 return False
             
-            # 等待頁面完全載入
-            await page.wait_for_load_state('networkidle', timeout=10000)
-            await page.wait_for_timeout(3000)
+            # 等待申請列表出現（同時讓 API 回應有機會被攔截）
+            await self.readiness.wait(page, 'dreamapply_applications', self.APPLICATIONS_READY)
             
             # 方法 1: 嘗試從 API 提取
             applications = await self.try_api_approach(page)
@@ -362,10 +293,11 @@ class DreamApplyMonitor(BaseMonitor):
             
             # 偵測變更
             old_status = self.load_saved_status('dreamapply_applications')
-            if self.detect_changes(old_status, {'applications': applications}):
+            changed = self.detect_changes(old_status, {'applications': applications})
+            if changed:
                 self.logger.info("⚠️ 偵測到狀態變更")
                 self.send_notification({
-                    'type': 'dreamapply_status_change',
+                    'type': 'application_status_change',
                     'platform': 'DreamApply',
                     'applications': applications,
                     'timestamp': datetime.now().isoformat()
@@ -376,30 +308,23 @@ class DreamApplyMonitor(BaseMonitor):
                 'applications': applications,
                 'last_checked': datetime.now().isoformat()
             })
+            self.record_poll('dreamapply_applications', changed=changed)
             
             # 更新 YAML
             self.update_application_status_yml(applications)
             
             # 清理
+            self.log_resource_summary()
             await context.close()
-            await self.browser.close()
-            await self.playwright.stop()
+            await self.close_browser()
             
             self.logger.info("=== 監控完成 ===")
             return True
         
         except Exception as e:
             self.logger.error(f"監控執行失敗: {e}")
-            if self.browser:
-                try:
-                    await self.browser.close()
-                except:
-                    pass
-            if self.playwright:
-                try:
-                    await self.playwright.stop()
-                except:
-                    pass
+            self.record_poll('dreamapply_applications', error=True)
+            await self.close_browser()
             return False
     
     def update_application_status_yml(self, applications: List[Dict[str, Any]]) -> None:
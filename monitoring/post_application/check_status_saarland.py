@@ -8,24 +8,53 @@ import os
 import sys
 from typing import Dict, List, Any, Optional
 from pathlib import Path
-from playwright.async_api import async_playwright, Browser, Page
+from playwright.async_api import Page
 from datetime import datetime
 
 sys.path.append(str(Path(__file__).parent.parent.parent))
 from monitoring.base_monitor import BaseMonitor
+from monitoring.response_capture import CaptureRule
+from crawling.readiness import ReadyCondition
 
 
 class SaarlandMonitor(BaseMonitor):
     """監控薩爾蘭大學申請進度"""
     
+    # 頁面就緒條件
+    HOME_READY = ReadyCondition(
+        selector='a:has-text("Login"), a:has-text("Sign in"), input[type="password"]'
+    )
+    APPLICATIONS_READY = ReadyCondition(
+        selector='.application, [class*="application"], .submission, table',
+        stable_ms=500
+    )
+    
+    # 登入狀態重用：驗證頁面與「已登入」元素
+    SESSION_CHECK_URL = 'https://apply.cs.uni-saarland.de'
+    SESSION_LOGGED_IN = 'a[href*="logout"], a:has-text("Logout"), a:has-text("Log out")'
+    
+    # 申請系統的 JSON API：有擷取到時不需解析 DOM
+    CAPTURE_RULES = [
+        CaptureRule(
+            name='applications',
+            url_pattern=r'apply\.cs\.uni-saarland\.de/.*(api|application|submission)',
+            records_path='applications[*]|data.applications[*]|submissions[*]|data[*]|[*]',
+            fields={
+                'program': 'program.name|programme.name|program|programme|degree|title',
+                'status': 'status.name|status|state|decision',
+                'application_id': 'id|applicationId',
+                'submitted_date': 'submittedAt|submitted|createdAt'
+            },
+            required=['status']
+        )
+    ]
+    
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         """初始化監控器"""
         super().__init__(config)
         self.username = os.getenv('SAARLAND_USERNAME')
         self.password = os.getenv('SAARLAND_PASSWORD')
         self.base_url = 'https://apply.cs.uni-saarland.de'
-        self.playwright = None
-        self.browser: Optional[Browser] = None
         
         if not self.username or not self.password:
             self.logger.warning("薩爾蘭帳號密碼未設定，請設定 SAARLAND_USERNAME 和 SAARLAND_PASSWORD 環境變數")
@@ -44,15 +73,14 @@ class SaarlandMonitor(BaseMonitor):
             self.logger.info("開始登入薩爾蘭大學申請系統")
             
             # 導航至首頁
-            await page.goto(self.base_url, timeout=30000)
-            await page.wait_for_timeout(2000)
+            await self.readiness.goto(page, self.base_url, 'saarland_home', self.HOME_READY)
             
             # 尋找並點擊登入連結
             try:
                 login_link = await page.wait_for_selector('a:has-text("Login"), a:has-text("Sign in")', timeout=5000)
                 if login_link:
                     await login_link.click()
-                    await page.wait_for_timeout(2000)
+                    await page.wait_for_selector('input[type="password"]', timeout=10000)
             except:
                 self.logger.info("可能已在登入頁面")
             
@@ -70,7 +98,7 @@ class SaarlandMonitor(BaseMonitor):
             
             # 等待登入完成
             try:
-                await page.wait_for_load_state('networkidle', timeout=15000)
+                await page.wait_for_url(lambda url: 'login' not in url.lower(), timeout=15000)
                 
                 # 檢查是否登入成功（查找使用者相關元素或確認不在登入頁面）
                 current_url = page.url
@@ -124,7 +152,7 @@ class SaarlandMonitor(BaseMonitor):
                         link = await page.wait_for_selector(f'a:has-text("{text}")', timeout=3000)
                         if link:
                             await link.click()
-                            await page.wait_for_timeout(2000)
+                            await page.wait_for_load_state('domcontentloaded')
                             self.logger.info(f"已點擊「{text}」")
                             break
                     except:
@@ -133,10 +161,13 @@ class SaarlandMonitor(BaseMonitor):
                 self.logger.info("可能已在申請頁面")
             
             # 等待內容載入
-            await page.wait_for_load_state('networkidle', timeout=10000)
-            await page.wait_for_timeout(3000)
+            await self.readiness.wait(page, 'saarland_applications', self.APPLICATIONS_READY)
+            
+            # 優先使用擷取到的 API 資料
+            applications = await self.applications_from_api()
+            if applications:
+                return applications
             
-            applications = []
             
             # 嘗試抓取申請資訊
             selectors = [
@@ -235,6 +266,30 @@ class SaarlandMonitor(BaseMonitor):
                 'checked_at': datetime.now().isoformat()
             }]
     
+    async def applications_from_api(self) -> List[Dict[str, Any]]:
+        """
+        將擷取到的 API 紀錄轉為申請狀態清單
+        
+        Returns:
+            申請狀態清單；沒有擷取到時為空清單
+        """
+        applications = []
+        for record in await self.captured_records('applications'):
+            application_data = {
+                'school': 'Saarland University',
+                'program': str(record.get('program', 'Computer Science')),
+                'status': str(record['status']),
+                'checked_at': datetime.now().isoformat()
+            }
+            for key in ('application_id', 'submitted_date'):
+                if record.get(key):
+                    application_data[key] = str(record[key])
+            applications.append(application_data)
+        
+        if applications:
+            self.logger.info(f"從 API 回應取得 {len(applications)} 個申請")
+        return applications
+    
     async def debug_screenshot(self, page: Page, name: str) -> None:
         """儲存除錯截圖"""
         try:
@@ -253,22 +308,24 @@ class SaarlandMonitor(BaseMonitor):
                 self.logger.error("未設定薩爾蘭帳號密碼")
                 return False
             
+            if not self.poll_due('saarland_applications'):
+                self.logger.info("尚未到期，略過本次檢查")
+                return True
+            
             self.logger.info("=== 開始監控薩爾蘭大學申請狀態 ===")
             
-            # 啟動 Playwright
-            self.playwright = await async_playwright().start()
-            self.browser = await self.playwright.chromium.launch(headless=True)
-            context = await self.browser.new_context(
-                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            )
+            # 啟動瀏覽器（由 MonitorRunner 執行時使用共用瀏覽器）
+            await self.launch_browser()
+            context = await self.new_session_context(self.browser, 'saarland', 'saarland')
             page = await context.new_page()
+            self.attach_capture(page)
             
-            # 登入
-            login_success = await self.login(page)
+            # 登入（優先重用已儲存的登入狀態）
+            login_success = await self.ensure_session(page, 'saarland', self.login)
             if not login_success:
+                self.record_poll('saarland_applications', error=True)
                 await context.close()
-                await self.browser.close()
-                await self.playwright.stop()
+                await self.close_browser()
                 return False
             
             # 抓取申請狀態
@@ -276,10 +333,11 @@ class SaarlandMonitor(BaseMonitor):
             
             # 偵測變更
             old_status = self.load_saved_status('saarland_applications')
-            if self.detect_changes(old_status, {'applications': applications}):
+            changed = self.detect_changes(old_status, {'applications': applications})
+            if changed:
                 self.logger.info("⚠️ 偵測到狀態變更")
                 self.send_notification({
-                    'type': 'saarland_status_change',
+                    'type': 'application_status_change',
                     'platform': 'Saarland University',
                     'applications': applications,
                     'timestamp': datetime.now().isoformat()
@@ -290,30 +348,23 @@ class SaarlandMonitor(BaseMonitor):
                 'applications': applications,
                 'last_checked': datetime.now().isoformat()
             })
+            self.record_poll('saarland_applications', changed=changed)
             
             # 更新 YAML
             self.update_application_status_yml(applications)
             
             # 清理
+            self.log_resource_summary()
             await context.close()
-            await self.browser.close()
-            await self.playwright.stop()
+            await self.close_browser()
             
             self.logger.info("=== 監控完成 ===")
             return True
         
         except Exception as e:
             self.logger.error(f"監控執行失敗: {e}")
-            if self.browser:
-                try:
-                    await self.browser.close()
-                except:
-                    pass
-            if self.playwright:
-                try:
-                    await self.playwright.stop()
-                except:
-                    pass
+            self.record_poll('saarland_applications', error=True)
+            await self.close_browser()
             return False
     
     def update_application_status_yml(self, applications: List[Dict[str, Any]]) -> None:
@@ -8,16 +8,48 @@ import os
 import sys
 from typing import Dict, List, Any, Optional
 from pathlib import Path
-from playwright.async_api import async_playwright, Browser, Page
+from playwright.async_api import Page
 from datetime import datetime
 
 sys.path.append(str(Path(__file__).parent.parent.parent))
 from monitoring.base_monitor import BaseMonitor
+from monitoring.response_capture import CaptureRule
+from crawling.readiness import ReadyCondition
 
 
 class SwedenApplicationMonitor(BaseMonitor):
     """監控瑞典 Universityadmissions.se 申請進度"""
     
+    # 頁面就緒條件
+    LOGIN_READY = ReadyCondition(
+        selector='a[href*="login"], button:has-text("Log in"), input[type="password"]'
+    )
+    APPLICATIONS_READY = ReadyCondition(
+        selector='.application-item, .application, [class*="application"], .course-item',
+        stable_ms=500
+    )
+    
+    # 登入狀態重用：驗證頁面與「已登入」元素
+    SESSION_CHECK_URL = 'https://www.universityadmissions.se/intl/start'
+    SESSION_LOGGED_IN = 'a[href*="logout"], a:has-text("Log out"), .user-info, .account-info'
+    
+    # 「我的申請」頁面背後的 JSON API：有擷取到時不需解析 DOM
+    CAPTURE_RULES = [
+        CaptureRule(
+            name='applications',
+            url_pattern=r'universityadmissions\.se/.*(api|application|mypages)',
+            records_path='applications[*]|data.applications[*]|selections[*]|data[*]|[*]',
+            fields={
+                'school': 'university.name|universityName|institution|university|school',
+                'program': 'course.name|programme.name|courseName|programName|title|name',
+                'status': 'status.text|status.name|statusText|status|result',
+                'application_id': 'applicationCode|courseCode|id',
+                'applied_date': 'appliedDate|submittedAt|createdAt'
+            },
+            required=['status']
+        )
+    ]
+    
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         """初始化監控器"""
         super().__init__(config)
@@ -25,8 +57,6 @@ class SwedenApplicationMonitor(BaseMonitor):
         self.password = os.getenv('SWEDEN_PASSWORD')
         self.base_url = 'https://www.universityadmissions.se'
         self.login_url = f'{self.base_url}/intl/start'
-        self.playwright = None
-        self.browser: Optional[Browser] = None
         
         if not self.username or not self.password:
             self.logger.warning("瑞典帳號密碼未設定，請設定 SWEDEN_USERNAME 和 SWEDEN_PASSWORD 環境變數")
@@ -45,8 +75,7 @@ class SwedenApplicationMonitor(BaseMonitor):
             self.logger.info("開始登入 Universityadmissions.se")
             
             # 導航至登入頁面
-            await page.goto(self.login_url, timeout=30000)
-            await page.wait_for_timeout(2000)
+            await self.readiness.goto(page, self.login_url, 'universityadmissions_login', self.LOGIN_READY)
             
             # 點擊登入按鈕（可能需要先點擊 "Log in" 連結）
             try:
@@ -54,7 +83,7 @@ class SwedenApplicationMonitor(BaseMonitor):
                 login_link = await page.wait_for_selector('a[href*="login"], button:has-text("Log in")', timeout=5000)
                 if login_link:
                     await login_link.click()
-                    await page.wait_for_timeout(2000)
+                    await page.wait_for_load_state('domcontentloaded')
             except:
                 self.logger.info("未找到登入連結，可能已在登入頁面")
             
@@ -133,14 +162,14 @@ class SwedenApplicationMonitor(BaseMonitor):
                         link = await page.wait_for_selector(f'a:has-text("{text}")', timeout=3000)
                         if link:
                             await link.click()
-                            await page.wait_for_timeout(2000)
+                            await page.wait_for_load_state('domcontentloaded')
                             self.logger.info(f"已點擊「{text}」連結")
                             break
                     except:
                         continue
                 
-                # 等待頁面載入
-                await page.wait_for_load_state('networkidle', timeout=10000)
+                # 等待申請列表出現
+                await self.readiness.wait(page, 'universityadmissions_applications', self.APPLICATIONS_READY)
                 
                 return True
             
@@ -167,9 +196,15 @@ class SwedenApplicationMonitor(BaseMonitor):
             self.logger.info("開始抓取申請狀態")
             
             # 等待申請列表載入
-            await page.wait_for_timeout(3000)
+            await self.readiness.wait(
+                page, 'universityadmissions_applications', self.APPLICATIONS_READY, default_timeout=5000
+            )
+            
+            # 優先使用擷取到的 API 資料
+            applications = await self.applications_from_api()
+            if applications:
+                return applications
             
-            applications = []
             
             # 嘗試多種可能的選擇器
             selectors = [
@@ -292,6 +327,30 @@ class SwedenApplicationMonitor(BaseMonitor):
                 'checked_at': datetime.now().isoformat()
             }]
     
+    async def applications_from_api(self) -> List[Dict[str, Any]]:
+        """
+        將擷取到的 API 紀錄轉為申請狀態清單
+        
+        Returns:
+            申請狀態清單；沒有擷取到時為空清單
+        """
+        applications = []
+        for record in await self.captured_records('applications'):
+            application_data = {
+                'school': str(record.get('school', 'Unknown')),
+                'program': str(record.get('program', 'Unknown')),
+                'status': str(record['status']),
+                'checked_at': datetime.now().isoformat()
+            }
+            for key in ('application_id', 'applied_date'):
+                if record.get(key):
+                    application_data[key] = str(record[key])
+            applications.append(application_data)
+        
+        if applications:
+            self.logger.info(f"從 API 回應取得 {len(applications)} 個申請")
+        return applications
+    
     async def extract_text(self, element, selectors: List[str]) -> Optional[str]:
         """
         從元素中使用多個選擇器嘗試抓取文字
@@ -345,28 +404,32 @@ class SwedenApplicationMonitor(BaseMonitor):
                 self.logger.error("未設定瑞典帳號密碼")
                 return False
             
+            if not self.poll_due('sweden_applications'):
+                self.logger.info("尚未到期，略過本次檢查")
+                return True
+            
             self.logger.info("=== 開始監控瑞典申請狀態 ===")
             
-            # 啟動 Playwright
-            self.playwright = await async_playwright().start()
-            self.browser = await self.playwright.chromium.launch(
-                headless=True  # 生產環境使用 True，測試時可改為 False
-            )
+            # 啟動瀏覽器（由 MonitorRunner 執行時使用共用瀏覽器）
+            await self.launch_browser()
             
             # 建立瀏覽器上下文
-            context = await self.browser.new_context(
-                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+            context = await self.new_session_context(
+                self.browser,
+                'universityadmissions',
+                'universityadmissions',
                 viewport={'width': 1920, 'height': 1080}
             )
             page = await context.new_page()
+            self.attach_capture(page)
             
-            # 1. 登入
-            login_success = await self.login(page)
+            # 1. 登入（優先重用已儲存的登入狀態）
+            login_success = await self.ensure_session(page, 'universityadmissions', self.login)
             if not login_success:
+                self.record_poll('sweden_applications', error=True)
                 self.logger.error("登入失敗")
                 await context.close()
-                await self.browser.close()
-                await self.playwright.stop()
+                await self.close_browser()
                 return False
             
             # 2. 導航至申請頁面
@@ -374,8 +437,7 @@ class SwedenApplicationMonitor(BaseMonitor):
             if not nav_success:
                 self.logger.error("導航失敗")
                 await context.close()
-                await self.browser.close()
-                await self.playwright.stop()
+                await self.close_browser()
                 return False
             
             # 3. 抓取申請狀態
@@ -385,12 +447,13 @@ class SwedenApplicationMonitor(BaseMonitor):
             old_status = self.load_saved_status('sweden_applications')
             
             # 5. 偵測變更
-            if self.detect_changes(old_status, {'applications': new_status}):
+            changed = self.detect_changes(old_status, {'applications': new_status})
+            if changed:
                 self.logger.info("⚠️ 偵測到狀態變更")
                 
                 # 發送通知
                 self.send_notification({
-                    'type': 'sweden_status_change',
+                    'type': 'application_status_change',
                     'platform': 'Universityadmissions.se',
                     'old_status': old_status.get('applications', []),
                     'new_status': new_status,
@@ -404,32 +467,25 @@ class SwedenApplicationMonitor(BaseMonitor):
                 'applications': new_status,
                 'last_checked': datetime.now().isoformat()
             })
+            self.record_poll('sweden_applications', changed=changed)
             
             # 7. 更新 application_status.yml
             self.update_application_status_yml(new_status)
             
             # 8. 清理
+            self.log_resource_summary()
             await context.close()
-            await self.browser.close()
-            await self.playwright.stop()
+            await self.close_browser()
             
             self.logger.info("=== 監控完成 ===")
             return True
         
         except Exception as e:
             self.logger.error(f"監控執行失敗: {e}")
+            self.record_poll('sweden_applications', error=True)
             
             # 確保清理資源
-            if self.browser:
-                try:
-                    await self.browser.close()
-                except:
-                    pass
-            if self.playwright:
-                try:
-                    await self.playwright.stop()
-                except:
-                    pass
+            await self.close_browser()
             
             return False
     
@@ -3,6 +3,7 @@
 """
 
 from .check_opening_status import ApplicationOpeningMonitor
+from .opening_analyzer import OpeningAnalyzer
 
-__all__ = ['ApplicationOpeningMonitor']
+__all__ = ['ApplicationOpeningMonitor', 'OpeningAnalyzer']
 
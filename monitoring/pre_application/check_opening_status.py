@@ -4,55 +4,35 @@
 """
 
 import asyncio
-import re
 from typing import Dict, List, Any, Optional
 from pathlib import Path
-from playwright.async_api import async_playwright, Browser, Page
+from urllib.parse import urlparse
+from playwright.async_api import Page
 from datetime import datetime
 import sys
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
 from monitoring.base_monitor import BaseMonitor
+from crawling.readiness import ReadyCondition
+from crawling.http_fetcher import HttpFetcher, FetchResult, looks_js_rendered
+from monitoring.pre_application.opening_analyzer import OpeningAnalyzer
 
 
 class ApplicationOpeningMonitor(BaseMonitor):
     """監控申請開放狀態"""
     
-    # 申請開放相關的關鍵字
-    OPEN_KEYWORDS = [
-        'apply now',
-        'application open',
-        'application period',
-        'submit application',
-        'start application',
-        'apply online',
-        'application portal',
-        'apply here',
-        '立即申請',
-        '開放申請',
-        '申請入口'
-    ]
-    
-    # 申請未開放的關鍵字
-    CLOSED_KEYWORDS = [
-        'application closed',
-        'applications are closed',
-        'not accepting applications',
-        'coming soon',
-        'opens on',
-        'will open',
-        '申請關閉',
-        '尚未開放',
-        '即將開放'
-    ]
+    # 申請頁面就緒條件：主要文字內容穩定
+    PAGE_READY = ReadyCondition(text_stable=True, stable_ms=500)
     
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         """初始化監控器"""
         super().__init__(config)
         self.schools_file = 'source_data/schools.yml'
         self.schools = []
-        self.browser: Optional[Browser] = None
-        self.playwright = None
+        self.analyzer = OpeningAnalyzer(
+            languages=self.config.get('languages'),
+            extra_keywords=self.config.get('extra_keywords')
+        )
     
     def load_schools(self) -> List[Dict[str, Any]]:
         """
@@ -64,82 +44,80 @@ class ApplicationOpeningMonitor(BaseMonitor):
         data = self.load_yaml(self.schools_file)
         return data.get('schools', [])
     
-    def detect_keywords(self, html_content: str, keywords: List[str]) -> bool:
+    def analyze_page(self, school_name: str, application_url: str, html_content: str) -> Dict[str, Any]:
         """
-        在 HTML 內容中偵測關鍵字
+        由頁面 HTML 判斷申請狀態（瀏覽器渲染後的內容或 HTTP 取得的原始 HTML 皆可）
         
         Args:
+            school_name: 學校名稱
+            application_url: 申請頁面 URL
             html_content: HTML 內容
-            keywords: 關鍵字清單
             
         Returns:
-            是否找到關鍵字
+            狀態資訊
         """
-        # 轉為小寫進行不分大小寫的比對
-        html_lower = html_content.lower()
-        
-        for keyword in keywords:
-            if keyword.lower() in html_lower:
-                self.logger.info(f"找到關鍵字: {keyword}")
-                return True
+        analysis = self.analyzer.analyze(html_content)
+        self.logger.info(f"{school_name} 判斷依據: {analysis['reason']}")
         
-        return False
+        return {
+            'school': school_name,
+            'url': application_url,
+            'status': analysis['status'],
+            'has_open_keywords': bool(analysis['open_matches']),
+            'has_closed_keywords': bool(analysis['closed_matches']),
+            'has_apply_button': analysis['has_apply_button'],
+            'has_form': analysis['has_form'],
+            'detected_dates': analysis['detected_dates'],
+            'apply_links': analysis['apply_links'],
+            'evidence': {
+                'reason': analysis['reason'],
+                'open_matches': analysis['open_matches'],
+                'closed_matches': analysis['closed_matches'],
+                'date_ranges': analysis['date_ranges']
+            },
+            'checked_at': datetime.now().isoformat()
+        }
     
-    def analyze_html_structure(self, html_content: str) -> Dict[str, Any]:
+    def status_from_http(
+        self,
+        school: Dict[str, Any],
+        fetched: Optional[FetchResult],
+        old_status: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
         """
-        分析 HTML 結構變化
+        HTTP 快速路徑：由原始 HTML 判斷狀態
         
         Args:
-            html_content: HTML 內容
+            school: 學校資料
+            fetched: HTTP 抓取結果
+            old_status: 上次的狀態
             
         Returns:
-            分析結果
+            狀態資訊；需要改用瀏覽器（失敗、殼頁面、狀態不明）時回傳 None
         """
-        analysis = {
-            'has_apply_button': False,
-            'has_form': False,
-            'has_date_info': False,
-            'detected_dates': [],
-            'apply_links': []
-        }
+        if fetched is None or fetched.error:
+            return None
         
-        # 偵測申請按鈕
-        apply_button_patterns = [
-            r'<button[^>]*>.*?apply.*?</button>',
-            r'<a[^>]*>.*?apply.*?</a>',
-            r'class="[^"]*apply[^"]*"',
-            r'id="[^"]*apply[^"]*"'
-        ]
-        
-        for pattern in apply_button_patterns:
-            if re.search(pattern, html_content, re.IGNORECASE):
-                analysis['has_apply_button'] = True
-                break
-        
-        # 偵測表單
-        if re.search(r'<form[^>]*>.*?</form>', html_content, re.IGNORECASE | re.DOTALL):
-            analysis['has_form'] = True
-        
-        # 偵測日期資訊
-        date_patterns = [
-            r'\d{4}-\d{2}-\d{2}',  # YYYY-MM-DD
-            r'\d{1,2}/\d{1,2}/\d{4}',  # DD/MM/YYYY or MM/DD/YYYY
-            r'\d{1,2}\s+(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{4}'
-        ]
+        school_name = school.get('name', 'Unknown')
         
-        for pattern in date_patterns:
-            matches = re.findall(pattern, html_content, re.IGNORECASE)
-            analysis['detected_dates'].extend(matches)
+        # 304：頁面未變更，沿用上次已確定的狀態
+        if fetched.not_modified:
+            if old_status.get('status') not in ('open', 'closed'):
+                return None
+            self.logger.info(f"{school_name} 頁面未變更 (304, {fetched.elapsed_ms:.0f} ms)")
+            return {**old_status, 'fetched_via': 'http', 'checked_at': datetime.now().isoformat()}
         
-        if analysis['detected_dates']:
-            analysis['has_date_info'] = True
+        if looks_js_rendered(fetched.html):
+            self.logger.info(f"{school_name} 頁面需要 JavaScript 渲染，改用瀏覽器")
+            return None
         
-        # 偵測申請連結
-        link_pattern = r'<a[^>]*href="([^"]*)"[^>]*>.*?apply.*?</a>'
-        links = re.findall(link_pattern, html_content, re.IGNORECASE)
-        analysis['apply_links'] = links
+        result = self.analyze_page(school_name, fetched.url, fetched.html)
+        if result['status'] == 'unknown':
+            return None
         
-        return analysis
+        result['fetched_via'] = 'http'
+        self.logger.info(f"{school_name} 狀態: {result['status']} (HTTP, {fetched.elapsed_ms:.0f} ms)")
+        return result
     
     async def check_school_status(self, school: Dict[str, Any], page: Page) -> Dict[str, Any]:
         """
@@ -167,43 +145,17 @@ class ApplicationOpeningMonitor(BaseMonitor):
         
         try:
             # 訪問申請頁面
-            await page.goto(application_url, timeout=30000, wait_until='networkidle')
-            
-            # 等待頁面載入
-            await page.wait_for_timeout(2000)
+            await self.readiness.goto(
+                page, application_url, f"opening_{urlparse(application_url).netloc}", self.PAGE_READY
+            )
             
             # 取得頁面內容
             html_content = await page.content()
             
-            # 偵測關鍵字
-            has_open_keywords = self.detect_keywords(html_content, self.OPEN_KEYWORDS)
-            has_closed_keywords = self.detect_keywords(html_content, self.CLOSED_KEYWORDS)
-            
-            # 分析 HTML 結構
-            html_analysis = self.analyze_html_structure(html_content)
+            result = self.analyze_page(school_name, application_url, html_content)
+            result['fetched_via'] = 'browser'
             
-            # 判斷狀態
-            if has_open_keywords or html_analysis['has_apply_button']:
-                status = 'open'
-            elif has_closed_keywords:
-                status = 'closed'
-            else:
-                status = 'unknown'
-            
-            result = {
-                'school': school_name,
-                'url': application_url,
-                'status': status,
-                'has_open_keywords': has_open_keywords,
-                'has_closed_keywords': has_closed_keywords,
-                'has_apply_button': html_analysis['has_apply_button'],
-                'has_form': html_analysis['has_form'],
-                'detected_dates': html_analysis['detected_dates'],
-                'apply_links': html_analysis['apply_links'],
-                'checked_at': datetime.now().isoformat()
-            }
-            
-            self.logger.info(f"{school_name} 狀態: {status}")
+            self.logger.info(f"{school_name} 狀態: {result['status']}")
             return result
             
         except Exception as e:
@@ -231,34 +183,68 @@ class ApplicationOpeningMonitor(BaseMonitor):
                 self.logger.warning("沒有學校資料")
                 return False
             
-            self.logger.info(f"開始監控 {len(self.schools)} 所學校")
+            # 只檢查排程到期的學校
+            due_schools = [school for school in self.schools if self.poll_due(school.get('name', 'Unknown'))]
+            self.logger.info(f"開始監控 {len(due_schools)}/{len(self.schools)} 所到期的學校")
             
-            # 啟動 Playwright
-            self.playwright = await async_playwright().start()
-            self.browser = await self.playwright.chromium.launch(
-                headless=True
-            )
+            if not due_schools:
+                self.logger.info("沒有到期的學校，略過本次檢查")
+                return True
             
-            # 建立瀏覽器上下文
-            context = await self.browser.new_context(
-                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            )
-            page = await context.new_page()
+            # HTTP 快速路徑：並行抓取伺服器端渲染的頁面（已知需要 JS 的網站除外）
+            fetcher = HttpFetcher(self.status_dir / 'http_validators.json')
+            prefetched = {}
+            if self.config.get('http_first', True) and fetcher.available:
+                http_urls = [
+                    school['application_url'] for school in due_schools
+                    if school.get('application_url') and not school.get('needs_js')
+                    and not fetcher.needs_js(school['application_url'])
+                ]
+                async with fetcher:
+                    prefetched = await fetcher.fetch_many(http_urls)
+                self.logger.info(f"HTTP 抓取 {len(prefetched)} 個頁面")
+            
+            # 瀏覽器只在需要時啟動（由 MonitorRunner 執行時使用共用瀏覽器）
+            context = None
+            page = None
             
             # 檢查每所學校
             changes_detected = []
+            last_host = None
             
-            for school in self.schools:
+            for school in due_schools:
                 school_name = school.get('name', 'Unknown')
+                application_url = school.get('application_url', '')
                 
                 # 取得舊狀態
                 old_status = self.load_saved_status(school_name)
                 
-                # 檢查新狀態
-                new_status = await self.check_school_status(school, page)
+                # 檢查新狀態：先用 HTTP 結果，無法判斷時才使用瀏覽器
+                fetched = prefetched.get(application_url)
+                new_status = self.status_from_http(school, fetched, old_status)
+                
+                if new_status is None:
+                    if page is None and application_url:
+                        await self.launch_browser()
+                        context = await self.new_context(self.browser, 'application_pages')
+                        page = await context.new_page()
+                    
+                    # 只在連續以瀏覽器造訪同一網站時間隔，避免過度頻繁的請求
+                    host = urlparse(application_url).netloc
+                    if host and host == last_host:
+                        await page.wait_for_timeout(3000)
+                    last_host = host
+                    
+                    new_status = await self.check_school_status(school, page)
+                    
+                    # 原始 HTML 無法判斷、渲染後可以：記錄此網站需要 JS
+                    if fetched is not None and fetched.html is not None \
+                            and new_status.get('status') in ('open', 'closed'):
+                        fetcher.mark_needs_js(application_url)
                 
                 # 偵測變更
-                if self.detect_changes(old_status, new_status):
+                changed = self.detect_changes(old_status, new_status)
+                if changed:
                     self.logger.info(f"偵測到狀態變更: {school_name}")
                     changes_detected.append({
                         'school': school_name,
@@ -281,13 +267,22 @@ class ApplicationOpeningMonitor(BaseMonitor):
                 # 儲存新狀態
                 self.save_status(school_name, new_status)
                 
-                # 避免過度頻繁的請求
-                await page.wait_for_timeout(3000)
+                # 排定下次檢查：截止日或頁面上的日期接近時縮短間隔
+                self.record_poll(
+                    school_name,
+                    changed=changed,
+                    error=new_status.get('status') == 'error',
+                    dates=[school.get('application_deadline'), school.get('application_opens')]
+                    + new_status.get('detected_dates', [])
+                )
+            
+            fetcher.save()
+            self.log_resource_summary()
             
             # 關閉瀏覽器
-            await context.close()
-            await self.browser.close()
-            await self.playwright.stop()
+            if context is not None:
+                await context.close()
+            await self.close_browser()
             
             # 產生摘要報告
             self.generate_report(changes_detected)
@@ -297,10 +292,7 @@ class ApplicationOpeningMonitor(BaseMonitor):
             
         except Exception as e:
             self.logger.error(f"監控執行失敗: {e}")
-            if self.browser:
-                await self.browser.close()
-            if self.playwright:
-                await self.playwright.stop()
+            await self.close_browser()
             return False
     
     def run(self) -> bool:
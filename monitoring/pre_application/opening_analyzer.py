@@ -0,0 +1,397 @@
+"""
+申請開放狀態分析
+Compiled Multilingual Opening-Status Analyzer
+
+功能：
+- 單次解析 HTML：同時取得可見文字、申請按鈕 / 連結與表單（不含 script、style 與屬性）
+- 所有語言的開放 / 關閉關鍵字編譯為單一比對式，一次掃描可見文字
+- 編譯的日期辨識：ISO、數字、英 / 德 / 瑞典 / 芬蘭 / 愛沙尼亞月份名稱、中文日期與日期區間
+- 回傳每個比對的位置與前後文，說明狀態判斷的依據
+"""
+
+import re
+import logging
+from datetime import date
+from html.parser import HTMLParser
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+
+
+# 各語言的開放 / 關閉關鍵字（比對時不分大小寫，空白可為任意空白字元）
+KEYWORDS: Dict[str, Dict[str, List[str]]] = {
+    'en': {
+        'open': [
+            'apply now', 'application open', 'applications open', 'application is open',
+            'applications are open', 'application period', 'submit application', 'submit your application',
+            'start application', 'start your application', 'apply online', 'application portal', 'apply here',
+            'now accepting applications',
+        ],
+        'closed': [
+            'application closed', 'applications closed', 'applications are closed', 'application is closed',
+            'not accepting applications', 'no longer accepting applications', 'application period has ended',
+            'deadline has passed', 'coming soon', 'opens on', 'will open',
+        ],
+    },
+    'zh': {
+        'open': ['立即申請', '開放申請', '申請入口', '線上申請', '立即申请', '开放申请', '申请入口', '在线申请'],
+        'closed': ['申請關閉', '尚未開放', '即將開放', '申請已截止', '申请关闭', '尚未开放', '即将开放', '申请已截止'],
+    },
+    'de': {
+        'open': ['jetzt bewerben', 'bewerbung offen', 'bewerbung ist möglich', 'online bewerben', 'zur bewerbung',
+                 'bewerbungsportal'],
+        'closed': ['bewerbung geschlossen', 'bewerbungsfrist abgelaufen', 'bewerbungsfrist ist abgelaufen',
+                   'keine bewerbung möglich', 'derzeit keine bewerbungen', 'bewerbung ab'],
+    },
+    'sv': {
+        'open': ['ansök nu', 'ansökan är öppen', 'ansökan öppen', 'anmälan är öppen', 'anmälan öppen', 'sök nu'],
+        'closed': ['ansökan är stängd', 'ansökan stängd', 'anmälan är stängd', 'anmälan har stängt',
+                   'anmälan öppnar', 'ansökan öppnar'],
+    },
+    'fi': {
+        'open': ['hae nyt', 'haku on auki', 'haku on käynnissä', 'hakulomake', 'hae tästä'],
+        'closed': ['haku on päättynyt', 'haku päättynyt', 'haku ei ole auki', 'haku avautuu', 'haku alkaa'],
+    },
+    'et': {
+        'open': ['kandideeri kohe', 'kandideeri nüüd', 'kandideerimine on avatud', 'vastuvõtt on avatud',
+                 'esita avaldus'],
+        'closed': ['kandideerimine on suletud', 'vastuvõtt on suletud', 'vastuvõtt on lõppenud',
+                   'kandideerimine algab', 'vastuvõtt algab'],
+    },
+}
+
+# 申請按鈕 / 連結文字（各語言的「申請」）
+APPLY_PATTERN = re.compile(
+    r'apply|bewerb|ansök|anmäl|\bhae\b|hakemus|kandideeri|avaldus|申請|申请',
+    re.IGNORECASE
+)
+
+def trie_pattern(words: Iterable[str]) -> str:
+    """
+    將字詞清單編譯為前綴樹形式的比對式（共同前綴只比對一次）
+
+    Args:
+        words: 字詞（已轉小寫）
+
+    Returns:
+        正規表示式字串
+    """
+    trie: Dict[str, Any] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node: Dict[str, Any]) -> str:
+        optional = '' in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if optional:
+            body = '(?:' + body + ')?'
+        return body
+
+    return build(trie)
+
+
+# 拉丁字母 / 數字（中文關鍵字不需要字詞邊界）
+WORD_CHAR = '[0-9A-Za-zäöüõšžåéèàáíóúÿ]'
+
+# 字詞邊界：兩側不同時為拉丁字母 / 數字。寫在比對式內，邊界不符時比對引擎會
+# 回溯改試較短的關鍵字或下一個位置，不會吃掉重疊的關鍵字
+# （"application opens on" 中 "application open" 不符，仍能比對到 "opens on"）
+KEYWORD_BOUNDARY = f'(?:(?<!{WORD_CHAR})|(?!{WORD_CHAR}))'
+
+
+MONTHS: Dict[str, int] = {}
+for _number, _names in enumerate([
+    ['january', 'jan', 'januar', 'januari', 'tammikuu', 'jaanuar'],
+    ['february', 'feb', 'februar', 'februari', 'helmikuu', 'veebruar'],
+    ['march', 'mar', 'märz', 'mars', 'maaliskuu', 'märts'],
+    ['april', 'apr', 'huhtikuu', 'aprill'],
+    ['may', 'mai', 'maj', 'toukokuu'],
+    ['june', 'jun', 'juni', 'kesäkuu', 'juuni'],
+    ['july', 'jul', 'juli', 'heinäkuu', 'juuli'],
+    ['august', 'aug', 'augusti', 'elokuu'],
+    ['september', 'sep', 'sept', 'syyskuu'],
+    ['october', 'oct', 'oktober', 'okt', 'lokakuu', 'oktoober'],
+    ['november', 'nov', 'marraskuu'],
+    ['december', 'dec', 'dezember', 'dez', 'joulukuu', 'detsember'],
+], start=1):
+    for _name in _names:
+        MONTHS[_name] = _number
+
+_MONTH = trie_pattern(MONTHS)
+
+# 單一日期（比對小寫文字）：以數字開頭的格式共用前導數字，避免逐一嘗試各格式；
+# 芬蘭語月份可帶格位字尾（tammikuuta）
+NUMERIC_DATE_PATTERN = re.compile(
+    r'(?<![\d.])(?P<lead>\d{1,4})(?:'
+    r'(?P<iso>-(?P<iso_m>\d{1,2})-(?P<iso_d>\d{1,2}))'
+    r'|(?P<num>[./](?P<num_m>\d{1,2})[./](?P<num_y>\d{4}))'
+    rf'|(?P<dmy>\.?\s+(?P<dmy_m>{_MONTH})(?:ta)?\.?,?\s+(?P<dmy_y>\d{{4}}))'
+    r'|(?P<zh>\s*年\s*(?P<zh_m>\d{1,2})\s*月\s*(?P<zh_d>\d{1,2})\s*日))'
+)
+MONTH_FIRST_DATE_PATTERN = re.compile(
+    rf'(?P<mdy_m>{_MONTH})\.?\s+(?P<mdy_d>\d{{1,2}})(?:st|nd|rd|th)?,?\s+(?P<mdy_y>\d{{4}})'
+)
+
+# 兩個日期之間的區間連接詞
+RANGE_CONNECTOR = re.compile(r'\s*(?:-|–|—|to|until|till|through|bis|kuni|asti|至|到|～|~)\s*')
+
+# 簡寫區間：1–15 January 2026、1.–15. tammikuuta 2026
+DAY_RANGE_PATTERN = re.compile(
+    rf'(?<!\d)(?P<d1>\d{{1,2}})\.?\s*[-–—]\s*(?P<d2>\d{{1,2}})\.?\s+(?P<m>{_MONTH})(?:ta)?\.?,?\s+(?P<y>\d{{4}})'
+)
+
+SKIP_TAGS = {'script', 'style', 'noscript', 'template', 'svg'}
+BLOCK_TAGS = {
+    'p', 'div', 'li', 'ul', 'ol', 'br', 'tr', 'td', 'th', 'table', 'section', 'article', 'header', 'footer',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'form', 'button', 'a', 'dt', 'dd', 'main', 'nav', 'aside',
+}
+
+
+def _to_iso(year: str, month: int, day: str) -> Optional[str]:
+    try:
+        return date(int(year), int(month), int(day)).isoformat()
+    except ValueError:
+        return None
+
+
+def _date_from_match(match: 're.Match') -> Optional[str]:
+    """日期比對結果轉為 ISO 日期（數字日期的日 / 月順序以歐洲慣例解讀）"""
+    groups = match.groupdict()
+    if groups.get('mdy_m'):
+        return _to_iso(groups['mdy_y'], MONTHS[groups['mdy_m']], groups['mdy_d'])
+
+    lead = groups['lead']
+    if groups['iso'] and len(lead) == 4:
+        return _to_iso(lead, int(groups['iso_m']), groups['iso_d'])
+    if groups['zh'] and len(lead) == 4:
+        return _to_iso(lead, int(groups['zh_m']), groups['zh_d'])
+    if len(lead) > 2:
+        return None
+    if groups['num']:
+        return _to_iso(groups['num_y'], int(groups['num_m']), lead)
+    if groups['dmy']:
+        return _to_iso(groups['dmy_y'], MONTHS[groups['dmy_m']], lead)
+    return None
+
+
+class _PageParser(HTMLParser):
+    """單次解析：可見文字、申請按鈕 / 連結、表單"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self.skip_depth = 0
+        self.has_form = False
+        self.apply_attr = False
+        self.apply_elements: List[Dict[str, Optional[str]]] = []
+        self._element: Optional[Dict[str, Any]] = None
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        if tag in SKIP_TAGS:
+            self.skip_depth += 1
+            return
+        if tag in BLOCK_TAGS:
+            self.parts.append('\n')
+        if tag == 'form':
+            self.has_form = True
+
+        attributes = dict(attrs)
+        if tag in ('a', 'button'):
+            marker = f"{attributes.get('class') or ''} {attributes.get('id') or ''}"
+            if 'apply' in marker.lower():
+                self.apply_attr = True
+            self._element = {'tag': tag, 'href': attributes.get('href'), 'text': []}
+        elif tag == 'input' and (attributes.get('type') or '').lower() == 'submit':
+            value = attributes.get('value') or ''
+            if APPLY_PATTERN.search(value):
+                self.apply_elements.append({'tag': 'input', 'href': None, 'text': value.strip()})
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in SKIP_TAGS:
+            self.skip_depth = max(0, self.skip_depth - 1)
+            return
+        if tag in BLOCK_TAGS:
+            self.parts.append('\n')
+        if tag in ('a', 'button') and self._element is not None:
+            text = ' '.join(''.join(self._element['text']).split())
+            if APPLY_PATTERN.search(text):
+                self.apply_elements.append({'tag': tag, 'href': self._element['href'], 'text': text})
+            self._element = None
+
+    def handle_data(self, data: str) -> None:
+        if self.skip_depth:
+            return
+        self.parts.append(data)
+        if self._element is not None:
+            self._element['text'].append(data)
+
+
+class OpeningAnalyzer:
+    """以編譯的關鍵字與日期比對式分析申請頁面"""
+
+    def __init__(
+        self,
+        languages: Optional[Iterable[str]] = None,
+        extra_keywords: Optional[Dict[str, List[str]]] = None,
+        context_chars: int = 60,
+        max_matches: int = 10
+    ):
+        """
+        初始化分析器（關鍵字只在此編譯一次）
+
+        Args:
+            languages: 啟用的語言（預設全部：en、zh、de、sv、fi、et）
+            extra_keywords: 額外關鍵字 {'open': [...], 'closed': [...]}
+            context_chars: 前後文擷取的字元數
+            max_matches: 每類比對最多回傳的筆數
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.context_chars = context_chars
+        self.max_matches = max_matches
+
+        languages = list(languages or KEYWORDS.keys())
+        self.lookup: Dict[str, Tuple[str, str]] = {}
+        for language in languages:
+            for category, keywords in KEYWORDS.get(language, {}).items():
+                for keyword in keywords:
+                    self.lookup.setdefault(keyword.lower(), (category, language))
+        for category, keywords in (extra_keywords or {}).items():
+            for keyword in keywords:
+                self.lookup.setdefault(keyword.lower(), (category, 'custom'))
+
+        # 所有關鍵字編譯為一個前綴樹比對式（比對小寫文字，字詞邊界包含在比對式內）
+        self.keyword_pattern = re.compile(KEYWORD_BOUNDARY + trie_pattern(self.lookup) + KEYWORD_BOUNDARY)
+
+    def _context(self, text: str, start: int, end: int) -> str:
+        snippet = text[max(0, start - self.context_chars):end + self.context_chars]
+        return ' '.join(snippet.split())
+
+    @staticmethod
+    def _lowered(text: str) -> Tuple[str, str]:
+        """回傳 (顯示用文字, 比對用小寫文字)，兩者位置對齊"""
+        lowered = text.lower()
+        return (text if len(lowered) == len(text) else lowered), lowered
+
+    def extract(self, html_content: str) -> _PageParser:
+        """解析 HTML（可見文字、按鈕、表單）"""
+        parser = _PageParser()
+        try:
+            parser.feed(html_content)
+            parser.close()
+        except Exception as e:
+            self.logger.debug(f"HTML 解析未完成: {e}")
+        return parser
+
+    def find_keywords(self, text: str) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        一次掃描文字中所有語言的關鍵字
+
+        Args:
+            text: 可見文字
+
+        Returns:
+            {'open': [...], 'closed': [...]}，每筆含 keyword、language、position、context
+        """
+        text, lowered = self._lowered(text)
+        matches: Dict[str, List[Dict[str, Any]]] = {'open': [], 'closed': []}
+        for match in self.keyword_pattern.finditer(lowered):
+            keyword, start, end = match.group(0), match.start(), match.end()
+            category, language = self.lookup[keyword]
+            matches.setdefault(category, []).append({
+                'keyword': keyword,
+                'language': language,
+                'position': start,
+                'context': self._context(text, start, end)
+            })
+        return matches
+
+    def find_dates(self, text: str) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        辨識日期與日期區間
+
+        Args:
+            text: 可見文字
+
+        Returns:
+            (日期清單, 區間清單)；日期含 text、date（ISO）、position，區間含 start、end、position、context
+        """
+        text, lowered = self._lowered(text)
+        dates = []
+        for pattern in (NUMERIC_DATE_PATTERN, MONTH_FIRST_DATE_PATTERN):
+            for match in pattern.finditer(lowered):
+                iso = _date_from_match(match)
+                if iso:
+                    dates.append({'text': text[match.start():match.end()], 'date': iso,
+                                  'position': match.start(), 'end': match.end()})
+        dates.sort(key=lambda d: d['position'])
+
+        ranges = []
+        for first, second in zip(dates, dates[1:]):
+            if RANGE_CONNECTOR.fullmatch(lowered[first['end']:second['position']]):
+                ranges.append({
+                    'start': first['date'], 'end': second['date'], 'position': first['position'],
+                    'context': self._context(text, first['position'], second['end'])
+                })
+
+        for match in DAY_RANGE_PATTERN.finditer(lowered):
+            month = MONTHS[match.group('m')]
+            start = _to_iso(match.group('y'), month, match.group('d1'))
+            end = _to_iso(match.group('y'), month, match.group('d2'))
+            if start and end:
+                ranges.append({
+                    'start': start, 'end': end, 'position': match.start(),
+                    'context': self._context(text, match.start(), match.end())
+                })
+                dates.append({'text': text[match.start():match.end()], 'date': start,
+                              'position': match.start(), 'end': match.end()})
+
+        for item in dates:
+            item.pop('end', None)
+        dates.sort(key=lambda d: d['position'])
+        return dates, sorted(ranges, key=lambda r: r['position'])
+
+    def analyze(self, html_content: str) -> Dict[str, Any]:
+        """
+        分析申請頁面
+
+        Args:
+            html_content: HTML 內容（瀏覽器渲染後或原始 HTML）
+
+        Returns:
+            分析結果：status、reason、關鍵字比對、申請按鈕 / 連結、表單、日期與日期區間
+        """
+        parser = self.extract(html_content)
+        text = re.sub(r'[ \t\r\f\v\xa0]+', ' ', ''.join(parser.parts))
+        keywords = self.find_keywords(text)
+        dates, ranges = self.find_dates(text)
+
+        has_apply_button = parser.apply_attr or bool(parser.apply_elements)
+        open_matches, closed_matches = keywords.get('open', []), keywords.get('closed', [])
+
+        if open_matches:
+            status, reason = 'open', f"開放關鍵字「{open_matches[0]['keyword']}」({open_matches[0]['language']})"
+        elif has_apply_button:
+            element = parser.apply_elements[0] if parser.apply_elements else {'text': 'class/id 含 apply'}
+            status, reason = 'open', f"申請按鈕「{element['text']}」"
+        elif closed_matches:
+            status, reason = 'closed', f"關閉關鍵字「{closed_matches[0]['keyword']}」({closed_matches[0]['language']})"
+        else:
+            status, reason = 'unknown', '沒有符合的關鍵字或申請按鈕'
+
+        return {
+            'status': status,
+            'reason': reason,
+            'open_matches': open_matches[:self.max_matches],
+            'closed_matches': closed_matches[:self.max_matches],
+            'has_apply_button': has_apply_button,
+            'has_form': parser.has_form,
+            'apply_links': list(dict.fromkeys(e['href'] for e in parser.apply_elements if e.get('href'))),
+            'detected_dates': list(dict.fromkeys(d['date'] for d in dates)),
+            'dates': dates[:self.max_matches],
+            'date_ranges': ranges[:self.max_matches],
+            'text_length': len(text)
+        }
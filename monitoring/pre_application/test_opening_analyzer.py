@@ -0,0 +1,68 @@
+"""
+申請頁面分析器測試
+Opening Analyzer Keyword Matching Test
+
+驗證關鍵字比對的字詞邊界：邊界不符的比對不會吃掉重疊的關鍵字，
+部分字詞（如 reapply 中的 apply）不會被誤判。
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from monitoring.pre_application.opening_analyzer import OpeningAnalyzer
+
+
+def _keywords(text: str):
+    found = OpeningAnalyzer().find_keywords(text)
+    return [m['keyword'] for m in found['open']], [m['keyword'] for m in found['closed']]
+
+
+def test_overlapping_keyword_after_rejected_match():
+    """「application open」後接 s 不符邊界，仍比對到重疊的「opens on」"""
+    open_keywords, closed_keywords = _keywords("Application opens on 1 March 2026")
+    assert open_keywords == []
+    assert closed_keywords == ['opens on']
+
+    result = OpeningAnalyzer().analyze("<p>Application opens on 1 March 2026</p>")
+    assert result['status'] == 'closed'
+    assert result['detected_dates'] == ['2026-03-01']
+
+
+def test_partial_word_not_matched():
+    """關鍵字前後接拉丁字母時不算比對"""
+    open_keywords, _ = _keywords("Please reapply nowhere else")
+    assert open_keywords == []
+
+    open_keywords, _ = _keywords("Apply now!")
+    assert open_keywords == ['apply now']
+
+
+def test_chinese_keywords_without_boundary():
+    """中文關鍵字不需要字詞邊界"""
+    open_keywords, closed_keywords = _keywords("本學程現已開放申請，請點選線上申請")
+    assert open_keywords == ['開放申請', '線上申請']
+    assert closed_keywords == []
+
+
+def main():
+    """直接執行時依序跑所有測試"""
+    tests = [
+        test_overlapping_keyword_after_rejected_match,
+        test_partial_word_not_matched,
+        test_chinese_keywords_without_boundary,
+    ]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+"""
+網路回應擷取
+Network Response Capture
+
+功能：
+- 監控器以 CaptureRule 宣告要擷取的 API 回應（URL 比對式）與 JSON 路徑欄位
+- 回應抵達時立即解析，只保留需要的欄位；原始 JSON 不留在記憶體
+- 每條規則的回應數、紀錄數與回應大小皆有上限
+"""
+
+import re
+import json
+import asyncio
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Deque, Set
+
+
+@dataclass
+class CaptureRule:
+    """
+    回應擷取規則
+
+    JSON 路徑以 . 分隔鍵，[*] 展開陣列，[0] 取索引，| 列出依序嘗試的替代路徑，
+    例如 'data.applications[*]|applications[*]|[*]'、'programme.name|programName'。
+    """
+    name: str                                   # 規則名稱
+    url_pattern: str                            # 回應 URL 的正規表示式
+    records_path: str = '[*]'                   # 紀錄清單的路徑
+    fields: Dict[str, str] = field(default_factory=dict)   # 輸出欄位 -> 紀錄內的路徑
+    required: List[str] = field(default_factory=list)      # 至少需要其中一個欄位才保留紀錄
+    max_responses: int = 5                      # 保留最近幾次回應的紀錄
+    max_records: int = 200                      # 每次回應最多保留的紀錄數
+
+
+def _parse_path(path: str) -> List[Any]:
+    """'a.b[*].c[0]' -> ['a', 'b', '*', 'c', 0]"""
+    steps: List[Any] = []
+    for part in re.findall(r'[^.\[\]]+|\[\*\]|\[\d+\]', path):
+        if part == '[*]':
+            steps.append('*')
+        elif part.startswith('['):
+            steps.append(int(part[1:-1]))
+        else:
+            steps.append(part)
+    return steps
+
+
+def json_path(data: Any, path: str) -> List[Any]:
+    """
+    依路徑取值（依序嘗試 | 分隔的替代路徑，回傳第一個有結果的路徑）
+
+    Args:
+        data: JSON 資料
+        path: 路徑
+
+    Returns:
+        符合的值清單（[*] 會展開成多個值）
+    """
+    for alternative in path.split('|'):
+        values = [data]
+        for step in _parse_path(alternative.strip()):
+            next_values = []
+            for value in values:
+                if step == '*' and isinstance(value, list):
+                    next_values.extend(value)
+                elif isinstance(step, int) and isinstance(value, list) and -len(value) <= step < len(value):
+                    next_values.append(value[step])
+                elif isinstance(step, str) and step != '*' and isinstance(value, dict) and step in value:
+                    next_values.append(value[step])
+            values = next_values
+            if not values:
+                break
+        values = [v for v in values if v is not None and v != '']
+        if values:
+            return values
+    return []
+
+
+class ResponseCapture:
+    """依規則擷取頁面的 JSON 回應"""
+
+    def __init__(self, rules: List[CaptureRule], max_bytes: int = 2 * 1024 * 1024):
+        """
+        初始化擷取器
+
+        Args:
+            rules: 擷取規則
+            max_bytes: 單一回應的大小上限（超過時略過）
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.rules = list(rules)
+        self.patterns = [(rule, re.compile(rule.url_pattern, re.IGNORECASE)) for rule in self.rules]
+        self.max_bytes = max_bytes
+        self.captured: Dict[str, Deque[List[Dict[str, Any]]]] = {
+            rule.name: deque(maxlen=rule.max_responses) for rule in self.rules
+        }
+        self.stats = {'matched': 0, 'parsed': 0, 'skipped': 0, 'records': 0}
+        self._pending: Set[asyncio.Task] = set()
+
+    def attach(self, page) -> None:
+        """在頁面上註冊回應處理（沒有規則時不註冊）"""
+        if self.rules:
+            page.on('response', self._on_response)
+
+    def _on_response(self, response) -> None:
+        """回應事件：只為符合規則的回應建立解析工作"""
+        rules = [rule for rule, pattern in self.patterns if pattern.search(response.url)]
+        if not rules:
+            return
+        self.stats['matched'] += 1
+        task = asyncio.ensure_future(self._handle(response, rules))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _handle(self, response, rules: List[CaptureRule]) -> None:
+        try:
+            if response.status != 200:
+                self.stats['skipped'] += 1
+                return
+            headers = response.headers
+            if 'json' not in headers.get('content-type', ''):
+                self.stats['skipped'] += 1
+                return
+            if int(headers.get('content-length') or 0) > self.max_bytes:
+                self.logger.debug(f"回應過大，略過: {response.url}")
+                self.stats['skipped'] += 1
+                return
+
+            body = await response.body()
+            if len(body) > self.max_bytes:
+                self.stats['skipped'] += 1
+                return
+            data = json.loads(body)
+        except Exception as e:
+            self.logger.debug(f"解析回應失敗 ({response.url}): {e}")
+            self.stats['skipped'] += 1
+            return
+
+        self.stats['parsed'] += 1
+        for rule in rules:
+            records = self.extract(rule, data)
+            if records:
+                self.captured[rule.name].append(records)
+                self.stats['records'] += len(records)
+                self.logger.info(f"[{rule.name}] 擷取 {len(records)} 筆紀錄: {response.url}")
+
+    @staticmethod
+    def extract(rule: CaptureRule, data: Any) -> List[Dict[str, Any]]:
+        """
+        依規則從 JSON 取出紀錄（只保留宣告的欄位）
+
+        Args:
+            rule: 擷取規則
+            data: JSON 資料
+
+        Returns:
+            紀錄清單
+        """
+        records = []
+        for item in json_path(data, rule.records_path)[:rule.max_records]:
+            if not isinstance(item, dict):
+                continue
+            record = {}
+            for name, path in rule.fields.items():
+                values = json_path(item, path)
+                if values:
+                    record[name] = values[0] if len(values) == 1 else values
+            if record and (not rule.required or any(name in record for name in rule.required)):
+                records.append(record)
+        return records
+
+    async def wait_idle(self, timeout: float = 5.0) -> None:
+        """等待進行中的解析工作完成"""
+        if self._pending:
+            await asyncio.wait(list(self._pending), timeout=timeout)
+
+    async def records(self, rule_name: str, timeout: float = 5.0) -> List[Dict[str, Any]]:
+        """
+        取得規則最近一次擷取到的紀錄
+
+        Args:
+            rule_name: 規則名稱
+            timeout: 等待進行中解析的秒數
+
+        Returns:
+            紀錄清單；尚未擷取到時為空清單
+        """
+        await self.wait_idle(timeout)
+        captured = self.captured.get(rule_name)
+        return list(captured[-1]) if captured else []
+
+    def clear(self) -> None:
+        """清除已擷取的紀錄"""
+        for captured in self.captured.values():
+            captured.clear()
@@ -0,0 +1,213 @@
+"""
+統一監控執行器
+Unified Monitor Runner
+
+功能：
+- 在同一個 event loop 中並行執行多個 BaseMonitor 子類別
+- 所有監控器共用一個 Chromium 程序，各自使用隔離的 context
+- 每個監控器有獨立的逾時；同時執行的監控器數量有上限
+"""
+
+import asyncio
+import sys
+import time
+import logging
+import argparse
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+from playwright.async_api import async_playwright
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from monitoring.base_monitor import BaseMonitor
+from monitoring.pre_application.check_opening_status import ApplicationOpeningMonitor
+from monitoring.post_application.check_status_sweden import SwedenApplicationMonitor
+from monitoring.post_application.check_status_dreamapply import DreamApplyMonitor
+from monitoring.post_application.check_status_saarland import SaarlandMonitor
+from monitoring.visa_monitor import VisaMonitor
+from notifications.event_bus import get_event_bus
+
+
+# 可執行的監控器（名稱 -> 類別）
+MONITORS = {
+    'pre_application': ApplicationOpeningMonitor,
+    'sweden': SwedenApplicationMonitor,
+    'dreamapply': DreamApplyMonitor,
+    'saarland': SaarlandMonitor,
+    'visa': VisaMonitor,
+}
+
+# 各監控器的預設逾時（秒）；可由監控器 config 的 timeout 覆寫
+DEFAULT_TIMEOUTS = {
+    'pre_application': 900,
+    'sweden': 300,
+    'dreamapply': 300,
+    'saarland': 300,
+    'visa': 600,
+}
+
+
+class MonitorRunner:
+    """在單一 event loop 與單一瀏覽器中並行執行監控器"""
+
+    def __init__(
+        self,
+        monitors: Dict[str, BaseMonitor],
+        max_concurrency: int = 3,
+        default_timeout: float = 600,
+        headless: bool = True
+    ):
+        """
+        初始化執行器
+
+        Args:
+            monitors: 名稱 -> 監控器實例
+            max_concurrency: 同時執行的監控器上限
+            default_timeout: 沒有設定逾時的監控器使用的逾時秒數
+            headless: 是否以 headless 模式啟動瀏覽器
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.monitors = monitors
+        self.max_concurrency = max(1, max_concurrency)
+        self.default_timeout = default_timeout
+        self.headless = headless
+        self.results: Dict[str, Dict[str, Any]] = {}
+
+    def timeout_for(self, name: str, monitor: BaseMonitor) -> float:
+        """監控器的逾時秒數（config 的 timeout 優先）"""
+        return float(monitor.config.get('timeout') or DEFAULT_TIMEOUTS.get(name, self.default_timeout))
+
+    async def _run_one(self, name: str, monitor: BaseMonitor, semaphore: asyncio.Semaphore) -> None:
+        """在名額內執行單一監控器並記錄結果"""
+        async with semaphore:
+            timeout = self.timeout_for(name, monitor)
+            started = time.perf_counter()
+            result: Dict[str, Any] = {'success': False}
+
+            try:
+                result['success'] = bool(await asyncio.wait_for(monitor.run_async(), timeout=timeout))
+            except asyncio.TimeoutError:
+                result['error'] = f'timeout after {timeout:.0f}s'
+                self.logger.error(f"[{name}] 執行逾時（{timeout:.0f} 秒），已中止")
+            except Exception as e:
+                result['error'] = str(e)
+                self.logger.error(f"[{name}] 執行失敗: {e}")
+            finally:
+                # 逾時或失敗時監控器可能未關閉自己的 context
+                await monitor.close_browser()
+
+            result['duration'] = round(time.perf_counter() - started, 1)
+            self.results[name] = result
+            self.logger.info(f"[{name}] {'成功' if result['success'] else '失敗'}，耗時 {result['duration']} 秒")
+
+    async def run_async(self) -> Dict[str, Dict[str, Any]]:
+        """
+        執行所有監控器
+
+        Returns:
+            名稱 -> {'success', 'duration', 'error'}
+        """
+        if not self.monitors:
+            self.logger.warning("沒有要執行的監控器")
+            return self.results
+
+        self.logger.info(f"=== 開始執行 {len(self.monitors)} 個監控器（同時上限 {self.max_concurrency}）===")
+        started = time.perf_counter()
+
+        # 通知在背景批次寄送，監控器不需等待 SMTP / GitHub
+        event_bus = get_event_bus()
+        await event_bus.start()
+
+        playwright = await async_playwright().start()
+        browser = await playwright.chromium.launch(headless=self.headless)
+
+        try:
+            for monitor in self.monitors.values():
+                monitor.shared_browser = browser
+
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            await asyncio.gather(*(
+                self._run_one(name, monitor, semaphore) for name, monitor in self.monitors.items()
+            ))
+        finally:
+            for monitor in self.monitors.values():
+                monitor.shared_browser = None
+            try:
+                await browser.close()
+            except Exception:
+                pass
+            await playwright.stop()
+            await event_bus.stop()
+
+        passed = sum(1 for result in self.results.values() if result['success'])
+        self.logger.info(
+            f"=== 監控完成：{passed}/{len(self.results)} 成功，總耗時 {time.perf_counter() - started:.1f} 秒 ==="
+        )
+        return self.results
+
+    def run(self) -> Dict[str, Dict[str, Any]]:
+        """同步包裝"""
+        return asyncio.run(self.run_async())
+
+
+def build_monitors(
+    names: Optional[List[str]] = None,
+    timeouts: Optional[Dict[str, float]] = None,
+    ignore_schedule: bool = False
+) -> Dict[str, BaseMonitor]:
+    """
+    依名稱建立監控器實例
+
+    Args:
+        names: 監控器名稱（預設全部）
+        timeouts: 名稱 -> 逾時秒數
+        ignore_schedule: 忽略輪詢排程，檢查所有目標
+
+    Returns:
+        名稱 -> 監控器實例
+    """
+    timeouts = timeouts or {}
+    monitors = {}
+    for name in names or list(MONITORS.keys()):
+        if name not in MONITORS:
+            raise ValueError(f"未知的監控器: {name}（可用: {', '.join(MONITORS)}）")
+        config = {'timeout': timeouts[name]} if name in timeouts else {}
+        if ignore_schedule:
+            config['ignore_schedule'] = True
+        monitors[name] = MONITORS[name](config or None)
+    return monitors
+
+
+def main():
+    """主函式"""
+    parser = argparse.ArgumentParser(description='在單一瀏覽器中並行執行監控器')
+    parser.add_argument('monitors', nargs='*', help=f"要執行的監控器（預設全部）: {', '.join(MONITORS)}")
+    parser.add_argument('--max-concurrency', type=int, default=3, help='同時執行的監控器上限')
+    parser.add_argument('--timeout', type=float, default=None, help='所有監控器使用相同的逾時秒數')
+    parser.add_argument('--headed', action='store_true', help='顯示瀏覽器視窗（本地除錯用）')
+    parser.add_argument('--ignore-schedule', action='store_true', help='忽略輪詢排程，檢查所有目標')
+    args = parser.parse_args()
+
+    names = args.monitors or list(MONITORS.keys())
+    timeouts = {name: args.timeout for name in names} if args.timeout else None
+
+    try:
+        monitors = build_monitors(names, timeouts, ignore_schedule=args.ignore_schedule)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(2)
+
+    runner = MonitorRunner(monitors, max_concurrency=args.max_concurrency, headless=not args.headed)
+    results = runner.run()
+
+    print("\n" + "=" * 60)
+    for name, result in results.items():
+        status = "✅ 成功" if result['success'] else f"❌ 失敗 {result.get('error', '')}"
+        print(f"{name:20} {status}  ({result['duration']} 秒)")
+
+    if not all(result['success'] for result in results.values()):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,288 @@
+"""
+自適應輪詢排程
+Adaptive Per-Target Polling Scheduler
+
+功能：
+- 為每個監控目標（學校、國家、平台）記錄下次應檢查的時間
+- 截止日期或預期開放日期接近時縮短間隔；數週未變更的目標放寬間隔；錯誤時指數退避
+- 可作為常駐迴圈執行，或單次執行「只檢查到期的目標」
+
+使用方式：
+    python monitoring/scheduler.py --once         # 執行到期的目標後結束
+    python monitoring/scheduler.py --loop         # 常駐，依最近的到期時間休眠
+    python monitoring/scheduler.py --status       # 列出各目標的下次檢查時間
+"""
+
+import re
+import sys
+import json
+import time
+import logging
+import argparse
+from pathlib import Path
+from datetime import datetime, date, timedelta
+from typing import Dict, List, Any, Iterable, Optional
+
+try:
+    from dateutil import parser as date_parser
+except ImportError:
+    date_parser = None
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+
+DEFAULT_SCHEDULE_FILE = Path('reports/status_history/poll_schedule.json')
+
+DATE_FORMATS = ['%Y-%m-%d', '%B %d, %Y', '%b %d, %Y', '%d %B %Y', '%d %b %Y', '%d.%m.%Y', '%d/%m/%Y']
+
+
+def parse_date(value: Any) -> Optional[date]:
+    """
+    解析日期（date、datetime 或常見的文字格式）
+
+    Args:
+        value: 日期值
+
+    Returns:
+        日期；無法解析時回傳 None
+    """
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if not value or not isinstance(value, str):
+        return None
+
+    text = re.sub(r'\s+', ' ', value.strip())
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+
+    if date_parser is not None:
+        try:
+            return date_parser.parse(text, fuzzy=True, default=datetime(datetime.now().year, 1, 1)).date()
+        except (ValueError, OverflowError):
+            return None
+    return None
+
+
+class PollScheduler:
+    """依目標重要性調整輪詢間隔的排程器"""
+
+    def __init__(
+        self,
+        schedule_file: Optional[Path] = None,
+        base_interval_hours: float = 24,
+        min_interval_hours: float = 2,
+        max_interval_hours: float = 24 * 7,
+        due_grace: float = 0.15
+    ):
+        """
+        初始化排程器
+
+        Args:
+            schedule_file: 排程狀態檔案
+            base_interval_hours: 一般目標的輪詢間隔
+            min_interval_hours: 最短間隔（截止日前夕）
+            max_interval_hours: 最長間隔（長期未變更或持續錯誤）
+            due_grace: 提前視為到期的寬限（間隔的比例），吸收排程啟動時間的抖動
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.schedule_file = Path(schedule_file or DEFAULT_SCHEDULE_FILE)
+        self.base_interval = base_interval_hours
+        self.min_interval = min_interval_hours
+        self.max_interval = max_interval_hours
+        self.due_grace = due_grace
+        self.targets: Dict[str, Dict[str, Any]] = self._load()
+        self.touched = set()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if not self.schedule_file.exists():
+            return {}
+        try:
+            with open(self.schedule_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            self.logger.warning(f"讀取排程狀態失敗，全部目標視為到期: {e}")
+            return {}
+
+    def save(self) -> None:
+        """儲存排程狀態（只覆寫本次更新過的目標，其他監控器可同時寫入）"""
+        try:
+            merged = self._load()
+            for key in self.touched:
+                merged[key] = self.targets[key]
+            self.schedule_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.schedule_file, 'w', encoding='utf-8') as f:
+                json.dump(merged, f, ensure_ascii=False, indent=2, sort_keys=True)
+            self.targets = merged
+            self.touched.clear()
+        except Exception as e:
+            self.logger.error(f"儲存排程狀態失敗: {e}")
+
+    @staticmethod
+    def key(monitor: str, identifier: str) -> str:
+        return f"{monitor}:{identifier}"
+
+    def due_at(self, entry: Dict[str, Any]) -> datetime:
+        """
+        目標實際視為到期的時間（next_due 減去寬限）
+
+        next_due 由上次檢查的完成時間起算；每日 cron 的啟動時間稍有抖動，
+        若要求嚴格超過 next_due，隔天的執行常會差幾分鐘而跳過，間隔就變成 48 小時。
+        """
+        next_due = datetime.fromisoformat(entry['next_due'])
+        interval = entry.get('interval_hours') or self.base_interval
+        return next_due - timedelta(hours=interval * self.due_grace)
+
+    def is_due(self, monitor: str, identifier: str, now: Optional[datetime] = None) -> bool:
+        """目標是否到期（沒有紀錄的目標一律到期；在寬限內即將到期的也算）"""
+        entry = self.targets.get(self.key(monitor, identifier))
+        if not entry or not entry.get('next_due'):
+            return True
+        return self.due_at(entry) <= (now or datetime.now())
+
+    def interval_for(
+        self,
+        entry: Dict[str, Any],
+        dates: Iterable[Any] = (),
+        now: Optional[datetime] = None
+    ) -> float:
+        """
+        計算下次輪詢的間隔（小時）
+
+        - 最近的截止 / 開放日期在 2 天內：最短間隔；7 天內：基準的 1/4；30 天內：基準的 1/2
+        - 超過 14 天未變更：基準 ×2；超過 28 天：×4（但不超過日期帶來的上限）
+        - 連續錯誤：每次 ×2
+
+        Args:
+            entry: 目標的排程紀錄
+            dates: 與目標相關的日期（截止日、預期開放日）
+            now: 目前時間
+
+        Returns:
+            間隔小時數
+        """
+        now = now or datetime.now()
+        interval = self.base_interval
+
+        last_changed = entry.get('last_changed')
+        if last_changed:
+            idle_days = (now - datetime.fromisoformat(last_changed)).days
+            if idle_days > 28:
+                interval *= 4
+            elif idle_days > 14:
+                interval *= 2
+
+        upcoming = [d for d in (parse_date(value) for value in dates) if d and d >= now.date()]
+        if upcoming:
+            days_left = (min(upcoming) - now.date()).days
+            if days_left <= 2:
+                interval = min(interval, self.min_interval)
+            elif days_left <= 7:
+                interval = min(interval, self.base_interval / 4)
+            elif days_left <= 30:
+                interval = min(interval, self.base_interval / 2)
+
+        errors = entry.get('errors', 0)
+        if errors:
+            interval *= 2 ** min(errors, 6)
+
+        return max(self.min_interval, min(self.max_interval, interval))
+
+    def record(
+        self,
+        monitor: str,
+        identifier: str,
+        changed: bool = False,
+        error: bool = False,
+        dates: Iterable[Any] = (),
+        now: Optional[datetime] = None
+    ) -> datetime:
+        """
+        記錄一次輪詢結果並排定下次檢查時間
+
+        Args:
+            monitor: 監控器名稱
+            identifier: 目標識別符
+            changed: 狀態是否變更
+            error: 是否發生錯誤
+            dates: 與目標相關的日期（截止日、預期開放日）
+            now: 目前時間
+
+        Returns:
+            下次檢查時間
+        """
+        now = now or datetime.now()
+        key = self.key(monitor, identifier)
+        entry = self.targets.setdefault(key, {})
+
+        entry['last_checked'] = now.isoformat()
+        entry.setdefault('last_changed', now.isoformat())
+        if changed:
+            entry['last_changed'] = now.isoformat()
+        entry['errors'] = entry.get('errors', 0) + 1 if error else 0
+
+        interval = self.interval_for(entry, dates, now)
+        next_due = now + timedelta(hours=interval)
+        entry['interval_hours'] = round(interval, 2)
+        entry['next_due'] = next_due.isoformat()
+        self.touched.add(key)
+
+        self.logger.debug(f"[{identifier}] 下次檢查 {next_due:%Y-%m-%d %H:%M}（間隔 {interval:.1f} 小時）")
+        return next_due
+
+    def next_due_time(self) -> Optional[datetime]:
+        """所有目標中最早的下次檢查時間"""
+        times = [datetime.fromisoformat(e['next_due']) for e in self._load().values() if e.get('next_due')]
+        return min(times) if times else None
+
+
+def run_due(names: Optional[List[str]] = None, max_concurrency: int = 3) -> Dict[str, Dict[str, Any]]:
+    """單次執行：各監控器只檢查到期的目標"""
+    from monitoring.runner import MonitorRunner, build_monitors
+
+    return MonitorRunner(build_monitors(names), max_concurrency=max_concurrency).run()
+
+
+def main():
+    """主函式"""
+    parser = argparse.ArgumentParser(description='自適應輪詢排程')
+    parser.add_argument('monitors', nargs='*', help='要執行的監控器（預設全部，名稱同 monitoring/runner.py）')
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--once', action='store_true', help='執行到期的目標後結束（預設）')
+    mode.add_argument('--loop', action='store_true', help='常駐執行')
+    mode.add_argument('--status', action='store_true', help='列出各目標的排程')
+    parser.add_argument('--max-concurrency', type=int, default=3, help='同時執行的監控器上限')
+    parser.add_argument('--min-sleep', type=float, default=300, help='常駐模式最短休眠秒數')
+    parser.add_argument('--max-sleep', type=float, default=3600, help='常駐模式最長休眠秒數')
+    args = parser.parse_args()
+
+    if args.status:
+        scheduler = PollScheduler()
+        now = datetime.now()
+        for key, entry in sorted(scheduler.targets.items(), key=lambda item: item[1].get('next_due', '')):
+            flag = "🔔" if scheduler.due_at(entry) <= now else "  "
+            print(f"{flag} {entry['next_due'][:16]}  每 {entry.get('interval_hours', '?'):>6} 小時  "
+                  f"錯誤 {entry.get('errors', 0)}  {key}")
+        return
+
+    if not args.loop:
+        run_due(args.monitors or None, args.max_concurrency)
+        return
+
+    logger = logging.getLogger('PollScheduler')
+    while True:
+        run_due(args.monitors or None, args.max_concurrency)
+
+        next_due = PollScheduler().next_due_time()
+        wait = (next_due - datetime.now()).total_seconds() if next_due else args.max_sleep
+        wait = max(args.min_sleep, min(args.max_sleep, wait))
+        logger.info(f"下次執行於 {wait / 60:.0f} 分鐘後")
+        time.sleep(wait)
+
+
+if __name__ == '__main__':
+    main()
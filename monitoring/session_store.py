@@ -0,0 +1,153 @@
+"""
+加密的登入狀態儲存
+Encrypted Session Storage
+
+功能：
+- 以 Fernet 加密儲存各入口網站的 Playwright storage state（cookies / localStorage）
+- 金鑰由環境變數 MONITOR_SESSION_KEY 提供（Fernet 金鑰或任意密語）
+- 未設定金鑰或未安裝 cryptography 時停用，不會以明文寫入磁碟
+"""
+
+import os
+import json
+import base64
+import hashlib
+import logging
+from pathlib import Path
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional
+
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+except ImportError:
+    Fernet = None
+    InvalidToken = Exception
+
+
+DEFAULT_SESSION_DIR = Path('.sessions')
+SESSION_KEY_ENV = 'MONITOR_SESSION_KEY'
+
+
+def build_fernet(secret: str):
+    """
+    由金鑰字串建立 Fernet；不是合法 Fernet 金鑰時以 SHA-256 由密語衍生
+
+    Args:
+        secret: Fernet 金鑰或密語
+
+    Returns:
+        Fernet 物件
+    """
+    try:
+        return Fernet(secret.encode('utf-8'))
+    except (ValueError, TypeError):
+        key = base64.urlsafe_b64encode(hashlib.sha256(secret.encode('utf-8')).digest())
+        return Fernet(key)
+
+
+class SessionStore:
+    """各入口網站的加密登入狀態"""
+
+    def __init__(
+        self,
+        session_dir: Optional[Path] = None,
+        secret: Optional[str] = None,
+        max_age_hours: float = 24
+    ):
+        """
+        初始化儲存
+
+        Args:
+            session_dir: 儲存目錄（預設 .sessions，不納入版本控制）
+            secret: 加密金鑰（預設讀取 MONITOR_SESSION_KEY）
+            max_age_hours: 登入狀態最長保留時數，超過即視為過期
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.session_dir = Path(session_dir or DEFAULT_SESSION_DIR)
+        self.max_age = timedelta(hours=max_age_hours)
+
+        secret = secret or os.getenv(SESSION_KEY_ENV)
+        self.fernet = None
+        if Fernet is None:
+            self.logger.info("未安裝 cryptography，停用登入狀態重用")
+        elif not secret:
+            self.logger.info(f"未設定 {SESSION_KEY_ENV}，停用登入狀態重用")
+        else:
+            self.fernet = build_fernet(secret)
+
+    @property
+    def enabled(self) -> bool:
+        """是否可加密儲存"""
+        return self.fernet is not None
+
+    def _path(self, portal: str) -> Path:
+        return self.session_dir / f"{portal.replace('/', '_')}.session"
+
+    def load(self, portal: str) -> Optional[Dict[str, Any]]:
+        """
+        讀取登入狀態
+
+        Args:
+            portal: 入口網站名稱
+
+        Returns:
+            Playwright storage state；不存在、過期或無法解密時回傳 None
+        """
+        path = self._path(portal)
+        if not self.enabled or not path.exists():
+            return None
+
+        try:
+            payload = json.loads(self.fernet.decrypt(path.read_bytes()).decode('utf-8'))
+        except InvalidToken:
+            self.logger.warning(f"[{portal}] 登入狀態無法解密（金鑰已變更？），改為重新登入")
+            self.clear(portal)
+            return None
+        except Exception as e:
+            self.logger.warning(f"[{portal}] 讀取登入狀態失敗: {e}")
+            return None
+
+        saved_at = datetime.fromisoformat(payload.get('saved_at', '1970-01-01T00:00:00'))
+        if datetime.now() - saved_at > self.max_age:
+            self.logger.info(f"[{portal}] 登入狀態已超過 {self.max_age}，重新登入")
+            self.clear(portal)
+            return None
+
+        return payload.get('state')
+
+    def save(self, portal: str, state: Dict[str, Any]) -> bool:
+        """
+        加密儲存登入狀態
+
+        Args:
+            portal: 入口網站名稱
+            state: Playwright storage state
+
+        Returns:
+            是否成功
+        """
+        if not self.enabled:
+            return False
+
+        try:
+            self.session_dir.mkdir(parents=True, exist_ok=True)
+            payload = json.dumps({'saved_at': datetime.now().isoformat(), 'state': state}).encode('utf-8')
+            path = self._path(portal)
+            tmp_path = path.with_suffix('.tmp')
+            tmp_path.write_bytes(self.fernet.encrypt(payload))
+            os.chmod(tmp_path, 0o600)
+            os.replace(tmp_path, path)
+            self.logger.info(f"[{portal}] 已加密儲存登入狀態")
+            return True
+        except Exception as e:
+            self.logger.warning(f"[{portal}] 儲存登入狀態失敗: {e}")
+            return False
+
+    def clear(self, portal: str) -> None:
+        """刪除登入狀態"""
+        try:
+            self._path(portal).unlink()
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            self.logger.debug(f"[{portal}] 刪除登入狀態失敗: {e}")
@@ -0,0 +1,324 @@
+"""
+狀態歷史儲存（SQLite，只追加）
+Append-Only Status History Store
+
+功能：
+- 每個 (監控器, 識別符) 只保留一列最新狀態；狀態有變更時才寫入欄位層級的差異
+- 儲存空間隨「變更次數」成長，而不是隨輪詢次數成長
+- 以索引查詢「某欄位何時變成某值」（例如 TalTech 的申請何時開放）與「最近 N 次變更」
+- 可由差異重建任一時間點的狀態
+"""
+
+import json
+import sys
+import sqlite3
+import logging
+import argparse
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS status_latest (
+    monitor TEXT NOT NULL,
+    identifier TEXT NOT NULL,
+    state TEXT NOT NULL,
+    first_seen TEXT NOT NULL,
+    last_checked TEXT NOT NULL,
+    last_changed TEXT NOT NULL,
+    checks INTEGER NOT NULL DEFAULT 1,
+    changes INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (monitor, identifier)
+);
+
+CREATE TABLE IF NOT EXISTS status_changes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    monitor TEXT NOT NULL,
+    identifier TEXT NOT NULL,
+    field TEXT NOT NULL,
+    old_value TEXT,
+    new_value TEXT,
+    changed_at TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_changes_target ON status_changes(monitor, identifier, changed_at);
+CREATE INDEX IF NOT EXISTS idx_changes_field ON status_changes(field, new_value, changed_at);
+"""
+
+# 每次輪詢都會改變、不代表狀態變更的欄位（fetched_via 為抓取方式：http / browser；
+# evidence 為判斷依據的比對位置與前後文）
+VOLATILE_FIELDS = {'last_updated', 'last_checked', 'checked_at', 'timestamp', 'fetched_via', 'evidence'}
+
+
+def _encode(value: Any) -> str:
+    """欄位值以 JSON 儲存（None 存為 'null'；SQL NULL 表示欄位不存在）"""
+    return json.dumps(value, ensure_ascii=False, sort_keys=True, default=str)
+
+
+def stable_state(status: Dict[str, Any]) -> Dict[str, Any]:
+    """移除每次輪詢都會改變的欄位"""
+    return {k: v for k, v in status.items() if k not in VOLATILE_FIELDS}
+
+
+def diff_states(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Tuple[Any, Any]]:
+    """
+    比較兩個狀態的頂層欄位
+
+    Returns:
+        欄位 -> (舊值, 新值)；新增的欄位舊值為 None，移除的欄位新值為 None
+    """
+    changes = {}
+    for field in old.keys() | new.keys():
+        old_value, new_value = old.get(field), new.get(field)
+        if field not in old or field not in new or _encode(old_value) != _encode(new_value):
+            changes[field] = (old_value, new_value)
+    return changes
+
+
+class StatusStore:
+    """監控狀態歷史"""
+
+    def __init__(self, db_file: Optional[Path] = None):
+        """
+        初始化儲存
+
+        Args:
+            db_file: 資料庫檔案（預設 reports/status_history/status_history.db）
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.db_file = Path(db_file or 'reports/status_history/status_history.db')
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+
+        # 資料庫檔案會被 workflow 提交，使用預設日誌模式避免留下 -wal / -shm 檔案
+        self.conn = sqlite3.connect(str(self.db_file), timeout=30)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        """關閉資料庫連線"""
+        self.conn.close()
+
+    def latest(self, monitor: str, identifier: str) -> Optional[Dict[str, Any]]:
+        """最新狀態（不含輪詢時間欄位）；沒有紀錄時回傳 None"""
+        row = self.conn.execute(
+            'SELECT state FROM status_latest WHERE monitor = ? AND identifier = ?',
+            (monitor, identifier)
+        ).fetchone()
+        return json.loads(row['state']) if row else None
+
+    def record(
+        self,
+        monitor: str,
+        identifier: str,
+        status: Dict[str, Any],
+        now: Optional[str] = None
+    ) -> Dict[str, Tuple[Any, Any]]:
+        """
+        記錄一次輪詢結果；只有狀態變更時才寫入差異
+
+        Args:
+            monitor: 監控器名稱
+            identifier: 識別符（學校或平台名稱）
+            status: 本次狀態
+            now: 記錄時間（ISO 格式，預設現在）
+
+        Returns:
+            變更的欄位 -> (舊值, 新值)；首次記錄時所有欄位的舊值為 None
+        """
+        now = now or datetime.now().isoformat()
+        state = stable_state(status)
+        old_state = self.latest(monitor, identifier)
+        changes = diff_states(old_state or {}, state)
+
+        with self.conn:
+            if changes:
+                self.conn.executemany(
+                    """INSERT INTO status_changes (monitor, identifier, field, old_value, new_value, changed_at)
+                    VALUES (?, ?, ?, ?, ?, ?)""",
+                    [
+                        (
+                            monitor, identifier, field,
+                            _encode(old) if old_state is not None and field in old_state else None,
+                            _encode(new) if field in state else None,
+                            now
+                        )
+                        for field, (old, new) in sorted(changes.items())
+                    ]
+                )
+
+            if old_state is None:
+                self.conn.execute(
+                    """INSERT INTO status_latest
+                    (monitor, identifier, state, first_seen, last_checked, last_changed, checks, changes)
+                    VALUES (?, ?, ?, ?, ?, ?, 1, 1)""",
+                    (monitor, identifier, _encode(state), now, now, now)
+                )
+            elif changes:
+                self.conn.execute(
+                    """UPDATE status_latest SET state = ?, last_checked = ?, last_changed = ?,
+                    checks = checks + 1, changes = changes + 1 WHERE monitor = ? AND identifier = ?""",
+                    (_encode(state), now, now, monitor, identifier)
+                )
+            else:
+                self.conn.execute(
+                    """UPDATE status_latest SET last_checked = ?, checks = checks + 1
+                    WHERE monitor = ? AND identifier = ?""",
+                    (now, monitor, identifier)
+                )
+
+        return changes
+
+    def _rows(self, sql: str, params: Tuple = ()) -> List[Dict[str, Any]]:
+        rows = []
+        for row in self.conn.execute(sql, params):
+            row = dict(row)
+            for key in ('old_value', 'new_value'):
+                if key in row:
+                    row[key] = json.loads(row[key]) if row[key] is not None else None
+            rows.append(row)
+        return rows
+
+    def transitions(
+        self,
+        monitor: Optional[str] = None,
+        identifier: Optional[str] = None,
+        field: Optional[str] = None,
+        limit: int = 20,
+        identifier_like: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        最近的狀態變更（新到舊）
+
+        Args:
+            monitor: 只查詢此監控器
+            identifier: 只查詢此識別符
+            field: 只查詢此欄位（例如 'status'）
+            limit: 回傳筆數上限
+            identifier_like: identifier 以部分字串比對（例如 'TalTech'）
+
+        Returns:
+            變更清單（monitor、identifier、field、old_value、new_value、changed_at）
+        """
+        sql = 'SELECT * FROM status_changes WHERE 1 = 1'
+        params: List[Any] = []
+        if monitor:
+            sql += ' AND monitor = ?'
+            params.append(monitor)
+        if identifier:
+            sql += ' AND identifier LIKE ?' if identifier_like else ' AND identifier = ?'
+            params.append(f'%{identifier}%' if identifier_like else identifier)
+        if field:
+            sql += ' AND field = ?'
+            params.append(field)
+        sql += ' ORDER BY changed_at DESC, id DESC LIMIT ?'
+        params.append(limit)
+        return self._rows(sql, tuple(params))
+
+    def changed_to(
+        self,
+        field: str,
+        value: Any,
+        identifier: Optional[str] = None,
+        monitor: Optional[str] = None,
+        identifier_like: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        某欄位變成指定值的時間（新到舊），例如 changed_to('status', 'open', 'TalTech', identifier_like=True)
+
+        Args:
+            field: 欄位名稱
+            value: 目標值
+            identifier: 識別符
+            monitor: 監控器名稱
+            identifier_like: identifier 以部分字串比對
+
+        Returns:
+            變更清單；第一筆為最近一次
+        """
+        sql = 'SELECT * FROM status_changes WHERE field = ? AND new_value = ?'
+        params: List[Any] = [field, _encode(value)]
+        if monitor:
+            sql += ' AND monitor = ?'
+            params.append(monitor)
+        if identifier:
+            sql += ' AND identifier LIKE ?' if identifier_like else ' AND identifier = ?'
+            params.append(f'%{identifier}%' if identifier_like else identifier)
+        return self._rows(sql + ' ORDER BY changed_at DESC, id DESC', tuple(params))
+
+    def state_at(self, monitor: str, identifier: str, when: str) -> Optional[Dict[str, Any]]:
+        """
+        由差異重建某時間點的狀態
+
+        Args:
+            monitor: 監控器名稱
+            identifier: 識別符
+            when: 時間點（ISO 格式）
+
+        Returns:
+            當時的狀態；當時尚無紀錄則回傳 None
+        """
+        rows = self.conn.execute(
+            """SELECT field, new_value FROM status_changes
+            WHERE monitor = ? AND identifier = ? AND changed_at <= ? ORDER BY changed_at, id""",
+            (monitor, identifier, when)
+        ).fetchall()
+        if not rows:
+            return None
+
+        state: Dict[str, Any] = {}
+        for row in rows:
+            if row['new_value'] is None:
+                state.pop(row['field'], None)
+            else:
+                state[row['field']] = json.loads(row['new_value'])
+        return state
+
+    def summary(self, monitor: Optional[str] = None) -> List[Dict[str, Any]]:
+        """每個目標的最新狀態摘要（輪詢次數、變更次數、最後變更時間）"""
+        sql = 'SELECT monitor, identifier, first_seen, last_checked, last_changed, checks, changes FROM status_latest'
+        params: Tuple = ()
+        if monitor:
+            sql += ' WHERE monitor = ?'
+            params = (monitor,)
+        return self._rows(sql + ' ORDER BY last_changed DESC', params)
+
+
+def main():
+    """主函式"""
+    parser = argparse.ArgumentParser(description='查詢監控狀態歷史')
+    parser.add_argument('--identifier', help='學校或平台名稱（部分字串比對，例如 TalTech）')
+    parser.add_argument('--monitor', help='監控器名稱（例如 ApplicationOpeningMonitor）')
+    parser.add_argument('--field', help='欄位名稱（例如 status）')
+    parser.add_argument('--value', help='搭配 --field：查詢欄位何時變成此值（例如 open）')
+    parser.add_argument('--limit', type=int, default=20, help='最近 N 次變更')
+    parser.add_argument('--summary', action='store_true', help='列出所有目標的摘要')
+    args = parser.parse_args()
+
+    store = StatusStore()
+
+    if args.summary:
+        for row in store.summary(args.monitor):
+            print(f"{row['monitor']:28} {row['identifier'][:40]:40} "
+                  f"輪詢 {row['checks']:4} 次，變更 {row['changes']:3} 次，最後變更 {row['last_changed']}")
+        return
+
+    if args.value is not None:
+        if not args.field:
+            print("❌ --value 需要搭配 --field")
+            sys.exit(2)
+        rows = store.changed_to(args.field, args.value, args.identifier, args.monitor, identifier_like=True)
+        if not rows:
+            print(f"沒有 {args.field} 變成 {args.value!r} 的紀錄")
+        for row in rows:
+            print(f"{row['changed_at']}  {row['identifier']}: {args.field} "
+                  f"{row['old_value']!r} → {row['new_value']!r}")
+        return
+
+    for row in store.transitions(args.monitor, args.identifier, args.field, args.limit, identifier_like=True):
+        print(f"{row['changed_at']}  [{row['monitor']}] {row['identifier']}: {row['field']} "
+              f"{row['old_value']!r} → {row['new_value']!r}")
+
+
+if __name__ == '__main__':
+    main()
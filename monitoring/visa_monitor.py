@@ -4,13 +4,12 @@ Visa and Immigration Information Monitor
 
 功能：
 - 監控各國簽證資訊頁面變更
-- 使用 hash 值偵測頁面內容變化
+- 依標題切分頁面段落，以段落指紋偵測內容變化並回報變更的文字
 - 簽證預約系統名額監控（進階）
 - 自動通知頁面更新
 """
 
 import asyncio
-import hashlib
 import os
 import sys
 import yaml
@@ -19,10 +18,14 @@ import logging
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Any, Optional
-from playwright.async_api import async_playwright, Browser, Page
+from urllib.parse import urlparse
+from playwright.async_api import Page
 
 sys.path.append(str(Path(__file__).parent.parent))
 from monitoring.base_monitor import BaseMonitor
+from monitoring.page_sections import SECTION_EXTRACT_JS, SectionSnapshotStore
+from monitoring.appointment_watcher import classify_availability
+from crawling.readiness import ReadyCondition
 
 # 設定日誌
 logging.basicConfig(
@@ -34,14 +37,17 @@ logging.basicConfig(
 class VisaMonitor(BaseMonitor):
     """簽證資訊監控器"""
     
+    # 頁面就緒條件：主要文字內容穩定
+    PAGE_READY = ReadyCondition(text_stable=True, stable_ms=500)
+    
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         """初始化監控器"""
         super().__init__(config)
         self.visa_file = 'source_data/visa_requirements.yml'
-        self.hash_storage_dir = Path('reports/status_history/visa_hashes')
-        self.hash_storage_dir.mkdir(parents=True, exist_ok=True)
-        self.playwright = None
-        self.browser: Optional[Browser] = None
+        self.section_store = SectionSnapshotStore(
+            Path('reports/status_history/visa_hashes'),
+            noise_threshold=self.config.get('noise_threshold', 3)
+        )
     
     def load_visa_data(self) -> Dict[str, Any]:
         """載入簽證資料"""
@@ -66,135 +72,48 @@ class VisaMonitor(BaseMonitor):
             self.logger.error(f"儲存簽證資料失敗: {e}")
             return False
     
-    def calculate_page_hash(self, content: str, method: str = 'content') -> str:
-        """
-        計算頁面內容的 hash 值
-        
-        Args:
-            content: 頁面內容
-            method: hash 方法 ('content' 或 'structure')
-            
-        Returns:
-            SHA256 hash 值
-        """
-        if method == 'structure':
-            # 移除空白字元和換行，只保留結構
-            content = ''.join(content.split())
-        
-        # 計算 SHA256
-        hash_value = hashlib.sha256(content.encode('utf-8')).hexdigest()
-        return hash_value
-    
-    def load_saved_hash(self, country_name: str) -> Optional[Dict[str, Any]]:
+    async def fetch_page_sections(self, page: Page, url: str) -> Optional[List[Dict[str, Any]]]:
         """
-        載入已儲存的 hash 值
-        
-        Args:
-            country_name: 國家名稱
-            
-        Returns:
-            Hash 資料
-        """
-        hash_file = self.hash_storage_dir / f"{country_name.replace(' ', '_')}_hash.json"
-        if hash_file.exists():
-            try:
-                with open(hash_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                self.logger.error(f"載入 hash 失敗 ({country_name}): {e}")
-        return None
-    
-    def save_hash(self, country_name: str, hash_data: Dict[str, Any]) -> bool:
-        """
-        儲存 hash 值
-        
-        Args:
-            country_name: 國家名稱
-            hash_data: Hash 資料
-            
-        Returns:
-            是否成功
-        """
-        hash_file = self.hash_storage_dir / f"{country_name.replace(' ', '_')}_hash.json"
-        try:
-            with open(hash_file, 'w', encoding='utf-8') as f:
-                json.dump(hash_data, f, ensure_ascii=False, indent=2)
-            return True
-        except Exception as e:
-            self.logger.error(f"儲存 hash 失敗 ({country_name}): {e}")
-            return False
-    
-    async def fetch_page_content(self, page: Page, url: str) -> Optional[str]:
-        """
-        抓取頁面內容
+        抓取頁面並依標題切分可見文字
         
         Args:
             page: Playwright Page 物件
             url: 目標 URL
             
         Returns:
-            頁面內容
+            段落清單（heading、path、text）；失敗時回傳 None
         """
         try:
             self.logger.info(f"正在訪問: {url}")
             
             # 訪問頁面
-            response = await page.goto(url, timeout=30000, wait_until='networkidle')
+            response, _ = await self.readiness.goto(
+                page, url, f"visa_{urlparse(url).netloc}", self.PAGE_READY
+            )
             
             if not response or response.status != 200:
                 self.logger.warning(f"頁面回應異常: {response.status if response else 'No response'}")
                 return None
             
-            # 等待頁面完全載入
-            await page.wait_for_timeout(3000)
-            
-            # 取得頁面內容
-            content = await page.content()
+            # 在瀏覽器內一次切分所有段落
+            sections = await page.evaluate(SECTION_EXTRACT_JS)
             
-            self.logger.info(f"✅ 成功抓取頁面 ({len(content)} 字元)")
-            return content
+            self.logger.info(f"✅ 成功抓取頁面 ({len(sections)} 個段落)")
+            return sections
         
         except Exception as e:
             self.logger.error(f"抓取頁面失敗 ({url}): {e}")
             return None
     
-    def extract_relevant_content(self, html_content: str) -> str:
-        """
-        從 HTML 中提取相關內容（移除不重要的變動部分）
-        
-        Args:
-            html_content: HTML 內容
-            
-        Returns:
-            處理後的內容
-        """
-        # 移除常見的動態內容
-        import re
-        
-        # 移除 script 和 style 標籤
-        content = re.sub(r'<script[^>]*>.*?</script>', '', html_content, flags=re.DOTALL)
-        content = re.sub(r'<style[^>]*>.*?</style>', '', content, flags=re.DOTALL)
-        
-        # 移除註解
-        content = re.sub(r'<!--.*?-->', '', content, flags=re.DOTALL)
-        
-        # 移除常見的動態元素
-        # 時間戳記、session ID 等
-        content = re.sub(r'\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}', 'TIMESTAMP', content)
-        content = re.sub(r'session_id=[^&\s"\']+', 'session_id=SESSION', content)
-        content = re.sub(r'csrf_token=[^&\s"\']+', 'csrf_token=TOKEN', content)
-        
-        return content
-    
     async def check_page_changes(self, country_data: Dict[str, Any]) -> Dict[str, Any]:
         """
-        檢查單一國家的頁面變更
+        檢查單一國家的頁面變更（段落層級）
         
         Args:
-            country_data: 國家資料
+            country_data: 國家資料（可用 ignore_sections 列出要忽略的段落標題）
             
         Returns:
-            檢查結果
+            檢查結果（changes 為有變更的段落與變更的文字）
         """
         country_name = country_data.get('name')
         info_url = country_data.get('information_page_url')
@@ -212,53 +131,36 @@ class VisaMonitor(BaseMonitor):
         
         try:
             # 建立頁面
-            context = await self.browser.new_context(
-                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            )
+            context = await self.new_context(self.browser, 'visa_information')
             page = await context.new_page()
             
-            # 抓取頁面內容
-            html_content = await self.fetch_page_content(page, info_url)
+            # 抓取段落
+            raw_sections = await self.fetch_page_sections(page, info_url)
+            await context.close()
             
-            if not html_content:
+            if not raw_sections:
                 result['error'] = 'Failed to fetch page'
-                await context.close()
                 return result
             
-            # 提取相關內容
-            relevant_content = self.extract_relevant_content(html_content)
-            
-            # 計算 hash
-            new_hash = self.calculate_page_hash(relevant_content, method='content')
+            # 與上次快照比對（只儲存有變更的段落）
+            comparison = self.section_store.compare(
+                country_name, info_url, raw_sections, country_data.get('ignore_sections', [])
+            )
+            result['sections'] = comparison['sections']
             
-            # 載入舊 hash
-            old_hash_data = self.load_saved_hash(country_name)
+            if comparison['noisy']:
+                self.logger.info(f"略過 {len(comparison['noisy'])} 個經常變動的段落: {country_name}")
+                result['noisy_sections'] = comparison['noisy']
             
-            if old_hash_data:
-                old_hash = old_hash_data.get('hash')
-                
-                if old_hash != new_hash:
-                    self.logger.info(f"⚠️ 偵測到變更: {country_name}")
-                    result['changed'] = True
-                    result['old_hash'] = old_hash
-                    result['new_hash'] = new_hash
-                    result['last_checked'] = old_hash_data.get('checked_at')
-                else:
-                    self.logger.info(f"✅ 無變更: {country_name}")
-            else:
-                self.logger.info(f"📝 首次檢查: {country_name}")
+            if comparison['first_check']:
+                self.logger.info(f"📝 首次檢查: {country_name}（{comparison['sections']} 個段落）")
                 result['first_check'] = True
-            
-            # 儲存新 hash
-            hash_data = {
-                'hash': new_hash,
-                'checked_at': datetime.now().isoformat(),
-                'url': info_url
-            }
-            self.save_hash(country_name, hash_data)
-            
-            # 關閉頁面
-            await context.close()
+            elif comparison['changes']:
+                self.logger.info(f"⚠️ 偵測到變更: {country_name}（{len(comparison['changes'])} 個段落）")
+                result['changed'] = True
+                result['changes'] = comparison['changes']
+            else:
+                self.logger.info(f"✅ 無變更: {country_name}")
             
             return result
         
@@ -287,39 +189,17 @@ class VisaMonitor(BaseMonitor):
         try:
             self.logger.info(f"檢查預約名額: {country_name}")
             
-            context = await self.browser.new_context(
-                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            )
+            context = await self.new_context(self.browser, 'visa_information')
             page = await context.new_page()
             
             # 訪問預約頁面
-            await page.goto(appointment_url, timeout=30000)
-            await page.wait_for_timeout(3000)
-            
-            # 嘗試偵測可用名額的關鍵字
-            content = await page.content()
-            
-            availability_keywords = {
-                'available': ['available', 'slots available', 'book now', '可預約', '有名額'],
-                'unavailable': ['no appointments', 'fully booked', 'not available', '無名額', '已額滿']
-            }
-            
-            has_availability = False
-            status = 'unknown'
-            
-            content_lower = content.lower()
-            
-            for keyword in availability_keywords['available']:
-                if keyword in content_lower:
-                    has_availability = True
-                    status = 'available'
-                    break
+            await self.readiness.goto(
+                page, appointment_url, f"visa_appointment_{urlparse(appointment_url).netloc}", self.PAGE_READY
+            )
             
-            if not has_availability:
-                for keyword in availability_keywords['unavailable']:
-                    if keyword in content_lower:
-                        status = 'unavailable'
-                        break
+            # 偵測可用名額的關鍵字（與預約監看共用）
+            status = classify_availability(await page.content())
+            has_availability = status == 'available'
             
             result = {
                 'country': country_name,
@@ -354,9 +234,12 @@ class VisaMonitor(BaseMonitor):
                 self.logger.warning("沒有國家資料")
                 return False
             
-            # 啟動 Playwright
-            self.playwright = await async_playwright().start()
-            self.browser = await self.playwright.chromium.launch(headless=True)
+            if not any(c.get('monitor_enabled', False) and self.poll_due(c.get('name')) for c in countries):
+                self.logger.info("沒有到期的國家，略過本次檢查")
+                return True
+            
+            # 啟動瀏覽器（由 MonitorRunner 執行時使用共用瀏覽器）
+            await self.launch_browser()
             
             results = {
                 'timestamp': datetime.now().isoformat(),
@@ -366,6 +249,7 @@ class VisaMonitor(BaseMonitor):
             }
             
             # 檢查每個國家
+            last_host = None
             for country in countries:
                 country_name = country.get('name')
                 
@@ -374,6 +258,17 @@ class VisaMonitor(BaseMonitor):
                     self.logger.info(f"⏭️  跳過 {country_name}（監控未啟用）")
                     continue
                 
+                # 檢查是否到期
+                if not self.poll_due(country_name):
+                    self.logger.info(f"⏭️  跳過 {country_name}（尚未到期）")
+                    continue
+                
+                # 只在連續造訪同一網站時間隔，避免過度頻繁的請求
+                host = urlparse(country.get('information_page_url') or '').netloc
+                if host and host == last_host:
+                    await asyncio.sleep(5)
+                last_host = host
+                
                 # 檢查頁面變更
                 change_result = await self.check_page_changes(country)
                 results['countries'].append(change_result)
@@ -386,6 +281,15 @@ class VisaMonitor(BaseMonitor):
                         'type': 'visa_info_change',
                         'country': country_name,
                         'url': change_result.get('url'),
+                        'changes': [
+                            {
+                                'section': change['section'],
+                                'type': change['type'],
+                                'added': change['added'][:5],
+                                'removed': change['removed'][:5]
+                            }
+                            for change in change_result.get('changes', [])
+                        ],
                         'timestamp': datetime.now().isoformat()
                     })
                     
@@ -408,15 +312,19 @@ class VisaMonitor(BaseMonitor):
                                 'timestamp': datetime.now().isoformat()
                             })
                 
-                # 避免過度頻繁的請求
-                await asyncio.sleep(5)
+                # 排定下次檢查：長期未變更的頁面放寬間隔，錯誤時退避
+                self.record_poll(
+                    country_name,
+                    changed=bool(change_result.get('changed')),
+                    error='error' in change_result
+                )
             
             # 儲存更新的簽證資料
             self.save_visa_data(visa_data)
+            self.log_resource_summary()
             
             # 關閉瀏覽器
-            await self.browser.close()
-            await self.playwright.stop()
+            await self.close_browser()
             
             # 生成報告
             self.generate_report(results)
@@ -432,16 +340,7 @@ class VisaMonitor(BaseMonitor):
             self.logger.error(f"監控執行失敗: {e}")
             
             # 清理資源
-            if self.browser:
-                try:
-                    await self.browser.close()
-                except:
-                    pass
-            if self.playwright:
-                try:
-                    await self.playwright.stop()
-                except:
-                    pass
+            await self.close_browser()
             
             return False
     
@@ -493,7 +392,17 @@ class VisaMonitor(BaseMonitor):
                         markdown += f"### {country_result['country']}\n\n"
                         markdown += f"- **URL**: {country_result['url']}\n"
                         markdown += f"- **檢查時間**: {country_result['checked_at']}\n"
-                        markdown += f"- **狀態**: 內容已變更\n\n"
+                        markdown += f"- **變更段落數**: {len(country_result.get('changes', []))}\n\n"
+                        
+                        for change in country_result.get('changes', []):
+                            label = {'added': '新增', 'removed': '移除', 'modified': '修改'}.get(change['type'], change['type'])
+                            markdown += f"#### {change['section']}（{label}）\n\n"
+                            markdown += "```diff\n"
+                            for line in change['removed']:
+                                markdown += f"- {line}\n"
+                            for line in change['added']:
+                                markdown += f"+ {line}\n"
+                            markdown += "```\n\n"
                         
                         if 'appointment' in country_result:
                             app = country_result['appointment']
@@ -529,7 +438,7 @@ def main():
     if success:
         print("\n✅ 監控完成")
         print("📄 報告已儲存至: reports/monitoring_reports/")
-        print("🔍 Hash 值已儲存至: reports/status_history/visa_hashes/")
+        print("🔍 段落快照已儲存至: reports/status_history/visa_hashes/")
     else:
         print("\n❌ 監控失敗")
         sys.exit(1)
@@ -180,6 +180,13 @@ class NotificationCenter:
                 'monitor_ielts_gaps': True,
                 'monitor_budget_overruns': True,
                 'monitor_missing_documents': True
+            },
+            'monitor_events': {
+                'enabled': True,
+                'email': True,
+                'github': True,
+                'github_event_types': ['visa_appointment_available'],
+                'labels': ['monitor-event', 'auto-generated']
             }
         }
         
@@ -526,6 +533,52 @@ class NotificationCenter:
         
         return summary
     
+    def format_event(self, event: Dict[str, Any]) -> str:
+        """One-line description of a monitor event"""
+        sys.path.insert(0, str(Path(__file__).parent))
+        from event_bus import describe_event
+        return describe_event(event)
+    
+    def dispatch_events(self, events: List[Dict[str, Any]]) -> bool:
+        """
+        Deliver a batch of monitor events (called by notifications/event_bus.py)
+        
+        Sends one summary email per batch and one GitHub issue per batch for
+        event types listed in monitor_events.github_event_types.
+        
+        Returns:
+            True when every enabled channel accepted the batch
+        """
+        settings = self.notification_settings['monitor_events']
+        if not settings['enabled'] or not events:
+            return True
+        
+        lines = [self.format_event(event) for event in events]
+        high_priority = any(event['priority'] == 'high' for event in events)
+        prefix = '🚨' if high_priority else '📋'
+        subject = f"{prefix} Monitor update - {len(events)} event(s)"
+        body = "\n".join(
+            ["Monitor Events", "=" * 40, "", f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", ""] +
+            [f"• [{event['created_at'][:16]}] {line}" for event, line in zip(events, lines)]
+        )
+        print(f"[EVENTS] {subject}")
+        
+        delivered = True
+        email_config = self.notification_settings['email_notifications']
+        if settings['email'] and email_config['enabled']:
+            delivered = self.send_email_notification(subject, body) and delivered
+        
+        issue_events = [e for e in events if e['event_type'] in settings['github_event_types']]
+        if (settings['github'] and issue_events and self.github.token
+                and self.notification_settings['github_integration']['enabled']):
+            title = f"{prefix} {self.format_event(issue_events[0])}"
+            if len(issue_events) > 1:
+                title += f" (+{len(issue_events) - 1} more)"
+            labels = settings['labels'] + sorted({e['event_type'].replace('_', '-') for e in issue_events})
+            delivered = self.github.create_issue(title[:250], body, labels) is not None and delivered
+        
+        return delivered
+    
     def generate_alert_summary(self, alerts: List[Dict[str, Any]]) -> str:
         """Generate human-readable alert summary"""
         lines = [
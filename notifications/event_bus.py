@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+Monitor Event Bus with a Durable Spool
+
+Features:
+- Monitors publish typed events without waiting on SMTP / GitHub latency
+- Every event is written to a local SQLite spool first, so events survive crashes
+  and undelivered events are retried on the next run
+- An async consumer batches pending events, suppresses duplicates and hands each
+  batch to NotificationCenter in a worker thread
+
+Usage:
+    python notifications/event_bus.py --drain    # deliver pending events (CI step)
+    python notifications/event_bus.py --stats    # spool summary
+"""
+
+import sys
+import json
+import asyncio
+import hashlib
+import sqlite3
+import logging
+import argparse
+from pathlib import Path
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional, Callable
+
+
+DEFAULT_SPOOL_FILE = Path('reports/status_history/event_spool.db')
+
+# Known event types: delivery priority and how long an identical event is suppressed
+EVENT_TYPES = {
+    'application_status_change': {'priority': 'normal', 'suppress_hours': 24},
+    'visa_info_change': {'priority': 'normal', 'suppress_hours': 24},
+    'visa_appointment_available': {'priority': 'high', 'suppress_hours': 1},
+}
+DEFAULT_EVENT_TYPE = {'priority': 'normal', 'suppress_hours': 24}
+
+# Fields that change on every poll and must not affect duplicate detection
+VOLATILE_KEYS = {'timestamp', 'checked_at', 'last_checked', 'last_updated'}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    event_type TEXT NOT NULL,
+    dedup_key TEXT NOT NULL,
+    priority TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    source TEXT,
+    created_at TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at TEXT NOT NULL,
+    delivered_at TEXT,
+    outcome TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_events_pending ON events(delivered_at, next_attempt_at);
+CREATE INDEX IF NOT EXISTS idx_events_dedup ON events(dedup_key, delivered_at);
+"""
+
+
+def _strip_volatile(value: Any) -> Any:
+    """Drop volatile keys at any depth"""
+    if isinstance(value, dict):
+        return {k: _strip_volatile(v) for k, v in value.items() if k not in VOLATILE_KEYS}
+    if isinstance(value, list):
+        return [_strip_volatile(v) for v in value]
+    return value
+
+
+def event_fingerprint(event_type: str, payload: Dict[str, Any]) -> str:
+    """Stable key for duplicate detection (ignores timestamps)"""
+    encoded = json.dumps(_strip_volatile(payload), ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(f"{event_type}:{encoded}".encode('utf-8')).hexdigest()[:24]
+
+
+def describe_event(event: Dict[str, Any]) -> str:
+    """One-line description of a monitor event"""
+    payload = event['payload']
+    event_type = event['event_type']
+
+    if event_type == 'application_status_change':
+        if 'school' in payload:
+            return (f"{payload['school']}: application status {payload.get('old_status', 'unknown')} "
+                    f"→ {payload.get('new_status', 'unknown')} {payload.get('url', '')}").strip()
+        applications = payload.get('applications') or payload.get('new_status') or []
+        statuses = ', '.join(
+            f"{app.get('program', app.get('school', '?'))}: {app.get('status', '?')}"
+            for app in applications if isinstance(app, dict)
+        )
+        return f"{payload.get('platform', 'Portal')}: application status changed ({statuses or 'see portal'})"
+
+    if event_type == 'visa_info_change':
+        sections = ', '.join(change.get('section', '') for change in payload.get('changes', []))
+        return f"{payload.get('country', '?')}: visa information changed ({sections or 'page'}) {payload.get('url', '')}".strip()
+
+    if event_type == 'visa_appointment_available':
+        slot = f" {payload['earliest_slot']}" if payload.get('earliest_slot') else ''
+        return f"{payload.get('country', '?')}: visa appointment available{slot} {payload.get('url', '')}".strip()
+
+    return f"{event_type}: {json.dumps(payload, ensure_ascii=False, default=str)[:200]}"
+
+
+class EventSpool:
+    """SQLite-backed queue of monitor events"""
+
+    def __init__(self, db_file: Optional[Path] = None):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.db_file = Path(db_file or DEFAULT_SPOOL_FILE)
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_file))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def append(self, event_type: str, payload: Dict[str, Any], source: Optional[str] = None,
+               dedup_key: Optional[str] = None) -> int:
+        """Persist an event and return its id"""
+        now = datetime.now().isoformat()
+        cursor = self.conn.execute(
+            "INSERT INTO events (event_type, dedup_key, priority, payload, source, created_at, next_attempt_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                event_type,
+                dedup_key or event_fingerprint(event_type, payload),
+                EVENT_TYPES.get(event_type, DEFAULT_EVENT_TYPE)['priority'],
+                json.dumps(payload, ensure_ascii=False, default=str),
+                source,
+                now,
+                now
+            )
+        )
+        self.conn.commit()
+        return cursor.lastrowid
+
+    def pending(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Undelivered events whose retry time has come, high priority first"""
+        rows = self.conn.execute(
+            "SELECT * FROM events WHERE delivered_at IS NULL AND next_attempt_at <= ? "
+            "ORDER BY priority = 'high' DESC, id LIMIT ?",
+            (datetime.now().isoformat(), limit)
+        ).fetchall()
+        return [{**dict(row), 'payload': json.loads(row['payload'])} for row in rows]
+
+    def recently_delivered(self, dedup_key: str, since: datetime) -> bool:
+        """Whether an identical event was already delivered after `since`"""
+        row = self.conn.execute(
+            "SELECT 1 FROM events WHERE dedup_key = ? AND outcome = 'sent' AND delivered_at >= ? LIMIT 1",
+            (dedup_key, since.isoformat())
+        ).fetchone()
+        return row is not None
+
+    def mark_delivered(self, ids: List[int], outcome: str = 'sent') -> None:
+        if not ids:
+            return
+        now = datetime.now().isoformat()
+        self.conn.executemany(
+            "UPDATE events SET delivered_at = ?, outcome = ? WHERE id = ?",
+            [(now, outcome, event_id) for event_id in ids]
+        )
+        self.conn.commit()
+
+    def mark_failed(self, ids: List[int], error: str, max_attempts: int = 5) -> None:
+        """Schedule a retry with exponential backoff; give up after max_attempts"""
+        now = datetime.now()
+        for event_id in ids:
+            row = self.conn.execute("SELECT attempts FROM events WHERE id = ?", (event_id,)).fetchone()
+            attempts = (row['attempts'] if row else 0) + 1
+            if attempts >= max_attempts:
+                self.conn.execute(
+                    "UPDATE events SET attempts = ?, delivered_at = ?, outcome = ? WHERE id = ?",
+                    (attempts, now.isoformat(), f"failed: {error}"[:500], event_id)
+                )
+            else:
+                retry_at = now + timedelta(minutes=2 ** attempts)
+                self.conn.execute(
+                    "UPDATE events SET attempts = ?, next_attempt_at = ?, outcome = ? WHERE id = ?",
+                    (attempts, retry_at.isoformat(), f"retry: {error}"[:500], event_id)
+                )
+        self.conn.commit()
+
+    def purge(self, keep_days: int = 30) -> int:
+        """Delete delivered events older than keep_days"""
+        cutoff = (datetime.now() - timedelta(days=keep_days)).isoformat()
+        cursor = self.conn.execute("DELETE FROM events WHERE delivered_at IS NOT NULL AND delivered_at < ?", (cutoff,))
+        self.conn.commit()
+        return cursor.rowcount
+
+    def since(self, last_id: int, limit: int = 100) -> List[Dict[str, Any]]:
+        """Events appended after last_id, oldest first (used by live viewers)"""
+        rows = self.conn.execute(
+            "SELECT * FROM events WHERE id > ? ORDER BY id LIMIT ?", (last_id, limit)
+        ).fetchall()
+        return [{**dict(row), 'payload': json.loads(row['payload'])} for row in rows]
+
+    def last_id(self) -> int:
+        row = self.conn.execute("SELECT MAX(id) FROM events").fetchone()
+        return row[0] or 0
+
+    def stats(self) -> Dict[str, Any]:
+        rows = self.conn.execute(
+            "SELECT event_type, COALESCE(outcome, 'pending') AS state, COUNT(*) AS n "
+            "FROM events GROUP BY event_type, state"
+        ).fetchall()
+        summary: Dict[str, Dict[str, int]] = {}
+        for row in rows:
+            state = row['state'].split(':')[0]
+            summary.setdefault(row['event_type'], {})
+            summary[row['event_type']][state] = summary[row['event_type']].get(state, 0) + row['n']
+        return summary
+
+
+class EventBus:
+    """In-process publisher / batching consumer on top of EventSpool"""
+
+    def __init__(
+        self,
+        spool_file: Optional[Path] = None,
+        handler: Optional[Callable[[List[Dict[str, Any]]], bool]] = None,
+        batch_size: int = 50,
+        batch_window: float = 5.0,
+        max_attempts: int = 5
+    ):
+        """
+        Args:
+            spool_file: SQLite spool location
+            handler: callable receiving a batch of events, returns True when delivered
+                     (default: NotificationCenter.dispatch_events, created on first use)
+            batch_size: maximum events per dispatch
+            batch_window: seconds to wait for more events before dispatching a normal-priority batch
+            max_attempts: delivery attempts before an event is given up
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.spool_file = spool_file
+        self._spool: Optional[EventSpool] = None
+        self.handler = handler
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.max_attempts = max_attempts
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stop_event: Optional[asyncio.Event] = None
+        self._consumer: Optional[asyncio.Task] = None
+
+    @property
+    def spool(self) -> EventSpool:
+        if self._spool is None:
+            self._spool = EventSpool(self.spool_file)
+        return self._spool
+
+    def publish(self, event_type: str, payload: Dict[str, Any], source: Optional[str] = None) -> Optional[int]:
+        """
+        Persist an event and wake the consumer; never blocks on delivery and never raises
+
+        Returns:
+            Event id, or None when the spool could not be written
+        """
+        try:
+            event_id = self.spool.append(event_type, payload, source=source)
+        except Exception as e:
+            self.logger.error(f"Failed to spool {event_type} event: {e}")
+            return None
+        if self._wakeup is not None:
+            self._wakeup.set()
+        self.logger.info(f"Queued {event_type} event #{event_id}")
+        return event_id
+
+    def _default_handler(self, events: List[Dict[str, Any]]) -> bool:
+        if self.handler is None:
+            sys.path.insert(0, str(Path(__file__).parent))
+            from alert_system import NotificationCenter
+            self.handler = NotificationCenter().dispatch_events
+        return self.handler(events)
+
+    async def drain(self) -> int:
+        """
+        Deliver all currently due events in batches
+
+        Returns:
+            Number of events handled (sent or suppressed)
+        """
+        handled = 0
+        while True:
+            events = self.spool.pending(self.batch_size)
+            if not events:
+                return handled
+
+            batch, suppressed, seen = [], [], set()
+            for event in events:
+                suppress_hours = EVENT_TYPES.get(event['event_type'], DEFAULT_EVENT_TYPE)['suppress_hours']
+                since = datetime.now() - timedelta(hours=suppress_hours)
+                if event['dedup_key'] in seen or self.spool.recently_delivered(event['dedup_key'], since):
+                    suppressed.append(event['id'])
+                else:
+                    seen.add(event['dedup_key'])
+                    batch.append(event)
+
+            self.spool.mark_delivered(suppressed, outcome='suppressed')
+            if suppressed:
+                self.logger.info(f"Suppressed {len(suppressed)} duplicate event(s)")
+
+            if batch:
+                ids = [event['id'] for event in batch]
+                try:
+                    delivered = await asyncio.to_thread(self._default_handler, batch)
+                    error = 'handler reported failure'
+                except Exception as e:
+                    delivered, error = False, str(e)
+                if delivered:
+                    self.spool.mark_delivered(ids)
+                    self.logger.info(f"Dispatched {len(batch)} event(s)")
+                else:
+                    self.spool.mark_failed(ids, error, self.max_attempts)
+                    self.logger.warning(f"Dispatch failed, will retry: {error}")
+                    return handled + len(suppressed)
+            handled += len(suppressed) + len(batch)
+
+    async def _consume(self) -> None:
+        while not self._stop_event.is_set():
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            # Give bursts from parallel monitors a moment to land in the same batch
+            pending = self.spool.pending(self.batch_size)
+            if pending and not any(event['priority'] == 'high' for event in pending):
+                try:
+                    await asyncio.wait_for(self._stop_event.wait(), timeout=self.batch_window)
+                except asyncio.TimeoutError:
+                    pass
+            try:
+                await self.drain()
+            except Exception as e:
+                self.logger.error(f"Event consumer error: {e}")
+
+    async def start(self) -> None:
+        """Start the background consumer (events already in the spool are delivered too)"""
+        if self._consumer is not None:
+            return
+        self._stop_event = asyncio.Event()
+        self._wakeup = asyncio.Event()
+        self._wakeup.set()
+        self._consumer = asyncio.create_task(self._consume())
+
+    async def stop(self, timeout: float = 60.0) -> None:
+        """Stop the consumer and make a final bounded delivery attempt"""
+        if self._consumer is None:
+            return
+        self._stop_event.set()
+        self._wakeup.set()
+        try:
+            await asyncio.wait_for(self._consumer, timeout=timeout)
+            await asyncio.wait_for(self.drain(), timeout=timeout)
+        except asyncio.TimeoutError:
+            self.logger.warning("Event delivery timed out; remaining events stay in the spool")
+        except Exception as e:
+            self.logger.error(f"Event delivery failed on shutdown: {e}")
+        finally:
+            self._consumer = None
+            self._wakeup = None
+
+
+_default_bus: Optional[EventBus] = None
+
+
+def get_event_bus() -> EventBus:
+    """Process-wide bus shared by all monitors"""
+    global _default_bus
+    if _default_bus is None:
+        _default_bus = EventBus()
+    return _default_bus
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Deliver or inspect spooled monitor events')
+    parser.add_argument('--drain', action='store_true', help='deliver all pending events')
+    parser.add_argument('--stats', action='store_true', help='show spool summary')
+    parser.add_argument('--spool', type=Path, default=DEFAULT_SPOOL_FILE, help='spool database')
+    parser.add_argument('--keep-days', type=int, default=30, help='purge delivered events older than this')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    bus = EventBus(args.spool)
+
+    if args.drain:
+        handled = asyncio.run(bus.drain())
+        purged = bus.spool.purge(args.keep_days)
+        print(f"[EVENTS] Handled {handled} event(s), purged {purged} old event(s)")
+
+    if args.stats or not args.drain:
+        for event_type, counts in sorted(bus.spool.stats().items()):
+            print(f"{event_type:30} " + ", ".join(f"{state}: {n}" for state, n in sorted(counts.items())))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
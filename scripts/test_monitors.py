@@ -14,6 +14,7 @@ from monitoring.pre_application.check_opening_status import ApplicationOpeningMo
 from monitoring.post_application.check_status_sweden import SwedenApplicationMonitor
 from monitoring.post_application.check_status_dreamapply import DreamApplyMonitor
 from monitoring.post_application.check_status_saarland import SaarlandMonitor
+from monitoring.runner import MonitorRunner, build_monitors
 
 
 def print_header(title: str) -> None:
@@ -99,6 +100,25 @@ def test_saarland_monitor() -> bool:
         return False
 
 
+def test_all_monitors() -> dict:
+    """在單一瀏覽器中並行測試全部監控器"""
+    print_header("並行測試全部監控器")
+    
+    names = {
+        'pre_application': 'Pre-Application',
+        'sweden': 'Sweden',
+        'dreamapply': 'DreamApply',
+        'saarland': 'Saarland',
+    }
+    
+    try:
+        results = MonitorRunner(build_monitors(list(names.keys()))).run()
+        return {names[name]: result['success'] for name, result in results.items()}
+    except Exception as e:
+        print(f"❌ 發生錯誤: {e}")
+        return {label: False for label in names.values()}
+
+
 def main():
     """主函式"""
     print("""
@@ -130,10 +150,7 @@ def main():
         results['Saarland'] = test_saarland_monitor()
     elif choice == '5':
         print("\n🚀 開始測試所有監控器...\n")
-        results['Pre-Application'] = test_pre_application_monitor()
-        results['Sweden'] = test_sweden_monitor()
-        results['DreamApply'] = test_dreamapply_monitor()
-        results['Saarland'] = test_saarland_monitor()
+        results = test_all_monitors()
     elif choice == '0':
         print("退出測試")
         return